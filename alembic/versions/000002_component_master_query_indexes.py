@@ -0,0 +1,31 @@
+"""Component master composite indexes for range queries
+
+Revision ID: 000002
+Revises: 000001
+Create Date: 2026-10-16 00:00:00.000000
+
+Backs the category + power/voltage/price range filters of the component
+query engine.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '000002'
+down_revision: Union[str, Sequence[str], None] = '000001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_component_master_category_power', 'component_master', ['category', 'power'])
+    op.create_index('ix_component_master_category_voltage', 'component_master', ['category', 'voltage'])
+    op.create_index('ix_component_master_category_price', 'component_master', ['category', 'price'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_component_master_category_price', table_name='component_master')
+    op.drop_index('ix_component_master_category_voltage', table_name='component_master')
+    op.drop_index('ix_component_master_category_power', table_name='component_master')
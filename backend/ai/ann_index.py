@@ -0,0 +1,212 @@
+"""
+Approximate nearest-neighbour index for design embeddings.
+==========================================================
+
+``IVFFlatIndex`` keeps all vectors in one contiguous float32 matrix and, once
+enough vectors are stored, partitions them into inverted lists around
+spherical k-means centroids (IVF-Flat).  A query scores the centroids, then
+only the rows in the ``nprobe`` closest lists, so retrieval cost grows with
+roughly ``sqrt(n)`` instead of ``n``.
+
+Similarity is the plain dot product, which equals cosine similarity for the
+L2-normalised embeddings produced by ``GraphEmbeddingEngine``.  Small or
+heavily filtered candidate sets are scored exactly, as is everything while
+the index is below ``train_threshold`` vectors.
+
+Training never happens inside ``search``: writers call ``maybe_train`` after
+adding vectors, and queries against an untrained index fall back to an exact
+scan.  Rows added after training join their nearest existing list.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class IVFFlatIndex:
+    """Append-only inverted-file index with exact re-scoring inside lists."""
+
+    def __init__(
+        self,
+        dim: int,
+        *,
+        nprobe: int = 8,
+        train_threshold: int = 4096,
+        exact_threshold: int = 2048,
+        kmeans_iters: int = 8,
+        max_train_samples: int = 32768,
+        seed: int = 0,
+    ):
+        self.dim = dim
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self.exact_threshold = exact_threshold
+        self.kmeans_iters = kmeans_iters
+        self.max_train_samples = max_train_samples
+        self._rng = np.random.default_rng(seed)
+        self._data = np.zeros((0, dim), dtype=np.float32)
+        self.size = 0
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[np.ndarray] = []
+        self._pending: List[List[int]] = []  # rows added since the lists were last packed
+        self._trained_size = 0
+
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray, **kwargs) -> "IVFFlatIndex":
+        """Index over an existing ``(n, dim)`` float32 matrix without copying it.
+
+        `matrix` may be a read-only memory map; it is copied into a growable
+        buffer on the first ``add``.
+        """
+        index = cls(matrix.shape[1], **kwargs)
+        index._data = matrix
+        index.size = len(matrix)
+        return index
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """View of the stored vectors, one row per id."""
+        return self._data[: self.size]
+
+    # ------------------------------------------------------------------ build
+    def _reserve(self, n: int) -> None:
+        if n <= len(self._data):
+            return
+        capacity = max(n, 2 * len(self._data), 64)
+        grown = np.zeros((capacity, self.dim), dtype=np.float32)
+        grown[: self.size] = self._data[: self.size]
+        self._data = grown
+
+    def add(self, vectors: np.ndarray) -> np.ndarray:
+        """Append vectors (shape ``(dim,)`` or ``(n, dim)``); return their row ids."""
+        batch = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        start = self.size
+        self._reserve(start + len(batch))
+        self._data[start : start + len(batch)] = batch
+        self.size += len(batch)
+        rows = np.arange(start, self.size)
+        if self.centroids is not None:
+            for row, lst in zip(rows, self._assign(batch)):
+                self._pending[lst].append(int(row))
+        return rows
+
+    def _assign(self, x: np.ndarray, chunk: int = 8192) -> np.ndarray:
+        out = np.empty(len(x), dtype=np.int64)
+        for i in range(0, len(x), chunk):
+            out[i : i + chunk] = np.argmax(x[i : i + chunk] @ self.centroids.T, axis=1)
+        return out
+
+    def train(self) -> None:
+        """(Re)partition all stored vectors with spherical k-means."""
+        x = self.vectors
+        nlist = max(1, int(np.sqrt(self.size)))
+        sample = x
+        if self.size > self.max_train_samples:
+            sample = x[self._rng.choice(self.size, self.max_train_samples, replace=False)]
+        centroids = sample[self._rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(self.kmeans_iters):
+            self.centroids = centroids
+            labels = self._assign(sample)
+            counts = np.bincount(labels, minlength=nlist)
+            sums = np.zeros_like(centroids)
+            nonempty = np.flatnonzero(counts)
+            by_label = sample[np.argsort(labels, kind="stable")]
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[nonempty]
+            sums[nonempty] = np.add.reduceat(by_label, starts, axis=0)
+            empty = counts == 0
+            if empty.any():  # re-seed empty lists from random samples
+                sums[empty] = sample[self._rng.choice(len(sample), int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = sums / np.maximum(norms, 1e-12)
+        self.centroids = centroids.astype(np.float32)
+        labels = self._assign(x)
+        order = np.argsort(labels, kind="stable")
+        bounds = np.searchsorted(labels[order], np.arange(nlist + 1))
+        self._lists = [order[bounds[i] : bounds[i + 1]] for i in range(nlist)]
+        self._pending = [[] for _ in range(nlist)]
+        self._trained_size = self.size
+        logger.debug("Trained IVF index: %d vectors in %d lists", self.size, nlist)
+
+    @property
+    def needs_training(self) -> bool:
+        """True once the index is large enough to (re)partition."""
+        if self.size < self.train_threshold:
+            return False
+        return self.centroids is None or self.size > 2 * self._trained_size
+
+    def maybe_train(self) -> bool:
+        """Train if ``needs_training``; return whether it did."""
+        if not self.needs_training:
+            return False
+        self.train()
+        return True
+
+    def _list(self, i: int) -> np.ndarray:
+        if self._pending[i]:
+            self._lists[i] = np.concatenate([self._lists[i], np.asarray(self._pending[i], dtype=np.int64)])
+            self._pending[i] = []
+        return self._lists[i]
+
+    # ----------------------------------------------------------------- search
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        *,
+        candidates: Optional[np.ndarray] = None,
+        min_score: float = -np.inf,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-`k` rows by dot product with `query`, best first.
+
+        `candidates` restricts the search to the given row ids (metadata
+        pre-filter).  Only rows scoring at least `min_score` are returned.
+        """
+        if self.size == 0 or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        q = np.asarray(query, dtype=np.float32).reshape(self.dim)
+
+        n_cand = self.size if candidates is None else len(candidates)
+        if n_cand <= self.exact_threshold or self.centroids is None:
+            rows = np.arange(self.size) if candidates is None else np.asarray(candidates, dtype=np.int64)
+            return self._top_k(rows, self._data[rows] @ q, k, min_score)
+
+        mask = None
+        if candidates is not None:
+            mask = np.zeros(self.size, dtype=bool)
+            mask[candidates] = True
+        order = np.argsort(-(self.centroids @ q))
+        # Widen the probe until k rows pass the threshold or every list is seen
+        probed = 0
+        nprobe = self.nprobe
+        row_parts: List[np.ndarray] = []
+        score_parts: List[np.ndarray] = []
+        hits = 0
+        while probed < len(order):
+            chunk = [self._list(int(i)) for i in order[probed : probed + nprobe]]
+            probed += nprobe
+            rows = np.concatenate(chunk) if chunk else np.empty(0, dtype=np.int64)
+            if mask is not None:
+                rows = rows[mask[rows]]
+            scores = self._data[rows] @ q
+            row_parts.append(rows)
+            score_parts.append(scores)
+            hits += int(np.count_nonzero(scores >= min_score))
+            if hits >= k:
+                break
+            nprobe *= 2
+        return self._top_k(np.concatenate(row_parts), np.concatenate(score_parts), k, min_score)
+
+    @staticmethod
+    def _top_k(rows: np.ndarray, scores: np.ndarray, k: int, min_score: float) -> Tuple[np.ndarray, np.ndarray]:
+        keep = scores >= min_score
+        rows, scores = rows[keep], scores[keep]
+        if len(rows) > k:
+            part = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[part], scores[part]
+        order = np.argsort(-scores, kind="stable")
+        return rows[order], scores[order]
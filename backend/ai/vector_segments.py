@@ -0,0 +1,274 @@
+"""
+Append-only segment files for the design vector store.
+=====================================================
+
+A store directory holds one *generation* of two files plus a manifest:
+
+- ``emb-<gen>.f32``: raw little-endian float32 rows, one per record,
+  memory-mapped on open.
+- ``rec-<gen>.log``: length-prefixed records, each a small JSON metadata
+  document followed by an opaque (zlib-compressed) blob.  Every part carries a
+  CRC32.  Metadata is read on open; blobs are read lazily by offset.
+- ``manifest.json``: ``{"format": 1, "dim": ..., "generation": ...}``.
+
+Appends are buffered and written in batches (embeddings first, then
+records, then fsync).  On open, a torn tail left by a crash mid-flush is
+truncated back to the last record present in both files.  ``compact``
+writes a fresh generation next to the current one and switches over by
+atomically replacing the manifest, so a crash at any point leaves either the
+old or the new generation intact.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<IIII")  # meta_len, blob_len, meta_crc, blob_crc
+
+
+@dataclass
+class RecordRef:
+    """Location of one record; `meta` is its decoded metadata document."""
+    row: int
+    meta: Dict[str, Any]
+    blob_offset: int
+    blob_len: int
+    blob_crc: int
+
+
+def _fsync_dir(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class SegmentStore:
+    """Embedding matrix plus record log for one vector store directory."""
+
+    def __init__(self, root: Path, dim: int, flush_every: int = 64):
+        self.root = Path(root)
+        self.dim = dim
+        self.flush_every = max(1, flush_every)
+        self.generation = 0
+        self.refs: List[RecordRef] = []
+        self._emb: np.ndarray = np.zeros((0, dim), dtype=np.float32)
+        self._rec_size = 0
+        self._pending: List[Tuple[bytes, bytes, np.ndarray]] = []
+        self._pending_blobs: Dict[int, bytes] = {}
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------ files
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / "manifest.json"
+
+    def _emb_path(self, gen: int) -> Path:
+        return self.root / f"emb-{gen}.f32"
+
+    def _rec_path(self, gen: int) -> Path:
+        return self.root / f"rec-{gen}.log"
+
+    def exists(self) -> bool:
+        return self.manifest_path.exists()
+
+    def open(self) -> List[RecordRef]:
+        """Load the current generation (recovering a torn tail) and return its records."""
+        with self._lock:
+            if not self.exists():
+                self.root.mkdir(parents=True, exist_ok=True)
+                self._write_manifest(0)
+            manifest = json.loads(self.manifest_path.read_text())
+            if manifest.get("dim") != self.dim:
+                raise ValueError(
+                    f"Segment store {self.root} has dim {manifest.get('dim')}, expected {self.dim}"
+                )
+            self.generation = int(manifest["generation"])
+            self._remove_other_generations()
+            for path in (self._emb_path(self.generation), self._rec_path(self.generation)):
+                path.touch(exist_ok=True)
+
+            refs, starts, good_end = self._scan_records()
+            row_bytes = self.dim * 4
+            emb_rows = self._emb_path(self.generation).stat().st_size // row_bytes
+            # A record is only live once both its embedding and its log entry exist
+            n = min(len(refs), emb_rows)
+            if n < len(refs):
+                good_end = starts[n]
+            self._truncate(self._rec_path(self.generation), good_end)
+            self._truncate(self._emb_path(self.generation), n * row_bytes)
+            self.refs = refs[:n]
+            self._rec_size = good_end
+            self._map_embeddings()
+            return list(self.refs)
+
+    def _scan_records(self) -> Tuple[List[RecordRef], List[int], int]:
+        """Valid records, their start offsets, and the end of the last one."""
+        refs: List[RecordRef] = []
+        starts: List[int] = []
+        path = self._rec_path(self.generation)
+        size = path.stat().st_size
+        offset = 0
+        with open(path, "rb") as f:
+            while offset + _HEADER.size <= size:
+                f.seek(offset)
+                meta_len, blob_len, meta_crc, blob_crc = _HEADER.unpack(f.read(_HEADER.size))
+                end = offset + _HEADER.size + meta_len + blob_len
+                if end > size:
+                    break
+                meta_bytes = f.read(meta_len)
+                if zlib.crc32(meta_bytes) != meta_crc:
+                    break
+                try:
+                    meta = json.loads(meta_bytes)
+                except ValueError:
+                    break
+                starts.append(offset)
+                refs.append(RecordRef(len(refs), meta, offset + _HEADER.size + meta_len, blob_len, blob_crc))
+                offset = end
+        if offset < size:
+            logger.warning(f"Truncating torn tail of {path} at byte {offset} (size {size})")
+        return refs, starts, offset
+
+    @staticmethod
+    def _truncate(path: Path, size: int) -> None:
+        if path.stat().st_size > size:
+            with open(path, "r+b") as f:
+                f.truncate(size)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _map_embeddings(self) -> None:
+        n = len(self.refs)
+        if n == 0:
+            self._emb = np.zeros((0, self.dim), dtype=np.float32)
+        else:
+            self._emb = np.memmap(self._emb_path(self.generation), dtype="<f4", mode="r", shape=(n, self.dim))
+
+    def _write_manifest(self, gen: int) -> None:
+        tmp = self.root / "manifest.json.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"format": FORMAT_VERSION, "dim": self.dim, "generation": gen}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.manifest_path)
+        _fsync_dir(self.root)
+
+    def _remove_other_generations(self) -> None:
+        keep = {self._emb_path(self.generation).name, self._rec_path(self.generation).name}
+        for path in self.root.iterdir():
+            if path.name.startswith(("emb-", "rec-")) and path.name not in keep:
+                path.unlink(missing_ok=True)
+
+    # --------------------------------------------------------------- reading
+    @property
+    def embeddings(self) -> np.ndarray:
+        """Flushed embedding rows (memory-mapped, read-only)."""
+        return self._emb
+
+    def vector(self, row: int) -> np.ndarray:
+        with self._lock:
+            flushed = len(self._emb)
+            if row < flushed:
+                return np.array(self._emb[row])
+            return self._pending[row - flushed][2].copy()
+
+    def read_blob(self, ref: RecordRef) -> bytes:
+        with self._lock:
+            pending = self._pending_blobs.get(ref.row)
+            if pending is not None:
+                return pending
+            with open(self._rec_path(self.generation), "rb") as f:
+                f.seek(ref.blob_offset)
+                blob = f.read(ref.blob_len)
+        if zlib.crc32(blob) != ref.blob_crc:
+            raise ValueError(f"Corrupt record blob for row {ref.row} in {self.root}")
+        return blob
+
+    # --------------------------------------------------------------- writing
+    def append(self, meta: Dict[str, Any], blob: bytes, vector: Optional[np.ndarray]) -> RecordRef:
+        """Buffer one record; written on the next (batched) flush."""
+        vec = np.zeros(self.dim, dtype=np.float32) if vector is None else np.asarray(vector, dtype=np.float32).reshape(self.dim)
+        meta_bytes = json.dumps(meta).encode("utf-8")
+        with self._lock:
+            row = len(self.refs)
+            offset = self._rec_size + sum(_HEADER.size + len(m) + len(b) for m, b, _ in self._pending)
+            ref = RecordRef(row, meta, offset + _HEADER.size + len(meta_bytes), len(blob), zlib.crc32(blob))
+            self.refs.append(ref)
+            self._pending.append((meta_bytes, blob, vec))
+            self._pending_blobs[row] = blob
+            if len(self._pending) >= self.flush_every:
+                self.flush()
+        return ref
+
+    def flush(self) -> None:
+        """Write buffered records: embeddings first, then the record log."""
+        with self._lock:
+            if not self._pending:
+                return
+            emb_path, rec_path = self._emb_path(self.generation), self._rec_path(self.generation)
+            with open(emb_path, "ab") as f:
+                f.write(np.stack([v for _, _, v in self._pending]).astype("<f4").tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(rec_path, "ab") as f:
+                for meta_bytes, blob, _ in self._pending:
+                    f.write(_HEADER.pack(len(meta_bytes), len(blob), zlib.crc32(meta_bytes), zlib.crc32(blob)))
+                    f.write(meta_bytes)
+                    f.write(blob)
+                f.flush()
+                os.fsync(f.fileno())
+                self._rec_size = f.tell()
+            self._pending.clear()
+            self._pending_blobs.clear()
+            self._map_embeddings()
+
+    def compact(self, items: Iterable[Tuple[Dict[str, Any], bytes, Optional[np.ndarray]]]) -> List[RecordRef]:
+        """Replace the store's contents with `items` via a new generation."""
+        with self._lock:
+            self._pending.clear()
+            self._pending_blobs.clear()
+            self.root.mkdir(parents=True, exist_ok=True)
+            new_gen = self.generation + 1
+            emb_path, rec_path = self._emb_path(new_gen), self._rec_path(new_gen)
+            with open(emb_path, "wb") as emb_f, open(rec_path, "wb") as rec_f:
+                for meta, blob, vector in items:
+                    vec = np.zeros(self.dim, dtype=np.float32) if vector is None else np.asarray(vector, dtype=np.float32).reshape(self.dim)
+                    meta_bytes = json.dumps(meta).encode("utf-8")
+                    emb_f.write(vec.astype("<f4").tobytes())
+                    rec_f.write(_HEADER.pack(len(meta_bytes), len(blob), zlib.crc32(meta_bytes), zlib.crc32(blob)))
+                    rec_f.write(meta_bytes)
+                    rec_f.write(blob)
+                for f in (emb_f, rec_f):
+                    f.flush()
+                    os.fsync(f.fileno())
+            _fsync_dir(self.root)
+            self._write_manifest(new_gen)  # the switch-over point
+            self.generation = new_gen
+            self._remove_other_generations()
+            return self.open()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush vector store segments in {self.root}: {e}")
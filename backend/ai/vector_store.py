@@ -10,8 +10,12 @@ retrieval-augmented generation (RAG) for intelligent wiring recommendations.
 Key Features:
 - Design pattern vectorization using graph embeddings
 - Similarity search for component layouts and topologies
-- Metadata filtering by system type, power rating, and compliance codes
+- Metadata filtering by system type, power rating, region and compliance codes
+- Approximate nearest-neighbour retrieval (IVF over a float32 matrix) with
+  inverted-index metadata pre-filtering
 - Batch operations for efficient design storage and retrieval
+- Append-only binary segment storage (memory-mapped embeddings, lazily read
+  graph blobs) with batched, crash-safe writes
 - Integration with enterprise monitoring and audit systems
 """
 
@@ -20,11 +24,20 @@ from __future__ import annotations
 import logging
 import hashlib
 import json
+import os
+import threading
+import weakref
+import zlib
 import numpy as np
+from collections.abc import Mapping
 from dataclasses import dataclass, asdict
-from typing import List, Dict, Tuple, Optional, Any, Union
+from pathlib import Path
+from typing import Iterator, List, Dict, Tuple, Optional, Any, Union
 from enum import Enum
 
+from backend.ai.ann_index import IVFFlatIndex
+from backend.ai.vector_segments import RecordRef, SegmentStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -75,6 +88,75 @@ class SearchResult:
     match_factors: Dict[str, float]  # Breakdown of similarity components
 
 
+def _metadata_to_dict(metadata: DesignMetadata) -> Dict[str, Any]:
+    data = asdict(metadata)
+    data["design_category"] = metadata.design_category.value
+    return data
+
+
+def _metadata_from_dict(data: Dict[str, Any]) -> DesignMetadata:
+    data = dict(data)
+    data["design_category"] = DesignCategory(data["design_category"])
+    return DesignMetadata(**data)
+
+
+class _PatternTable(Mapping):
+    """
+    Read-only ``pattern_id -> DesignPattern`` view over the segment store.
+
+    Metadata for every pattern is held in memory; graph data and embeddings
+    are only read from disk when a pattern is first accessed.
+    """
+
+    def __init__(self, segments: SegmentStore):
+        self._segments = segments
+        self._refs: Dict[str, RecordRef] = {}
+        self._metadata: Dict[str, DesignMetadata] = {}
+        self._loaded: Dict[str, DesignPattern] = {}
+
+    def load(self, refs: List[RecordRef]):
+        self._refs.clear()
+        self._metadata.clear()
+        self._loaded.clear()
+        for ref in refs:
+            pattern_id = ref.meta["pattern_id"]
+            self._refs[pattern_id] = ref
+            self._metadata[pattern_id] = _metadata_from_dict(ref.meta["metadata"])
+
+    def add(self, pattern: DesignPattern, ref: RecordRef):
+        self._refs[pattern.pattern_id] = ref
+        self._metadata[pattern.pattern_id] = pattern.metadata
+        self._loaded[pattern.pattern_id] = pattern
+
+    def ref(self, pattern_id: str) -> RecordRef:
+        return self._refs[pattern_id]
+
+    def metadata(self, pattern_id: str) -> DesignMetadata:
+        return self._metadata[pattern_id]
+
+    def __getitem__(self, pattern_id: str) -> DesignPattern:
+        pattern = self._loaded.get(pattern_id)
+        if pattern is None:
+            ref = self._refs[pattern_id]
+            graph_data = json.loads(zlib.decompress(self._segments.read_blob(ref)))
+            embedding = self._segments.vector(ref.row).tolist() if ref.meta.get("has_embedding") else None
+            pattern = DesignPattern(
+                pattern_id=pattern_id,
+                graph_data=graph_data,
+                metadata=self._metadata[pattern_id],
+                embedding=embedding,
+                similarity_hash=ref.meta.get("similarity_hash")
+            )
+            self._loaded[pattern_id] = pattern
+        return pattern
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._refs)
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+
 class GraphEmbeddingEngine:
     """
     Advanced graph embedding system for converting ODL designs into vectors.
@@ -382,67 +464,175 @@ class EnterpriseVectorStore:
     performance optimization for large-scale design repositories.
     """
     
-    def __init__(self, store_path: Optional[str] = None):
+    def __init__(self, store_path: Optional[str] = None, flush_every: Optional[int] = None):
         self.store_path = store_path or "vector_store.json"
         self.embedding_engine = GraphEmbeddingEngine()
-        self.patterns: Dict[str, DesignPattern] = {}
+        # Records live in "<store_path without .json>.segments/"; a legacy JSON
+        # file at store_path is imported on first open.
+        if flush_every is None:
+            flush_every = int(os.getenv("VECTOR_STORE_FLUSH_EVERY", "64"))
+        self.segments = SegmentStore(
+            Path(self.store_path).with_suffix(".segments"),
+            self.embedding_engine.embedding_dim,
+            flush_every=flush_every,
+        )
+        self.patterns = _PatternTable(self.segments)
         self.index_dirty = True
+        self._hash_to_id: Dict[str, str] = {}
         self._load_store()
+        self._rebuild_index()
+        # Write out any buffered records when the store is dropped or at exit
+        self._finalizer = weakref.finalize(self, self.segments.close)
+
+    # Metadata fields with inverted indexes (filter key -> DesignMetadata attr)
+    _INDEXED_FIELDS = {
+        "system_type": "system_type",
+        "design_category": "design_category",
+        "geographical_region": "geographical_region",
+        "region": "geographical_region",
+    }
+
+    def _rebuild_index(self):
+        """Build the embedding matrix, ANN index and metadata indexes from scratch."""
+        dim = self.embedding_engine.embedding_dim
+        self.ann_index = IVFFlatIndex(dim)
+        self._row_ids: List[str] = []
+        self._row_power: List[float] = []
+        self._power_array: Optional[np.ndarray] = None
+        self._field_rows: Dict[str, Dict[Any, List[int]]] = {
+            attr: {} for attr in set(self._INDEXED_FIELDS.values())
+        }
+        self._code_rows: Dict[str, List[int]] = {}
+        self._hash_to_id = {}
+
+        # Embeddings come straight from the memory-mapped segment file
+        self.segments.flush()
+        indexed: List[str] = []
+        for pattern_id in self.patterns:
+            ref = self.patterns.ref(pattern_id)
+            if ref.meta.get("similarity_hash"):
+                self._hash_to_id.setdefault(ref.meta["similarity_hash"], pattern_id)
+            if ref.meta.get("has_embedding"):
+                indexed.append(pattern_id)
+        if indexed:
+            rows = [self.patterns.ref(pid).row for pid in indexed]
+            self.ann_index.add(self.segments.embeddings[rows])
+            self.ann_index.maybe_train()
+        for row, pattern_id in enumerate(indexed):
+            self._index_metadata(row, pattern_id, self.patterns.metadata(pattern_id))
+        self.index_dirty = False
+
+    def _index_metadata(self, row: int, pattern_id: str, meta: DesignMetadata):
+        self._row_ids.append(pattern_id)
+        self._row_power.append(meta.power_rating)
+        self._power_array = None
+        for attr, index in self._field_rows.items():
+            index.setdefault(getattr(meta, attr), []).append(row)
+        for code in meta.compliance_codes:
+            self._code_rows.setdefault(code, []).append(row)
+
+    def _index_pattern(self, pattern: DesignPattern):
+        """Add one newly stored pattern to the ANN and metadata indexes."""
+        if pattern.similarity_hash:
+            self._hash_to_id.setdefault(pattern.similarity_hash, pattern.pattern_id)
+        if not pattern.embedding or len(pattern.embedding) != self.ann_index.dim:
+            return
+        row = int(self.ann_index.add(np.asarray(pattern.embedding, dtype=np.float32))[0])
+        self.ann_index.maybe_train()
+        self._index_metadata(row, pattern.pattern_id, pattern.metadata)
+
+    def _candidate_rows(self, filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Row ids passing the metadata filters, or None when unfiltered."""
+        if not filters:
+            return None
+        rows: Optional[set] = None
+        for key, value in filters.items():
+            attr = self._INDEXED_FIELDS.get(key)
+            if attr is not None:
+                matched = set(self._field_rows[attr].get(value, ()))
+            elif key == "compliance_codes":
+                matched = set()
+                for code in value:
+                    matched.update(self._code_rows.get(code, ()))
+            else:
+                continue
+            rows = matched if rows is None else rows & matched
+            if not rows:
+                return np.empty(0, dtype=np.int64)
+
+        cand = None if rows is None else np.fromiter(rows, dtype=np.int64, count=len(rows))
+        if "power_range" in filters:
+            min_power, max_power = filters["power_range"]
+            if self._power_array is None:
+                self._power_array = np.asarray(self._row_power, dtype=np.float64)
+            power = self._power_array if cand is None else self._power_array[cand]
+            keep = np.flatnonzero((power >= min_power) & (power <= max_power))
+            cand = keep if cand is None else cand[keep]
+        return cand
     
     def _load_store(self):
-        """Load existing patterns from persistent storage."""
+        """Open the segment store, importing a legacy JSON store if present."""
         try:
-            import os
-            if os.path.exists(self.store_path):
-                with open(self.store_path, 'r') as f:
-                    data = json.load(f)
-                    
-                for pattern_data in data.get("patterns", []):
-                    metadata_dict = pattern_data["metadata"]
-                    metadata_dict["design_category"] = DesignCategory(metadata_dict["design_category"])
-                    
-                    pattern = DesignPattern(
-                        pattern_id=pattern_data["pattern_id"],
-                        graph_data=pattern_data["graph_data"],
-                        metadata=DesignMetadata(**metadata_dict),
-                        embedding=pattern_data.get("embedding"),
-                        similarity_hash=pattern_data.get("similarity_hash")
-                    )
-                    self.patterns[pattern.pattern_id] = pattern
-                    
-                logger.info(f"Loaded {len(self.patterns)} design patterns from {self.store_path}")
+            is_new = not self.segments.exists()
+            refs = self.segments.open()
+            if is_new and not refs and os.path.exists(self.store_path):
+                refs = self._import_json_store()
+            self.patterns.load(refs)
+            logger.info(f"Loaded {len(self.patterns)} design patterns from {self.segments.root}")
         except Exception as e:
             logger.warning(f"Failed to load vector store: {e}")
-    
+
+    def _import_json_store(self) -> List[RecordRef]:
+        """One-time migration of the old single-file JSON format."""
+        with open(self.store_path, 'r') as f:
+            data = json.load(f)
+        patterns = [
+            DesignPattern(
+                pattern_id=pattern_data["pattern_id"],
+                graph_data=pattern_data["graph_data"],
+                metadata=_metadata_from_dict(pattern_data["metadata"]),
+                embedding=pattern_data.get("embedding"),
+                similarity_hash=pattern_data.get("similarity_hash")
+            )
+            for pattern_data in data.get("patterns", [])
+        ]
+        refs = self.segments.compact(self._record(p) for p in patterns)
+        logger.info(f"Imported {len(refs)} design patterns from {self.store_path}")
+        return refs
+
+    def _record(self, pattern: DesignPattern) -> Tuple[Dict[str, Any], bytes, Optional[np.ndarray]]:
+        """Segment record (metadata document, graph blob, embedding) for a pattern."""
+        dim = self.embedding_engine.embedding_dim
+        has_embedding = bool(pattern.embedding) and len(pattern.embedding) == dim
+        if pattern.embedding and not has_embedding:
+            logger.warning(f"Dropping embedding of {pattern.pattern_id}: wrong dimension")
+        meta = {
+            "pattern_id": pattern.pattern_id,
+            "metadata": _metadata_to_dict(pattern.metadata),
+            "similarity_hash": pattern.similarity_hash,
+            "has_embedding": has_embedding,
+        }
+        blob = zlib.compress(json.dumps(pattern.graph_data, separators=(",", ":")).encode("utf-8"))
+        vector = np.asarray(pattern.embedding, dtype=np.float32) if has_embedding else None
+        return meta, blob, vector
+
     def _save_store(self):
-        """Persist patterns to storage."""
+        """Write buffered records to the segment files."""
         try:
-            patterns_data = []
-            for pattern in self.patterns.values():
-                metadata_dict = asdict(pattern.metadata)
-                metadata_dict["design_category"] = pattern.metadata.design_category.value
-                
-                patterns_data.append({
-                    "pattern_id": pattern.pattern_id,
-                    "graph_data": pattern.graph_data,
-                    "metadata": metadata_dict,
-                    "embedding": pattern.embedding,
-                    "similarity_hash": pattern.similarity_hash
-                })
-            
-            data = {
-                "version": "1.0",
-                "patterns": patterns_data,
-                "total_patterns": len(patterns_data)
-            }
-            
-            with open(self.store_path, 'w') as f:
-                json.dump(data, f, indent=2)
-                
-            logger.info(f"Saved {len(self.patterns)} design patterns to {self.store_path}")
+            self.segments.flush()
         except Exception as e:
             logger.error(f"Failed to save vector store: {e}")
-    
+
+    def flush(self):
+        """Persist all stored designs now instead of at the next batch boundary."""
+        self._save_store()
+
+    def compact(self):
+        """Rewrite the segment files into a fresh generation (crash-safe)."""
+        refs = self.segments.compact(self._record(self.patterns[pid]) for pid in list(self.patterns))
+        self.patterns.load(refs)
+        self._rebuild_index()
+
     def _generate_similarity_hash(self, graph_data: Dict[str, Any]) -> str:
         """Generate hash for duplicate detection."""
         # Create normalized representation for hashing
@@ -472,14 +662,10 @@ class EnterpriseVectorStore:
         pattern_id = f"pattern_{similarity_hash[:8]}_{int(metadata.creation_timestamp)}"
         
         # Check for duplicates
-        existing_pattern = next(
-            (p for p in self.patterns.values() if p.similarity_hash == similarity_hash),
-            None
-        )
-        
-        if existing_pattern:
-            logger.info(f"Similar pattern already exists: {existing_pattern.pattern_id}")
-            return existing_pattern.pattern_id
+        existing_id = self._hash_to_id.get(similarity_hash)
+        if existing_id is not None:
+            logger.info(f"Similar pattern already exists: {existing_id}")
+            return existing_id
         
         # Generate embedding
         try:
@@ -497,9 +683,12 @@ class EnterpriseVectorStore:
             similarity_hash=similarity_hash
         )
         
-        self.patterns[pattern_id] = pattern
-        self.index_dirty = True
-        self._save_store()
+        # Buffered append; written with the next batch (see ``flush``)
+        self.patterns.add(pattern, self.segments.append(*self._record(pattern)))
+        if self.index_dirty:
+            self._rebuild_index()
+        else:
+            self._index_pattern(pattern)
         
         logger.info(f"Stored design pattern {pattern_id} with {len(graph_data.get('nodes', {}))} nodes")
         return pattern_id
@@ -534,52 +723,24 @@ class EnterpriseVectorStore:
             logger.error(f"Failed to generate query embedding: {e}")
             return []
         
+        if self.index_dirty:
+            self._rebuild_index()
+
+        candidates = self._candidate_rows(filters)
+        rows, scores = self.ann_index.search(
+            query_embedding, top_k, candidates=candidates, min_score=min_similarity
+        )
+
+        # Detailed match factors only for the final top-k
         results = []
-        
-        for pattern in self.patterns.values():
-            # Apply metadata filters
-            if filters and not self._matches_filters(pattern.metadata, filters):
-                continue
-            
-            if not pattern.embedding:
-                continue
-            
-            # Calculate cosine similarity
-            pattern_embedding = np.array(pattern.embedding)
-            similarity = np.dot(query_embedding, pattern_embedding)
-            
-            if similarity >= min_similarity:
-                # Calculate detailed match factors
-                match_factors = self._calculate_match_factors(query_graph, pattern.graph_data)
-                
-                results.append(SearchResult(
-                    pattern=pattern,
-                    similarity_score=similarity,
-                    match_factors=match_factors
-                ))
-        
-        # Sort by similarity and return top-k
-        results.sort(key=lambda r: r.similarity_score, reverse=True)
-        return results[:top_k]
-    
-    def _matches_filters(self, metadata: DesignMetadata, filters: Dict[str, Any]) -> bool:
-        """Check if metadata matches filter criteria."""
-        for filter_key, filter_value in filters.items():
-            if filter_key == "power_range":
-                min_power, max_power = filter_value
-                if not (min_power <= metadata.power_rating <= max_power):
-                    return False
-            elif filter_key == "system_type":
-                if metadata.system_type != filter_value:
-                    return False
-            elif filter_key == "design_category":
-                if metadata.design_category != filter_value:
-                    return False
-            elif filter_key == "compliance_codes":
-                if not any(code in metadata.compliance_codes for code in filter_value):
-                    return False
-        
-        return True
+        for row, score in zip(rows, scores):
+            pattern = self.patterns[self._row_ids[row]]
+            results.append(SearchResult(
+                pattern=pattern,
+                similarity_score=float(score),
+                match_factors=self._calculate_match_factors(query_graph, pattern.graph_data)
+            ))
+        return results
     
     def _calculate_match_factors(self, query_graph: Dict[str, Any], pattern_graph: Dict[str, Any]) -> Dict[str, float]:
         """Calculate detailed similarity breakdown."""
@@ -632,10 +793,11 @@ class EnterpriseVectorStore:
         category_counts = {}
         power_ratings = []
         
-        for pattern in self.patterns.values():
-            category = pattern.metadata.design_category.value
+        for pattern_id in self.patterns:
+            metadata = self.patterns.metadata(pattern_id)
+            category = metadata.design_category.value
             category_counts[category] = category_counts.get(category, 0) + 1
-            power_ratings.append(pattern.metadata.power_rating)
+            power_ratings.append(metadata.power_rating)
         
         return {
             "total_patterns": len(self.patterns),
@@ -649,6 +811,20 @@ class EnterpriseVectorStore:
         }
 
 
+_STORES: Dict[str, EnterpriseVectorStore] = {}
+_STORES_LOCK = threading.RLock()
+
+
+def get_enterprise_vector_store(store_path: Optional[str] = None) -> EnterpriseVectorStore:
+    """Process-wide store for `store_path`, opened (and indexed) on first use."""
+    key = str(Path(store_path or "vector_store.json").resolve())
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = _STORES[key] = EnterpriseVectorStore(store_path)
+        return store
+
+
 # Convenience functions for backward compatibility and simple usage
 def retrieve_similar(
     query_graph: Dict[str, Any],
@@ -666,8 +842,9 @@ def retrieve_similar(
     Returns:
         List of (graph_data, metadata) tuples for similar designs
     """
-    store = EnterpriseVectorStore(store_path)
-    results = store.search_similar(query_graph, top_k=top_n, min_similarity=0.1)
+    store = get_enterprise_vector_store(store_path)
+    with _STORES_LOCK:
+        results = store.search_similar(query_graph, top_k=top_n, min_similarity=0.1)
     
     return [(result.pattern.graph_data, asdict(result.pattern.metadata)) for result in results]
 
@@ -712,5 +889,8 @@ def store_design_pattern(
         project_id=additional_metadata.get("project_id")
     )
     
-    store = EnterpriseVectorStore(store_path)
-    return store.store_design(graph_data, metadata)
\ No newline at end of file
+    store = get_enterprise_vector_store(store_path)
+    with _STORES_LOCK:
+        pattern_id = store.store_design(graph_data, metadata)
+        store.flush()
+    return pattern_id
\ No newline at end of file
@@ -35,7 +35,7 @@ from enum import Enum
 from backend.schemas.odl import ODLGraph, ODLEdge, STANDARD_EDGE_KINDS
 
 from backend.ai.panel_grouping import EnterpriseGroupingEngine, GroupingStrategy, StringConfiguration
-from backend.ai.vector_store import EnterpriseVectorStore, DesignMetadata, DesignCategory, retrieve_similar
+from backend.ai.vector_store import DesignMetadata, DesignCategory, _STORES_LOCK, get_enterprise_vector_store, retrieve_similar
 from backend.ai.llm_wiring_suggest import LLMWiringSuggestionEngine, WiringContext, WiringSuggestion
 from backend.tools.enterprise_electrical_topology import create_electrical_connections, ConnectionSuggestion, ConnectionType
 from backend.schemas.pipeline import (
@@ -147,7 +147,7 @@ class EnterpriseAIWiringPipeline:
         )
         
         if self.config.use_vector_store:
-            self.vector_store = EnterpriseVectorStore()
+            self.vector_store = get_enterprise_vector_store()
         else:
             self.vector_store = None
             
@@ -337,12 +337,13 @@ class EnterpriseAIWiringPipeline:
                 self.metrics.cache_hits += 1
                 return self.cache[cache_key]
             
-            # Retrieve similar patterns
-            search_results = self.vector_store.search_similar(
-                query_graph={"nodes": graph.nodes, "edges": getattr(graph, 'edges', [])},
-                top_k=self.config.vector_store_top_k,
-                min_similarity=0.2
-            )
+            # Retrieve similar patterns; the store is shared process-wide
+            with _STORES_LOCK:
+                search_results = self.vector_store.search_similar(
+                    query_graph={"nodes": graph.nodes, "edges": getattr(graph, 'edges', [])},
+                    top_k=self.config.vector_store_top_k,
+                    min_similarity=0.2
+                )
             
             retrieved_patterns = [result.pattern for result in search_results]
             
@@ -579,7 +580,8 @@ class EnterpriseAIWiringPipeline:
                     designer_id="ai_pipeline"
                 )
                 
-                pattern_id = self.vector_store.store_design(graph_data, metadata)
+                with _STORES_LOCK:
+                    pattern_id = self.vector_store.store_design(graph_data, metadata)
                 logger.info(f"Stored design pattern {pattern_id} for future learning")
                 
             except Exception as e:
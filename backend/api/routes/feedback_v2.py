@@ -21,10 +21,12 @@ from backend.database.session import get_session
 from backend.models.ai_action_log import AiActionLog
 from backend.models.ai_action_vector import AiActionVector
 from backend.models.memory import Memory as MemoryModel
+from backend.scalability.job_queue import get_job_queue
 from backend.services.anonymizer_service import AnonymizerService
 from backend.services.embedding_service import EmbeddingService
 from backend.services.vector_store import VectorStore, get_vector_store
 from backend.services import encryptor
+from backend.services import embedding_backfill  # noqa: F401 - registers embed_action_vectors
 
 router = APIRouter()
 
@@ -121,6 +123,12 @@ async def log_feedback_v2(
             embedding=embedding_db,
             meta={"version": 1},
         )
+        if not embedding:
+            # Filled in later by the ``embed_action_vectors`` job
+            vec_entry.meta["embedding_pending"] = {
+                "type": payload.proposed_action.get("type", ""),
+                "user_decision": payload.user_decision,
+            }
         session.add(vec_entry)
         
         # Flush to get the auto-generated ID before trying vector store
@@ -172,6 +180,12 @@ async def log_feedback_v2(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to log feedback: {exc}",
             )
+
+        if not embedding:
+            try:
+                await get_job_queue().enqueue("embed_action_vectors", {"ids": [vec_entry.id]})
+            except Exception as exc:
+                logger.warning(f"Failed to queue embedding backfill: {exc}")
         
         logger.info("log_feedback_v2 completed successfully")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
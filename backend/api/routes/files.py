@@ -12,7 +12,6 @@ from fastapi import (
     File,
     HTTPException,
     status,
-    BackgroundTasks,
     Response,
 )
 from fastapi.responses import FileResponse
@@ -25,7 +24,7 @@ from backend.database.session import get_session
 from backend.auth.dependencies import require_file_upload
 from backend.auth.models import User
 from backend.schemas.file_asset import FileAssetRead, FileAssetUpdate
-from backend.services.file_service import FileService, run_parsing_job
+from backend.services.file_service import FileService, enqueue_parsing_job
 from backend.utils.id import generate_id
 from backend.security.file_validation import validate_uploaded_file, generate_safe_filename, is_safe_path
 
@@ -166,11 +165,9 @@ async def get_file_status(
 )
 async def trigger_datasheet_parsing(
     file_id: str,
-    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session),
-    ai_client: AsyncOpenAI = Depends(get_ai_client),
 ) -> FileAssetRead:
-    """Kick off AI parsing as a background task."""
+    """Queue AI parsing on the durable job queue."""
     asset = await FileService.get(session, file_id)
     if not asset:
         raise HTTPException(status_code=404, detail="File not found")
@@ -180,7 +177,7 @@ async def trigger_datasheet_parsing(
         )
 
     updated_asset = await FileService.trigger_parsing(asset, session)
-    background_tasks.add_task(run_parsing_job, asset.id, session, ai_client)
+    await enqueue_parsing_job(asset.id)
     return FileAssetRead.model_validate(updated_asset)
 
 
@@ -1,9 +1,9 @@
 from __future__ import annotations
 from fastapi import APIRouter, HTTPException, Query, Depends
-from typing import Literal
+from typing import List, Literal, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.services.layout_provider import suggest_positions
+from backend.services.layout_provider import suggest_positions, supports_incremental
 from backend.services.edge_router import route_edges
 from backend.services.odl_sync import rebuild_odl_for_session
 from backend.services.wiring import AutoWiringService
@@ -21,19 +21,27 @@ router = APIRouter(prefix="/layout", tags=["layout"])
 async def layout_suggest(
     session_id: str,
     layer: Literal["single_line", "high_level", "civil", "networking", "physical"] = Query("single_line"),
+    incremental: bool = Query(False),
+    changed: Optional[List[str]] = Query(None),
 ):
     """
     Suggest positions for UNLOCKED nodes on a layer.
     Frontend can apply these suggestions by PATCHing each component's layout/lock.
+
+    ``incremental=true`` keeps the current layout and returns only the nodes
+    that move to fit ``changed`` (default: nodes not yet on the layer).  The
+    response's ``incremental`` is false when the configured provider (ELK)
+    laid out the whole layer instead.
     """
     if get_current_snapshot is None:
         raise HTTPException(status_code=500, detail="Snapshot provider unavailable.")
     snapshot = await get_current_snapshot(session_id=session_id)
     if snapshot is None:
         raise HTTPException(status_code=404, detail="Session not found")
+    incremental = incremental and supports_incremental()
     try:
-        positions = await suggest_positions(snapshot, layer=layer)
-        return {"layer": layer, "positions": positions}
+        positions = await suggest_positions(snapshot, layer=layer, incremental=incremental, changed=changed)
+        return {"layer": layer, "positions": positions, "incremental": incremental}
     except NotImplementedError as e:  # pragma: no cover - provider-specific
         raise HTTPException(status_code=501, detail=str(e))
     except Exception as e:  # pragma: no cover - generic errors
@@ -44,9 +52,14 @@ async def layout_suggest(
 async def route_orthogonal(
     session_id: str,
     layer: Literal["single_line", "high_level", "civil", "networking", "physical"] = Query("single_line"),
+    nodes: Optional[List[str]] = Query(None),
     session: AsyncSession = Depends(get_session),
 ):
-    """Compute orthogonal routes for UNLOCKED links on a layer and persist them."""
+    """Compute orthogonal routes for UNLOCKED links on a layer and persist them.
+
+    With ``nodes`` (e.g. the ids an incremental layout moved) only links
+    touching those nodes, or with no path on the layer yet, are re-routed.
+    """
 
     if get_current_snapshot is None:
         raise HTTPException(status_code=500, detail="Snapshot provider unavailable.")
@@ -54,7 +67,15 @@ async def route_orthogonal(
     if snapshot is None:
         raise HTTPException(status_code=404, detail="Session not found")
     try:
-        routes = await route_edges(snapshot, layer=layer)
+        only = None
+        if nodes is not None:
+            moved = set(nodes)
+            only = {
+                link.id or f"e_{link.source_id}_{link.target_id}"
+                for link in snapshot.links
+                if link.source_id in moved or link.target_id in moved or not link.path_by_layer.get(layer)
+            }
+        routes = await route_edges(snapshot, layer=layer, only=only)
     except NotImplementedError as e:  # pragma: no cover - client-side routing
         raise HTTPException(status_code=501, detail=str(e))
     except Exception as e:  # pragma: no cover - generic errors
@@ -6,6 +6,7 @@ Endpoints:
 - GET  /odl/{session_id}             -> retrieve full ODL graph
 - POST /odl/{session_id}/patch       -> apply ODLPatch (CAS via If-Match)
 - GET  /odl/{session_id}/view        -> derived projection for a layer
+- GET  /odl/{session_id}/stream      -> SSE stream of per-layer view deltas
 
 Headers:
 - If-Match: <version> (required for PATCH)
@@ -16,11 +17,16 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request, Response
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import StreamingResponse
+import asyncio
+import json
 import logging
 import uuid
-from typing import Any, Mapping
+from typing import Any, AsyncIterator, Mapping, Optional
 
-from backend.database.session import get_session
+from backend.database.session import SessionMaker, get_session
+from backend.odl.deltas import layer_delta
+from backend.odl.events import ODLEventBus
 from backend.odl.schemas import ODLGraph, ODLPatch, PatchOp
 from backend.odl.store import ODLStore
 from backend.odl.views import layer_view
@@ -30,6 +36,10 @@ from backend.utils.adpf import wrap_response
 
 logger = logging.getLogger(__name__)
 
+# Seconds between heartbeats on an idle view stream; each heartbeat also probes
+# the head version to catch patches committed by other worker processes.
+STREAM_HEARTBEAT_S = 15.0
+
 router = APIRouter(prefix="/odl", tags=["ODL"])
 
 
@@ -230,10 +240,10 @@ async def get_head(session_id: str, db: AsyncSession = Depends(get_session)):
     Lightweight head endpoint for canvas sync. Returns current version only.
     """
     store = await _store_from_session(db)
-    g = await store.get_graph(db, session_id)
-    if not g:
+    version = await store.get_head_version(db, session_id)
+    if version is None:
         raise HTTPException(404, "Session not found")
-    return {"session_id": session_id, "version": g.version}
+    return {"session_id": session_id, "version": version}
 
 
 @router.get("/{session_id}/components", tags=["odl"])
@@ -457,5 +467,111 @@ async def get_view_delta(
     view = _view_to_dict(layer_view(g, layer))
     return {"changed": True, "version": g.version, "view": view}
 
+
+def _sse(event: dict, event_id: Optional[int] = None) -> str:
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}data: {json.dumps(event, default=str)}\n\n"
+
+
+async def _stream_head_version(session_id: str) -> Optional[int]:
+    async with SessionMaker() as db:
+        return await ODLStore().get_head_version(db, session_id)
+
+
+async def _stream_snapshot(session_id: str, layer: str) -> Optional[dict]:
+    async with SessionMaker() as db:
+        g = await ODLStore().get_graph(db, session_id)
+    if not g:
+        return None
+    return {"type": "snapshot", "version": g.version, "view": _view_to_dict(layer_view(g, layer))}
+
+
+async def _view_event_stream(
+    session_id: str,
+    layer: str,
+    since: Optional[int],
+    heartbeat: Optional[float] = None,
+) -> AsyncIterator[str]:
+    """
+    Yield SSE frames: `delta` events while the in-process change history can
+    bridge the client's version, otherwise a full `snapshot`.  Delta and
+    snapshot frames carry `id: <version>` so EventSource reconnects resume via
+    Last-Event-ID.
+    """
+    q = ODLEventBus.subscribe(session_id)
+    last = since
+
+    async def _catch_up(head: int) -> list:
+        nonlocal last
+        changes = ODLEventBus.changes_between(session_id, last, head) if last is not None else None
+        if changes is None:
+            snap = await _stream_snapshot(session_id, layer)
+            if snap is None:
+                return [({"type": "error", "detail": "Session not found"}, None)]
+            last = snap["version"]
+            return [(snap, last)]
+        out = []
+        for c in changes:
+            out.append((dict(layer_delta(c, layer), type="delta"), c.version))
+            last = c.version
+        return out
+
+    try:
+        head = await _stream_head_version(session_id)
+        if head is None:
+            yield _sse({"type": "error", "detail": "Session not found"})
+            return
+        yield _sse({"type": "hello", "session_id": session_id, "layer": layer, "version": head})
+        for ev, eid in await _catch_up(head):
+            yield _sse(ev, eid)
+        while True:
+            try:
+                change = await asyncio.wait_for(q.get(), timeout=heartbeat or STREAM_HEARTBEAT_S)
+            except asyncio.TimeoutError:
+                head = await _stream_head_version(session_id)
+                if head is not None and last is not None and head > last:
+                    for ev, eid in await _catch_up(head):
+                        yield _sse(ev, eid)
+                yield _sse({"type": "heartbeat", "version": last})
+                continue
+            if last is not None and change.version <= last:
+                continue  # already covered by a snapshot/catch-up
+            if change.from_version == last:
+                last = change.version
+                yield _sse(dict(layer_delta(change, layer), type="delta"), last)
+            else:
+                for ev, eid in await _catch_up(change.version):
+                    yield _sse(ev, eid)
+    except asyncio.CancelledError:
+        pass
+    finally:
+        ODLEventBus.unsubscribe(session_id, q)
+
+
+@router.get("/{session_id}/stream")
+async def stream_view_deltas(
+    session_id: str,
+    layer: str = Query("single-line"),
+    since: Optional[int] = Query(None, description="Client's last known version"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Server-Sent Events stream replacing `/view_delta` polling.
+    Events: hello | delta | snapshot | heartbeat | error
+
+    `delta` carries per-layer `nodes`/`edges` `{added, updated, removed}` for one
+    patch (`from_version` -> `version`).  A `snapshot` (full layer view) is sent
+    when `since` is missing or older than the retained change history.
+    """
+    layer_name = (layer or "single-line").strip().lower()
+    resume = since
+    if last_event_id and last_event_id.strip().isdigit():
+        resume = int(last_event_id.strip())
+    return StreamingResponse(
+        _view_event_stream(session_id, layer_name, resume),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # IMPORTANT: Register this router in your API aggregator or FastAPI app:
 #   app.include_router(backend.api.routes.odl.router)
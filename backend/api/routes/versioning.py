@@ -21,7 +21,7 @@ async def get_diff(session_id: str, from_version: int, to_version: int):
     """
     Return the list of patches needed to move from `from_version` to `to_version`.
     """
-    patches = get_patch_diff(session_id, from_version, to_version)
+    patches = await get_patch_diff(session_id, from_version, to_version)
     if patches is None:
         raise HTTPException(status_code=404, detail="No patches found for version range")
     return {"patches": patches}
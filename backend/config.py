@@ -9,11 +9,12 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 import os
 
 # ---- Layout provider configuration ----
-# LAYOUT_PROVIDER: "elk" | "dagre" | "builtin"
+# LAYOUT_PROVIDER: "layered" | "elk" | "dagre" | "builtin"
+# - "layered": server runs the in-process Sugiyama layout from layered_layout.py.
 # - "elk": server will call an HTTP ELK endpoint to compute positions.
 # - "dagre": server delegates to client (frontend) for layout; server API returns 501.
 # - "builtin": server uses the simple layered fallback from layout_engine.py.
-LAYOUT_PROVIDER = os.getenv("LAYOUT_PROVIDER", "builtin").lower()
+LAYOUT_PROVIDER = os.getenv("LAYOUT_PROVIDER", "layered").lower()
 # For "elk" provider, set an ELK HTTP service URL (e.g., http://localhost:7777/elk/layout)
 LAYOUT_HTTP_URL = os.getenv("LAYOUT_HTTP_URL", "").strip()
 
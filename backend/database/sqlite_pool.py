@@ -0,0 +1,236 @@
+"""
+Pooled, WAL-mode access to a plain ``sqlite3`` database file.
+
+Used by stores that talk to SQLite directly rather than through SQLAlchemy
+(e.g. :mod:`backend.services.odl_graph_service`).  All disk I/O runs on
+worker threads so ``async`` callers never block the event loop:
+
+ - Reads run on a small executor, each borrowing one of N long-lived
+   connections.  WAL mode lets them proceed while a write is in flight.
+ - Writes go to a single writer thread (SQLite allows one writer anyway)
+   which drains its queue and commits everything pending in one
+   transaction, so concurrent sessions share one fsync instead of paying
+   one each.  Every job runs under its own SAVEPOINT: a failing job is
+   rolled back and re-raised to its caller without affecting the batch.
+
+The schema callback runs once, on the writer connection, before the first
+job is served.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple, TypeVar, Union
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+Job = Callable[[sqlite3.Connection], Any]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+class SQLitePool:
+    """Reader connection pool plus a batching single-writer thread."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        readers: Optional[int] = None,
+        max_batch: Optional[int] = None,
+        init_schema: Optional[Job] = None,
+        busy_timeout_ms: int = 5000,
+    ) -> None:
+        self.path = str(path)
+        self.readers = readers or _env_int("SQLITE_POOL_READERS", 4)
+        self.max_batch = max_batch or _env_int("SQLITE_POOL_MAX_BATCH", 64)
+        self.busy_timeout_ms = busy_timeout_ms
+        self._init_schema = init_schema
+        self._lock = threading.Lock()
+        self._started = False
+        self._closed = False
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all: List[sqlite3.Connection] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._writes: "queue.Queue[Optional[Tuple[Job, Future]]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._init_error: Optional[BaseException] = None
+
+    # ------------------------------------------------------------------ setup
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode: transactions are managed explicitly below.
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        # In WAL mode NORMAL is durable against application crashes and only
+        # syncs on checkpoints, not on every commit.
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def start(self) -> None:
+        """Open connections, initialise the schema and start the writer.
+
+        Safe to call repeatedly; the first call does the work.  Called
+        implicitly by the first read or write.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("SQLitePool is closed")
+            if self._started:
+                return
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._writer = threading.Thread(
+                target=self._write_loop, name="sqlite-writer", daemon=True
+            )
+            self._writer.start()
+            self._ready.wait()
+            if self._init_error is not None:
+                err, self._init_error = self._init_error, None
+                self._writer = None
+                raise err
+            for _ in range(self.readers):
+                conn = self._connect()
+                self._all.append(conn)
+                self._idle.put(conn)
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.readers, thread_name_prefix="sqlite-reader"
+            )
+            self._started = True
+
+    def close(self) -> None:
+        """Flush pending writes, stop the writer and close all connections."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if not self._started:
+                return
+        self._writes.put(None)
+        if self._writer is not None:
+            self._writer.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        for conn in self._all:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._all.clear()
+
+    # ------------------------------------------------------------------ reads
+    def _read(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        conn = self._idle.get()
+        try:
+            return fn(conn)
+        finally:
+            if conn.in_transaction:  # fn left a read transaction open
+                conn.rollback()
+            self._idle.put(conn)
+
+    async def read(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Run `fn(conn)` on a pooled connection in a worker thread."""
+        self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._read, fn)
+
+    def read_sync(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Blocking variant of :meth:`read` for synchronous callers."""
+        self.start()
+        return self._read(fn)
+
+    # ----------------------------------------------------------------- writes
+    def submit(self, fn: Callable[[sqlite3.Connection], T]) -> "Future[T]":
+        """Queue `fn(conn)` for the writer; the future resolves after commit."""
+        self.start()
+        fut: Future = Future()
+        self._writes.put((fn, fut))
+        return fut
+
+    async def write(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Run `fn(conn)` in the next write batch and return its result."""
+        return await asyncio.wrap_future(self.submit(fn))
+
+    def write_sync(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Blocking variant of :meth:`write` for synchronous callers."""
+        return self.submit(fn).result()
+
+    def _write_loop(self) -> None:
+        try:
+            conn = self._connect()
+            if self._init_schema is not None:
+                conn.execute("BEGIN")
+                self._init_schema(conn)
+                conn.execute("COMMIT")
+        except BaseException as exc:  # surfaced by start()
+            self._init_error = exc
+            self._ready.set()
+            return
+        self._all.append(conn)
+        self._ready.set()
+
+        stopping = False
+        while not stopping:
+            item = self._writes.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._run_batch(conn, batch)
+
+    def _run_batch(self, conn: sqlite3.Connection, batch: List[Tuple[Job, Future]]) -> None:
+        outcomes: List[Tuple[Future, bool, Any]] = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for fn, fut in batch:
+                if not fut.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT job")
+                try:
+                    result = fn(conn)
+                except BaseException as exc:
+                    conn.execute("ROLLBACK TO job")
+                    conn.execute("RELEASE job")
+                    outcomes.append((fut, False, exc))
+                else:
+                    conn.execute("RELEASE job")
+                    outcomes.append((fut, True, result))
+            conn.execute("COMMIT")
+        except BaseException as exc:
+            logger.error("SQLite write batch failed: %s", exc, exc_info=True)
+            if conn.in_transaction:
+                try:
+                    conn.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+            for _, fut in batch:
+                if fut.done():
+                    continue
+                if fut.running() or fut.set_running_or_notify_cancel():
+                    fut.set_exception(exc)
+            return
+        for fut, ok, value in outcomes:
+            if ok:
+                fut.set_result(value)
+            else:
+                fut.set_exception(value)
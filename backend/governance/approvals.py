@@ -95,23 +95,14 @@ def decide(
         async def _apply() -> int:
             async with SessionMaker() as adb:
                 store = ODLStore()
-                from backend.odl.store import graphs
-                from backend.odl.schemas import ODLPatch, ODLGraph
-                res = await adb.execute(select(graphs).where(graphs.c.session_id == session_id))
-                row = res.fetchone()
-                if not row:
+                from backend.odl.schemas import ODLPatch
+                # get_graph reports the head version (row version wins over
+                # the version embedded in the stored snapshot)
+                g = await store.get_graph(adb, session_id)
+                if not g:
                     raise KeyError("Session not found")
-                data = dict(row._mapping["graph_json"])
-                actual_version = row._mapping["version"]
-                if data.get("version") != actual_version:
-                    data["version"] = actual_version
-                    await adb.execute(
-                        update(graphs).where(graphs.c.session_id == session_id).values(graph_json=data)
-                    )
-                    await adb.commit()
-                g = ODLGraph.model_validate(data)
                 patch = ODLPatch.model_validate(patch_json)
-                _, new_version = await store.apply_patch_cas(adb, session_id, actual_version, patch)
+                _, new_version = await store.apply_patch_cas(adb, session_id, g.version, patch)
                 return new_version
 
         new_version = asyncio.run(_apply())
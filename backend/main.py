@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+import os
 from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI, Request, HTTPException
@@ -65,10 +66,39 @@ async def lifespan(app: FastAPI):
         # Do not crash if table creation fails; log an error
         logger.error(f"Database table creation failed: {exc}", exc_info=True)
 
+    # Open the ODL session store's connection pool and create its schema once
+    try:
+        from backend.services import odl_graph_service
+        odl_graph_service.init_db()
+    except Exception as exc:
+        logger.error(f"ODL session store initialization failed: {exc}", exc_info=True)
+
+    # Run background job workers (datasheet parsing, embedding backfills) in
+    # this process unless a dedicated worker process handles them.
+    job_queue = None
+    if os.getenv("JOB_WORKERS_ENABLED", "1") == "1":
+        try:
+            from backend.scalability.job_queue import get_job_queue
+            from backend.services import embedding_backfill, file_service  # noqa: F401 - register handlers
+            job_queue = get_job_queue()
+            await job_queue.start()
+        except Exception as exc:
+            logger.error(f"Job queue startup failed: {exc}", exc_info=True)
+
     app.state.ai_ready = True
 
     yield
     logger.info("Cleaning up AI services.")
+    if job_queue is not None:
+        await job_queue.stop()
+    # Stop the worker processes of the layout, edge routing and auto-design pools
+    from backend.utils.process_pool import shutdown_process_pools
+    shutdown_process_pools(wait=False)
+    try:
+        from backend.services import odl_graph_service
+        odl_graph_service.close_db()
+    except Exception as exc:
+        logger.error(f"ODL session store shutdown failed: {exc}", exc_info=True)
 
 
 app = FastAPI(title="OriginFlow API", lifespan=lifespan)
@@ -1,7 +1,7 @@
 """ORM model representing a master component record."""
 from __future__ import annotations
 
-from sqlalchemy import String, Integer, Float, Boolean, JSON
+from sqlalchemy import String, Integer, Float, Boolean, JSON, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from backend.models import Base
@@ -11,6 +11,12 @@ class ComponentMaster(Base):
     """Table storing manufacturer component data and specs."""
 
     __tablename__ = "component_master"
+    # Range filters of the component query engine run within one category
+    __table_args__ = (
+        Index("ix_component_master_category_power", "category", "power"),
+        Index("ix_component_master_category_voltage", "category", "voltage"),
+        Index("ix_component_master_category_price", "category", "price"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     part_number: Mapped[str] = mapped_column(String, unique=True, index=True)
@@ -63,6 +63,111 @@ policy_cache_dogpile_wait = Counter(
     labelnames=("tenant_id",),
 )
 
+# ---------------------------------------------------------------------------
+# ODL graph cache
+# ---------------------------------------------------------------------------
+odl_graph_cache_hits = Counter(
+    "odl_graph_cache_hits_total",
+    "ODL graph reads served from the in-process cache",
+)
+odl_graph_cache_misses = Counter(
+    "odl_graph_cache_misses_total",
+    "ODL graph reads that required a full load and validation",
+)
+odl_graph_cache_evictions = Counter(
+    "odl_graph_cache_evictions_total",
+    "ODL graph cache entries evicted (LRU or superseded version)",
+)
+odl_graph_cache_size = Gauge(
+    "odl_graph_cache_entries",
+    "ODL graphs currently held in the in-process cache",
+)
+
+# ---------------------------------------------------------------------------
+# Shared cache subsystem (backend.utils.cache)
+# ---------------------------------------------------------------------------
+cache_tier_hits = Counter(
+    "cache_tier_hits_total",
+    "Cache reads served, per cache and tier",
+    labelnames=("cache", "tier"),  # tier=memory|redis
+)
+cache_tier_misses = Counter(
+    "cache_tier_misses_total",
+    "Cache reads that missed the memory tier",
+    labelnames=("cache",),
+)
+cache_tier_evictions = Counter(
+    "cache_tier_evictions_total",
+    "Entries dropped from a memory cache",
+    labelnames=("cache", "reason"),  # reason=size|expired|rejected
+)
+
+# ---------------------------------------------------------------------------
+# Deterministic tool result cache
+# ---------------------------------------------------------------------------
+tool_result_cache_hits = Counter(
+    "tool_result_cache_hits_total",
+    "Tool invocations served from the result cache",
+    labelnames=("tool", "tier"),  # tier=memory|disk
+)
+tool_result_cache_misses = Counter(
+    "tool_result_cache_misses_total",
+    "Tool invocations that had to be computed",
+    labelnames=("tool",),
+)
+tool_result_cache_evictions = Counter(
+    "tool_result_cache_evictions_total",
+    "Tool results evicted from memory (entry or byte bound)",
+)
+tool_result_cache_bytes = Gauge(
+    "tool_result_cache_bytes",
+    "Serialized size of tool results held in memory",
+)
+
+# ---------------------------------------------------------------------------
+# Embedding worker
+# ---------------------------------------------------------------------------
+embedding_batch_size = Histogram(
+    "embedding_batch_size",
+    "Texts encoded per model call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+embedding_queue_latency = Histogram(
+    "embedding_queue_latency_seconds",
+    "Time a text waits in the embedding queue before its batch is encoded",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+embedding_cache_hits = Counter(
+    "embedding_cache_hits_total",
+    "Texts whose embedding was served from the cache",
+    labelnames=("tier",),  # tier=memory|disk
+)
+embedding_cache_misses = Counter(
+    "embedding_cache_misses_total",
+    "Texts that had to be encoded",
+)
+
+# ---------------------------------------------------------------------------
+# Background job queue
+# ---------------------------------------------------------------------------
+jobs_processed = Counter(
+    "jobs_processed_total",
+    "Background job attempts by outcome",
+    labelnames=("queue", "kind", "outcome"),  # outcome=done|retry|dead
+)
+job_wait_latency = Histogram(
+    "job_wait_latency_seconds",
+    "Time a job was due before a worker claimed it",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30, 120),
+    labelnames=("queue",),
+)
+job_run_latency = Histogram(
+    "job_run_latency_seconds",
+    "Handler run time per job attempt",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 15, 60, 300),
+    labelnames=("queue",),
+)
+
 # ---------------------------------------------------------------------------
 # HTTP server metrics
 # ---------------------------------------------------------------------------
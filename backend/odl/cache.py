@@ -0,0 +1,98 @@
+"""
+In-process cache of validated ODL graphs.
+
+Entries are keyed by ``(session_id, version)``.  Versions are assigned by the
+store and never reused for a session, so an entry can never go stale; the
+store decides whether an entry is *current* by probing the head version
+(a single integer column) before falling back to a full load.
+
+Cached graphs are shared between requests: treat them as read-only and derive
+new versions with ``apply_patch`` (which copies) rather than mutating them.
+"""
+from __future__ import annotations
+
+import os
+from typing import Dict, Optional
+
+from backend.odl.schemas import ODLGraph
+from backend.observability.metrics import (
+    odl_graph_cache_hits,
+    odl_graph_cache_misses,
+    odl_graph_cache_evictions,
+    odl_graph_cache_size,
+)
+from backend.utils.cache import MemoryCache
+
+
+def _default_max_entries() -> int:
+    try:
+        return max(0, int(os.getenv("ODL_GRAPH_CACHE_SIZE", "128")))
+    except ValueError:
+        return 128
+
+
+class GraphCache:
+    """Bounded LRU of ``ODLGraph`` objects keyed by ``(session_id, version)``."""
+
+    def __init__(self, max_entries: Optional[int] = None) -> None:
+        self.max_entries = _default_max_entries() if max_entries is None else max_entries
+        self._mem = MemoryCache(self.max_entries, policy="lru", name="odl_graph")
+
+    @staticmethod
+    def _tag(session_id: str) -> str:
+        return f"session:{session_id}"
+
+    @property
+    def hits(self) -> int:
+        return self._mem.hits
+
+    @property
+    def misses(self) -> int:
+        return self._mem.misses
+
+    def get(self, session_id: str, version: int) -> Optional[ODLGraph]:
+        g = self._mem.get((session_id, version))
+        try:
+            (odl_graph_cache_misses if g is None else odl_graph_cache_hits).inc()
+        except Exception:  # pragma: no cover
+            pass
+        return g
+
+    def put(self, graph: ODLGraph) -> None:
+        if self.max_entries <= 0:
+            return
+        mem = self._mem
+        before = mem.evictions
+        # Older versions of the same session are unreachable once a newer one
+        # is cached; drop them eagerly instead of waiting for LRU.
+        evicted = mem.replace_tagged(
+            (graph.session_id, graph.version),
+            graph,
+            self._tag(graph.session_id),
+            stale=lambda key: key[1] < graph.version,
+        )
+        evicted += mem.evictions - before
+        size = len(mem)
+        try:
+            if evicted:
+                odl_graph_cache_evictions.inc(evicted)
+            odl_graph_cache_size.set(size)
+        except Exception:  # pragma: no cover
+            pass
+
+    def invalidate(self, session_id: Optional[str] = None) -> None:
+        if session_id is None:
+            self._mem.clear()
+        else:
+            self._mem.invalidate_tag(self._tag(session_id))
+        try:
+            odl_graph_cache_size.set(len(self._mem))
+        except Exception:  # pragma: no cover
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._mem), "hits": self.hits, "misses": self.misses}
+
+
+# Process-wide cache shared by every ODLStore instance.
+graph_cache = GraphCache()
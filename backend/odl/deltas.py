@@ -0,0 +1,119 @@
+"""
+Incremental view deltas derived from applied patches.
+
+``build_change`` turns one applied ``ODLPatch`` into a layer-agnostic
+``GraphChange``: the before/after objects of every node and edge the patch
+could have moved in or out of *any* layer view.  ``layer_delta`` then projects
+a change onto a single layer as node/edge add, update and remove lists.
+
+A change only holds references to (immutable, structurally shared) node and
+edge objects, so its size is O(patch) regardless of the graph size.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from backend.odl.edge_index import edge_index
+from backend.odl.schemas import ODLEdge, ODLGraph, ODLNode, ODLPatch
+from backend.odl.views import in_layer
+
+# (edge, source node, target node) as seen in one graph version
+EdgeState = Tuple[ODLEdge, Optional[ODLNode], Optional[ODLNode]]
+
+
+@dataclass
+class GraphChange:
+    """Before/after state of everything a single patch touched."""
+    session_id: str
+    from_version: int
+    version: int
+    nodes: Dict[str, Tuple[Optional[ODLNode], Optional[ODLNode]]] = field(default_factory=dict)
+    edges: Dict[str, Tuple[Optional[EdgeState], Optional[EdgeState]]] = field(default_factory=dict)
+
+
+def _layer_attr(n: Optional[ODLNode]) -> Tuple[bool, Any]:
+    return (n is not None, None if n is None else (n.attrs or {}).get("layer"))
+
+
+def _edge_state(g: ODLGraph, e: Optional[ODLEdge]) -> Optional[EdgeState]:
+    if e is None:
+        return None
+    return (e, g.nodes.get(e.source_id), g.nodes.get(e.target_id))
+
+
+def build_change(before: ODLGraph, after: ODLGraph, patch: ODLPatch) -> GraphChange:
+    """Collect the nodes/edges `patch` touched going from `before` to `after`."""
+    node_ids: Set[str] = set()
+    edge_ids: Set[str] = set()
+    for op in patch.operations:
+        oid = op.value.get("id")
+        if oid is None:
+            continue
+        if op.op in ("add_node", "update_node", "remove_node"):
+            node_ids.add(str(oid))
+        elif op.op in ("add_edge", "update_edge", "remove_edge"):
+            edge_ids.add(str(oid))
+
+    change = GraphChange(session_id=after.session_id, from_version=before.version, version=after.version)
+    # Membership only depends on presence and the `layer` attr; edges of nodes
+    # whose membership may have changed can enter/leave views too.
+    before_idx = after_idx = None
+    for nid in node_ids:
+        b, a = before.nodes.get(nid), after.nodes.get(nid)
+        change.nodes[nid] = (b, a)
+        if _layer_attr(b) != _layer_attr(a):
+            before_idx = before_idx or edge_index(before)
+            after_idx = after_idx or edge_index(after)
+            edge_ids |= before_idx.incident(nid) | after_idx.incident(nid)
+
+    if edge_ids:
+        before_idx = before_idx or edge_index(before)
+        after_idx = after_idx or edge_index(after)
+        for eid in edge_ids:
+            change.edges[eid] = (
+                _edge_state(before, before_idx.get(eid)),
+                _edge_state(after, after_idx.get(eid)),
+            )
+    return change
+
+
+def _node_in(n: Optional[ODLNode], layer: str) -> bool:
+    return n is not None and in_layer(n, layer)
+
+
+def _edge_in(state: Optional[EdgeState], layer: str) -> bool:
+    return state is not None and _node_in(state[1], layer) and _node_in(state[2], layer)
+
+
+def layer_delta(change: GraphChange, layer: str) -> Dict[str, Any]:
+    """Project a change onto `layer` as add/update/remove lists."""
+    nodes: Dict[str, List[Any]] = {"added": [], "updated": [], "removed": []}
+    edges: Dict[str, List[Any]] = {"added": [], "updated": [], "removed": []}
+
+    for nid, (b, a) in change.nodes.items():
+        was, now = _node_in(b, layer), _node_in(a, layer)
+        if now and not was:
+            nodes["added"].append(a.model_dump())
+        elif now and a is not b:
+            nodes["updated"].append(a.model_dump())
+        elif was and not now:
+            nodes["removed"].append(nid)
+
+    for eid, (b, a) in change.edges.items():
+        was, now = _edge_in(b, layer), _edge_in(a, layer)
+        if now and not was:
+            edges["added"].append(a[0].model_dump())
+        elif now and a[0] is not b[0]:
+            edges["updated"].append(a[0].model_dump())
+        elif was and not now:
+            edges["removed"].append(eid)
+
+    return {
+        "session_id": change.session_id,
+        "layer": layer,
+        "from_version": change.from_version,
+        "version": change.version,
+        "nodes": nodes,
+        "edges": edges,
+    }
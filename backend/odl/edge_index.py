@@ -0,0 +1,157 @@
+"""
+Edge index for ODLGraph patch application.
+
+``ODLGraph.edges`` stays a plain list (the wire format), but lookups by edge id
+and by endpoint go through an ``EdgeIndex`` that lives on the graph as a
+private attribute and is maintained incrementally by ``patches._apply_op``.
+
+Removals are tombstoned and the list is compacted once per patch, so a patch
+with k edge ops on a graph with E edges costs O(k + E) instead of O(k * E).
+
+``fork`` gives a copy-on-write view for the next graph version: the lookup
+tables are shared with the previous version and each one (and each per-node
+id set) is copied only the first time the new version writes to it.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Set
+
+from backend.odl.schemas import ODLEdge, ODLGraph
+
+
+class EdgeIndex:
+    """Id/source/target index over a graph's edge list."""
+
+    def __init__(self, edges: List[ODLEdge]) -> None:
+        self.edges = edges
+        self.pos: Dict[str, int] = {}
+        self.by_source: Dict[str, Set[str]] = {}
+        self.by_target: Dict[str, Set[str]] = {}
+        self.dead: Set[int] = set()
+        # Legacy graphs may carry repeated edge ids; only the first occurrence
+        # is addressable, the rest are removed together with it.
+        self.shadowed: Dict[str, List[int]] = {}
+        for i, e in enumerate(edges):
+            if e.id in self.pos:
+                self.shadowed.setdefault(e.id, []).append(i)
+                continue
+            self.pos[e.id] = i
+            self.by_source.setdefault(e.source_id, set()).add(e.id)
+            self.by_target.setdefault(e.target_id, set()).add(e.id)
+        self.size = len(edges)
+        # Containers this instance may mutate; None means "all of them"
+        # (freshly built), otherwise names / (name, node_id) keys copied so far.
+        self._owned: Optional[Set[object]] = None
+
+    def fork(self, edges: List[ODLEdge]) -> "EdgeIndex":
+        """Index for `edges`, a shallow copy of this index's list (compacted)."""
+        assert not self.dead, "compact() before forking"
+        new = EdgeIndex.__new__(EdgeIndex)
+        new.edges = edges
+        new.size = self.size
+        new.dead = set()
+        new.pos = self.pos
+        new.shadowed = self.shadowed
+        new.by_source = self.by_source
+        new.by_target = self.by_target
+        new._owned = set()
+        return new
+
+    def _own(self, name: str) -> Dict:
+        if self._owned is not None and name not in self._owned:
+            setattr(self, name, dict(getattr(self, name)))
+            self._owned.add(name)
+        return getattr(self, name)
+
+    def _own_ids(self, name: str, node_id: str) -> Set[str]:
+        index = self._own(name)
+        ids = index.get(node_id)
+        if self._owned is None or (name, node_id) in self._owned:
+            if ids is None:
+                ids = index[node_id] = set()
+            return ids
+        ids = index[node_id] = set(ids or ())
+        self._owned.add((name, node_id))
+        return ids
+
+    # Derived data: two graphs with equal fields are equal regardless of
+    # whether (or how) their index has been built.
+    def __eq__(self, other: object) -> bool:
+        return other is None or isinstance(other, EdgeIndex)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def is_current(self, g: ODLGraph) -> bool:
+        """False if `g.edges` was replaced or resized behind the index's back."""
+        return g.edges is self.edges and len(g.edges) == self.size
+
+    def get(self, edge_id: str) -> Optional[ODLEdge]:
+        i = self.pos.get(edge_id)
+        return None if i is None else self.edges[i]
+
+    def incident(self, node_id: str) -> Set[str]:
+        """Ids of edges with `node_id` as source or target."""
+        return self.by_source.get(node_id, set()) | self.by_target.get(node_id, set())
+
+    def add(self, edge: ODLEdge) -> None:
+        self.edges.append(edge)
+        self._own("pos")[edge.id] = self.size
+        self.size += 1
+        self._own_ids("by_source", edge.source_id).add(edge.id)
+        self._own_ids("by_target", edge.target_id).add(edge.id)
+
+    def replace(self, edge: ODLEdge) -> None:
+        """Swap in a new version of an indexed edge (endpoints unchanged)."""
+        self.edges[self.pos[edge.id]] = edge
+
+    def remove(self, edge_id: str) -> None:
+        if edge_id not in self.pos:
+            return
+        i = self._own("pos").pop(edge_id)
+        e = self.edges[i]
+        self.dead.add(i)
+        if edge_id in self.shadowed:
+            self.dead.update(self._own("shadowed").pop(edge_id))
+        self._discard("by_source", e.source_id, edge_id)
+        self._discard("by_target", e.target_id, edge_id)
+
+    def remove_many(self, edge_ids: Iterable[str]) -> None:
+        for edge_id in list(edge_ids):
+            self.remove(edge_id)
+
+    def compact(self, g: ODLGraph) -> None:
+        """Drop tombstoned edges from the list in a single pass."""
+        if not self.dead:
+            return
+        dead = self.dead
+        live = [e for i, e in enumerate(self.edges) if i not in dead]
+        self.edges = live
+        self.size = len(live)
+        self.dead = set()
+        self.pos = {}
+        self.shadowed = {}
+        if self._owned is not None:
+            self._owned.update(("pos", "shadowed"))
+        for i, e in enumerate(live):
+            if e.id in self.pos:
+                self.shadowed.setdefault(e.id, []).append(i)
+            else:
+                self.pos[e.id] = i
+        g.edges = live
+
+    def _discard(self, name: str, node_id: str, edge_id: str) -> None:
+        if edge_id not in getattr(self, name).get(node_id, ()):
+            return
+        ids = self._own_ids(name, node_id)
+        ids.discard(edge_id)
+        if not ids:
+            del getattr(self, name)[node_id]
+
+
+def edge_index(g: ODLGraph) -> EdgeIndex:
+    """Return the graph's edge index, (re)building it if missing or stale."""
+    idx = g._edge_index
+    if idx is None or not idx.is_current(g):
+        idx = EdgeIndex(g.edges)
+        g._edge_index = idx
+    return idx
@@ -0,0 +1,127 @@
+"""
+In-process event bus for ODL graph changes.
+
+``ODLStore.apply_patch_cas`` publishes a ``GraphChange`` per committed patch.
+The bus fans changes out to per-session subscriber queues (used by the view
+delta stream) and keeps a short per-session history so reconnecting clients
+can resume from a version instead of re-downloading the whole view.
+
+Only changes committed by this process are seen here; stream consumers must
+probe the store's head version and fall back to a snapshot when the history
+cannot bridge the gap (e.g. another worker applied a patch).
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional
+
+from backend.odl.deltas import GraphChange
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+class _SessionChannel:
+    def __init__(self, history: int) -> None:
+        self.history: Deque[GraphChange] = deque(maxlen=history)
+        # queue -> event loop that owns it (publishers may run on other threads)
+        self.subscribers: Dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+
+
+def _offer(q: asyncio.Queue, change: GraphChange) -> None:
+    try:
+        q.put_nowait(change)
+    except asyncio.QueueFull:
+        # Slow consumer: drop the oldest change; the stream notices the
+        # version gap and resynchronizes with a snapshot.
+        try:
+            q.get_nowait()
+            q.put_nowait(change)
+        except Exception:
+            pass
+
+
+class ODLEventBus:
+    """Minimal in-process pub/sub with bounded replay history per session."""
+
+    history_size: int = _env_int("ODL_DELTA_HISTORY", 64)
+    max_sessions: int = _env_int("ODL_DELTA_SESSIONS", 256)
+    queue_size: int = 256
+    _channels: "OrderedDict[str, _SessionChannel]" = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def _get(cls, session_id: str) -> _SessionChannel:
+        ch = cls._channels.get(session_id)
+        if ch is None:
+            ch = _SessionChannel(cls.history_size)
+            cls._channels[session_id] = ch
+            # Evict the least recently used idle channels
+            for sid in list(cls._channels):
+                if len(cls._channels) <= cls.max_sessions:
+                    break
+                if not cls._channels[sid].subscribers and sid != session_id:
+                    del cls._channels[sid]
+        cls._channels.move_to_end(session_id)
+        return ch
+
+    @classmethod
+    def subscribe(cls, session_id: str) -> asyncio.Queue:
+        q: asyncio.Queue = asyncio.Queue(maxsize=cls.queue_size)
+        with cls._lock:
+            cls._get(session_id).subscribers[q] = asyncio.get_running_loop()
+        return q
+
+    @classmethod
+    def unsubscribe(cls, session_id: str, q: asyncio.Queue) -> None:
+        with cls._lock:
+            ch = cls._channels.get(session_id)
+            if ch:
+                ch.subscribers.pop(q, None)
+
+    @classmethod
+    def publish(cls, change: GraphChange) -> None:
+        with cls._lock:
+            ch = cls._get(change.session_id)
+            ch.history.append(change)
+            subscribers = list(ch.subscribers.items())
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        for q, loop in subscribers:
+            if loop is current:
+                _offer(q, change)
+                continue
+            try:
+                loop.call_soon_threadsafe(_offer, q, change)
+            except RuntimeError:  # subscriber loop already closed
+                cls.unsubscribe(change.session_id, q)
+
+    @classmethod
+    def changes_between(cls, session_id: str, since: int, head: int) -> Optional[List[GraphChange]]:
+        """Contiguous changes covering (since, head], or None if history has a gap."""
+        if since >= head:
+            return []
+        with cls._lock:
+            ch = cls._channels.get(session_id)
+            history = list(ch.history) if ch else []
+        out = [c for c in history if since < c.version <= head]
+        expected = since
+        for c in out:
+            if c.from_version != expected:
+                return None
+            expected = c.version
+        return out if expected == head else None
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._channels.clear()
@@ -0,0 +1,128 @@
+"""
+Layer membership index for ODLGraph views.
+
+``layer_view`` used to scan every node and edge per call.  A ``LayerIndex``
+maps each ``attrs["layer"]`` value to its node ids (nodes without a layer are
+kept in a separate set, since they belong to every layer) and remembers each
+node's position in ``graph.nodes`` so views keep the dict's order.  Edges
+between the selected nodes come from the graph's ``EdgeIndex``.
+
+The index is built lazily on the first view of a graph version and then
+travels with later versions: ``patches._apply_op`` updates it incrementally
+and ``patches._fork`` shares it copy-on-write, like the edge index.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set
+
+from backend.odl.schemas import ODLGraph, ODLNode
+
+_UNLAYERED = object()  # bucket key for nodes without a "layer" attr
+_UNINDEXABLE = object()  # unhashable layer values never equal a layer name
+
+
+def _layer_key(n: ODLNode) -> Any:
+    lyr = (n.attrs or {}).get("layer")
+    if lyr is None:
+        return _UNLAYERED
+    return lyr if isinstance(lyr, Hashable) else _UNINDEXABLE
+
+
+class LayerIndex:
+    """layer -> node ids, plus node order, for one graph version."""
+
+    def __init__(self, nodes: Dict[str, ODLNode]) -> None:
+        self.nodes = nodes
+        self.seq: Dict[str, int] = {}
+        self.by_layer: Dict[Any, Set[str]] = {}
+        self.next_seq = 0
+        self.size = 0
+        # None: freshly built, everything owned; otherwise keys copied so far
+        self._owned: Optional[Set[object]] = None
+        for n in nodes.values():
+            self.add(n)
+
+    def fork(self, nodes: Dict[str, ODLNode]) -> "LayerIndex":
+        """Index for `nodes`, a shallow copy of this index's dict."""
+        new = LayerIndex.__new__(LayerIndex)
+        new.nodes = nodes
+        new.seq = self.seq
+        new.by_layer = self.by_layer
+        new.next_seq = self.next_seq
+        new.size = self.size
+        new._owned = set()
+        return new
+
+    # Derived data: never affects graph equality (see EdgeIndex).
+    def __eq__(self, other: object) -> bool:
+        return other is None or isinstance(other, LayerIndex)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def is_current(self, g: ODLGraph) -> bool:
+        return g.nodes is self.nodes and len(g.nodes) == self.size
+
+    def _own_seq(self) -> Dict[str, int]:
+        if self._owned is not None and "seq" not in self._owned:
+            self.seq = dict(self.seq)
+            self._owned.add("seq")
+        return self.seq
+
+    def _bucket(self, key: Any) -> Set[str]:
+        if self._owned is not None:
+            if "by_layer" not in self._owned:
+                self.by_layer = dict(self.by_layer)
+                self._owned.add("by_layer")
+            if ("layer", key) not in self._owned:
+                self.by_layer[key] = set(self.by_layer.get(key, ()))
+                self._owned.add(("layer", key))
+        return self.by_layer.setdefault(key, set())
+
+    def _discard(self, key: Any, node_id: str) -> None:
+        if node_id not in self.by_layer.get(key, ()):
+            return
+        bucket = self._bucket(key)
+        bucket.discard(node_id)
+        if not bucket:
+            del self.by_layer[key]
+
+    def add(self, n: ODLNode) -> None:
+        self._own_seq()[n.id] = self.next_seq
+        self.next_seq += 1
+        self.size += 1
+        self._bucket(_layer_key(n)).add(n.id)
+
+    def update(self, old: ODLNode, new: ODLNode) -> None:
+        """Move `new` to its layer bucket; order is unchanged (same dict key)."""
+        old_key, new_key = _layer_key(old), _layer_key(new)
+        if old_key is new_key or old_key == new_key:
+            return
+        self._discard(old_key, old.id)
+        self._bucket(new_key).add(new.id)
+
+    def remove(self, n: ODLNode) -> None:
+        self._own_seq().pop(n.id, None)
+        self.size -= 1
+        self._discard(_layer_key(n), n.id)
+
+    def members(self, layer: str) -> List[str]:
+        """Ids of nodes in `layer` (layer match or unlayered), in graph order."""
+        ids: Iterable[str] = self.by_layer.get(layer, set()) | self.by_layer.get(_UNLAYERED, set())
+        return sorted(ids, key=self.seq.__getitem__)
+
+
+def layer_index(g: ODLGraph) -> LayerIndex:
+    """Return the graph's layer index, (re)building it if missing or stale."""
+    idx = g._layer_index
+    if idx is None or not idx.is_current(g):
+        idx = LayerIndex(g.nodes)
+        g._layer_index = idx
+    return idx
+
+
+def maintained_layer_index(g: ODLGraph) -> Optional[LayerIndex]:
+    """The index if one is attached and current; never builds one."""
+    idx = g._layer_index
+    if idx is not None and not idx.is_current(g):
+        g._layer_index = idx = None
+    return idx
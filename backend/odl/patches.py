@@ -8,6 +8,8 @@ from __future__ import annotations
 
 from typing import Dict, Tuple
 from backend.odl.schemas import ODLGraph, ODLPatch, PatchOp, ODLNode, ODLEdge
+from backend.odl.edge_index import edge_index
+from backend.odl.layer_index import maintained_layer_index
 
 
 class PatchError(ValueError):
@@ -23,7 +25,10 @@ def _apply_op(g: ODLGraph, op: PatchOp) -> None:
             if g.nodes[node.id] != node:
                 raise PatchError(f"Node '{node.id}' already exists with different data")
             return
+        lidx = maintained_layer_index(g)  # fetch before the dict grows
         g.nodes[node.id] = node
+        if lidx is not None:
+            lidx.add(node)
         return
 
     if op.op == "update_node":
@@ -41,21 +46,29 @@ def _apply_op(g: ODLGraph, op: PatchOp) -> None:
                     n.attrs.pop(k, None)
                 else:
                     n.attrs[k] = val
+        lidx = maintained_layer_index(g)
+        if lidx is not None:
+            lidx.update(g.nodes[node_id], n)
         g.nodes[node_id] = n
         return
 
     if op.op == "remove_node":
         node_id = str(v.get("id", ""))
         if node_id in g.nodes:
+            lidx = maintained_layer_index(g)
             # Remove also any edges touching node_id
-            g.nodes.pop(node_id)
-            g.edges = [e for e in g.edges if e.source_id != node_id and e.target_id != node_id]
+            removed = g.nodes.pop(node_id)
+            if lidx is not None:
+                lidx.remove(removed)
+            idx = edge_index(g)
+            idx.remove_many(idx.incident(node_id))
         return
 
     if op.op == "add_edge":
         edge = ODLEdge(**v)
+        idx = edge_index(g)
         # Idempotent: skip if same edge id exists with same content
-        exists = next((e for e in g.edges if e.id == edge.id), None)
+        exists = idx.get(edge.id)
         if exists:
             if exists != edge:
                 raise PatchError(f"Edge '{edge.id}' already exists with different data")
@@ -63,15 +76,15 @@ def _apply_op(g: ODLGraph, op: PatchOp) -> None:
         # Validate endpoints
         if edge.source_id not in g.nodes or edge.target_id not in g.nodes:
             raise PatchError("Edge endpoints must exist")
-        g.edges.append(edge)
+        idx.add(edge)
         return
 
     if op.op == "update_edge":
         edge_id = str(v.get("id", ""))
-        idx = next((i for i, e in enumerate(g.edges) if e.id == edge_id), -1)
-        if idx < 0:
+        idx = edge_index(g)
+        e = idx.get(edge_id)
+        if e is None:
             raise PatchError(f"Edge '{edge_id}' not found")
-        e = g.edges[idx]
         new = e.model_copy(deep=True)
         if "kind" in v: new.kind = str(v["kind"])
         if "attrs" in v:
@@ -80,12 +93,12 @@ def _apply_op(g: ODLGraph, op: PatchOp) -> None:
                     new.attrs.pop(k, None)
                 else:
                     new.attrs[k] = val
-        g.edges[idx] = new
+        idx.replace(new)
         return
 
     if op.op == "remove_edge":
         edge_id = str(v.get("id", ""))
-        g.edges = [e for e in g.edges if e.id != edge_id]
+        edge_index(g).remove(edge_id)
         return
 
     if op.op == "set_meta":
@@ -100,16 +113,54 @@ def _apply_op(g: ODLGraph, op: PatchOp) -> None:
     raise PatchError(f"Unknown op '{op.op}'")
 
 
+def _fork(graph: ODLGraph) -> ODLGraph:
+    """
+    Copy-on-write clone: fresh top-level containers that share every node and
+    edge object with `graph`.  `_apply_op` never mutates a shared node/edge in
+    place (updates clone the one object they touch), so `graph` is left intact
+    even if the patch fails part-way.
+    """
+    g = ODLGraph.model_construct(
+        session_id=graph.session_id,
+        version=graph.version,
+        nodes=dict(graph.nodes),
+        edges=list(graph.edges),
+        meta=dict(graph.meta),
+    )
+    idx = graph._edge_index
+    if idx is not None and idx.is_current(graph) and not idx.dead:
+        g._edge_index = idx.fork(g.edges)
+    lidx = graph._layer_index
+    if lidx is not None and lidx.is_current(graph):
+        g._layer_index = lidx.fork(g.nodes)
+    return g
+
+
 def apply_patch(graph: ODLGraph, patch: ODLPatch, applied_op_ids: Dict[str, bool]) -> Tuple[ODLGraph, Dict[str, bool]]:
     """
     Apply a patch to a graph producing a new graph instance.
     `applied_op_ids` is a set-like dict used to skip already applied op_ids (idempotency).
+
+    The new graph structurally shares untouched nodes/edges with `graph`;
+    treat both as immutable once returned.
+    """
+    g = _fork(graph)
+    apply_patch_in_place(g, patch, applied_op_ids)
+    # version increment is handled by the store
+    return g, applied_op_ids
+
+
+def apply_patch_in_place(g: ODLGraph, patch: ODLPatch, applied_op_ids: Dict[str, bool]) -> Dict[str, bool]:
+    """
+    Apply a patch by mutating `g` directly (no copy, no rollback).
+    Only use on a graph the caller owns, e.g. when replaying a persisted op log.
     """
-    g = graph.model_copy(deep=True)
     for op in patch.operations:
         if applied_op_ids.get(op.op_id):
             continue  # idempotent re-apply → no-op
         _apply_op(g, op)
         applied_op_ids[op.op_id] = True
-    # version increment is handled by the store
-    return g, applied_op_ids
+    # Edge removals are tombstoned by the index; drop them in one pass
+    if g._edge_index is not None:
+        g._edge_index.compact(g)
+    return applied_op_ids
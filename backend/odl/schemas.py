@@ -10,8 +10,8 @@ Versioning:
 """
 from __future__ import annotations
 
-from typing import Dict, List, Literal, Optional
-from pydantic import BaseModel, Field, ConfigDict
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field, ConfigDict, PrivateAttr
 
 
 class ODLNode(BaseModel):
@@ -41,6 +41,9 @@ class ODLGraph(BaseModel):
     edges: List[ODLEdge] = Field(default_factory=list)
     meta: Dict[str, object] = Field(default_factory=dict)  # requirements, domain, etc.
     model_config = ConfigDict(extra="forbid")
+    # Derived lookups (see backend.odl.edge_index / layer_index); never serialized.
+    _edge_index: Optional[Any] = PrivateAttr(default=None)
+    _layer_index: Optional[Any] = PrivateAttr(default=None)
 
 
 class PatchOp(BaseModel):
@@ -1,22 +1,47 @@
 """
 Persistence and optimistic concurrency for ODL graphs.
 
-Default implementation stores the entire graph JSON plus a separate table for
-op idempotency tracking (patch/operation ids).  Swap this for a more granular
-storage if/when needed.
+Two storage modes are supported (select with ``ODL_STORE_MODE``):
+
+- ``snapshot`` (default): every patch rewrites the entire graph JSON.
+- ``oplog``: every patch appends its operations to a per-session op log and
+  only bumps the head version; a compacted snapshot of the full graph is
+  written every ``ODL_SNAPSHOT_EVERY`` versions and the covered log entries
+  are pruned.  Reads rebuild from the latest snapshot plus the log tail.
+
+In both modes ``odl_graphs.version`` is the head version and
+``odl_graphs.graph_json`` is the latest snapshot (its embedded ``version``
+is the snapshot version).  Reads always replay any log tail, so sessions
+written in either mode can be read by a store in either mode.
+
+Committed patches are published to ``ODLEventBus`` (``backend.odl.events``)
+so view delta streams can push incremental updates.
+
+Validated graphs are kept in a process-wide LRU (``backend.odl.cache``) keyed
+by ``(session_id, version)``.  Reads probe the head version first and only
+load/validate the graph on a miss; writes populate the cache (write-through).
+
+A separate table tracks op idempotency (patch/operation ids).
 """
 from __future__ import annotations
 
+import logging
+import os
 from typing import Optional, Dict, Any, Tuple
-from dataclasses import dataclass
-from sqlalchemy import Table, Column, String, Integer, JSON, MetaData, select, insert, update, UniqueConstraint
+from dataclasses import dataclass, field
+from sqlalchemy import Table, Column, String, Integer, JSON, MetaData, select, insert, update, delete, UniqueConstraint
 from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine
 from sqlalchemy.exc import IntegrityError
 
+from backend.odl.cache import GraphCache, graph_cache
+from backend.odl.deltas import build_change
+from backend.odl.events import ODLEventBus
 from backend.odl.schemas import ODLGraph, ODLPatch
-from backend.odl.patches import apply_patch
+from backend.odl.patches import apply_patch, apply_patch_in_place
 
 
+logger = logging.getLogger(__name__)
+
 metadata = MetaData()
 
 graphs = Table(
@@ -33,11 +58,38 @@ idempotency = Table(
     UniqueConstraint("session_id", "op_id", name="uq_odl_idempotency"),
 )
 
+# Append-only op log used by the "oplog" storage mode.  The unique
+# (session_id, version) constraint doubles as the CAS guard for writers.
+patch_log = Table(
+    "odl_patch_log", metadata,
+    Column("session_id", String, nullable=False),
+    Column("version", Integer, nullable=False),
+    Column("patch_json", JSON, nullable=False),
+    UniqueConstraint("session_id", "version", name="uq_odl_patch_log_version"),
+)
+
+STORE_MODES = ("snapshot", "oplog")
+
+
+def _default_mode() -> str:
+    mode = os.getenv("ODL_STORE_MODE", "snapshot").strip().lower()
+    return mode if mode in STORE_MODES else "snapshot"
+
+
+def _default_snapshot_every() -> int:
+    try:
+        return max(1, int(os.getenv("ODL_SNAPSHOT_EVERY", "50")))
+    except ValueError:
+        return 50
+
 
 @dataclass
 class ODLStore:
     """ODL persistence with optimistic concurrency and idempotency."""
     engine: Optional[AsyncEngine] = None
+    mode: str = field(default_factory=_default_mode)
+    snapshot_every: int = field(default_factory=_default_snapshot_every)
+    cache: Optional[GraphCache] = field(default_factory=lambda: graph_cache)
 
     async def init_schema(self, db: AsyncSession) -> None:
         engine = db.bind
@@ -55,15 +107,47 @@ class ODLStore:
             )
         )
         await db.commit()
+        if self.cache is not None:
+            self.cache.put(g)
         return g
 
+    async def get_head_version(self, db: AsyncSession, session_id: str) -> Optional[int]:
+        """Cheap probe: return the head version without loading the graph."""
+        result = await db.execute(select(graphs.c.version).where(graphs.c.session_id == session_id))
+        return result.scalar_one_or_none()
+
     async def get_graph(self, db: AsyncSession, session_id: str) -> Optional[ODLGraph]:
+        if self.cache is not None:
+            head = await self.get_head_version(db, session_id)
+            if head is None:
+                return None
+            cached = self.cache.get(session_id, head)
+            if cached is not None:
+                return cached
         result = await db.execute(select(graphs).where(graphs.c.session_id == session_id))
         row = result.fetchone()
         if not row:
             return None
-        data = row._mapping["graph_json"]
-        return ODLGraph.model_validate(data)
+        head = row._mapping["version"]
+        g = ODLGraph.model_validate(row._mapping["graph_json"])
+        if g.version < head:
+            await self._replay_tail(db, g, head)
+        g.version = head
+        if self.cache is not None:
+            self.cache.put(g)
+        return g
+
+    async def _replay_tail(self, db: AsyncSession, g: ODLGraph, head: int) -> None:
+        """Apply logged patches in (g.version, head] to the snapshot `g` in place."""
+        result = await db.execute(
+            select(patch_log.c.patch_json)
+            .where(patch_log.c.session_id == g.session_id)
+            .where(patch_log.c.version > g.version)
+            .where(patch_log.c.version <= head)
+            .order_by(patch_log.c.version)
+        )
+        for row in result.fetchall():
+            apply_patch_in_place(g, ODLPatch.model_validate(row._mapping["patch_json"]), {})
 
     async def apply_patch_cas(
         self,
@@ -89,10 +173,85 @@ class ODLStore:
                 pass
 
         new_graph.version = new_version
+        if self.mode == "oplog":
+            await self._append_log(db, session_id, expected_version, patch, new_graph)
+        else:
+            result = await db.execute(
+                update(graphs)
+                .where(graphs.c.session_id == session_id)
+                .where(graphs.c.version == expected_version)
+                .values(version=new_version, graph_json=new_graph.model_dump())
+            )
+            if result.rowcount != 1:
+                await db.rollback()
+                raise ValueError(f"Version mismatch: expected {expected_version}")
+        await db.commit()
+        if self.cache is not None:
+            self.cache.put(new_graph)
+        try:
+            ODLEventBus.publish(build_change(current, new_graph, patch))
+        except Exception:  # the write is committed; streams resync via snapshot
+            logger.exception("ODL change publish failed sid=%s v=%s", session_id, new_version)
+        return new_graph, new_version
+
+    async def _append_log(
+        self,
+        db: AsyncSession,
+        session_id: str,
+        expected_version: int,
+        patch: ODLPatch,
+        new_graph: ODLGraph,
+    ) -> None:
+        """Persist a patch as a log entry; O(patch) unless a snapshot is due."""
+        new_version = new_graph.version
+        try:
+            await db.execute(
+                insert(patch_log).values(
+                    session_id=session_id,
+                    version=new_version,
+                    patch_json=patch.model_dump(),
+                )
+            )
+        except IntegrityError:
+            await db.rollback()
+            raise ValueError(f"Version mismatch: expected {expected_version}, version {new_version} already written")
+
+        values: Dict[str, Any] = {"version": new_version}
+        snapshot_due = new_version % self.snapshot_every == 0
+        if snapshot_due:
+            values["graph_json"] = new_graph.model_dump()
+        result = await db.execute(
+            update(graphs)
+            .where(graphs.c.session_id == session_id)
+            .where(graphs.c.version == expected_version)
+            .values(**values)
+        )
+        if result.rowcount != 1:
+            await db.rollback()
+            raise ValueError(f"Version mismatch: expected {expected_version}")
+        if snapshot_due:
+            await self._prune_log(db, session_id, new_version)
+
+    async def _prune_log(self, db: AsyncSession, session_id: str, upto_version: int) -> None:
         await db.execute(
+            delete(patch_log)
+            .where(patch_log.c.session_id == session_id)
+            .where(patch_log.c.version <= upto_version)
+        )
+
+    async def compact(self, db: AsyncSession, session_id: str) -> Optional[ODLGraph]:
+        """Write a full snapshot at the head version and prune the covered log."""
+        g = await self.get_graph(db, session_id)
+        if g is None:
+            return None
+        result = await db.execute(
             update(graphs)
             .where(graphs.c.session_id == session_id)
-            .values(version=new_version, graph_json=new_graph.model_dump())
+            .where(graphs.c.version == g.version)
+            .values(graph_json=g.model_dump())
         )
+        if result.rowcount == 1:
+            # Only prune when the snapshot actually landed (head did not move).
+            await self._prune_log(db, session_id, g.version)
         await db.commit()
-        return new_graph, new_version
+        return g
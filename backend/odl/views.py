@@ -2,20 +2,39 @@ from __future__ import annotations
 
 from typing import List
 from backend.odl.schemas import ODLGraph, LayerView, ODLNode, ODLEdge
+from backend.odl.edge_index import edge_index
+from backend.odl.layer_index import layer_index
+
+
+def in_layer(n: ODLNode, layer: str) -> bool:
+    """Layer membership rule shared by views and view deltas."""
+    lyr = (n.attrs or {}).get("layer")
+    return (lyr == layer) if lyr is not None else True  # default include
 
 
 def layer_view(graph: ODLGraph, layer: str) -> LayerView:
     """
     Simple layer projection based on node.attr["layer"] equality.
     If nodes do not have a "layer" attr, the view returns all nodes.
-    """
-    def _in_layer(n: ODLNode) -> bool:
-        lyr = (n.attrs or {}).get("layer")
-        return (lyr == layer) if lyr is not None else True  # default include
 
-    nodes = [n for n in graph.nodes.values() if _in_layer(n)]
-    node_ids = {n.id for n in nodes}
-    edges = [e for e in graph.edges if e.source_id in node_ids and e.target_id in node_ids]
+    Uses the graph's layer and edge indexes, so once they are built the cost
+    is proportional to the layer (its nodes and their outgoing edges).
+    """
+    node_ids = layer_index(graph).members(layer)
+    nodes = [graph.nodes[nid] for nid in node_ids]
+    members = set(node_ids)
+    eidx = edge_index(graph)
+    pos, all_edges, by_source = eidx.pos, eidx.edges, eidx.by_source
+    picked = []
+    for nid in node_ids:
+        out = by_source.get(nid)
+        if out:
+            for eid in out:
+                i = pos[eid]
+                if all_edges[i].target_id in members:
+                    picked.append(i)
+    picked.sort()
+    edges = [all_edges[i] for i in picked]
     return LayerView(
         session_id=graph.session_id,
         base_version=graph.version,
@@ -1,12 +1,58 @@
 from __future__ import annotations
-from typing import List, Dict, Any
+import logging
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from pydantic import BaseModel, Field
 from backend.tools.schemas import make_patch
 from backend.odl.schemas import PatchOp, ODLPatch
 from backend.orchestrator.plan_spec import PlanSpec
+from backend.tools.catalog import InverterItem, ModuleItem, inverter_catalog, module_catalog
+from backend.tools.stringing_solver import InverterArrays, ModuleArrays, SiteArrays, solve_stringing
 from backend.tools import design_state, standards_check_v2, electrical_v2
 from backend.tools import select_equipment, stringing, ocp_dc, materialize, schedules as schedules_tool
 from backend.tools import routing, mechanical, labels as labels_tool, bom as bom_tool, explain_design_v2
 from backend.tools.nl.parse_plan_spec import parse_plan_spec, NLToPlanSpecInput
+from backend.utils.process_pool import SharedProcessPool
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Plan:
+    """Array layout one pipeline run is built around."""
+    series: int
+    parallel: int
+    modules: int
+
+
+def _default_plan(spec: PlanSpec) -> _Plan:
+    big = spec.targets.dc_kw_stc >= 5
+    return _Plan(series=7 if big else 8, parallel=2 if big else 1, modules=14 if big else 8)
+
+
+class _StageClock:
+    """Records the time since the previous lap under each stage name (ms)."""
+
+    def __init__(self, timings: Dict[str, float]):
+        self.timings = timings
+        self._last = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.timings[stage] = round((now - self._last) * 1000.0, 3)
+        self._last = now
+
+
+def _findings(patch: ODLPatch) -> List[Dict[str, Any]]:
+    for op in patch.operations:
+        attrs = (op.value or {}).get("attrs", {})
+        if attrs.get("tool") == "check_compliance_v2":
+            return list(attrs.get("result", {}).get("findings", []))
+    return []
 
 
 def _collect_ops(*patches: ODLPatch | Dict[str, Any]) -> List[PatchOp]:
@@ -23,6 +69,30 @@ def _collect_ops(*patches: ODLPatch | Dict[str, Any]) -> List[PatchOp]:
 
 def run_auto_design(spec: PlanSpec, session_id: str, request_id: str, simulate: bool = True) -> ODLPatch:
     """End-to-end planner. Returns an ODLPatch (not applied) that the UI can preview."""
+    # Single candidate: first catalog pairing, fixed layout
+    m, inv = module_catalog().items[0], inverter_catalog().items[0]
+    patch, _, _ = _run_pipeline(spec, session_id, request_id, simulate, m, inv, _default_plan(spec), {})
+    return patch
+
+
+def _run_pipeline(
+    spec: PlanSpec,
+    session_id: str,
+    request_id: str,
+    simulate: bool,
+    m: ModuleItem,
+    inv: InverterItem,
+    plan: _Plan,
+    timings: Dict[str, float],
+    prune_on_gate: bool = False,
+) -> Tuple[Optional[ODLPatch], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Run every stage for one module/inverter pairing.
+
+    Returns ``(patch, gate_findings, final_findings)``; with `prune_on_gate`
+    the patch is None when the compliance gate reports an error.  Stage
+    durations (ms) are recorded into `timings`.
+    """
+    clock = _StageClock(timings)
     ops: List[PatchOp] = []
     # 1) design state
     ds_patch = design_state.compute_design_state(
@@ -40,22 +110,14 @@ def run_auto_design(spec: PlanSpec, session_id: str, request_id: str, simulate:
         )
     )
     ops += _collect_ops(ds_patch)
+    clock.lap("design_state")
 
-    # 2) equipment
-    eq_patch = select_equipment.select_equipment(
-        select_equipment.SelectEquipmentInput(
-            session_id=session_id,
-            request_id=f"{request_id}:equip",
-            target_kw_stc=spec.targets.dc_kw_stc,
-        )
-    )
+    # 2) equipment: the pairing this run is built around
+    eq_patch = select_equipment.equipment_patch(f"{request_id}:equip", m, inv)
     ops += _collect_ops(eq_patch)
+    clock.lap("equipment")
 
-    # 3) stringing (use catalog first item for simplicity)
-    from backend.tools.catalog import load_modules, load_inverters
-
-    m = load_modules()[0]
-    inv = load_inverters()[0]
+    # 3) stringing
     str_patch = stringing.select_dc_stringing(
         stringing.SelectStringingInput(
             session_id=session_id,
@@ -76,6 +138,7 @@ def run_auto_design(spec: PlanSpec, session_id: str, request_id: str, simulate:
         )
     )
     ops += _collect_ops(str_patch)
+    clock.lap("stringing")
 
     # 4) fast compliance check (gate)
     from backend.tools.standards_check_v2 import (
@@ -109,21 +172,26 @@ def run_auto_design(spec: PlanSpec, session_id: str, request_id: str, simulate:
                     count=inv.mppt_windows[0].get("count", 1),
                 ),
             ),
-            dc_series_count=7,
+            dc_series_count=plan.series,
         )
     )
     ops += _collect_ops(comp)
+    gate_findings = _findings(comp)
+    clock.lap("compliance_gate")
+    if prune_on_gate and any(f.get("severity") == "error" for f in gate_findings):
+        return None, gate_findings, []
 
     # 5) DC OCPD determination
     ocpdc = ocp_dc.select_ocp_dc(
         ocp_dc.SelectOcpDcInput(
             session_id=session_id,
             request_id=f"{request_id}:ocpdc",
-            strings_parallel=2,
+            strings_parallel=plan.parallel,
             module=ocp_dc.Module(isc=m.isc),
         )
     )
     ops += _collect_ops(ocpdc)
+    clock.lap("ocp_dc")
 
     # 6) AC OCPD
     acpd = electrical_v2.select_ocp_ac_v2(
@@ -134,9 +202,10 @@ def run_auto_design(spec: PlanSpec, session_id: str, request_id: str, simulate:
         )
     )
     ops += _collect_ops(acpd)
+    clock.lap("ocp_ac")
 
     # 7) Conductors (first pass – nominal lengths)
-    cdc = electrical_v2.select_conductors_v2(
+    cdc, cac = electrical_v2.select_conductors_v2_batch([
         electrical_v2.SelectConductorsV2Input(
             session_id=session_id,
             request_id=f"{request_id}:cdc",
@@ -144,9 +213,8 @@ def run_auto_design(spec: PlanSpec, session_id: str, request_id: str, simulate:
             current_A=10.7,
             length_m=15.0,
             system_v=290.0,
-        )
-    )
-    cac = electrical_v2.select_conductors_v2(
+            code_profile=spec.env.profile,
+        ),
         electrical_v2.SelectConductorsV2Input(
             session_id=session_id,
             request_id=f"{request_id}:cac",
@@ -154,9 +222,11 @@ def run_auto_design(spec: PlanSpec, session_id: str, request_id: str, simulate:
             current_A=round((inv.ac_kW * 1000) / 240.0, 2),
             length_m=20.0,
             system_v=240.0,
-        )
-    )
+            code_profile=spec.env.profile,
+        ),
+    ])
     ops += _collect_ops(cdc, cac)
+    clock.lap("conductors")
 
     # 8) Materialize nodes/edges (simulate switch)
     mats = materialize.materialize_design(
@@ -167,12 +237,13 @@ def run_auto_design(spec: PlanSpec, session_id: str, request_id: str, simulate:
             inverter_id=inv.id,
             inverter_title=inv.title,
             mppts=sum(w.get("count", 1) for w in inv.mppt_windows),
-            modules=14 if spec.targets.dc_kw_stc >= 5 else 8,
-            modules_per_string=7 if spec.targets.dc_kw_stc >= 5 else 8,
-            strings_parallel=2 if spec.targets.dc_kw_stc >= 5 else 1,
+            modules=plan.modules,
+            modules_per_string=plan.series,
+            strings_parallel=plan.parallel,
         )
     )
     ops += _collect_ops(mats)
+    clock.lap("materialize")
 
     # 9) Expand connections (bundle edges)
     exp = electrical_v2.expand_connections_v2(
@@ -186,6 +257,7 @@ def run_auto_design(spec: PlanSpec, session_id: str, request_id: str, simulate:
         )
     )
     ops += _collect_ops(exp)
+    clock.lap("expand_connections")
 
     # 10) Route bundles (compute lengths)
     routes = routing.plan_routes(
@@ -206,6 +278,7 @@ def run_auto_design(spec: PlanSpec, session_id: str, request_id: str, simulate:
         )
     )
     ops += _collect_ops(routes)
+    clock.lap("routing")
 
     # 11) Mechanical
     mech = mechanical.layout_racking(
@@ -220,10 +293,11 @@ def run_auto_design(spec: PlanSpec, session_id: str, request_id: str, simulate:
                 height_m=6.0,
                 setback_m=0.5,
             ),
-            modules_count=14 if spec.targets.dc_kw_stc >= 5 else 8,
+            modules_count=plan.modules,
         )
     )
     ops += _collect_ops(mech)
+    clock.lap("mechanical")
 
     # 12) Schedules (uses routes)
     route_data = []
@@ -240,6 +314,7 @@ def run_auto_design(spec: PlanSpec, session_id: str, request_id: str, simulate:
         )
     )
     ops += _collect_ops(sch)
+    clock.lap("schedules")
 
     # 13) Labels
     labs = labels_tool.generate_labels(
@@ -251,6 +326,7 @@ def run_auto_design(spec: PlanSpec, session_id: str, request_id: str, simulate:
         )
     )
     ops += _collect_ops(labs)
+    clock.lap("labels")
 
     # 14) Final compliance (lightweight)
     final = standards_check_v2.check_compliance_v2(
@@ -276,13 +352,14 @@ def run_auto_design(spec: PlanSpec, session_id: str, request_id: str, simulate:
                     count=inv.mppt_windows[0].get("count", 1),
                 ),
             ),
-            dc_series_count=7 if spec.targets.dc_kw_stc >= 5 else 8,
+            dc_series_count=plan.series,
             ac_conductor=None,
             dc_ocpd=None,
             circuit_kind="ac_feeder",
         )
     )
     ops += _collect_ops(final)
+    clock.lap("final_compliance")
 
     # 15) BOM (pull schedules if any)
     sched_data = {}
@@ -299,11 +376,12 @@ def run_auto_design(spec: PlanSpec, session_id: str, request_id: str, simulate:
             equip={
                 "inverter": {"id": inv.id, "title": inv.title},
                 "module": {"id": m.id, "title": m.title},
-                "array_modules": 14 if spec.targets.dc_kw_stc >= 5 else 8,
+                "array_modules": plan.modules,
             },
         )
     )
     ops += _collect_ops(bom)
+    clock.lap("bom")
 
     # 16) Story
     story = explain_design_v2.explain_design_v2(
@@ -316,7 +394,7 @@ def run_auto_design(spec: PlanSpec, session_id: str, request_id: str, simulate:
                     "site_tmax_C": spec.env.site_tmax_C,
                 },
                 "counts": {
-                    "modules": 14 if spec.targets.dc_kw_stc >= 5 else 8,
+                    "modules": plan.modules,
                     "inverters": 1,
                 },
             },
@@ -324,8 +402,158 @@ def run_auto_design(spec: PlanSpec, session_id: str, request_id: str, simulate:
         )
     )
     ops += _collect_ops(story)
+    clock.lap("story")
+
+    return make_patch(request_id, ops), gate_findings, _findings(final)
+
+
+class AutoDesignCandidate(BaseModel):
+    """One evaluated module/inverter pairing of a multi-candidate run."""
+    rank: int
+    module_id: str
+    inverter_id: str
+    series: int
+    parallel: int
+    array_kw_stc: float
+    score: float  # pre-rank score; lower is better
+    findings: List[Dict[str, Any]] = Field(default_factory=list)
+    timings_ms: Dict[str, float] = Field(default_factory=dict)
+    patch: ODLPatch
+
+
+class AutoDesignCandidates(BaseModel):
+    """Ranked previews plus the pairings pruned at the compliance gate."""
+    candidates: List[AutoDesignCandidate]
+    pruned: List[Dict[str, Any]] = Field(default_factory=list)
+    timings_ms: Dict[str, float] = Field(default_factory=dict)
+
+
+def rank_pairings(spec: PlanSpec, top_k: int = 3, inverter_kw_window: Tuple[float, float] = (0.7, 1.2)):
+    """Top-`top_k` feasible (module, inverter, stringing) pairings for `spec`.
+
+    Every catalog module is paired with every inverter whose AC rating is in
+    the window (the smallest one above it when none is) and stringing is
+    solved for all pairs in one vectorized pass.  Each feasible stringing is
+    scored by its relative distance from the DC target plus the distance of
+    its DC/AC ratio from 1.2; a pairing is represented by its best one.
+    """
+    mods, invs = module_catalog(), inverter_catalog()
+    target = spec.targets.dc_kw_stc
+    window = invs.in_window(target * inverter_kw_window[0], target * inverter_kw_window[1])
+    if not window and len(invs):
+        window = [invs.smallest_at_least(target * inverter_kw_window[0])]
+    if not len(mods) or not window:
+        return []
+    sol = solve_stringing(
+        ModuleArrays.from_items(mods.items),
+        InverterArrays.from_items(window),
+        SiteArrays.from_values(spec.env.site_tmin_C),
+        target_kw_stc=target,
+        series_range=(4, 19),  # as select_dc_stringing
+    )
+    if not len(sol):
+        return []
+    ac_kW = np.array([inv.ac_kW for inv in window], dtype=float)
+    kw = sol.array_kw_stc
+    score = np.abs(kw - target) / max(target, 1e-9) + 0.25 * np.abs(kw / ac_kW[sol.inverter] - 1.2)
+    # Best-scoring stringing per pairing (longer strings break ties)
+    combo = sol.module * len(window) + sol.inverter
+    order = np.lexsort((-sol.series, score, combo))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = combo[order][1:] != combo[order][:-1]
+    best = order[first]
+    best = best[np.argsort(score[best], kind="stable")]
+    ranked = []
+    for k in best[:top_k]:
+        series, parallel = int(sol.series[k]), int(sol.parallel[k])
+        ranked.append((
+            mods.items[int(sol.module[k])],
+            window[int(sol.inverter[k])],
+            _Plan(series, parallel, series * parallel),
+            float(kw[k]),
+            round(float(score[k]), 6),
+        ))
+    return ranked
+
 
-    return make_patch(request_id, ops)
+def _evaluate_candidate(args) -> Dict[str, Any]:
+    """Process-pool entry point: run one pairing's pipeline, pruning at the gate."""
+    spec, session_id, request_id, simulate, m, inv, plan = args
+    timings: Dict[str, float] = {}
+    patch, gate, final = _run_pipeline(spec, session_id, request_id, simulate, m, inv, plan, timings, True)
+    return {"patch": patch, "gate": gate, "final": final, "timings": timings}
+
+
+_POOL = SharedProcessPool("auto_design", "AUTO_DESIGN_WORKERS")
+
+
+def _candidate_pool() -> Optional[Executor]:
+    """Shared worker pool (AUTO_DESIGN_WORKERS, default CPU count up to 4); None runs inline."""
+    return _POOL.get()
+
+
+def run_auto_design_candidates(
+    spec: PlanSpec,
+    session_id: str,
+    request_id: str,
+    simulate: bool = True,
+    top_k: int = 3,
+    executor: Optional[Executor] = None,
+) -> AutoDesignCandidates:
+    """Evaluate the top-`top_k` module/inverter pairings concurrently.
+
+    Each pairing runs the full pipeline in a worker process (`executor`, or
+    the shared pool).  Pairings whose compliance gate reports an error stop
+    there and are listed under ``pruned``.  Survivors are ranked by final
+    compliance errors, then warnings, then the pre-rank score; each carries
+    its preview patch and per-stage timings.
+    """
+    clock = _StageClock({})
+    pairings = rank_pairings(spec, top_k)
+    clock.lap("rank")
+    jobs = [
+        (spec, session_id, f"{request_id}:c{i}", simulate, m, inv, plan)
+        for i, (m, inv, plan, _, _) in enumerate(pairings)
+    ]
+    pool = executor if executor is not None else _candidate_pool()
+    if pool is None or len(jobs) <= 1:
+        results = [_evaluate_candidate(job) for job in jobs]
+    else:
+        try:
+            results = list(pool.map(_evaluate_candidate, jobs))
+        except Exception as e:  # broken pool: degrade to inline evaluation
+            _POOL.discard(pool, e)
+            logger.warning(f"Auto-design candidate pool failed, evaluating inline: {e}")
+            results = [_evaluate_candidate(job) for job in jobs]
+    clock.lap("evaluate")
+
+    survivors, pruned = [], []
+    for (m, inv, plan, kw, score), res in zip(pairings, results):
+        if res["patch"] is None:
+            pruned.append({"module_id": m.id, "inverter_id": inv.id, "findings": res["gate"]})
+            continue
+        findings = res["gate"] + res["final"]
+        errors = sum(1 for f in findings if f.get("severity") == "error")
+        warnings = sum(1 for f in findings if f.get("severity") == "warn")
+        survivors.append(((errors, warnings, score), AutoDesignCandidate(
+            rank=0,
+            module_id=m.id,
+            inverter_id=inv.id,
+            series=plan.series,
+            parallel=plan.parallel,
+            array_kw_stc=kw,
+            score=score,
+            findings=findings,
+            timings_ms=res["timings"],
+            patch=res["patch"],
+        )))
+    survivors.sort(key=lambda x: x[0])
+    candidates = []
+    for rank, (_, cand) in enumerate(survivors, start=1):
+        cand.rank = rank
+        candidates.append(cand)
+    clock.lap("rank_results")
+    return AutoDesignCandidates(candidates=candidates, pruned=pruned, timings_ms=clock.timings)
 
 
 def auto_design_from_nl(
@@ -359,5 +587,12 @@ def auto_design_from_nl(
     return make_patch(request_id, merged_ops)
 
 
-__all__ = ["run_auto_design", "auto_design_from_nl"]
+__all__ = [
+    "run_auto_design",
+    "run_auto_design_candidates",
+    "rank_pairings",
+    "AutoDesignCandidate",
+    "AutoDesignCandidates",
+    "auto_design_from_nl",
+]
 
@@ -7,6 +7,10 @@ Responsibilities:
 - Enforce risk policy (auto/review/blocked)
 - Apply returned ODLPatch via ODL store with CAS
 - Return a single ADPF envelope
+
+The ``long_plan`` task plans a full PV design with ``LongPlanner`` and runs
+it through ``run_plan``: independent steps run concurrently, their patches
+are merged and the card reports per-step status and the critical path.
 """
 from __future__ import annotations
 
@@ -14,9 +18,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.utils.adpf import wrap_response
 from backend.orchestrator.context import load_graph_and_view_nodes
-from backend.orchestrator.router import run_task, ActArgs
+from backend.orchestrator.router import run_plan, run_task, ActArgs
 from backend.orchestrator.policy import decide
+from backend.odl.schemas import ODLGraph
 from backend.odl.store import ODLStore
+from backend.planner.long_planner import LongPlanner
+from backend.planner.schema import LongPlan
 from backend.services.component_library import find_by_categories
 from backend.tools.selection import find_components
 from backend.tools.schemas import SelectionInput
@@ -68,6 +75,18 @@ class Orchestrator:
         # 2) Determine domain from graph meta (default 'PV')
         domain = (graph.meta or {}).get("domain") or "PV"
 
+        # 2b) Multi-step design: plan, then run independent steps concurrently
+        if task == "long_plan":
+            card = await LongPlanner().plan(session_id, args.command or "", args.layer)
+            return await self._run_plan(
+                db=db,
+                graph=graph,
+                plan=card.plan,
+                request_id=request_id,
+                domain=domain,
+                warnings=budget_warnings,
+            )
+
         # 3) Special handling for placeholder replacement: select real components, then build patch
         if task == "replace_placeholders":
             # Identify placeholders in current layer
@@ -182,3 +201,79 @@ class Orchestrator:
             status="complete",
             warnings=budget_warnings or None,
         )
+
+    async def _run_plan(
+        self,
+        *,
+        db: AsyncSession,
+        graph: ODLGraph,
+        plan: LongPlan,
+        request_id: str,
+        domain: str,
+        warnings: list[str],
+    ):
+        """Run `plan` against `graph` and apply the merged patch when every step
+        succeeded without conflicts and the policy allows all of them."""
+        execution = await run_plan(
+            plan=plan, session_id=graph.session_id, request_id=request_id, graph=graph
+        )
+        steps = [
+            {
+                "id": t.id,
+                "title": t.title,
+                "status": execution.results[t.id].status,
+                "duration_ms": execution.results[t.id].duration_ms,
+                "error": execution.results[t.id].error,
+            }
+            for t in plan.tasks
+        ]
+        card = {
+            "title": "Plan Executed",
+            "steps": steps,
+            "critical_path": execution.critical_path,
+            "critical_path_ms": execution.critical_path_ms,
+            "wall_ms": execution.wall_ms,
+            "work_ms": execution.work_ms,
+        }
+        problems = [f"Step {s['id']} {s['status']}: {s['error']}" for s in steps if s["status"] != "done"]
+        problems += [f"Conflicting changes between {' and '.join(c['steps'])}" for c in execution.conflicts]
+        warnings = list(warnings or []) + problems
+
+        decisions = [
+            "review_required" if not t.can_auto else decide(t.id, risk_override=domain_risk_override(domain, t.id))
+            for t in plan.tasks
+        ]
+        if "blocked" in decisions:
+            return wrap_response(
+                thought="Plan blocked by policy",
+                card={**card, "title": "Blocked by Policy"},
+                status="blocked",
+                warnings=warnings or None,
+            )
+        if "review_required" in decisions or problems:
+            return wrap_response(
+                thought="Plan requires approval before applying its patch",
+                card={
+                    **card,
+                    "title": "Approval Required",
+                    "actions": [{"type": "propose_patch", "payload": execution.patch.model_dump()}],
+                },
+                patch=None,
+                status="pending",
+                warnings=warnings or None,
+            )
+
+        store = ODLStore()
+        _, new_version = await store.apply_patch_cas(
+            db=db,
+            session_id=graph.session_id,
+            expected_version=graph.version,
+            patch=execution.patch,
+        )
+        return wrap_response(
+            thought=f"Applied plan via request {request_id}",
+            card={**card, "title": "Plan Applied", "subtitle": f"New version: {new_version}"},
+            patch={"session_id": graph.session_id, "version": new_version},
+            status="complete",
+            warnings=warnings or None,
+        )
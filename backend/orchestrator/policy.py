@@ -40,6 +40,11 @@ TASK_RISK: dict[str, Risk] = {
     "pv_generate_wiring": "low",
     "pv_compliance_check": "low",
     "pv_compute_bom": "low",
+    "pv_explain": "low",
+    # Mechanical tools only record surfaces/racking metadata
+    "mech_surface": "low",
+    "mech_racking_layout": "low",
+    "mech_attachment_check": "low",
 }
 
 
@@ -34,11 +34,22 @@ from backend.tools.pv import (
 )
 from backend.tools.mech import surface, racking
 from backend.orchestrator.plan_spec import PlanSpec
-from backend.orchestrator.auto_designer import run_auto_design, auto_design_from_nl
+from backend.orchestrator.auto_designer import run_auto_design, run_auto_design_candidates, auto_design_from_nl
 from backend.tools.standards_profiles import load_profile
 from backend.ai.tools.generate_wiring_advanced import generate_wiring_advanced
 from backend.tools.ai_wiring import generate_ai_wiring
 from backend.odl.schemas import ODLGraph, ODLEdge, PatchOp
+from backend.orchestrator.scheduler import (
+    PlanExecution,
+    PlanStep,
+    ancestors,
+    build_dag,
+    execute_plan,
+    topological_order,
+)
+from backend.odl.patches import apply_patch
+from backend.odl.views import layer_view
+from backend.planner.schema import LongPlan
 import asyncio
 import logging
 from backend.tools.replacement import apply_replacements, ReplaceInput, ReplacementItem
@@ -86,6 +97,7 @@ def get_tool(task_id: str):
         "materialize_design": materialize.materialize_design,
         "generate_bom": bom_tool.generate_bom,
         "auto_design": run_auto_design,  # takes PlanSpec
+        "auto_design_candidates": run_auto_design_candidates,  # ranked top-K previews
         # chat convenience: NL -> PlanSpec -> auto design (simulate-first)
         "auto_design_from_nl": auto_design_from_nl,
         # protective devices
@@ -209,6 +221,8 @@ class ActArgs(BaseModel):
     existing_components: list[str] | None = None
     rating_A: float | None = None
     voltage_rating_V: float | None = None
+    # Natural-language request (PV tools that parse requirements, long_plan)
+    command: str | None = None
 
 
 async def run_task(
@@ -219,8 +233,14 @@ async def run_task(
     layer_nodes: list[ODLNode],
     args: ActArgs,
     db: Optional[object] = None,
+    graph: Optional[ODLGraph] = None,
 ) -> Optional[ODLPatch]:
-    """Build tool input for `task`, invoke, and return an ODLPatch (or None)."""
+    """Build tool input for `task`, invoke, and return an ODLPatch (or None).
+
+    When `graph` is given, PV tools read it instead of the stored session
+    graph (used by ``run_plan`` to expose upstream steps' unapplied patches)
+    and their failures propagate so the plan can skip dependent steps.
+    """
     if task == "generate_wiring":
         inp = GenerateWiringInput(
             session_id=session_id,
@@ -299,15 +319,28 @@ async def run_task(
         inp = ReplaceInput(session_id=session_id, request_id=request_id, replacements=repls)
         return apply_replacements(inp)
 
-    # Handle PV tools - these use a different calling convention
+    # Handle PV and mechanical tools - these use a different calling convention
     tool_func = get_tool(task)
     if tool_func:
         # PV tools expect different arguments - adapt them here
-        if task.startswith("pv_"):
+        if task.startswith(("pv_", "mech_")):
             from backend.odl.store import ODLStore
             
             # PV tools expect: store, session_id, args dict  
             store = ODLStore()
+            if graph is not None:
+                async def get_graph_override(_db, session_id_param):
+                    return graph
+
+                async def get_odl_override(session_id_param):
+                    return graph
+
+                async def get_meta_override(session_id_param):
+                    return graph.meta
+
+                store.get_graph = get_graph_override
+                store.get_odl = get_odl_override
+                store.get_meta = get_meta_override
             # Add compatibility methods for PV tools that expect different APIs
             if not hasattr(store, 'get_odl'):
                 # Create a wrapper that provides the database session
@@ -365,6 +398,8 @@ async def run_task(
                 return make_patch(request_id, ops=[])
                     
             except Exception as e:
+                if graph is not None:
+                    raise
                 logger = logging.getLogger(__name__)
                 logger.warning(f"PV tool {task} failed: {e}")
                 import traceback
@@ -372,3 +407,59 @@ async def run_task(
                 return None
     
     return None
+
+
+async def run_plan(
+    *,
+    plan: LongPlan,
+    session_id: str,
+    request_id: str,
+    graph: ODLGraph,
+    max_concurrency: Optional[int] = None,
+    strict: bool = False,
+) -> PlanExecution:
+    """Run a multi-step plan, scheduling independent tools concurrently.
+
+    Steps are ordered by the ODL paths their tools read and write plus each
+    task's ``depends_on``.  Each step runs against `graph` with the patches
+    of all its (transitive) predecessors applied, in plan order, so
+    dependents see upstream results without anything being persisted.
+    Every step gets its own request id and, for PV tools, its own database
+    sessions (``run_task`` without ``db``), so concurrent steps never share a
+    session.  A step whose tool raises or is unknown fails and its dependents
+    are skipped.  The merged patch is returned for preview/approval rather
+    than applied.
+    """
+    tasks = {t.id: t for t in plan.tasks}
+    steps = [PlanStep(id=t.id, args=t.args, depends_on=list(t.depends_on)) for t in plan.tasks]
+    preds = build_dag(steps)
+    order = topological_order(steps, preds)
+    upstream = ancestors(order, preds)
+    patches: Dict[str, ODLPatch] = {}
+
+    def working_graph(step_id: str) -> ODLGraph:
+        ops = [op for sid in order if sid in upstream[step_id] and sid in patches for op in patches[sid].operations]
+        if not ops:
+            return graph
+        working, _ = apply_patch(graph, ODLPatch(patch_id=f"plan:{step_id}", operations=ops), {})
+        return working
+
+    async def runner(step: PlanStep) -> Optional[ODLPatch]:
+        task = tasks[step.id]
+        working = working_graph(step.id)
+        patch = await run_task(
+            task=step.tool,
+            session_id=session_id,
+            request_id=f"{request_id}:{step.id}",
+            layer_nodes=layer_view(working, task.layer).nodes,
+            args=ActArgs(layer=task.layer, attrs=dict(task.args or {})),
+            graph=working,
+        )
+        if patch is None:
+            raise ValueError(f"Unknown task {step.tool!r}")
+        patches[step.id] = patch
+        return patch
+
+    return await execute_plan(
+        steps, runner, request_id=request_id, max_concurrency=max_concurrency, strict=strict
+    )
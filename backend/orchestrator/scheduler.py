@@ -0,0 +1,374 @@
+"""
+DAG scheduler for multi-step tool plans.
+
+Each tool declares the ODL paths it reads and writes (``ToolIO``): meta keys
+(``meta:design_state.equip``), node types (``nodes:panel``), edge kinds
+(``edges:string``) or ``*`` for "anything".  ``build_dag`` orders two plan
+steps only when their paths overlap (read-after-write, write-after-read or
+write-after-write, in plan order) or one explicitly depends on the other;
+``execute_plan`` then runs every step as soon as its predecessors finish, so
+independent tools run concurrently.
+
+Patches are merged in plan order.  Two steps with no ordering between them
+that touch the same node, edge or meta path are reported as conflicts (or
+rejected with ``strict=True``).  The result carries per-step timings and the
+critical path: the chain of dependent steps that bounds wall-clock latency.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from backend.odl.schemas import ODLPatch, PatchOp
+
+logger = logging.getLogger(__name__)
+
+ANY = "*"
+
+
+@dataclass(frozen=True)
+class ToolIO:
+    """ODL paths a tool reads and writes."""
+    reads: FrozenSet[str] = frozenset()
+    writes: FrozenSet[str] = frozenset()
+
+
+def _io(reads: Iterable[str] = (), writes: Iterable[str] = ()) -> ToolIO:
+    return ToolIO(frozenset(reads), frozenset(writes))
+
+
+# Tools without a declaration are treated as reading and writing everything
+UNKNOWN_IO = _io([ANY], [ANY])
+
+TOOL_IO: Dict[str, ToolIO] = {
+    "pv_set_assumptions": _io(writes=["meta:design_state"]),
+    "pv_select_components": _io(
+        writes=["nodes:inverter", "nodes:panel", "nodes:microinverter", "meta:design_state.equip"]
+    ),
+    "pv_stringing_plan": _io(
+        reads=["nodes:panel", "nodes:inverter", "meta:design_state.env", "meta:design_state.equip"],
+        writes=["meta:design_state.stringing"],
+    ),
+    "pv_apply_stringing": _io(
+        reads=["meta:design_state.stringing", "nodes:panel", "nodes:inverter"],
+        writes=["edges"],
+    ),
+    "pv_add_disconnects": _io(reads=["meta:design_state.equip"], writes=["nodes:disconnect"]),
+    "pv_size_protection": _io(
+        reads=["meta:design_state.equip", "meta:design_state.stringing"],
+        writes=["nodes:protection", "meta:electrical.protection"],
+    ),
+    "pv_size_conductors": _io(
+        reads=["meta:design_state.targets", "meta:design_state.equip", "meta:physical.routes"],
+        writes=["meta:electrical.conductors"],
+    ),
+    "pv_generate_wiring": _io(
+        reads=["nodes", "meta:design_state.stringing", "meta:design_state.equip"],
+        writes=["edges", "meta:physical.bundles", "meta:physical.routes", "meta:electrical.connections"],
+    ),
+    "pv_compliance_check": _io(reads=["meta:design_state", "meta:electrical"]),
+    "pv_compute_bom": _io(
+        reads=["nodes", "meta:design_state", "meta:electrical.conductors"], writes=["meta:bom"]
+    ),
+    "pv_explain": _io(reads=["meta:design_state"]),
+    "mech_surface": _io(writes=["meta:mechanical.surfaces"]),
+    "mech_racking_layout": _io(reads=["meta:mechanical.surfaces"], writes=["meta:mechanical.racking"]),
+    "mech_attachment_check": _io(
+        reads=["meta:mechanical.surfaces", "meta:mechanical.racking", "meta:design_state.stringing"]
+    ),
+}
+
+
+def io_for(tool: str) -> ToolIO:
+    return TOOL_IO.get(tool, UNKNOWN_IO)
+
+
+_SEP = re.compile(r"[.:]")
+
+
+def _parts(path: str) -> Tuple[str, ...]:
+    return tuple(_SEP.split(path))
+
+
+def paths_overlap(a: str, b: str) -> bool:
+    """True when one path equals or contains the other (``*`` overlaps all)."""
+    if a == ANY or b == ANY:
+        return True
+    pa, pb = _parts(a), _parts(b)
+    n = min(len(pa), len(pb))
+    return pa[:n] == pb[:n]
+
+
+def _any_overlap(xs: FrozenSet[str], ys: FrozenSet[str]) -> bool:
+    return any(paths_overlap(x, y) for x in xs for y in ys)
+
+
+@dataclass
+class PlanStep:
+    """One tool invocation; `tool` defaults to the step id."""
+    id: str
+    tool: str = ""
+    args: Any = None
+    depends_on: List[str] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.tool = self.tool or self.id
+
+
+@dataclass
+class StepResult:
+    id: str
+    status: str  # "done" | "failed" | "skipped"
+    patch: Optional[ODLPatch] = None
+    start_ms: float = 0.0
+    duration_ms: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class PlanExecution:
+    patch: ODLPatch
+    results: Dict[str, StepResult]
+    predecessors: Dict[str, Set[str]]
+    conflicts: List[Dict[str, Any]]
+    critical_path: List[str]
+    critical_path_ms: float
+    wall_ms: float
+    work_ms: float
+
+
+class PatchConflictError(ValueError):
+    """Concurrent plan steps produced overlapping patches."""
+
+    def __init__(self, conflicts: List[Dict[str, Any]]):
+        super().__init__(f"{len(conflicts)} conflicting patch operation(s) between concurrent steps")
+        self.conflicts = conflicts
+
+
+def build_dag(
+    steps: List[PlanStep], io: Callable[[str], ToolIO] = io_for
+) -> Dict[str, Set[str]]:
+    """Predecessors of each step from path overlaps and explicit `depends_on`.
+
+    Raises ``ValueError`` for duplicate ids, unknown dependencies or cycles.
+    """
+    ids = [s.id for s in steps]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Plan step ids must be unique")
+    known = set(ids)
+    decl = [io(s.tool) for s in steps]
+    preds: Dict[str, Set[str]] = {s.id: set() for s in steps}
+    for j, later in enumerate(steps):
+        for dep in later.depends_on:
+            if dep not in known:
+                raise ValueError(f"Step {later.id!r} depends on unknown step {dep!r}")
+            preds[later.id].add(dep)
+        for i in range(j):
+            a, b = decl[i], decl[j]
+            if (
+                _any_overlap(a.writes, b.reads)
+                or _any_overlap(a.reads, b.writes)
+                or _any_overlap(a.writes, b.writes)
+            ):
+                preds[later.id].add(steps[i].id)
+    topological_order(steps, preds)  # raises on cycles
+    return preds
+
+
+def topological_order(steps: List[PlanStep], preds: Dict[str, Set[str]]) -> List[str]:
+    """Kahn's algorithm; ties broken by plan order."""
+    index = {s.id: i for i, s in enumerate(steps)}
+    remaining = {k: set(v) for k, v in preds.items()}
+    succs: Dict[str, List[str]] = {s.id: [] for s in steps}
+    for sid, ps in preds.items():
+        for p in ps:
+            succs[p].append(sid)
+    ready = sorted((sid for sid, ps in remaining.items() if not ps), key=index.get)
+    order: List[str] = []
+    while ready:
+        sid = ready.pop(0)
+        order.append(sid)
+        for nxt in succs[sid]:
+            remaining[nxt].discard(sid)
+            if not remaining[nxt]:
+                ready.append(nxt)
+                ready.sort(key=index.get)
+    if len(order) != len(steps):
+        cyclic = sorted(set(index) - set(order), key=index.get)
+        raise ValueError(f"Plan has a dependency cycle among {cyclic}")
+    return order
+
+
+def ancestors(order: List[str], preds: Dict[str, Set[str]]) -> Dict[str, Set[str]]:
+    """Transitive predecessors of each step; `order` must be topological."""
+    anc: Dict[str, Set[str]] = {}
+    for sid in order:
+        acc: Set[str] = set()
+        for p in preds[sid]:
+            acc.add(p)
+            acc |= anc[p]
+        anc[sid] = acc
+    return anc
+
+
+def _op_keys(op: PatchOp) -> List[str]:
+    value = op.value or {}
+    if op.op == "set_meta":
+        return [f"meta:{value.get('path', '')}"]
+    if op.op.endswith("_node"):
+        return [f"node:{value.get('id') or value.get('node_id')}"]
+    if op.op.endswith("_edge"):
+        return [f"edge:{value.get('id') or value.get('edge_id')}"]
+    return []
+
+
+def _overlapping_keys(a: Set[str], b: Set[str]) -> Set[str]:
+    hits = set(a & b)
+    metas_a = [k for k in a if k.startswith("meta:")]
+    metas_b = [k for k in b if k.startswith("meta:")]
+    for x in metas_a:
+        for y in metas_b:
+            if x != y and paths_overlap(x, y):
+                hits.update((x, y))
+    return hits
+
+
+def merge_patches(
+    order: List[str],
+    results: Dict[str, StepResult],
+    preds: Dict[str, Set[str]],
+    request_id: str,
+) -> Tuple[ODLPatch, List[Dict[str, Any]]]:
+    """Concatenate patches in `order`; report overlaps between unordered steps."""
+    anc = ancestors(order, preds)
+    keys: Dict[str, Set[str]] = {}
+    op_ids: Dict[str, str] = {}
+    ops: List[PatchOp] = []
+    conflicts: List[Dict[str, Any]] = []
+    for sid in order:
+        patch = results[sid].patch
+        if patch is None:
+            continue
+        mine: Set[str] = set()
+        for op in patch.operations:
+            mine.update(_op_keys(op))
+            owner = op_ids.get(op.op_id)
+            if owner is not None:
+                conflicts.append({"steps": [owner, sid], "keys": [f"op:{op.op_id}"]})
+            op_ids[op.op_id] = sid
+            ops.append(op)
+        for other, theirs in keys.items():
+            if other in anc[sid]:
+                continue  # ordered: the later step intentionally builds on it
+            hit = _overlapping_keys(mine, theirs)
+            if hit:
+                conflicts.append({"steps": [other, sid], "keys": sorted(hit)})
+        keys[sid] = mine
+    return ODLPatch(patch_id=f"patch:{request_id}", operations=ops), conflicts
+
+
+def _critical_path(order: List[str], preds: Dict[str, Set[str]], results: Dict[str, StepResult]):
+    best: Dict[str, Tuple[float, Optional[str]]] = {}
+    for sid in order:
+        prev = max(preds[sid], key=lambda p: best[p][0], default=None)
+        base = best[prev][0] if prev is not None else 0.0
+        best[sid] = (base + results[sid].duration_ms, prev)
+    if not best:
+        return [], 0.0
+    tail = max(order, key=lambda s: best[s][0])
+    total = best[tail][0]
+    path: List[str] = []
+    node: Optional[str] = tail
+    while node is not None:
+        path.append(node)
+        node = best[node][1]
+    return path[::-1], round(total, 3)
+
+
+async def execute_plan(
+    steps: List[PlanStep],
+    runner: Callable[[PlanStep], Awaitable[Optional[ODLPatch]]],
+    *,
+    request_id: str,
+    max_concurrency: Optional[int] = None,
+    strict: bool = False,
+    io: Callable[[str], ToolIO] = io_for,
+) -> PlanExecution:
+    """Run `steps` through `runner` in dependency order, concurrently where possible.
+
+    A failed step's dependents are skipped; independent branches continue.
+    With `strict`, conflicting concurrent patches raise ``PatchConflictError``.
+    """
+    preds = build_dag(steps, io)
+    order = topological_order(steps, preds)
+    by_id = {s.id: s for s in steps}
+    results: Dict[str, StepResult] = {}
+    done: Dict[str, asyncio.Event] = {s.id: asyncio.Event() for s in steps}
+    gate = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+    t0 = time.perf_counter()
+
+    async def run(sid: str) -> None:
+        try:
+            for p in preds[sid]:
+                await done[p].wait()
+            failed = [p for p in preds[sid] if results[p].status != "done"]
+            if failed:
+                results[sid] = StepResult(sid, "skipped", error=f"upstream failed: {sorted(failed)}")
+                return
+            if gate is not None:
+                await gate.acquire()
+            start = time.perf_counter()
+            try:
+                patch = await runner(by_id[sid])
+                results[sid] = StepResult(sid, "done", patch=patch)
+            except Exception as e:
+                logger.warning(f"Plan step {sid} failed: {e}")
+                results[sid] = StepResult(sid, "failed", error=str(e))
+            finally:
+                if gate is not None:
+                    gate.release()
+                end = time.perf_counter()
+                results[sid].start_ms = round((start - t0) * 1000.0, 3)
+                results[sid].duration_ms = round((end - start) * 1000.0, 3)
+        finally:
+            done[sid].set()
+
+    await asyncio.gather(*(run(sid) for sid in order))
+    wall_ms = round((time.perf_counter() - t0) * 1000.0, 3)
+
+    patch, conflicts = merge_patches(order, results, preds, request_id)
+    if conflicts and strict:
+        raise PatchConflictError(conflicts)
+    path, path_ms = _critical_path(order, preds, results)
+    return PlanExecution(
+        patch=patch,
+        results=results,
+        predecessors=preds,
+        conflicts=conflicts,
+        critical_path=path,
+        critical_path_ms=path_ms,
+        wall_ms=wall_ms,
+        work_ms=round(sum(r.duration_ms for r in results.values()), 3),
+    )
+
+
+__all__ = [
+    "ToolIO",
+    "TOOL_IO",
+    "UNKNOWN_IO",
+    "io_for",
+    "paths_overlap",
+    "PlanStep",
+    "StepResult",
+    "PlanExecution",
+    "PatchConflictError",
+    "build_dag",
+    "topological_order",
+    "ancestors",
+    "merge_patches",
+    "execute_plan",
+]
@@ -18,6 +18,9 @@ class LongPlanner:
 
     This simplified version does not inspect existing ODL state but derives
     a sequence of standard tool invocations based on requested system size.
+    Tasks list only dependencies their tools' ODL reads and writes cannot
+    express (see ``backend.orchestrator.scheduler.TOOL_IO``), so independent
+    steps run concurrently.
     """
 
     def __init__(self, store: object | None = None):
@@ -71,64 +74,60 @@ class LongPlanner:
                 id="mech_surface",
                 title="Define roof surface (single plane)",
                 args={"name":"R1","tilt_deg":25,"az_deg":180,"size_m":[11.0,6.0],"setbacks_m":0.5},
-                depends_on=["pv_select_components"], layer=layer),
+                layer=layer),
             PlanTask(
                 id="mech_racking_layout",
                 title="Place modules on surface",
                 args={"surface":"R1","module_size_m":[1.14,1.72],"row_spacing_m":0.02},
-                depends_on=["mech_surface"], layer=layer),
-            PlanTask(
-                id="mech_attachment_check",
-                title="Check attachment spans & counts",
-                args={"surface":"R1","max_span_m":1.8,"edge_clear_m":0.3},
-                depends_on=["mech_racking_layout"], layer=layer),
+                layer=layer),
             PlanTask(
                 id="pv_stringing_plan",
                 title="Compute stringing across MPPTs (series/parallel)",
                 args={"layer": layer, "target_kw": kw},
-                depends_on=["pv_select_components","mech_racking_layout"],
+                # Strings are laid out over the racked modules; the other
+                # steps are ordered by the ODL paths their tools declare.
+                depends_on=["mech_racking_layout"],
                 layer=layer,
             ),
+            PlanTask(
+                id="mech_attachment_check",
+                title="Check attachment spans & counts",
+                args={"surface":"R1","max_span_m":1.8,"edge_clear_m":0.3},
+                layer=layer),
             PlanTask(
                 id="pv_apply_stringing",
                 title="Apply stringing (create DC links to MPPT terminals)",
                 args={"layer": layer},
-                depends_on=["pv_stringing_plan"],
                 layer=layer,
             ),
             PlanTask(
                 id="pv_add_disconnects",
                 title="Add required DC/AC disconnects",
                 args={"layer": layer, "jurisdiction_profile": "NEC_2023"},
-                depends_on=["pv_apply_stringing"],
                 layer=layer,
             ),
             PlanTask(
                 id="pv_size_protection",
                 title="Size OCPD/fusing per NEC 690",
                 args={"layer": layer, "profile": "NEC_2023"},
-                depends_on=["pv_add_disconnects"],
                 layer=layer,
             ),
             PlanTask(
                 id="pv_size_conductors",
                 title="Size DC/AC conductors with derates and voltage-drop budgets",
                 args={"layer": layer, "dc_vdrop_pct": 2.0, "ac_vdrop_pct": 3.0},
-                depends_on=["pv_size_protection"],
                 layer=layer,
             ),
             PlanTask(
                 id="pv_generate_wiring",
                 title="Auto-route links & create bundles/routes",
                 args={"layer": layer},
-                depends_on=["pv_size_conductors"],
                 layer=layer,
             ),
             PlanTask(
                 id="pv_compliance_check",
                 title="Compliance check (blocking if non-conforming)",
                 args={"layer": layer, "profile": "NEC_2023"},
-                depends_on=["pv_generate_wiring"],
                 layer=layer,
                 risk="medium",
             ),
@@ -136,14 +135,12 @@ class LongPlanner:
                 id="pv_compute_bom",
                 title="Compute BOM and cost summary",
                 args={"layer": layer},
-                depends_on=["pv_compliance_check"],
                 layer=layer,
             ),
             PlanTask(
                 id="pv_explain",
                 title="Explain the design (homeowner + engineer views)",
                 args={"layer": layer},
-                depends_on=["pv_compute_bom"],
                 layer=layer,
             ),
         ]
@@ -11,14 +11,13 @@ from typing import Any, Dict, List, Optional, Callable, Set
 from datetime import datetime, timedelta
 import time
 import json
-import hashlib
 
 import redis.asyncio as redis
-from concurrent.futures import ThreadPoolExecutor
-import aiocache
-from aiocache import Cache
 from prometheus_client import Histogram, Counter
 
+from backend.scalability.job_queue import Job, JobQueue, configure_queue, current_job, get_job_queue
+from backend.utils.cache import MemoryCache, RedisTier, TwoTierCache
+
 
 logger = logging.getLogger(__name__)
 
@@ -110,23 +109,33 @@ class CacheEntry:
 
 
 class EnterpriseCache:
-    """Enterprise-grade caching system with Redis backing."""
+    """Enterprise-grade caching system with Redis backing.
+
+    A ``TwoTierCache``: the local tier is a byte-bounded W-TinyLFU
+    ``MemoryCache`` whose entries expire on its timing wheel, in front of
+    Redis.  Each entry is tagged with its tenant in both tiers; Redis writes
+    are pipelined and prefix invalidation walks keys with ``SCAN``.
+    """
 
     def __init__(self, config: ScalabilityConfig):
         self.config = config
         self.redis: Optional[redis.Redis] = None
-        self.local_cache: Dict[str, CacheEntry] = {}
-        self.cache_size_bytes = 0
-
-        # Initialize aiocache for local caching
-        self.cache = Cache(
-            Cache.MEMORY,
-            ttl=config.cache_ttl_seconds,
-            max_size=10000
+        self.local_cache = MemoryCache(
+            100_000,
+            max_bytes=config.max_cache_size_mb * 1024 * 1024,
+            sizeof=lambda value: len(json.dumps(value, default=str)),
+            default_ttl=config.cache_ttl_seconds,
+            policy="tinylfu",
+            name="enterprise",
         )
 
         if config.redis_url:
             self.redis = redis.from_url(config.redis_url)
+        self.cache = TwoTierCache(self.local_cache, RedisTier(self.redis) if self.redis else None)
+
+    @property
+    def cache_size_bytes(self) -> int:
+        return self.local_cache.stats()["bytes"]
 
     async def initialize(self) -> None:
         """Initialize the cache system."""
@@ -140,37 +149,17 @@ class EnterpriseCache:
         """Get value from cache with tenant isolation."""
 
         cache_key = self._make_cache_key(key, tenant_id)
+        try:
+            value, tier = await self.cache.lookup(cache_key)
+        except Exception as e:  # only the Redis tier can fail
+            logger.warning(f"Redis cache get failed: {e}")
+            value, tier = None, None
 
-        # Try local cache first
-        if cache_key in self.local_cache:
-            entry = self.local_cache[cache_key]
-            if not self._is_expired(entry):
-                entry.access_count += 1
-                entry.last_accessed = datetime.now()
-                SCALABILITY_METRICS["cache_hits_total"].labels(
-                    cache_name="local", tenant_id=tenant_id
-                ).inc()
-                return entry.value
-
-        # Try Redis cache
-        if self.redis:
-            try:
-                value = await self.redis.get(cache_key)
-                if value is not None:
-                    # Deserialize and store locally
-                    data = json.loads(value)
-                    entry = CacheEntry(
-                        key=cache_key,
-                        value=data["value"],
-                        ttl_seconds=data["ttl_seconds"]
-                    )
-                    self.local_cache[cache_key] = entry
-                    SCALABILITY_METRICS["cache_hits_total"].labels(
-                        cache_name="redis", tenant_id=tenant_id
-                    ).inc()
-                    return entry.value
-            except Exception as e:
-                logger.warning(f"Redis cache get failed: {e}")
+        if tier is not None:
+            SCALABILITY_METRICS["cache_hits_total"].labels(
+                cache_name="local" if tier == "memory" else tier, tenant_id=tenant_id
+            ).inc()
+            return value
 
         SCALABILITY_METRICS["cache_misses_total"].labels(
             cache_name="total", tenant_id=tenant_id
@@ -189,79 +178,40 @@ class EnterpriseCache:
         cache_key = self._make_cache_key(key, tenant_id)
         ttl = ttl_seconds or self.config.cache_ttl_seconds
 
-        entry = CacheEntry(
-            key=cache_key,
-            value=value,
-            ttl_seconds=ttl
-        )
-
-        # Store locally
-        self.local_cache[cache_key] = entry
-
-        # Clean expired entries periodically
-        await self._cleanup_expired_entries()
-
-        # Store in Redis if available
-        if self.redis:
-            try:
-                data = {
-                    "value": value,
-                    "ttl_seconds": ttl,
-                    "created_at": datetime.now().isoformat()
-                }
-                await self.redis.setex(cache_key, ttl, json.dumps(data))
-                return True
-            except Exception as e:
-                logger.warning(f"Redis cache set failed: {e}")
+        # The local write happens before Redis is touched, so it survives a Redis failure
+        try:
+            await self.cache.set(cache_key, value, ttl=ttl, tags=(self._tenant_tag(tenant_id),))
+        except Exception as e:
+            logger.warning(f"Redis cache set failed: {e}")
 
         return True
 
     async def invalidate(self, key_pattern: str, tenant_id: str = "default") -> int:
-        """Invalidate cache entries matching pattern."""
+        """Invalidate cache entries whose key starts with `key_pattern` (a
+        trailing ``*`` is ignored)."""
 
-        cache_key_pattern = self._make_cache_key(key_pattern, tenant_id)
-        invalidated_count = 0
-
-        # Invalidate local cache
-        keys_to_remove = [
-            k for k in self.local_cache.keys()
-            if k.startswith(cache_key_pattern.rstrip("*"))
-        ]
-
-        for key in keys_to_remove:
-            del self.local_cache[key]
-            invalidated_count += 1
-
-        # Invalidate Redis cache
-        if self.redis:
-            try:
-                # Redis pattern matching for invalidation
-                keys = await self.redis.keys(f"{cache_key_pattern}*")
-                if keys:
-                    await self.redis.delete(*keys)
-                    invalidated_count += len(keys)
-            except Exception as e:
-                logger.warning(f"Redis cache invalidation failed: {e}")
+        prefix = self._make_cache_key(key_pattern.rstrip("*"), tenant_id)
+        try:
+            return await self.cache.invalidate_prefix(prefix)
+        except Exception as e:
+            logger.warning(f"Redis cache invalidation failed: {e}")
+            return 0
 
-        return invalidated_count
+    async def invalidate_tenant(self, tenant_id: str) -> int:
+        """Drop every cached entry of `tenant_id`."""
+        try:
+            return await self.cache.invalidate_tag(self._tenant_tag(tenant_id))
+        except Exception as e:
+            logger.warning(f"Redis cache invalidation failed: {e}")
+            return 0
 
     def _make_cache_key(self, key: str, tenant_id: str) -> str:
         """Create tenant-isolated cache key."""
         return f"cache:{tenant_id}:{key}"
 
-    def _is_expired(self, entry: CacheEntry) -> bool:
-        """Check if cache entry is expired."""
-        return datetime.now() - entry.created_at > timedelta(seconds=entry.ttl_seconds)
-
-    async def _cleanup_expired_entries(self) -> None:
-        """Clean up expired cache entries."""
-        expired_keys = [
-            key for key, entry in self.local_cache.items()
-            if self._is_expired(entry)
-        ]
-
-        for key in expired_keys:
-            del self.local_cache[key]
+    @staticmethod
+    def _tenant_tag(tenant_id: str) -> str:
+        return f"tenant:{tenant_id}"
 
 
 class CircuitBreakerManager:
@@ -328,27 +278,30 @@ class CircuitBreakerManager:
 
 
 class EnterpriseQueueManager:
-    """Enterprise-grade queue management for background tasks."""
+    """Named background task queues on the durable job queue.
 
-    def __init__(self, config: ScalabilityConfig):
-        self.config = config
-        self.redis: Optional[redis.Redis] = None
-        self.executor = ThreadPoolExecutor(max_workers=config.worker_threads)
-        self.queues: Dict[str, asyncio.Queue] = {}
+    Tasks are jobs of kind ``task:<queue_name>`` in
+    ``backend.scalability.job_queue``: they are persisted (SQLite by
+    default, no Redis needed), claimed in priority order and retried on
+    failure.  ``process_queue`` registers the queue's handler and runs
+    ``worker_threads`` async workers for it; ``dequeue_task`` leases single
+    tasks to callers that settle them with ``ack_task``/``fail_task``.
+    """
 
-        if config.redis_url:
-            self.redis = redis.from_url(config.redis_url)
+    DEFAULT_QUEUES = ("default", "agent_tasks", "background_jobs")
+
+    def __init__(self, config: ScalabilityConfig, jobs: Optional[JobQueue] = None):
+        self.config = config
+        self.jobs = jobs or get_job_queue()
 
     async def initialize(self) -> None:
         """Initialize queue manager."""
-        if self.redis:
-            await self.redis.ping()
-            logger.info("Queue manager Redis backend connected")
+        for name in self.DEFAULT_QUEUES:
+            configure_queue(name, concurrency=self.config.worker_threads, max_depth=self.config.max_queue_size)
 
-        # Create default queues
-        self.queues["default"] = asyncio.Queue(maxsize=self.config.max_queue_size)
-        self.queues["agent_tasks"] = asyncio.Queue(maxsize=self.config.max_queue_size)
-        self.queues["background_jobs"] = asyncio.Queue(maxsize=self.config.max_queue_size)
+    @staticmethod
+    def _kind(queue_name: str) -> str:
+        return f"task:{queue_name}"
 
     async def enqueue_task(
         self,
@@ -356,97 +309,84 @@ class EnterpriseQueueManager:
         task_data: Dict[str, Any],
         priority: int = 5
     ) -> str:
-        """Enqueue a task for background processing."""
-
-        task_id = f"task_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hashlib.md5(json.dumps(task_data).encode()).hexdigest()[:8]}"
+        """Enqueue a task for background processing (higher priority runs first).
 
-        task = {
-            "task_id": task_id,
-            "data": task_data,
-            "priority": priority,
-            "created_at": datetime.now().isoformat(),
-            "status": "queued"
-        }
-
-        # Add to local queue
-        if queue_name in self.queues:
-            await self.queues[queue_name].put(task)
+        Raises ``QueueFullError`` when the queue holds ``max_queue_size``
+        unfinished tasks instead of dropping older ones.
+        """
 
-            # Update queue depth metric
-            SCALABILITY_METRICS["queue_depth"].labels(queue_name=queue_name).observe(
-                self.queues[queue_name].qsize()
-            )
-
-        # Store in Redis for persistence
-        if self.redis:
-            await self.redis.lpush(f"queue:{queue_name}", json.dumps(task))
-            await self.redis.ltrim(f"queue:{queue_name}", 0, self.config.max_queue_size)
+        task_id = await self.jobs.enqueue(
+            self._kind(queue_name), task_data, priority=priority, queue=queue_name
+        )
+        counts = (await self.jobs.stats()).get(queue_name, {})
+        SCALABILITY_METRICS["queue_depth"].labels(queue_name=queue_name).observe(
+            counts.get("queued", 0)
+        )
 
         logger.info(f"Enqueued task {task_id} to queue {queue_name}")
         return task_id
 
+    @staticmethod
+    def _task(job: Job) -> Dict[str, Any]:
+        return {
+            "task_id": job.id,
+            "data": job.payload,
+            "priority": job.priority,
+            "created_at": datetime.fromtimestamp(job.created_at).isoformat(),
+            "status": job.status,
+            "attempt": job.attempts,
+            "lease_until": job.lease_until,
+        }
+
     async def dequeue_task(self, queue_name: str) -> Optional[Dict[str, Any]]:
-        """Dequeue a task for processing."""
+        """Lease the highest-priority due task, if any.
 
-        if queue_name not in self.queues:
-            return None
+        The caller must report the outcome with ``ack_task`` or
+        ``fail_task`` before ``lease_until``; otherwise the task is handed
+        out again.
+        """
 
-        try:
-            # Try local queue first
-            task = await asyncio.wait_for(
-                self.queues[queue_name].get(),
-                timeout=1.0
-            )
-            return task
-        except asyncio.TimeoutError:
-            # Try Redis queue
-            if self.redis:
-                result = await self.redis.rpop(f"queue:{queue_name}")
-                if result:
-                    return json.loads(result)
+        job = await self.jobs.claim(queue_name)
+        return None if job is None else self._task(job)
 
-        return None
+    async def _leased(self, task: Dict[str, Any]) -> Optional[Job]:
+        job = await self.jobs.get(task["task_id"])
+        if job is None or job.status != "running" or job.attempts != task["attempt"]:
+            return None  # lease lapsed and the task was re-issued or finished
+        return job
+
+    async def ack_task(self, task: Dict[str, Any]) -> bool:
+        """Mark a dequeued task done; False if its lease was lost."""
+        job = await self._leased(task)
+        return job is not None and await self.jobs.ack(job)
+
+    async def fail_task(self, task: Dict[str, Any], error: str) -> bool:
+        """Report a dequeued task as failed so it is retried (or dead after
+        its last attempt); False if its lease was lost."""
+        job = await self._leased(task)
+        return job is not None and await self.jobs.fail(job, error)
 
     async def process_queue(self, queue_name: str, handler: Callable) -> None:
-        """Process tasks from a queue with the given handler."""
-
-        while True:
-            try:
-                task = await self.dequeue_task(queue_name)
-                if task:
-                    # Process task in thread pool to avoid blocking
-                    loop = asyncio.get_event_loop()
-                    await loop.run_in_executor(
-                        self.executor,
-                        self._process_task_sync,
-                        handler,
-                        task
-                    )
-                else:
-                    await asyncio.sleep(1)  # Wait before checking again
-
-            except Exception as e:
-                logger.error(f"Queue processing error: {e}")
-                await asyncio.sleep(5)  # Back off on error
-
-    def _process_task_sync(self, handler: Callable, task: Dict[str, Any]) -> None:
-        """Process task synchronously in thread pool."""
-        try:
-            # Convert async handler to sync if needed
-            import inspect
-            if inspect.iscoroutinefunction(handler):
-                # This is a simplified approach - in practice you'd need proper async handling
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                result = loop.run_until_complete(handler(task))
-                loop.close()
-            else:
-                result = handler(task)
+        """Process tasks from a queue with the given handler until cancelled.
 
-            logger.info(f"Task {task['task_id']} processed successfully")
+        `handler` receives the task dict; coroutine functions are awaited on
+        the event loop, plain functions run in a worker thread.  Cancelling
+        stops the workers started here; running tasks go back to the queue.
+        """
 
-        except Exception as e:
-            logger.error(f"Task {task['task_id']} processing failed: {e}")
+        async def run(payload: Dict[str, Any]) -> None:
+            task = self._task(current_job.get())
+            if asyncio.iscoroutinefunction(handler):
+                await handler(task)
+            else:
+                await asyncio.to_thread(handler, task)
+
+        self.jobs.register(self._kind(queue_name), run, queue=queue_name)
+        await self.jobs.start([queue_name])
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await asyncio.shield(self.jobs.stop([queue_name]))
 
 
 class LoadBalancer:
@@ -0,0 +1,668 @@
+"""
+Durable background jobs with priorities, retries and async workers.
+
+A job is a JSON payload addressed to a registered handler (its ``kind``).
+Every handler belongs to a queue, and queues have their own worker
+concurrency, visibility timeout and retry backoff (``configure_queue``).
+
+ - Priority: higher ``priority`` runs first, FIFO within a priority.
+ - Workers are asyncio tasks that await the handler directly (plain
+   functions run via ``asyncio.to_thread``).  An idle worker sleeps on an
+   event set by ``enqueue`` or until the next delayed job or lease expiry
+   comes due, so nothing polls in-process; with the SQLite store it also
+   re-checks every ``JOB_QUEUE_POLL_S`` seconds for jobs enqueued by other
+   processes.
+ - Visibility timeout: a claimed job is leased for the queue's
+   ``visibility_timeout_s`` and its handler is cancelled when the lease runs
+   out.  A job whose lease lapsed (the worker's process died) can be claimed
+   again.  Every claim counts as an attempt and stale workers cannot
+   overwrite a newer attempt's outcome.
+ - Retries: a failed attempt is re-queued with exponential backoff until
+   ``max_attempts``; the job is then kept as ``dead`` with its last error.
+ - Callers that run jobs themselves lease one with ``claim`` and report the
+   outcome with ``ack`` or ``fail``, under the same lease and retry rules.
+
+Stores:
+ - ``MemoryJobStore``: per-queue heaps, for tests and throwaway processes.
+ - ``SQLiteJobStore``: a ``jobs`` table behind a ``SQLitePool``.  Claims run
+   on the pool's writer inside ``BEGIN IMMEDIATE`` so several processes can
+   share the file; no Redis is needed.
+
+Handlers register at import time with ``@job_handler(kind, queue=...)``;
+``get_job_queue()`` returns the process-wide queue (``JOB_QUEUE_BACKEND`` =
+``sqlite`` (default) or ``memory``; ``JOB_QUEUE_DB`` overrides the file).
+"""
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import heapq
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from backend.database.sqlite_pool import SQLitePool
+from backend.observability.metrics import job_run_latency, job_wait_latency, jobs_processed
+from backend.utils.id import generate_id
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = Path(__file__).resolve().parent.parent / "data" / "jobs.db"
+
+TERMINAL = ("done", "dead")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+@dataclass
+class Job:
+    """One unit of background work and its delivery state."""
+
+    id: str
+    kind: str
+    queue: str
+    payload: Dict[str, Any]
+    priority: int = 5
+    status: str = "queued"  # queued | running | done | dead
+    attempts: int = 0
+    max_attempts: int = 3
+    run_at: float = 0.0
+    lease_until: Optional[float] = None
+    last_error: Optional[str] = None
+    created_at: float = 0.0
+    finished_at: Optional[float] = None
+
+
+@dataclass
+class QueueConfig:
+    """Worker settings for one queue."""
+
+    concurrency: int = 1
+    visibility_timeout_s: float = 300.0
+    backoff_s: float = 2.0
+    max_backoff_s: float = 300.0
+    max_depth: int = 0  # queued + running jobs accepted; 0 = unbounded
+
+
+@dataclass
+class _Handler:
+    fn: Callable[[Dict[str, Any]], Any]
+    queue: str
+    max_attempts: int
+
+
+class QueueFullError(RuntimeError):
+    """Raised by ``enqueue`` when a queue is at its ``max_depth``."""
+
+
+# The job a handler is running for (its id, attempt number, ...).
+current_job: ContextVar[Optional[Job]] = ContextVar("current_job", default=None)
+
+
+_HANDLERS: Dict[str, _Handler] = {}
+_QUEUES: Dict[str, QueueConfig] = {}
+
+
+def job_handler(kind: str, *, queue: str = "default", max_attempts: int = 3):
+    """Register the decorated function (sync or async, taking the payload)."""
+
+    def register(fn: Callable[[Dict[str, Any]], Any]) -> Callable[[Dict[str, Any]], Any]:
+        _HANDLERS[kind] = _Handler(fn, queue, max_attempts)
+        return fn
+
+    return register
+
+
+def configure_queue(name: str, **options: Any) -> QueueConfig:
+    """Set worker options for queue `name` (see ``QueueConfig``)."""
+    cfg = _QUEUES[name] = dataclasses.replace(_QUEUES.get(name, QueueConfig()), **options)
+    return cfg
+
+
+# ---------------------------------------------------------------------------
+# Stores
+# ---------------------------------------------------------------------------
+class MemoryJobStore:
+    """In-process store: a due heap, a delayed heap and a lease heap per queue."""
+
+    poll_s: Optional[float] = None
+
+    def __init__(self) -> None:
+        self._jobs: Dict[str, Job] = {}
+        self._seqs: Dict[str, int] = {}
+        self._seq = itertools.count()
+        self._ready: Dict[str, List[Tuple[int, int, str]]] = {}
+        self._delayed: Dict[str, List[Tuple[float, int, str]]] = {}
+        self._leases: Dict[str, List[Tuple[float, int, str]]] = {}
+
+    def _schedule(self, job: Job) -> None:
+        heapq.heappush(self._delayed.setdefault(job.queue, []), (job.run_at, self._seqs[job.id], job.id))
+
+    async def add(self, job: Job) -> None:
+        self._jobs[job.id] = dataclasses.replace(job)
+        self._seqs[job.id] = next(self._seq)
+        self._schedule(job)
+
+    async def claim(self, queue: str, now: float, lease_s: float) -> Optional[Job]:
+        ready = self._ready.setdefault(queue, [])
+        delayed = self._delayed.get(queue, [])
+        while delayed and delayed[0][0] <= now:
+            run_at, seq, jid = heapq.heappop(delayed)
+            job = self._jobs.get(jid)
+            if job is not None and job.status == "queued" and job.run_at == run_at:
+                heapq.heappush(ready, (-job.priority, seq, jid))
+        leases = self._leases.get(queue, [])
+        while leases and leases[0][0] <= now:
+            until, attempts, jid = heapq.heappop(leases)
+            job = self._jobs.get(jid)
+            if job is not None and job.status == "running" and job.attempts == attempts:
+                job.status, job.run_at = "queued", until  # lease lapsed
+                heapq.heappush(ready, (-job.priority, self._seqs[jid], jid))
+        while ready:
+            _, _, jid = heapq.heappop(ready)
+            job = self._jobs.get(jid)
+            if job is None or job.status != "queued" or job.run_at > now:
+                continue
+            job.status, job.attempts, job.lease_until = "running", job.attempts + 1, now + lease_s
+            heapq.heappush(self._leases.setdefault(queue, []), (job.lease_until, job.attempts, jid))
+            return dataclasses.replace(job)
+        return None
+
+    async def finish(self, job: Job, token: int) -> bool:
+        stored = self._jobs.get(job.id)
+        if stored is None or stored.status != "running" or stored.attempts != token:
+            return False
+        self._jobs[job.id] = dataclasses.replace(job)
+        if job.status == "queued":
+            self._schedule(job)
+        return True
+
+    async def next_due(self, queue: str) -> Optional[float]:
+        heads = [h[0][0] for h in (self._delayed.get(queue), self._leases.get(queue)) if h]
+        return min(heads) if heads else None
+
+    async def depth(self, queue: str) -> int:
+        return sum(1 for j in self._jobs.values() if j.queue == queue and j.status not in TERMINAL)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        return dataclasses.replace(job) if job is not None else None
+
+    async def counts(self) -> Dict[str, Dict[str, int]]:
+        out: Dict[str, Dict[str, int]] = {}
+        for j in self._jobs.values():
+            by_status = out.setdefault(j.queue, {})
+            by_status[j.status] = by_status.get(j.status, 0) + 1
+        return out
+
+    async def purge(self, before: float) -> int:
+        old = [k for k, j in self._jobs.items() if j.status == "done" and (j.finished_at or 0) < before]
+        for k in old:
+            del self._jobs[k]
+            del self._seqs[k]
+        return len(old)
+
+
+_COLUMNS = (
+    "id, kind, queue, payload, priority, status, attempts, max_attempts, "
+    "run_at, lease_until, last_error, created_at, finished_at"
+)
+
+
+def _init_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            queue TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            priority INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL,
+            max_attempts INTEGER NOT NULL,
+            run_at REAL NOT NULL,
+            lease_until REAL,
+            last_error TEXT,
+            created_at REAL NOT NULL,
+            finished_at REAL
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS ix_jobs_queued ON jobs (queue, status, priority DESC, run_at)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_lease ON jobs (queue, status, lease_until)")
+
+
+def _row_job(row: Tuple[Any, ...]) -> Job:
+    return Job(
+        id=row[0], kind=row[1], queue=row[2], payload=json.loads(row[3]), priority=row[4],
+        status=row[5], attempts=row[6], max_attempts=row[7], run_at=row[8], lease_until=row[9],
+        last_error=row[10], created_at=row[11], finished_at=row[12],
+    )
+
+
+class SQLiteJobStore:
+    """Durable store: a WAL-mode SQLite ``jobs`` table shared across processes."""
+
+    def __init__(self, path: Union[str, Path] = DB_PATH, *, pool: Optional[SQLitePool] = None) -> None:
+        self.pool = pool or SQLitePool(path, init_schema=_init_schema)
+        self.poll_s: Optional[float] = _env_float("JOB_QUEUE_POLL_S", 5.0) or None
+
+    async def add(self, job: Job) -> None:
+        def _insert(conn: sqlite3.Connection) -> None:
+            conn.execute(
+                f"INSERT INTO jobs ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job.id, job.kind, job.queue, json.dumps(job.payload), job.priority, job.status,
+                    job.attempts, job.max_attempts, job.run_at, job.lease_until, job.last_error,
+                    job.created_at, job.finished_at,
+                ),
+            )
+
+        await self.pool.write(_insert)
+
+    async def claim(self, queue: str, now: float, lease_s: float) -> Optional[Job]:
+        def _claim(conn: sqlite3.Connection) -> Optional[Job]:
+            row = conn.execute(
+                """
+                SELECT rowid FROM jobs
+                WHERE queue = ? AND ((status = 'queued' AND run_at <= ?)
+                                     OR (status = 'running' AND lease_until <= ?))
+                ORDER BY priority DESC, rowid
+                LIMIT 1
+                """,
+                (queue, now, now),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_until = ? WHERE rowid = ?",
+                (now + lease_s, row[0]),
+            )
+            return _row_job(conn.execute(f"SELECT {_COLUMNS} FROM jobs WHERE rowid = ?", (row[0],)).fetchone())
+
+        return await self.pool.write(_claim)
+
+    async def finish(self, job: Job, token: int) -> bool:
+        def _update(conn: sqlite3.Connection) -> bool:
+            cur = conn.execute(
+                """
+                UPDATE jobs SET status = ?, attempts = ?, run_at = ?, lease_until = ?,
+                                last_error = ?, finished_at = ?
+                WHERE id = ? AND status = 'running' AND attempts = ?
+                """,
+                (
+                    job.status, job.attempts, job.run_at, job.lease_until, job.last_error,
+                    job.finished_at, job.id, token,
+                ),
+            )
+            return cur.rowcount == 1
+
+        return await self.pool.write(_update)
+
+    async def next_due(self, queue: str) -> Optional[float]:
+        def _select(conn: sqlite3.Connection) -> Optional[float]:
+            return conn.execute(
+                """
+                SELECT MIN(t) FROM (
+                    SELECT MIN(run_at) AS t FROM jobs WHERE queue = ? AND status = 'queued'
+                    UNION ALL
+                    SELECT MIN(lease_until) FROM jobs WHERE queue = ? AND status = 'running'
+                )
+                """,
+                (queue, queue),
+            ).fetchone()[0]
+
+        return await self.pool.read(_select)
+
+    async def depth(self, queue: str) -> int:
+        def _count(conn: sqlite3.Connection) -> int:
+            return conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE queue = ? AND status IN ('queued', 'running')", (queue,)
+            ).fetchone()[0]
+
+        return await self.pool.read(_count)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        def _select(conn: sqlite3.Connection) -> Optional[Job]:
+            row = conn.execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return _row_job(row) if row else None
+
+        return await self.pool.read(_select)
+
+    async def counts(self) -> Dict[str, Dict[str, int]]:
+        def _select(conn: sqlite3.Connection) -> List[Tuple[str, str, int]]:
+            return conn.execute("SELECT queue, status, COUNT(*) FROM jobs GROUP BY queue, status").fetchall()
+
+        out: Dict[str, Dict[str, int]] = {}
+        for queue, status, n in await self.pool.read(_select):
+            out.setdefault(queue, {})[status] = n
+        return out
+
+    async def purge(self, before: float) -> int:
+        def _delete(conn: sqlite3.Connection) -> int:
+            return conn.execute(
+                "DELETE FROM jobs WHERE status = 'done' AND finished_at < ?", (before,)
+            ).rowcount
+
+        return await self.pool.write(_delete)
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+# ---------------------------------------------------------------------------
+# Queue and workers
+# ---------------------------------------------------------------------------
+def _inc(metric, *labels: str) -> None:
+    try:
+        metric.labels(*labels).inc()
+    except Exception:  # pragma: no cover
+        pass
+
+
+def _observe(metric, value: float, *labels: str) -> None:
+    try:
+        metric.labels(*labels).observe(value)
+    except Exception:  # pragma: no cover
+        pass
+
+
+class JobQueue:
+    """Enqueue jobs and run them on per-queue asyncio workers."""
+
+    def __init__(
+        self,
+        store: Optional[Union[MemoryJobStore, SQLiteJobStore]] = None,
+        *,
+        handlers: Optional[Dict[str, _Handler]] = None,
+        queues: Optional[Dict[str, QueueConfig]] = None,
+        retention_s: Optional[float] = None,
+    ) -> None:
+        self.store = store or MemoryJobStore()
+        self._handlers = _HANDLERS if handlers is None else handlers
+        self._queues = _QUEUES if queues is None else queues
+        self.retention_s = _env_float("JOB_RETENTION_S", 7 * 86400) if retention_s is None else retention_s
+        self._wake: Dict[str, asyncio.Event] = {}
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._workers: Dict[str, List[asyncio.Task]] = {}
+        self._finished = 0
+
+    def register(self, kind: str, fn: Callable[[Dict[str, Any]], Any], *, queue: str = "default", max_attempts: int = 3) -> None:
+        self._handlers[kind] = _Handler(fn, queue, max_attempts)
+
+    def config(self, queue: str) -> QueueConfig:
+        return self._queues.get(queue) or QueueConfig()
+
+    def _event(self, queue: str) -> asyncio.Event:
+        ev = self._wake.get(queue)
+        if ev is None:
+            ev = self._wake[queue] = asyncio.Event()
+        return ev
+
+    @property
+    def running(self) -> bool:
+        return any(not t.done() for tasks in self._workers.values() for t in tasks)
+
+    async def enqueue(
+        self,
+        kind: str,
+        payload: Optional[Dict[str, Any]] = None,
+        *,
+        priority: int = 5,
+        queue: Optional[str] = None,
+        delay_s: float = 0.0,
+        max_attempts: Optional[int] = None,
+    ) -> str:
+        """Persist a job and wake an idle worker; returns the job id.
+
+        `payload` must be JSON-serialisable; it is what the handler receives.
+        """
+        spec = self._handlers.get(kind)
+        if spec is None and queue is None:
+            raise KeyError(f"No job handler registered for {kind!r}")
+        queue = queue or spec.queue
+        max_depth = self.config(queue).max_depth
+        if max_depth and await self.store.depth(queue) >= max_depth:
+            raise QueueFullError(f"Queue {queue!r} is full ({max_depth} jobs)")
+        now = time.time()
+        job = Job(
+            id=generate_id("job"),
+            kind=kind,
+            queue=queue,
+            payload=json.loads(json.dumps(payload or {})),
+            priority=priority,
+            max_attempts=max_attempts or (spec.max_attempts if spec else 3),
+            run_at=now + max(0.0, delay_s),
+            created_at=now,
+        )
+        await self.store.add(job)
+        self._event(queue).set()
+        return job.id
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await self.store.get(job_id)
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Job:
+        """Wait until `job_id` is done or dead and return its final state."""
+
+        async def _wait() -> Job:
+            while True:
+                fut = asyncio.get_running_loop().create_future()
+                waiters = self._waiters.setdefault(job_id, [])
+                waiters.append(fut)
+                try:
+                    job = await self.store.get(job_id)
+                    if job is None:
+                        raise KeyError(job_id)
+                    if job.status in TERMINAL:
+                        return job
+                    # Jobs finished by another process are only seen on re-check
+                    await asyncio.wait_for(fut, self.store.poll_s)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    if fut in waiters:
+                        waiters.remove(fut)
+
+        return await asyncio.wait_for(_wait(), timeout)
+
+    async def stats(self) -> Dict[str, Dict[str, int]]:
+        return await self.store.counts()
+
+    async def start(self, queues: Optional[List[str]] = None) -> None:
+        """Start workers for `queues` (default: every queue with a handler).
+
+        Queues that already have workers are skipped.
+        """
+        if not self._workers:
+            await self.store.purge(time.time() - self.retention_s)
+        names = [q for q in queues or sorted({h.queue for h in self._handlers.values()}) if q not in self._workers]
+        for name in names:
+            self._workers[name] = [
+                asyncio.create_task(self._worker(name), name=f"job-worker:{name}:{i}")
+                for i in range(max(1, self.config(name).concurrency))
+            ]
+        logger.info("Job workers started for queues: %s", ", ".join(names))
+
+    async def stop(self, queues: Optional[List[str]] = None) -> None:
+        """Cancel the workers of `queues` (default: all); jobs they were
+        running go back to the queue."""
+        names = list(self._workers) if queues is None else [q for q in queues if q in self._workers]
+        tasks = [t for name in names for t in self._workers.pop(name)]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def claim(self, queue: str) -> Optional[Job]:
+        """Lease the next due job on `queue` to a caller that runs it itself.
+
+        The job stays ``running`` until ``ack`` or ``fail``; without either
+        it is handed out again once the queue's visibility timeout lapses.
+        """
+        cfg = self.config(queue)
+        while True:
+            job = await self.store.claim(queue, time.time(), cfg.visibility_timeout_s)
+            if job is None or not await self._bury_lapsed(job):
+                return job
+
+    async def ack(self, job: Job) -> bool:
+        """Mark a claimed job done; False if its lease was lost meanwhile."""
+        token = job.attempts
+        job = dataclasses.replace(job, status="done", finished_at=time.time(), lease_until=None, last_error=None)
+        return await self._finish(job, token, "done")
+
+    async def fail(self, job: Job, error: str) -> bool:
+        """Record a failed attempt of a claimed job: it is retried with
+        backoff, or ``dead`` after ``max_attempts``.  False if the lease was lost."""
+        token = job.attempts
+        job = dataclasses.replace(job, last_error=error)
+        outcome = self._retry_or_bury(job, self.config(job.queue))
+        return await self._finish(job, token, outcome)
+
+    async def _worker(self, queue: str) -> None:
+        cfg = self.config(queue)
+        wake = self._event(queue)
+        while True:
+            wake.clear()
+            try:
+                job = await self.store.claim(queue, time.time(), cfg.visibility_timeout_s)
+            except Exception as exc:
+                logger.error("Job claim on %s failed: %s", queue, exc, exc_info=True)
+                await asyncio.sleep(cfg.backoff_s)
+                continue
+            if job is None:
+                await self._idle(queue, wake)
+            elif not await self._bury_lapsed(job):
+                await self._run(job, cfg)
+
+    async def _idle(self, queue: str, wake: asyncio.Event) -> None:
+        try:
+            due = await self.store.next_due(queue)
+        except Exception:  # pragma: no cover - store unavailable
+            due = None
+        timeout = None if due is None else max(0.0, due - time.time())
+        if self.store.poll_s is not None:
+            timeout = self.store.poll_s if timeout is None else min(timeout, self.store.poll_s)
+        try:
+            await asyncio.wait_for(wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _bury_lapsed(self, job: Job) -> bool:
+        """Mark `job` dead if the lease that just lapsed was its last attempt."""
+        if job.attempts <= job.max_attempts:
+            return False
+        token = job.attempts
+        job.status, job.finished_at = "dead", time.time()
+        job.last_error = job.last_error or "visibility timeout exceeded"
+        await self._finish(job, token, "dead")
+        return True
+
+    def _retry_or_bury(self, job: Job, cfg: QueueConfig) -> str:
+        """Schedule a retry for the failed attempt, or mark `job` dead."""
+        now = time.time()
+        job.lease_until = None
+        if job.attempts >= job.max_attempts:
+            job.status, job.finished_at = "dead", now
+            logger.error("Job %s (%s) failed permanently: %s", job.id, job.kind, job.last_error)
+            return "dead"
+        delay = min(cfg.max_backoff_s, cfg.backoff_s * 2 ** (job.attempts - 1))
+        job.status, job.run_at = "queued", now + delay
+        logger.warning("Job %s (%s) failed, retrying in %.1fs: %s", job.id, job.kind, delay, job.last_error)
+        return "retry"
+
+    async def _run(self, job: Job, cfg: QueueConfig) -> None:
+        token = job.attempts
+        spec = self._handlers.get(job.kind)
+        started = time.time()
+        _observe(job_wait_latency, max(0.0, started - job.run_at), job.queue)
+        t0 = time.perf_counter()
+        ctx = current_job.set(job)
+        try:
+            if spec is None:
+                raise LookupError(f"No job handler registered for {job.kind!r}")
+            if asyncio.iscoroutinefunction(spec.fn):
+                work = spec.fn(job.payload)
+            else:
+                work = asyncio.to_thread(spec.fn, job.payload)
+            await asyncio.wait_for(work, cfg.visibility_timeout_s)
+        except asyncio.CancelledError:
+            job.status, job.attempts, job.run_at, job.lease_until = "queued", token - 1, time.time(), None
+            await asyncio.shield(self._finish(job, token, None))
+            raise
+        except Exception as exc:
+            if isinstance(exc, asyncio.TimeoutError):
+                job.last_error = f"timed out after {cfg.visibility_timeout_s:g}s"
+            else:
+                job.last_error = f"{type(exc).__name__}: {exc}"
+            await self._finish(job, token, self._retry_or_bury(job, cfg))
+        else:
+            job.status, job.finished_at, job.lease_until, job.last_error = "done", time.time(), None, None
+            await self._finish(job, token, "done")
+        finally:
+            current_job.reset(ctx)
+            _observe(job_run_latency, time.perf_counter() - t0, job.queue)
+
+    async def _finish(self, job: Job, token: int, outcome: Optional[str]) -> bool:
+        try:
+            ok = await self.store.finish(job, token)
+        except Exception as exc:
+            logger.error("Recording job %s failed: %s", job.id, exc, exc_info=True)
+            return False
+        if not ok:
+            logger.warning("Job %s attempt %d was superseded; result dropped", job.id, token)
+            return False
+        if outcome is not None:
+            _inc(jobs_processed, job.queue, job.kind, outcome)
+        if job.status in TERMINAL:
+            for fut in self._waiters.pop(job.id, []):
+                if not fut.done():
+                    fut.set_result(None)
+            self._finished += 1
+            if self._finished % 1000 == 0:
+                await self.store.purge(time.time() - self.retention_s)
+        return True
+
+
+_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Process-wide job queue over the configured store."""
+    global _queue
+    if _queue is None:
+        if os.getenv("JOB_QUEUE_BACKEND", "sqlite").lower() == "memory":
+            store: Union[MemoryJobStore, SQLiteJobStore] = MemoryJobStore()
+        else:
+            store = SQLiteJobStore(os.getenv("JOB_QUEUE_DB") or DB_PATH)
+        _queue = JobQueue(store)
+    return _queue
+
+
+__all__ = [
+    "Job",
+    "JobQueue",
+    "MemoryJobStore",
+    "QueueConfig",
+    "QueueFullError",
+    "SQLiteJobStore",
+    "configure_queue",
+    "current_job",
+    "get_job_queue",
+    "job_handler",
+]
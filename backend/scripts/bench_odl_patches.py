@@ -0,0 +1,79 @@
+"""
+Benchmark ODL patch application on large graphs.
+
+Applies a mixed wiring patch (add/update/remove edges plus a few node
+removals) of ``k`` operations to a graph with ``E`` edges and prints the
+wall-clock time for each (E, k) pair.  With the edge index the cost grows
+with ``k + E``; the former linear-scan implementation grew with ``k * E``.
+
+Usage::
+
+    python -m backend.scripts.bench_odl_patches
+"""
+from __future__ import annotations
+
+import json
+import time
+from typing import Dict, List
+
+from backend.odl.patches import apply_patch
+from backend.odl.schemas import ODLEdge, ODLGraph, ODLNode, ODLPatch, PatchOp
+
+
+def build_graph(n_edges: int) -> ODLGraph:
+    n_nodes = max(2, n_edges // 2)
+    nodes = {f"n{i}": ODLNode(id=f"n{i}", type="panel", attrs={"layer": "electrical"}) for i in range(n_nodes)}
+    edges = [
+        ODLEdge(id=f"e{i}", source_id=f"n{i % n_nodes}", target_id=f"n{(i * 7 + 1) % n_nodes}", kind="dc_string")
+        for i in range(n_edges)
+    ]
+    return ODLGraph(session_id="bench", version=1, nodes=nodes, edges=edges)
+
+
+def wiring_patch(g: ODLGraph, n_ops: int) -> ODLPatch:
+    # New edges attach to the lower half of the nodes; removals only hit the
+    # upper half so every op in the patch stays valid.
+    half = len(g.nodes) // 2
+    n_edges = len(g.edges)
+    ops: List[PatchOp] = []
+    for i in range(n_ops):
+        kind = i % 5
+        if kind in (0, 1):
+            ops.append(PatchOp(op_id=f"a{i}", op="add_edge", value={
+                "id": f"new{i}", "source_id": f"n{i % half}", "target_id": f"n{(i + 3) % half}", "kind": "dc_string",
+            }))
+        elif kind == 2:
+            ops.append(PatchOp(op_id=f"u{i}", op="update_edge", value={"id": f"new{i - 1}", "attrs": {"gauge": "10AWG"}}))
+        elif kind == 3:
+            ops.append(PatchOp(op_id=f"r{i}", op="remove_edge", value={"id": f"e{(i * 17 + 5) % n_edges}"}))
+        else:
+            ops.append(PatchOp(op_id=f"x{i}", op="remove_node", value={"id": f"n{half + (i * 11) % half}"}))
+    return ODLPatch(patch_id=f"bench-{n_ops}", operations=ops)
+
+
+def run(edge_counts=(1_000, 5_000, 20_000), op_counts=(100, 500, 2_000), repeat: int = 3) -> List[Dict[str, float]]:
+    results: List[Dict[str, float]] = []
+    for n_edges in edge_counts:
+        g = build_graph(n_edges)
+        for n_ops in op_counts:
+            patch = wiring_patch(g, n_ops)
+            best = float("inf")
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                apply_patch(g, patch, {})
+                best = min(best, time.perf_counter() - t0)
+            results.append({
+                "edges": n_edges,
+                "ops": n_ops,
+                "ms": round(best * 1000, 2),
+                "us_per_op_plus_edge": round(best * 1e6 / (n_ops + n_edges), 3),
+            })
+    return results
+
+
+def main() -> None:
+    print(json.dumps(run(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark design vector search.
+
+Stores ``N`` random vectors in a temporary SQLite database and times, per
+query: ``DesignKnowledgeService.search`` (index search plus an ORM load of the
+hits), ``OptimizedVectorSearchService.similarity_search_optimized`` cold
+(cache miss), warm (cache hit) and with a metadata filter, and
+``batch_similarity_search`` per query in a batch of 64.
+
+Usage::
+
+    python -m backend.scripts.bench_vector_search
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+import numpy as np  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from backend.models.design_vector import DesignVector  # noqa: E402
+from backend.services import design_knowledge_service as dks  # noqa: E402
+from backend.services.design_vector_index import DesignVectorIndex  # noqa: E402
+from backend.services.optimized_vector_search import OptimizedVectorSearchService  # noqa: E402
+
+
+async def _time(fn, queries) -> float:
+    t0 = time.perf_counter()
+    for q in queries:
+        await fn(q)
+    return (time.perf_counter() - t0) * 1000 / len(queries)
+
+
+async def bench(n: int, dim: int, n_queries: int, root: Path) -> Dict[str, float]:
+    rng = np.random.default_rng(0)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{root / f'bench_{n}.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(DesignVector.__table__.create)
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    queries = rng.normal(size=(n_queries, dim)).tolist()
+    async with maker() as session:
+        for i in range(0, n, 5000):
+            chunk = vectors[i : i + 5000]
+            await session.execute(
+                insert(DesignVector),
+                [{"vector": v.tolist(), "meta": {"kind": ("roof", "ground")[(i + j) % 2]}} for j, v in enumerate(chunk)],
+            )
+        await session.commit()
+
+        index = DesignVectorIndex(root / f"index_{n}")
+        knowledge = dks.DesignKnowledgeService.__new__(dks.DesignKnowledgeService)
+        knowledge.session, knowledge._index = session, index
+        fast = OptimizedVectorSearchService(session, index=index)
+        await fast.precompute_similarities()  # build the matrix and bitmaps outside the timings
+
+        row = {"vectors": n, "dim": dim}
+        row["knowledge_search_ms"] = await _time(lambda q: knowledge.search(q, limit=10), queries)
+        row["optimized_cold_ms"] = await _time(lambda q: fast.similarity_search_optimized(q, k=10, min_score=-1.0), queries)
+        row["optimized_cached_ms"] = await _time(lambda q: fast.similarity_search_optimized(q, k=10, min_score=-1.0), queries)
+        row["optimized_filtered_ms"] = await _time(
+            lambda q: fast.similarity_search_optimized(q, k=10, filter_metadata={"kind": "ground"}, min_score=-1.0),
+            queries,
+        )
+        t0 = time.perf_counter()
+        for i in range(0, n_queries, 64):
+            await fast.batch_similarity_search(queries[i : i + 64], k=10)
+        row["batch_per_query_ms"] = (time.perf_counter() - t0) * 1000 / n_queries
+    await engine.dispose()
+    return {k: round(v, 3) if isinstance(v, float) else v for k, v in row.items()}
+
+
+def run(sizes=(1_000, 10_000, 50_000), dim: int = 384, n_queries: int = 128) -> List[Dict[str, float]]:
+    with tempfile.TemporaryDirectory() as tmp:
+        return [asyncio.run(bench(n, dim, n_queries, Path(tmp))) for n in sizes]
+
+
+def main() -> None:
+    print(json.dumps(run(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,75 @@
 """In-memory component library service.
 
 This service is a placeholder used by domain agents to query and store
-component specifications. It keeps components in a simple list of
- dictionaries keyed by part number. Replace with a real database-backed
-implementation when available.
+component specifications. It keeps components as dictionaries keyed by
+part number, with a lazily built per-category power column for range
+searches. Replace with a real database-backed implementation when
+available.
 """
 from __future__ import annotations
 
-from typing import Any, AsyncIterator, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def _rating(comp: Dict[str, Any]) -> float:
+    """Power (panels) or capacity (inverters) as a float; NaN if unusable."""
+    value = comp.get("power")
+    if value is None:
+        value = comp.get("capacity")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
 
 
 class ComponentDBService:
     """Lightweight in-memory component store."""
 
     def __init__(self) -> None:
-        self.components: List[Dict[str, Any]] = []
+        self._parts: Dict[str, Dict[str, Any]] = {}
+        # category -> (components in insertion order, their ratings)
+        self._columns: Dict[str, Tuple[List[Dict[str, Any]], np.ndarray]] = {}
+
+    @property
+    def components(self) -> List[Dict[str, Any]]:
+        return list(self._parts.values())
+
+    def _category(self, category: str) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        cached = self._columns.get(category)
+        if cached is None:
+            rows = [c for c in self._parts.values() if c.get("category") == category]
+            cached = (rows, np.array([_rating(c) for c in rows], dtype=float))
+            self._columns[category] = cached
+        return cached
 
     async def exists(self, category: str) -> bool:
         """Return True if any component of the given category exists."""
-        return any(c for c in self.components if c.get("category") == category)
+        return bool(self._category(category)[0])
 
-    async def search(self, category: str, min_power: Optional[float] = None) -> List[Dict[str, Any]]:
+    async def search(
+        self,
+        category: str,
+        min_power: Optional[float] = None,
+        max_power: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
         """Return components in the given category, optionally filtered by power.
 
         Args:
             category: Component category to search (e.g., 'panel', 'inverter').
             min_power: Optional minimum power/capacity rating to filter results.
+            max_power: Optional maximum power/capacity rating.
         """
-        results = [c for c in self.components if c.get("category") == category]
+        rows, rating = self._category(category)
+        if min_power is None and max_power is None:
+            return list(rows)
+        keep = ~np.isnan(rating)
         if min_power is not None:
-            def meets_power(comp: Dict[str, Any]) -> bool:
-                value = comp.get("power")
-                if value is None:
-                    value = comp.get("capacity")
-                try:
-                    return float(value) >= float(min_power)
-                except (TypeError, ValueError):
-                    return False
-            results = [c for c in results if meets_power(c)]
-        return results
+            keep &= rating >= float(min_power)
+        if max_power is not None:
+            keep &= rating <= float(max_power)
+        return [rows[i] for i in np.flatnonzero(keep)]
 
     async def ingest(
         self, category: str, part_number: str, attributes: Dict[str, Any]
@@ -49,25 +80,17 @@ class ComponentDBService:
         """
         component = {"category": category, "part_number": part_number}
         component.update(attributes)
-        for idx, c in enumerate(self.components):
-            if c.get("part_number") == part_number:
-                self.components[idx] = component
-                return part_number
-        self.components.append(component)
+        previous = self._parts.get(part_number)
+        if previous is not None:
+            self._columns.pop(previous.get("category"), None)
+        self._parts[part_number] = component  # an upsert keeps its original position
+        self._columns.pop(component.get("category"), None)
         return part_number
 
     async def get_by_part_number(self, part_number: str) -> Optional[Dict[str, Any]]:
-        """Return the first component matching ``part_number``.
-
-        The in-memory store keeps components as dictionaries keyed by
-        ``part_number``.  This helper searches the list and returns the
-        matching component dictionary when found or ``None`` otherwise.
-        """
+        """Return the component stored under ``part_number``, or ``None``."""
 
-        for comp in self.components:
-            if comp.get("part_number") == part_number:
-                return comp
-        return None
+        return self._parts.get(part_number)
 
 
 async def get_component_db_service() -> AsyncIterator[ComponentDBService]:
@@ -7,48 +7,45 @@ and services talk to the database.
 """
 from __future__ import annotations
 
-from typing import Dict, List, Optional
-from sqlalchemy import select
+from typing import Dict, List, Optional, Sequence
 from sqlalchemy.orm import Session
 
+from backend.services.component_query import ComponentQuery, component_query_engine
+
 
 def find_by_categories(
     db: Session,
     categories: List[str],
     min_power: Optional[float] = None,
     limit: int = 50,
+    *,
+    max_power: Optional[float] = None,
+    min_voltage: Optional[float] = None,
+    max_voltage: Optional[float] = None,
+    manufacturers: Sequence[str] = (),
+    max_price: Optional[float] = None,
+    sort: str = "id",
 ) -> List[Dict]:
     """
     Return a list of component dicts from `component_master` matching categories.
-    Each dict includes: part_number, name, manufacturer, category, power, price.
-    """
-    try:
-        from backend.models.component_master import ComponentMaster  # type: ignore
-    except Exception:
-        # If your project stores component master elsewhere, adjust this import.
-        raise RuntimeError("ComponentMaster model not found")
+    Each dict includes: id, part_number, name, manufacturer, category, power,
+    voltage, price.
 
-    stmt = select(ComponentMaster).where(ComponentMaster.category.in_(categories))
-    rows = db.execute(stmt).scalars().all()
-    out: List[Dict] = []
-    for r in rows:
-        if min_power is not None:
-            try:
-                p = float(r.power or 0)
-                if p < float(min_power):
-                    continue
-            except Exception:
-                continue
-        out.append(
-            {
-                "part_number": r.part_number,
-                "name": r.name,
-                "manufacturer": r.manufacturer,
-                "category": r.category,
-                "power": r.power,
-                "price": r.price,
-            }
-        )
-        if len(out) >= limit:
-            break
-    return out
+    Filters are evaluated by the component query engine (indexed SQL, or the
+    in-memory columnar index for hot categories); use
+    ``component_query_engine.search`` directly for cursor pagination.
+    """
+    if not categories:
+        return []
+    query = ComponentQuery(
+        categories=tuple(categories),
+        min_power=None if min_power is None else float(min_power),
+        max_power=max_power,
+        min_voltage=min_voltage,
+        max_voltage=max_voltage,
+        manufacturers=tuple(manufacturers),
+        max_price=max_price,
+        sort=sort,
+        limit=limit,
+    )
+    return component_query_engine.search(db, query).items
@@ -18,6 +18,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.services.component_naming_service import ComponentNamingService
+from backend.services.component_query import component_query_engine
 
 
 async def update_existing_component_names(session: AsyncSession) -> None:
@@ -62,6 +63,7 @@ async def update_existing_component_names(session: AsyncSession) -> None:
         if new_name:
             comp.name = new_name
     await session.commit()
+    component_query_engine.invalidate()
 
 
 __all__ = ["update_existing_component_names"]
@@ -0,0 +1,341 @@
+"""
+Component query engine for the component master catalog.
+
+Queries combine category, power/voltage ranges, manufacturer and price
+filters with a sort key and keyset pagination.  They run either as indexed
+SQL (``build_select``; composite ``(category, power|voltage|price)`` indexes
+back the range filters) or against an in-memory columnar index that keeps
+NumPy arrays for "hot" categories such as panels and inverters, so repeated
+placeholder replacement never rescans the table.
+
+Both paths return identical pages: rows are ordered by the sort key, ties by
+id, and a page's ``next_cursor`` resumes after its last row.  Rows without a
+value for the sort key (e.g. no price when sorting by price per watt) are
+excluded.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from backend.models.component_master import ComponentMaster
+
+SORT_KEYS = ("id", "price_per_watt", "power", "price")
+FACET_FIELDS = ("manufacturer", "category")
+RESULT_FIELDS = ("id", "part_number", "name", "manufacturer", "category", "power", "voltage", "price")
+
+
+@dataclass(frozen=True)
+class ComponentQuery:
+    """Filters, ordering and page position for a catalog query."""
+    categories: Tuple[str, ...]
+    min_power: Optional[float] = None
+    max_power: Optional[float] = None
+    min_voltage: Optional[float] = None
+    max_voltage: Optional[float] = None
+    manufacturers: Tuple[str, ...] = ()
+    max_price: Optional[float] = None
+    include_deprecated: bool = True
+    sort: str = "id"
+    descending: bool = False
+    limit: int = 50
+    after: Optional[str] = None  # cursor from a previous page
+
+    def __post_init__(self) -> None:
+        if self.sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key {self.sort!r}; expected one of {SORT_KEYS}")
+        object.__setattr__(self, "categories", tuple(self.categories))
+        object.__setattr__(self, "manufacturers", tuple(self.manufacturers))
+
+
+@dataclass
+class ComponentPage:
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(value: Optional[float], row_id: int) -> str:
+    raw = json.dumps([value, int(row_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[float], int]:
+    try:
+        value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (None if value is None else float(value)), int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def _sort_value(row: Dict[str, Any], sort: str) -> Optional[float]:
+    if sort == "id":
+        return None
+    if sort == "price_per_watt":
+        return row["price"] / row["power"]
+    return row[sort]
+
+
+def _page(rows: List[Dict[str, Any]], query: ComponentQuery, has_more: bool) -> ComponentPage:
+    cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        cursor = encode_cursor(_sort_value(last, query.sort), last["id"])
+    return ComponentPage(items=rows, next_cursor=cursor)
+
+
+# ---------------------------------------------------------------------------
+# SQL path
+# ---------------------------------------------------------------------------
+
+
+def _sql_sort_expr(sort: str):
+    cm = ComponentMaster
+    return {
+        "id": None,
+        "price_per_watt": cm.price / cm.power,
+        "power": cm.power,
+        "price": cm.price,
+    }[sort]
+
+
+def _sql_filters(query: ComponentQuery) -> List[Any]:
+    cm = ComponentMaster
+    conds: List[Any] = [cm.category.in_(query.categories)]
+    if query.min_power is not None:
+        # Missing power counts as 0 W, as the original Python filter did
+        cond = cm.power >= query.min_power
+        conds.append(or_(cond, cm.power.is_(None)) if query.min_power <= 0 else cond)
+    if query.max_power is not None:
+        conds.append(cm.power <= query.max_power)
+    if query.min_voltage is not None:
+        conds.append(cm.voltage >= query.min_voltage)
+    if query.max_voltage is not None:
+        conds.append(cm.voltage <= query.max_voltage)
+    if query.manufacturers:
+        conds.append(cm.manufacturer.in_(query.manufacturers))
+    if query.max_price is not None:
+        conds.append(cm.price <= query.max_price)
+    if not query.include_deprecated:
+        conds.append(or_(cm.deprecated.is_(False), cm.deprecated.is_(None)))
+    if query.sort == "price_per_watt":
+        conds.extend([cm.price.is_not(None), cm.power > 0])
+    elif query.sort in ("power", "price"):
+        conds.append(getattr(cm, query.sort).is_not(None))
+    return conds
+
+
+def build_select(query: ComponentQuery):
+    """Indexed SELECT for one page (``limit + 1`` rows to detect more)."""
+    cm = ComponentMaster
+    key = _sql_sort_expr(query.sort)
+    conds = _sql_filters(query)
+    if query.after:
+        value, last_id = decode_cursor(query.after)
+        if key is None:
+            conds.append(cm.id > last_id)
+        else:
+            beyond = key < value if query.descending else key > value
+            conds.append(or_(beyond, and_(key == value, cm.id > last_id)))
+    cols = [getattr(cm, f) for f in RESULT_FIELDS]
+    stmt = select(*cols).where(*conds)
+    if key is not None:
+        stmt = stmt.order_by(key.desc() if query.descending else key.asc())
+    return stmt.order_by(cm.id.asc()).limit(query.limit + 1)
+
+
+def search_sql(db: Session, query: ComponentQuery) -> ComponentPage:
+    rows = [dict(r._mapping) for r in db.execute(build_select(query))]
+    return _page(rows[: query.limit], query, len(rows) > query.limit)
+
+
+def facet_counts_sql(db: Session, query: ComponentQuery, field: str = "manufacturer") -> Dict[str, int]:
+    """Row counts per `field` value among rows matching the query filters."""
+    if field not in FACET_FIELDS:
+        raise ValueError(f"Unknown facet {field!r}; expected one of {FACET_FIELDS}")
+    col = getattr(ComponentMaster, field)
+    stmt = select(col, func.count()).where(*_sql_filters(query)).group_by(col)
+    return {k: int(n) for k, n in db.execute(stmt)}
+
+
+# ---------------------------------------------------------------------------
+# In-memory columnar path
+# ---------------------------------------------------------------------------
+
+
+def _floats(rows: Sequence[Dict[str, Any]], key: str) -> np.ndarray:
+    return np.array([np.nan if r.get(key) is None else float(r[key]) for r in rows], dtype=float)
+
+
+@dataclass
+class ColumnarIndex:
+    """Column arrays over a set of component rows for vectorized queries."""
+    rows: List[Dict[str, Any]]
+    ids: np.ndarray
+    power: np.ndarray
+    voltage: np.ndarray
+    price: np.ndarray
+    deprecated: np.ndarray
+    category: np.ndarray  # object arrays; compared with np.isin
+    manufacturer: np.ndarray
+    loaded_at: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "ColumnarIndex":
+        rows = list(rows)
+        return cls(
+            rows=rows,
+            ids=np.array([int(r["id"]) for r in rows], dtype=np.int64),
+            power=_floats(rows, "power"),
+            voltage=_floats(rows, "voltage"),
+            price=_floats(rows, "price"),
+            deprecated=np.array([bool(r.get("deprecated")) for r in rows], dtype=bool),
+            category=np.array([r.get("category") for r in rows], dtype=object),
+            manufacturer=np.array([r.get("manufacturer") for r in rows], dtype=object),
+        )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _sort_key(self, sort: str) -> Optional[np.ndarray]:
+        if sort == "id":
+            return None
+        if sort == "price_per_watt":
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.where(self.power > 0, self.price / self.power, np.nan)
+        return self.power if sort == "power" else self.price
+
+    def mask(self, query: ComponentQuery) -> np.ndarray:
+        m = np.isin(self.category, list(query.categories))
+        # NaN comparisons are False, so range filters drop rows missing the value
+        if query.min_power is not None:
+            ok = self.power >= query.min_power
+            m &= (ok | np.isnan(self.power)) if query.min_power <= 0 else ok
+        if query.max_power is not None:
+            m &= self.power <= query.max_power
+        if query.min_voltage is not None:
+            m &= self.voltage >= query.min_voltage
+        if query.max_voltage is not None:
+            m &= self.voltage <= query.max_voltage
+        if query.manufacturers:
+            m &= np.isin(self.manufacturer, list(query.manufacturers))
+        if query.max_price is not None:
+            m &= self.price <= query.max_price
+        if not query.include_deprecated:
+            m &= ~self.deprecated
+        key = self._sort_key(query.sort)
+        if key is not None:
+            m &= ~np.isnan(key)
+        return m
+
+    def search(self, query: ComponentQuery) -> ComponentPage:
+        m = self.mask(query)
+        key = self._sort_key(query.sort)
+        if query.after:
+            value, last_id = decode_cursor(query.after)
+            if key is None:
+                m &= self.ids > last_id
+            else:
+                beyond = key < value if query.descending else key > value
+                m &= beyond | ((key == value) & (self.ids > last_id))
+        idx = np.flatnonzero(m)
+        if key is None:
+            order = idx[np.argsort(self.ids[idx], kind="stable")]
+        else:
+            k = key[idx]
+            order = idx[np.lexsort((self.ids[idx], -k if query.descending else k))]
+        take = order[: query.limit + 1]
+        rows = [{f: self.rows[i].get(f) for f in RESULT_FIELDS} for i in take[: query.limit]]
+        return _page(rows, query, len(take) > query.limit)
+
+    def facet_counts(self, query: ComponentQuery, field: str = "manufacturer") -> Dict[str, int]:
+        if field not in FACET_FIELDS:
+            raise ValueError(f"Unknown facet {field!r}; expected one of {FACET_FIELDS}")
+        values = getattr(self, field)[self.mask(query)]
+        keys, counts = np.unique(values.astype(str), return_counts=True) if len(values) else ((), ())
+        return {str(k): int(n) for k, n in zip(keys, counts)}
+
+
+def _env_categories() -> Tuple[str, ...]:
+    raw = os.getenv("COMPONENT_HOT_CATEGORIES", "panel,inverter")
+    return tuple(c.strip() for c in raw.split(",") if c.strip())
+
+
+def _env_ttl() -> float:
+    try:
+        return float(os.getenv("COMPONENT_INDEX_TTL_S", "300"))
+    except ValueError:
+        return 300.0
+
+
+class ComponentQueryEngine:
+    """Routes queries to a columnar index over the hot categories or to SQL.
+
+    A query is served from memory when every requested category is hot.  The
+    index covers all hot categories at once; it loads on first use and
+    reloads after `ttl_s` seconds or an explicit ``invalidate``.
+    """
+
+    def __init__(self, hot_categories: Optional[Iterable[str]] = None, ttl_s: Optional[float] = None) -> None:
+        self.hot_categories = set(_env_categories() if hot_categories is None else hot_categories)
+        self.ttl_s = _env_ttl() if ttl_s is None else ttl_s
+        self._index: Optional[ColumnarIndex] = None
+        self._lock = threading.Lock()
+
+    def _load(self, db: Session) -> ColumnarIndex:
+        cm = ComponentMaster
+        cols = [getattr(cm, f) for f in RESULT_FIELDS] + [cm.deprecated]
+        stmt = select(*cols).where(cm.category.in_(sorted(self.hot_categories))).order_by(cm.id)
+        return ColumnarIndex.from_rows(dict(r._mapping) for r in db.execute(stmt))
+
+    def index_for(self, db: Session, categories: Sequence[str]) -> Optional[ColumnarIndex]:
+        """The columnar index if it covers `categories`, else None."""
+        if not categories or not set(categories) <= self.hot_categories:
+            return None
+        with self._lock:
+            idx = self._index
+        if idx is None or time.monotonic() - idx.loaded_at > self.ttl_s:
+            idx = self._load(db)
+            with self._lock:
+                self._index = idx
+        return idx
+
+    def search(self, db: Session, query: ComponentQuery) -> ComponentPage:
+        idx = self.index_for(db, query.categories)
+        return idx.search(query) if idx is not None else search_sql(db, query)
+
+    def facet_counts(self, db: Session, query: ComponentQuery, field: str = "manufacturer") -> Dict[str, int]:
+        idx = self.index_for(db, query.categories)
+        return idx.facet_counts(query, field) if idx is not None else facet_counts_sql(db, query, field)
+
+    def invalidate(self, categories: Optional[Iterable[str]] = None) -> None:
+        """Drop the index (always, or only if it covers any of `categories`)."""
+        with self._lock:
+            if categories is None or self.hot_categories & set(categories):
+                self._index = None
+
+
+# Process-wide engine used by the component library service.
+component_query_engine = ComponentQueryEngine()
+
+
+__all__ = [
+    "ComponentQuery",
+    "ComponentPage",
+    "ColumnarIndex",
+    "ComponentQueryEngine",
+    "build_select",
+    "search_sql",
+    "facet_counts_sql",
+    "encode_cursor",
+    "decode_cursor",
+    "component_query_engine",
+]
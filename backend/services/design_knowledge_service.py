@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.database.session import SessionMaker
 from backend.models.design_vector import DesignVector
+from backend.services.design_vector_index import get_design_vector_index
 from backend.services.embedding_service import EmbeddingService
 from pydantic import BaseModel
 
@@ -29,44 +30,26 @@ class DesignKnowledgeService:
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
         self._embedder = EmbeddingService()
+        self._index = get_design_vector_index()
 
     async def store_vector(self, data: DesignVectorCreate) -> DesignVector:
         obj = DesignVector(vector=data.vector, meta=data.meta)
         self.session.add(obj)
         await self.session.commit()
         await self.session.refresh(obj)
+        await self._index.sync(self.session)
         return obj
 
     async def search(self, query: List[float], limit: int = 5) -> List[tuple[DesignVector, float]]:
-        """Optimized vector search with pagination and caching."""
-        # Add reasonable limit to prevent memory issues
+        """Top matches by cosine similarity over every stored design vector."""
         effective_limit = min(limit, 100)
-        
-        # Use optimized query with limit at database level
-        stmt = select(DesignVector).limit(1000)  # Reasonable upper bound
-        result = await self.session.execute(stmt)
-        vectors = result.scalars().all()
-        
-        # Vectorized similarity computation for better performance
-        import numpy as np
-        
-        if not vectors:
+        await self._index.sync(self.session)
+        hits = self._index.search(query, effective_limit)
+        if not hits:
             return []
-        
-        # Convert to numpy arrays for efficient computation
-        query_array = np.array(query)
-        vector_arrays = np.array([vec.vector for vec in vectors])
-        
-        # Batch cosine similarity computation
-        query_norm = query_array / np.linalg.norm(query_array)
-        vector_norms = vector_arrays / np.linalg.norm(vector_arrays, axis=1, keepdims=True)
-        similarities = np.dot(vector_norms, query_norm)
-        
-        # Get top-k results efficiently
-        top_k_indices = np.argpartition(similarities, -effective_limit)[-effective_limit:]
-        top_k_indices = top_k_indices[np.argsort(similarities[top_k_indices])[::-1]]
-        
-        return [(vectors[i], float(similarities[i])) for i in top_k_indices]
+        stmt = select(DesignVector).where(DesignVector.id.in_([i for i, _ in hits]))
+        by_id = {v.id: v for v in (await self.session.execute(stmt)).scalars()}
+        return [(by_id[i], score) for i, score in hits if i in by_id]
 
     async def save_design_as_template(self, snapshot: dict, name: str) -> DesignVector:
         """Embed and store a design snapshot as a reusable template."""
@@ -77,6 +60,7 @@ class DesignKnowledgeService:
         self.session.add(obj)
         await self.session.commit()
         await self.session.refresh(obj)
+        await self._index.sync(self.session)
         return obj
 
 
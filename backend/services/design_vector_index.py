@@ -0,0 +1,321 @@
+"""
+Persistent similarity index over all ``DesignVector`` rows.
+
+Vectors are L2-normalised into one float32 matrix (cosine similarity becomes
+a dot product) and served through ``IVFFlatIndex``: exact ``argpartition``
+top-k over the whole corpus while it is small, inverted lists once it grows.
+
+The matrix and its row -> ``DesignVector.id`` map are mirrored to two
+append-only files in the index directory (``vectors.f32``, ``ids.i64``) and
+memory-mapped on cold start, so a new process does not re-read every vector
+from the database.  Several workers may share the directory: appends take an
+exclusive lock on ``lock`` and skip ids another worker already wrote, so the
+files hold each id once, in ascending order.  Before each search the index catches up with rows whose
+id is above the highest indexed id, so vectors stored by other workers
+appear without a rebuild.  If the database's highest id falls below the
+index's (the table was reset), the index is rebuilt from the database.
+
+Rows whose dimension differs from the index dimension are skipped.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.ai.ann_index import IVFFlatIndex
+from backend.models.design_vector import DesignVector
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: single writer per directory
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+DEFAULT_ROOT = Path(__file__).resolve().parent.parent / "data" / "design_vectors.segments"
+
+
+def _normalise(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=-1, keepdims=True)
+    return x / np.maximum(norms, 1e-12)
+
+
+class DesignVectorIndex:
+    """Normalised design vectors keyed by ``DesignVector.id``."""
+
+    def __init__(self, root: Optional[str | Path] = None) -> None:
+        self.root = Path(root or os.getenv("DESIGN_VECTOR_INDEX_DIR") or DEFAULT_ROOT)
+        self.dim: Optional[int] = None
+        self.ann: Optional[IVFFlatIndex] = None
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.max_id = 0  # highest DesignVector.id seen, indexed or skipped
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return 0 if self.ann is None else self.ann.size
+
+    # ------------------------------------------------------------------ files
+    @property
+    def _manifest(self) -> Path:
+        return self.root / "manifest.json"
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.root / "vectors.f32"
+
+    @property
+    def _ids_path(self) -> Path:
+        return self.root / "ids.i64"
+
+    @contextmanager
+    def _exclusive(self):
+        """Hold the directory's write lock (shared with other processes)."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / "lock", "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_manifest(self) -> Optional[dict]:
+        try:
+            manifest = json.loads(self._manifest.read_text())
+        except (OSError, ValueError):
+            return None
+        return manifest if manifest.get("format") == FORMAT_VERSION else None
+
+    def _write_manifest(self, dim: int, max_id: int) -> None:
+        tmp = self._manifest.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"format": FORMAT_VERSION, "dim": dim, "max_id": max_id}))
+        os.replace(tmp, self._manifest)
+
+    def _reset_files(self, dim: int) -> None:
+        for path in (self._vectors_path, self._ids_path):
+            path.unlink(missing_ok=True)  # new inodes: other workers may map the old ones
+            path.write_bytes(b"")
+        self._write_manifest(dim, 0)
+
+    def _aligned_rows(self, dim: int) -> int:
+        """Rows present in both files; a crash between the two appends leaves
+        one file a row ahead, which is truncated away."""
+        n_vec = self._vectors_path.stat().st_size // (4 * dim)
+        n_ids = self._ids_path.stat().st_size // 8
+        n = min(n_vec, n_ids)
+        for path, size in ((self._vectors_path, n * 4 * dim), (self._ids_path, n * 8)):
+            if path.stat().st_size != size:
+                os.truncate(path, size)
+        return n
+
+    def _open_files(self) -> None:
+        """Memory-map a previously written index, if any."""
+        self._loaded = True
+        manifest = self._read_manifest()
+        if manifest is None:
+            return
+        dim = int(manifest["dim"])
+        try:
+            with self._exclusive():
+                n = self._aligned_rows(dim)
+        except OSError:
+            return
+        matrix = (
+            np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(n, dim))
+            if n
+            else np.zeros((0, dim), dtype=np.float32)
+        )
+        self.dim = dim
+        self.ann = IVFFlatIndex.from_matrix(matrix)
+        self.ann.maybe_train()
+        self.ids = np.fromfile(self._ids_path, dtype=np.int64, count=n)
+        self.max_id = max(int(manifest.get("max_id", 0)), int(self.ids.max()) if n else 0)
+        logger.info(f"Opened design vector index with {n} vectors from {self.root}")
+
+    def _persist(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        """Append rows not yet on disk, under the directory lock."""
+        try:
+            with self._exclusive():
+                manifest = self._read_manifest()
+                if manifest is None or int(manifest["dim"]) != self.dim:
+                    # Missing or cleared by another worker: write everything we hold
+                    self._reset_files(self.dim)
+                    vectors, ids = self.ann.vectors, self.ids
+                    on_disk = 0
+                else:
+                    n = self._aligned_rows(self.dim)
+                    last = int(np.fromfile(self._ids_path, dtype="<i8", count=1, offset=8 * (n - 1))[0]) if n else 0
+                    on_disk = max(int(manifest.get("max_id", 0)), last)
+                new = ids > on_disk
+                if new.any():
+                    with open(self._vectors_path, "ab") as f:
+                        f.write(np.ascontiguousarray(vectors[new], dtype="<f4").tobytes())
+                    with open(self._ids_path, "ab") as f:
+                        f.write(np.ascontiguousarray(ids[new], dtype="<i8").tobytes())
+                self._write_manifest(self.dim, max(on_disk, self.max_id))
+        except OSError as e:
+            logger.warning(f"Failed to persist design vector index to {self.root}: {e}")
+
+    # ------------------------------------------------------------------ build
+    def add(self, rows: Sequence[Tuple[int, Sequence[float]]]) -> int:
+        """Index ``(id, vector)`` pairs with ids above ``max_id``; return how many."""
+        with self._lock:
+            if not self._loaded:
+                self._open_files()
+            fresh = sorted((int(i), v) for i, v in rows if int(i) > self.max_id)
+            if not fresh:
+                return 0
+            if self.dim is None:
+                first = next((v for _, v in fresh if v), None)
+                if first is None:
+                    self.max_id = fresh[-1][0]
+                    return 0
+                self.dim = len(first)
+                self.ann = IVFFlatIndex(self.dim)
+            keep = [(i, v) for i, v in fresh if v is not None and len(v) == self.dim]
+            if len(keep) < len(fresh):
+                logger.warning(f"Skipped {len(fresh) - len(keep)} design vectors with dim != {self.dim}")
+            self.max_id = fresh[-1][0]
+            if not keep:
+                return 0
+            ids = np.array([i for i, _ in keep], dtype=np.int64)
+            vectors = _normalise(np.array([v for _, v in keep], dtype=np.float32))
+            # ids first: a concurrent search never sees a row without its id
+            self.ids = np.concatenate([self.ids, ids])
+            self.ann.add(vectors)
+            self.ann.maybe_train()
+            self._persist(vectors, ids)
+            return len(keep)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.dim = None
+            self.ann = None
+            self.ids = np.zeros(0, dtype=np.int64)
+            self.max_id = 0
+            self._loaded = True
+            try:
+                with self._exclusive():
+                    for path in (self._manifest, self._vectors_path, self._ids_path):
+                        path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    async def sync(self, session: AsyncSession, batch: int = 5000) -> int:
+        """Index rows stored since the last sync; rebuild if the table was reset."""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._open_files()
+        db_max = (await session.execute(select(func.max(DesignVector.id)))).scalar() or 0
+        if db_max < self.max_id:
+            logger.info("Design vector table was reset; rebuilding the index")
+            self.clear()
+        added = 0
+        while db_max > self.max_id:
+            stmt = (
+                select(DesignVector.id, DesignVector.vector)
+                .where(DesignVector.id > self.max_id)
+                .order_by(DesignVector.id)
+                .limit(batch)
+            )
+            rows = (await session.execute(stmt)).all()
+            if not rows:
+                break
+            added += self.add([(r[0], r[1]) for r in rows])
+        return added
+
+    # ----------------------------------------------------------------- search
+    @property
+    def generation(self) -> Tuple[int, int]:
+        """Changes whenever rows are added or the index is rebuilt."""
+        return len(self), self.max_id
+
+    def _query_ok(self, dim: int) -> bool:
+        if self.ann is None or self.ann.size == 0:
+            return False
+        if dim != self.dim:
+            logger.warning(f"Query dim {dim} does not match design vector index dim {self.dim}")
+            return False
+        return True
+
+    def search(
+        self,
+        query: Sequence[float],
+        k: int,
+        *,
+        candidates: Optional[np.ndarray] = None,
+        min_score: float = -np.inf,
+    ) -> List[Tuple[int, float]]:
+        """Top-`k` ``(DesignVector.id, cosine similarity)``, best first.
+
+        `candidates` restricts the search to the given index rows.
+        """
+        if k <= 0 or not self._query_ok(len(query)):
+            return []
+        rows, scores = self.ann.search(
+            _normalise(np.asarray(query, dtype=np.float32)), k, candidates=candidates, min_score=min_score
+        )
+        ids = self.ids
+        return [(int(ids[r]), float(s)) for r, s in zip(rows, scores)]
+
+    def search_batch(
+        self,
+        queries: Sequence[Sequence[float]],
+        k: int,
+        *,
+        candidates: Optional[np.ndarray] = None,
+        chunk: int = 256,
+    ) -> List[List[Tuple[int, float]]]:
+        """Exact top-`k` for many queries: one matrix product per chunk of
+        queries, then ``argpartition`` per row."""
+        q = np.asarray(queries, dtype=np.float32)
+        if len(q) == 0:
+            return []
+        if k <= 0 or q.ndim != 2 or not self._query_ok(q.shape[1]):
+            return [[] for _ in range(len(q))]
+        rows = np.arange(self.ann.size) if candidates is None else np.asarray(candidates, dtype=np.int64)
+        if len(rows) == 0:
+            return [[] for _ in range(len(q))]
+        matrix = self.ann.vectors if candidates is None else self.ann.vectors[rows]
+        ids = self.ids[rows]
+        k = min(k, len(rows))
+        out: List[List[Tuple[int, float]]] = []
+        for start in range(0, len(q), chunk):
+            sims = _normalise(q[start : start + chunk]) @ matrix.T
+            part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+            top = np.take_along_axis(sims, part, axis=1)
+            order = np.argsort(-top, axis=1, kind="stable")
+            part = np.take_along_axis(part, order, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            out.extend([(int(ids[c]), float(v)) for c, v in zip(pr, tr)] for pr, tr in zip(part, top))
+        return out
+
+
+_index: Optional[DesignVectorIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_design_vector_index() -> DesignVectorIndex:
+    """Process-wide index shared by every DesignKnowledgeService."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = DesignVectorIndex()
+        return _index
+
+
+__all__ = ["DEFAULT_ROOT", "DesignVectorIndex", "get_design_vector_index"]
@@ -3,27 +3,50 @@ from __future__ import annotations
 
 Providers:
  - ``elk``: call an external ELK HTTP endpoint with ``edgeRouting=ORTHOGONAL``
- - ``builtin``: grid-based Manhattan router with obstacle avoidance
+ - ``builtin``: grid-based A* Manhattan router with obstacle avoidance
  - ``client``: routing handled in the browser via ``elkjs`` (server returns 501)
+
+The builtin router searches a ``GRID``-pixel lattice with A* (Manhattan
+heuristic, a penalty per bend) inside the bounding box of the two ports plus
+a margin, widening once to the whole diagram before falling back to an L
+route.  Obstacle lookups go through a uniform-grid spatial hash, so a cell
+test touches only the nodes near it.  A link may leave and enter its own
+endpoints' padding but never crosses a node body.  Large layers are routed
+in chunks on a process pool (``EDGE_ROUTER_WORKERS``, default CPU count up
+to 4).
 """
 
-from typing import Dict, List, Tuple
+import asyncio
+import heapq
+import logging
+import os
+from concurrent.futures import Executor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 import httpx
 
 from backend.config import EDGE_ROUTER_PROVIDER, LAYOUT_HTTP_URL
 from backend.schemas.analysis import DesignSnapshot
+from backend.utils.process_pool import SharedProcessPool
+
+logger = logging.getLogger(__name__)
 
 PADDING = 18.0  # obstacle padding around nodes (px)
 GRID = 12.0  # grid resolution for builtin router
+BEND_PENALTY = 3.0  # cost of a turn, in grid steps
+SEARCH_MARGIN = 6  # grid cells around the ports' bounding box
+MAX_EXPANSIONS = 200_000  # per search window
+BUCKET = 8 * GRID  # spatial hash cell size (px)
+PARALLEL_MIN_LINKS = 32  # fewer links are routed inline
 
+Rect = Tuple[float, float, float, float]
+Point = Tuple[float, float]
 
-def _obstacles(
-    snapshot: DesignSnapshot, layer: str
-) -> List[Tuple[float, float, float, float]]:
-    """Return inflated node rectangles as (x0, y0, x1, y1)."""
 
-    rects: List[Tuple[float, float, float, float]] = []
+def _component_rects(snapshot: DesignSnapshot, layer: str) -> Dict[str, Rect]:
+    """Inflated node rectangles as (x0, y0, x1, y1), keyed by component id."""
+
+    rects: Dict[str, Rect] = {}
     for c in snapshot.components:
         pos = (c.layout or {}).get(layer)
         if not pos:
@@ -34,17 +57,21 @@ def _obstacles(
         y0 = pos["y"] - h / 2 - PADDING
         x1 = pos["x"] + w / 2 + PADDING
         y1 = pos["y"] + h / 2 + PADDING
-        rects.append((x0, y0, x1, y1))
+        rects[c.id] = (x0, y0, x1, y1)
     return rects
 
 
-def _ports(
-    snapshot: DesignSnapshot, layer: str, src_id: str, tgt_id: str
-) -> Tuple[Tuple[float, float], Tuple[float, float]]:
+def _obstacles(snapshot: DesignSnapshot, layer: str) -> List[Rect]:
+    """Return inflated node rectangles as (x0, y0, x1, y1)."""
+
+    return list(_component_rects(snapshot, layer).values())
+
+
+def _ports(by_id: Dict[str, object], layer: str, src_id: str, tgt_id: str) -> Tuple[Point, Point]:
     """Simple L->R ports: source right edge center, target left edge center."""
 
-    src = next(c for c in snapshot.components if c.id == src_id)
-    tgt = next(c for c in snapshot.components if c.id == tgt_id)
+    src = by_id[src_id]
+    tgt = by_id[tgt_id]
     sw = getattr(src, "width", 120.0) or 120.0
     tw = getattr(tgt, "width", 120.0) or 120.0
     sp = (src.layout[layer]["x"] + sw / 2, src.layout[layer]["y"])
@@ -56,70 +83,208 @@ def _grid_snap(x: float) -> float:
     return round(x / GRID) * GRID
 
 
-def _bfs_manhattan(
-    start: Tuple[float, float],
-    goal: Tuple[float, float],
-    rects: List[Tuple[float, float, float, float]],
-) -> List[Tuple[float, float]]:
-    """Simple BFS on a coarse grid avoiding rectangular obstacles."""
+class ObstacleIndex:
+    """Uniform-grid spatial hash over obstacle rectangles."""
 
-    from collections import deque
+    def __init__(self, rects: Sequence[Rect], bucket: float = BUCKET) -> None:
+        self.rects = list(rects)
+        self.bucket = bucket
+        self._buckets: Dict[Tuple[int, int], List[int]] = {}
+        self._memo: Dict[Tuple[int, int], Tuple[int, ...]] = {}
+        for i, (x0, y0, x1, y1) in enumerate(self.rects):
+            for bx in range(int(x0 // bucket), int(x1 // bucket) + 1):
+                for by in range(int(y0 // bucket), int(y1 // bucket) + 1):
+                    self._buckets.setdefault((bx, by), []).append(i)
 
-    sx, sy = _grid_snap(start[0]), _grid_snap(start[1])
-    gx, gy = _grid_snap(goal[0]), _grid_snap(goal[1])
+    def owners_at(self, cx: int, cy: int) -> Tuple[int, ...]:
+        """Indexes of the rectangles containing grid cell (cx, cy)."""
+        hit = self._memo.get((cx, cy))
+        if hit is None:
+            x, y = cx * GRID, cy * GRID
+            near = self._buckets.get((int(x // self.bucket), int(y // self.bucket)), ())
+            hit = tuple(i for i in near if self.rects[i][0] <= x <= self.rects[i][2] and self.rects[i][1] <= y <= self.rects[i][3])
+            self._memo[(cx, cy)] = hit
+        return hit
 
-    def blocked(x: float, y: float) -> bool:
-        for x0, y0, x1, y1 in rects:
-            if x0 <= x <= x1 and y0 <= y <= y1:
-                return True
-        return False
+    def extent(self) -> Optional[Rect]:
+        if not self.rects:
+            return None
+        return (
+            min(r[0] for r in self.rects),
+            min(r[1] for r in self.rects),
+            max(r[2] for r in self.rects),
+            max(r[3] for r in self.rects),
+        )
 
-    dirs = [(GRID, 0), (-GRID, 0), (0, GRID), (0, -GRID)]
-    q = deque([(sx, sy)])
-    parent: Dict[Tuple[float, float], Tuple[float, float] | None] = {(sx, sy): None}
 
-    while q:
-        x, y = q.popleft()
-        if (x, y) == (gx, gy):
-            break
-        for dx, dy in dirs:
-            nx, ny = x + dx, y + dy
-            if (nx, ny) in parent or blocked(nx, ny):
-                continue
-            parent[(nx, ny)] = (x, y)
-            q.append((nx, ny))
+_DIRS = ((1, 0), (-1, 0), (0, 1), (0, -1))
 
-    path: List[Tuple[float, float]] = []
-    cur = (gx, gy)
-    if cur not in parent:
-        return [(sx, sy), (gx, sy), (gx, gy)]
 
-    while cur is not None:
-        path.append(cur)
-        cur = parent[cur]
-    path.reverse()
+def _simplify(path: Iterable[Point]) -> List[Point]:
+    """Drop collinear interior points."""
 
-    pruned: List[Tuple[float, float]] = []
+    pruned: List[Point] = []
     for p in path:
-        if not pruned:
-            pruned.append(p)
-        elif len(pruned) >= 2:
+        if len(pruned) >= 2:
             x0, y0 = pruned[-2]
             x1, y1 = pruned[-1]
             x2, y2 = p
             if (x0 == x1 == x2) or (y0 == y1 == y2):
                 pruned[-1] = p
-            else:
-                pruned.append(p)
-        else:
-            pruned.append(p)
+                continue
+        pruned.append(p)
     return pruned
 
 
+def _search(
+    start: Tuple[int, int],
+    goal: Tuple[int, int],
+    blocked,
+    bounds: Tuple[int, int, int, int],
+) -> Optional[List[Tuple[int, int]]]:
+    """A* over grid cells within `bounds`; None if the goal is unreachable."""
+
+    bx0, by0, bx1, by1 = bounds
+    gx, gy = goal
+    aligned_goal = lambda x, y: x == gx or y == gy  # noqa: E731
+
+    def h(x: int, y: int) -> float:
+        return abs(x - gx) + abs(y - gy) + (0.0 if aligned_goal(x, y) else BEND_PENALTY)
+
+    # State: (cell x, cell y, incoming direction; 4 = none)
+    first = (start[0], start[1], 4)
+    best: Dict[Tuple[int, int, int], float] = {first: 0.0}
+    parent: Dict[Tuple[int, int, int], Optional[Tuple[int, int, int]]] = {first: None}
+    heap = [(h(*start), 0, 0.0, first)]
+    tie = 0
+    expanded = 0
+    while heap:
+        _, _, g, state = heapq.heappop(heap)
+        if g > best.get(state, float("inf")):
+            continue
+        x, y, d = state
+        if (x, y) == goal:
+            cells: List[Tuple[int, int]] = []
+            cur: Optional[Tuple[int, int, int]] = state
+            while cur is not None:
+                cells.append((cur[0], cur[1]))
+                cur = parent[cur]
+            cells.reverse()
+            return cells
+        expanded += 1
+        if expanded > MAX_EXPANSIONS:
+            return None
+        for nd, (dx, dy) in enumerate(_DIRS):
+            nx, ny = x + dx, y + dy
+            if not (bx0 <= nx <= bx1 and by0 <= ny <= by1) or blocked(nx, ny):
+                continue
+            ng = g + 1.0 + (BEND_PENALTY if d != 4 and nd != d else 0.0)
+            nxt = (nx, ny, nd)
+            if ng < best.get(nxt, float("inf")):
+                best[nxt] = ng
+                parent[nxt] = state
+                tie += 1
+                heapq.heappush(heap, (ng + h(nx, ny), tie, ng, nxt))
+    return None
+
+
+def _astar_manhattan(
+    start: Point,
+    goal: Point,
+    index: ObstacleIndex,
+    endpoints: Sequence[int] = (),
+) -> List[Point]:
+    """Orthogonal route from `start` to `goal` avoiding the indexed obstacles.
+
+    `endpoints` are the rectangles of the link's own nodes: their padding is
+    passable so the route can leave and reach the ports, their bodies
+    (outline included, so routes do not run along it) are not.
+    """
+
+    sx, sy = round(start[0] / GRID), round(start[1] / GRID)
+    gx, gy = round(goal[0] / GRID), round(goal[1] / GRID)
+    own = set(endpoints)
+
+    def blocked(cx: int, cy: int) -> bool:
+        if (cx, cy) == (gx, gy):
+            return False
+        for i in index.owners_at(cx, cy):
+            if i not in own:
+                return True
+            x0, y0, x1, y1 = index.rects[i]
+            x, y = cx * GRID, cy * GRID
+            if x0 + PADDING <= x <= x1 - PADDING and y0 + PADDING <= y <= y1 - PADDING:
+                return True
+        return False
+
+    margin = max(SEARCH_MARGIN, (abs(gx - sx) + abs(gy - sy)) // 4)
+    windows = [(min(sx, gx) - margin, min(sy, gy) - margin, max(sx, gx) + margin, max(sy, gy) + margin)]
+    ext = index.extent()
+    if ext is not None:
+        wide = (
+            min(windows[0][0], int(ext[0] // GRID) - 2),
+            min(windows[0][1], int(ext[1] // GRID) - 2),
+            max(windows[0][2], int(ext[2] // GRID) + 2),
+            max(windows[0][3], int(ext[3] // GRID) + 2),
+        )
+        if wide != windows[0]:
+            windows.append(wide)
+
+    for bounds in windows:
+        cells = _search((sx, sy), (gx, gy), blocked, bounds)
+        if cells is not None:
+            return _simplify((cx * GRID, cy * GRID) for cx, cy in cells)
+    sx, sy, gx, gy = sx * GRID, sy * GRID, gx * GRID, gy * GRID
+    return [(sx, sy), (gx, sy), (gx, gy)]
+
+
+_RouteTask = Tuple[str, Point, Point, Tuple[int, ...]]  # edge id, source port, target port, endpoint rects
+
+
+def _route_batch(job: Tuple[List[Rect], List[_RouteTask]]) -> List[Tuple[str, List[Point]]]:
+    """Route a chunk of links; top-level so worker processes can run it."""
+
+    rects, tasks = job
+    index = ObstacleIndex(rects)
+    return [(eid, _astar_manhattan(s, t, index, own)) for eid, s, t, own in tasks]
+
+
+_POOL = SharedProcessPool("edge_router", "EDGE_ROUTER_WORKERS")
+
+
+def _router_pool() -> Optional[Executor]:
+    """Shared worker pool (EDGE_ROUTER_WORKERS, default CPU count up to 4); None routes inline."""
+    return _POOL.get()
+
+
+async def _route_all(rects: List[Rect], tasks: List[_RouteTask]) -> List[Tuple[str, List[Point]]]:
+    pool = _router_pool() if len(tasks) >= PARALLEL_MIN_LINKS else None
+    if pool is None:
+        return _route_batch((rects, tasks))
+    n_chunks = min(len(tasks), 4 * (getattr(pool, "_max_workers", None) or os.cpu_count() or 1))
+    chunks = [tasks[i::n_chunks] for i in range(n_chunks)]
+    loop = asyncio.get_running_loop()
+    try:
+        parts = await asyncio.gather(*(loop.run_in_executor(pool, _route_batch, (rects, c)) for c in chunks))
+    except Exception as e:  # broken pool: degrade to inline routing
+        _POOL.discard(pool, e)
+        logger.warning(f"Edge router pool failed, routing inline: {e}")
+        return _route_batch((rects, tasks))
+    return [r for part in parts for r in part]
+
+
 async def route_edges(
-    snapshot: DesignSnapshot, layer: str = "single_line"
+    snapshot: DesignSnapshot,
+    layer: str = "single_line",
+    only: Optional[Iterable[str]] = None,
 ) -> Dict[str, List[Dict[str, float]]]:
-    """Route all unlocked links on ``layer`` and return waypoint mappings."""
+    """Route all unlocked links on ``layer`` and return waypoint mappings.
+
+    ``only`` restricts routing to the given edge ids; every node still counts
+    as an obstacle.
+    """
+
+    wanted = None if only is None else set(only)
 
     provider = EDGE_ROUTER_PROVIDER
 
@@ -151,7 +316,8 @@ async def route_edges(
                 continue
             eid = l.id or f"e_{l.source_id}_{l.target_id}"
             edges.append({"id": eid, "sources": [l.source_id], "targets": [l.target_id]})
-            unlocked.append(eid)
+            if wanted is None or eid in wanted:
+                unlocked.append(eid)
 
         graph = {
             "id": "root",
@@ -195,21 +361,22 @@ async def route_edges(
         raise NotImplementedError("client-side edge routing")
 
     # Builtin Manhattan router
-    rects = _obstacles(snapshot, layer)
-    routes: Dict[str, List[Dict[str, float]]] = {}
+    by_id = {c.id: c for c in snapshot.components}
+    rect_by_id = _component_rects(snapshot, layer)
+    slot = {cid: i for i, cid in enumerate(rect_by_id)}
+    tasks: List[_RouteTask] = []
     for l in snapshot.links:
         if (l.locked_in_layers or {}).get(layer):
             continue
-        if not ((next(c for c in snapshot.components if c.id == l.source_id).layout or {}).get(layer)):
+        if l.source_id not in slot or l.target_id not in slot:
             continue
-        if not ((next(c for c in snapshot.components if c.id == l.target_id).layout or {}).get(layer)):
+        eid = l.id or f"e_{l.source_id}_{l.target_id}"
+        if wanted is not None and eid not in wanted:
             continue
-        s, t = _ports(snapshot, layer, l.source_id, l.target_id)
-        path = _bfs_manhattan(s, t, rects)
-        routes[l.id or f"e_{l.source_id}_{l.target_id}"] = [
-            {"x": float(x), "y": float(y)} for (x, y) in path
-        ]
-    return routes
+        s, t = _ports(by_id, layer, l.source_id, l.target_id)
+        tasks.append((eid, s, t, (slot[l.source_id], slot[l.target_id])))
+    routed = await _route_all(list(rect_by_id.values()), tasks)
+    return {eid: [{"x": float(x), "y": float(y)} for (x, y) in path] for eid, path in routed}
 
 
 __all__ = ["route_edges"]
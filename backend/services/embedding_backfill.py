@@ -0,0 +1,111 @@
+"""
+Background embedding of AI action vectors on the job queue.
+
+``log_feedback_v2`` keeps its record when no embedding could be produced;
+such rows carry ``meta["embedding_pending"]`` (the proposal type and user
+decision the feedback text is built from) and an ``embed_action_vectors``
+job fills them in, retrying with backoff while the embedding backend is
+unavailable.  ``enqueue_embedding_backfill`` sweeps the whole table for rows
+still missing an embedding, one low-priority page per job.
+"""
+from __future__ import annotations
+
+import base64
+import os
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+
+from backend.database.session import SessionMaker
+from backend.models.ai_action_vector import AiActionVector
+from backend.scalability.job_queue import configure_queue, get_job_queue, job_handler
+from backend.services import encryptor
+from backend.services.embedding_service import EmbeddingService
+from backend.services.vector_store import get_vector_store
+from backend.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+BACKFILL_BATCH = int(os.getenv("EMBEDDING_BACKFILL_BATCH", "256"))
+# Sweep pages yield to per-record jobs (default priority 5).
+BACKFILL_PRIORITY = 1
+
+configure_queue("embeddings", concurrency=1, visibility_timeout_s=600.0)
+
+
+def _text(row: AiActionVector) -> str:
+    pending = (row.meta or {}).get("embedding_pending") or {}
+    decision = pending.get("user_decision") or ("approved" if row.approval else "rejected")
+    return EmbeddingService.feedback_text(
+        row.action_type,
+        pending.get("type", ""),
+        row.anonymized_prompt,
+        row.anonymized_context,
+        row.session_history,
+        decision,
+    )
+
+
+@job_handler("embed_action_vectors", queue="embeddings", max_attempts=5)
+async def embed_action_vectors(payload: Dict[str, Any]) -> None:
+    """Embed the rows in ``payload["ids"]``, or one page after ``payload["after_id"]``."""
+    ids: Optional[List[int]] = payload.get("ids")
+    batch = int(payload.get("batch", BACKFILL_BATCH))
+    async with SessionMaker() as session:
+        stmt = select(AiActionVector)
+        if ids is not None:
+            stmt = stmt.where(AiActionVector.id.in_(ids))
+        else:
+            stmt = stmt.where(AiActionVector.id > int(payload.get("after_id", 0))).order_by(AiActionVector.id).limit(batch)
+        rows = list((await session.execute(stmt)).scalars())
+        pending = [r for r in rows if not r.embedding]
+        if pending:
+            vectors = await EmbeddingService().embed_text([_text(r) for r in pending])
+            if any(not any(v) for v in vectors):  # zero vectors: no backend loaded
+                raise RuntimeError("Embedding backend unavailable")
+            key = os.getenv("EMBEDDING_ENCRYPTION_KEY")
+            for row, vector in zip(pending, vectors):
+                row.embedding = (
+                    base64.b64encode(encryptor.encrypt_vector(vector, key.encode())).decode("utf-8")
+                    if key
+                    else vector
+                )
+                meta = dict(row.meta or {})
+                meta.pop("embedding_pending", None)
+                row.meta = meta
+            await session.commit()
+
+            store = get_vector_store()
+            for row, vector in zip(pending, vectors):
+                try:
+                    await store.upsert(
+                        row.id,
+                        vector,
+                        {
+                            "action_type": row.action_type,
+                            "component_type": row.component_type,
+                            "approval": row.approval,
+                            "user_prompt": row.user_prompt,
+                            "design_context": row.design_context,
+                        },
+                    )
+                except Exception as exc:
+                    logger.warning(f"Failed to upsert backfilled vector {row.id}: {exc}")
+            logger.info(f"Backfilled {len(pending)} action vector embeddings")
+
+    if ids is None and len(rows) == batch:
+        await get_job_queue().enqueue(
+            "embed_action_vectors",
+            {"after_id": rows[-1].id, "batch": batch},
+            priority=BACKFILL_PRIORITY,
+        )
+
+
+async def enqueue_embedding_backfill(batch: int = BACKFILL_BATCH) -> str:
+    """Start a sweep that embeds every action vector still missing one."""
+    return await get_job_queue().enqueue(
+        "embed_action_vectors", {"after_id": 0, "batch": batch}, priority=BACKFILL_PRIORITY
+    )
+
+
+__all__ = ["embed_action_vectors", "enqueue_embedding_backfill"]
@@ -6,11 +6,35 @@ package.  A fallback path can use OpenAI's embedding API if the
 environment variable ``OPENAI_API_KEY`` is set and the local model
 fails or is disabled.  Texts are concatenated from action metadata
 before being embedded.
+
+The model is loaded once per process and every ``EmbeddingService`` shares
+one ``EmbeddingWorker``: concurrent ``embed_*`` calls are queued, collected
+into micro-batches for a short window and encoded in a thread pool, so the
+event loop never blocks on the model.  Identical texts in flight are encoded
+once, and results are kept in a content-hash LRU (optionally backed by a
+directory shared between processes).
+
+Environment:
+  EMBEDDING_BATCH_WINDOW_MS   how long a batch waits for more texts (default 5)
+  EMBEDDING_MAX_BATCH         texts per model call (default 64)
+  EMBEDDING_WORKERS           encoder threads (default 1)
+  EMBEDDING_CACHE_ENTRIES     memory cache bound (default 10000, 0 disables)
+  EMBEDDING_CACHE_DIR         enables the on-disk cache tier
 """
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
-from typing import List, Optional, Any
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
 
 try:  # pragma: no cover - optional dependency
     from sentence_transformers import SentenceTransformer  # type: ignore
@@ -23,31 +47,286 @@ except ImportError:  # pragma: no cover - optional dependency
     OpenAI = None  # type: ignore
 
 from backend.config import settings
+from backend.observability.metrics import (
+    embedding_batch_size,
+    embedding_cache_hits,
+    embedding_cache_misses,
+    embedding_queue_latency,
+)
 
 
 logger = logging.getLogger(__name__)
 
+OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
 
-class EmbeddingService:
-    """Service to convert text input into embedding vectors."""
 
-    def __init__(self) -> None:
-        model_name = settings.embedding_model_name
-        self.model: Optional[SentenceTransformer] = None
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+class EmbeddingCache:
+    """LRU of embeddings keyed by a hash of the model id and text."""
+
+    def __init__(self, max_entries: Optional[int] = None, disk_dir: Optional[str | Path] = None) -> None:
+        self.max_entries = _env_int("EMBEDDING_CACHE_ENTRIES", 10000) if max_entries is None else max_entries
+        if disk_dir is None:
+            disk_dir = os.getenv("EMBEDDING_CACHE_DIR") or None
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model_id: str, text: str) -> str:
+        return hashlib.sha256(f"{model_id}\0{text}".encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        return self.disk_dir / key[:2] / f"{key}.f32" if self.disk_dir else None
+
+    def _remember(self, key: str, vec: np.ndarray) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = vec
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vec = self._entries.get(key)
+            if vec is not None:
+                self._entries.move_to_end(key)
+        tier = "memory" if vec is not None else None
+        path = self._disk_path(key) if vec is None else None
+        if path is not None:
+            try:
+                vec = np.fromfile(path, dtype="<f4")
+                tier = "disk"
+                self._remember(key, vec)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                logger.warning(f"Embedding cache read failed for {path}: {e}")
+        with self._lock:
+            if tier is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.disk_hits += tier == "disk"
+        try:
+            if tier is None:
+                embedding_cache_misses.inc()
+            else:
+                embedding_cache_hits.labels(tier=tier).inc()
+        except Exception:  # pragma: no cover
+            pass
+        return None if vec is None else vec.tolist()
+
+    def put(self, key: str, vector: List[float]) -> None:
+        vec = np.asarray(vector, dtype=np.float32)
+        self._remember(key, vec)
+        path = self._disk_path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            vec.astype("<f4").tofile(tmp)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Embedding cache write failed for {path}: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_Item = Tuple[str, str, "asyncio.Future[List[float]]", float]  # key, text, future, enqueued_at
+
+
+class EmbeddingWorker:
+    """Micro-batching front end for a synchronous ``encode(texts)`` function.
+
+    ``encode`` runs in a thread pool and returns one vector per text (an
+    empty list when no backend could embed it; those are not cached).
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], List[List[float]]],
+        model_id: str,
+        *,
+        window_ms: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        workers: Optional[int] = None,
+        cache: Optional[EmbeddingCache] = None,
+    ) -> None:
+        self.encode = encode
+        self.model_id = model_id
+        self.window_s = (_env_int("EMBEDDING_BATCH_WINDOW_MS", 5) if window_ms is None else window_ms) / 1000.0
+        self.max_batch = max(1, _env_int("EMBEDDING_MAX_BATCH", 64) if max_batch is None else max_batch)
+        self.cache = cache if cache is not None else EmbeddingCache()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, _env_int("EMBEDDING_WORKERS", 1) if workers is None else workers),
+            thread_name_prefix="embedding",
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.batches: deque = deque(maxlen=100)  # recent batch sizes
+
+    def _ensure_running(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            # First use, or a new event loop (tests, worker restarts)
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._inflight = {}
+            self._task = loop.create_task(self._run())
+        return self._queue
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Vectors for `texts`, from cache or the next batch."""
+        queue = self._ensure_running()
+        out: List[Optional[List[float]]] = [None] * len(texts)
+        waits: List[Tuple[int, asyncio.Future]] = []
+        for i, text in enumerate(texts):
+            key = self.cache.key(self.model_id, text)
+            fut = self._inflight.get(key)
+            if fut is None:
+                out[i] = self.cache.get(key)
+                if out[i] is not None:
+                    continue
+                fut = self._loop.create_future()
+                self._inflight[key] = fut
+                queue.put_nowait((key, text, fut, time.perf_counter()))
+            waits.append((i, fut))
+        if waits:
+            vectors = await asyncio.gather(*(asyncio.shield(f) for _, f in waits))
+            for (i, _), vec in zip(waits, vectors):
+                out[i] = vec
+        return out  # type: ignore[return-value]
+
+    async def _collect(self, queue: asyncio.Queue) -> List[_Item]:
+        batch = [await queue.get()]
+        deadline = self._loop.time() + self.window_s
+        while len(batch) < self.max_batch:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            batch = await self._collect(queue)
+            started = time.perf_counter()
+            try:
+                embedding_batch_size.observe(len(batch))
+                for _, _, _, enqueued in batch:
+                    embedding_queue_latency.observe(started - enqueued)
+            except Exception:  # pragma: no cover
+                pass
+            self.batches.append(len(batch))
+            try:
+                vectors = await self._loop.run_in_executor(self._executor, self.encode, [t for _, t, _, _ in batch])
+            except Exception as exc:
+                for key, _, fut, _ in batch:
+                    self._inflight.pop(key, None)
+                    if not fut.done():
+                        fut.set_exception(exc)
+                continue
+            for (key, _, fut, _), vec in zip(batch, vectors):
+                if vec:
+                    self.cache.put(key, vec)
+                self._inflight.pop(key, None)
+                if not fut.done():
+                    fut.set_result(vec)
+
+
+_embedder_instance: Optional[SentenceTransformer] = None
+_openai_client: Optional[OpenAI] = None
+_backends_loaded = False
+_backend_lock = threading.Lock()
+_worker: Optional[EmbeddingWorker] = None
+
+
+def _load_backends() -> None:
+    """Load the local model and the OpenAI client once per process."""
+    global _backends_loaded, _embedder_instance, _openai_client
+    with _backend_lock:
+        if _backends_loaded:
+            return
+        _backends_loaded = True
         if SentenceTransformer is not None:
             try:
-                self.model = SentenceTransformer(model_name)
+                _embedder_instance = SentenceTransformer(settings.embedding_model_name)
             except Exception as exc:  # pragma: no cover - model download issues
-                logger.warning("Failed to load embedding model %s: %s", model_name, exc)
-                self.model = None
-
-        self.openai_client: Optional[OpenAI] = None
-        if OpenAI is not None and settings.openai_api_key:
+                logger.warning("Failed to load embedding model %s: %s", settings.embedding_model_name, exc)
+        if _embedder_instance is None and OpenAI is not None and settings.openai_api_key:
             try:
-                self.openai_client = OpenAI(api_key=settings.openai_api_key)
+                _openai_client = OpenAI(api_key=settings.openai_api_key)
             except Exception as exc:  # pragma: no cover - optional dependency
                 logger.warning("Failed to init OpenAI client: %s", exc)
-                self.openai_client = None
+
+
+def _encode(texts: List[str]) -> List[List[float]]:
+    """Encode with the local model, else OpenAI; empty vectors on failure."""
+    try:
+        if _embedder_instance is not None:
+            return np.asarray(_embedder_instance.encode(texts, convert_to_numpy=True)).tolist()
+        if _openai_client is None:
+            raise RuntimeError("No embedding model available")
+        response = _openai_client.embeddings.create(input=texts, model=OPENAI_EMBEDDING_MODEL)
+        return [d.embedding for d in response.data]
+    except RuntimeError as exc:
+        logger.warning("Embedding failed: %s", exc)
+        return [[] for _ in texts]
+
+
+def get_embedding_worker() -> EmbeddingWorker:
+    """Process-wide worker shared by every EmbeddingService."""
+    global _worker
+    _load_backends()
+    with _backend_lock:
+        if _worker is None:
+            model_id = (
+                settings.embedding_model_name if _embedder_instance is not None else f"openai:{OPENAI_EMBEDDING_MODEL}"
+            )
+            _worker = EmbeddingWorker(_encode, model_id)
+        return _worker
+
+
+class EmbeddingService:
+    """Service to convert text input into embedding vectors."""
+
+    def __init__(self, worker: Optional[EmbeddingWorker] = None) -> None:
+        self._worker = worker or get_embedding_worker()
+
+    @property
+    def model(self) -> Optional[SentenceTransformer]:
+        return _embedder_instance
+
+    @property
+    def openai_client(self) -> Optional[OpenAI]:
+        return _openai_client
 
     async def embed_text(self, texts: List[str]) -> List[List[float]]:
         """Embed a list of texts into vectors.
@@ -57,33 +336,39 @@ class EmbeddingService:
         requested text.  This allows callers to proceed gracefully when
         embeddings cannot be generated.
         """
-        try:
-            if self.model:
-                embeddings = self.model.encode(texts, convert_to_tensor=True)
-                return embeddings.detach().cpu().tolist()
-            if not self.openai_client:
-                raise RuntimeError("No embedding model available")
-            response = self.openai_client.embeddings.create(
-                input=texts,
-                model="text-embedding-3-small",
-            )
-            return [d.embedding for d in response.data]
-        except RuntimeError as exc:
-            logger.warning("Embedding failed: %s", exc)
-            return [[] for _ in texts]
+        return await self._worker.embed(texts)
 
     async def embed_log(self, payload: Any, anonymized_prompt: str, anonymized_context: dict) -> List[float]:
         """Embed an enriched feedback log."""
         proposed = payload.proposed_action if hasattr(payload, "proposed_action") else payload.get("proposed_action", {})
-        text = " ".join([
+        text = self.feedback_text(
             proposed.get("action", ""),
             proposed.get("type", ""),
+            anonymized_prompt,
+            anonymized_context,
+            payload.session_history,
+            payload.user_decision,
+        )
+        return (await self.embed_text([text]))[0]
+
+    @staticmethod
+    def feedback_text(
+        action: str,
+        action_type: str,
+        anonymized_prompt: str,
+        anonymized_context: Any,
+        session_history: Any,
+        user_decision: str,
+    ) -> str:
+        """Text embedded for a feedback log (shared with the backfill job)."""
+        return " ".join([
+            action or "",
+            action_type or "",
             anonymized_prompt or "",
             str(anonymized_context or {}),
-            str(payload.session_history or {}),
-            payload.user_decision,
+            str(session_history or {}),
+            user_decision,
         ])
-        return (await self.embed_text([text]))[0]
 
     async def embed_query(self, action: Any, ctx: dict, history: dict) -> List[float]:
         """Embed an action query for retrieval."""
@@ -97,13 +382,12 @@ class EmbeddingService:
         query_text = " ".join(parts)
         return (await self.embed_text([query_text]))[0]
 
-_embedder_instance: Optional[SentenceTransformer] = None
 
 def get_sentence_embedder() -> SentenceTransformer:
     """Return a shared SentenceTransformer encoder for synchronous use."""
-    global _embedder_instance
+    _load_backends()
     if _embedder_instance is None:
         if SentenceTransformer is None:  # pragma: no cover - optional dependency
             raise RuntimeError("SentenceTransformer not installed")
-        _embedder_instance = SentenceTransformer(settings.embedding_model_name)
+        raise RuntimeError(f"Failed to load embedding model {settings.embedding_model_name}")
     return _embedder_instance
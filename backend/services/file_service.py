@@ -8,6 +8,7 @@ from typing import Any
 from typing_extensions import TypedDict
 
 import asyncio
+import os
 import json
 from datetime import datetime, timezone
 from openai import AsyncOpenAI
@@ -31,6 +32,8 @@ except Exception:  # pragma: no cover - fallback when dependencies missing
 from backend.parsers.table_extractor import extract_tables
 
 from backend.config import settings
+from backend.database.session import SessionMaker
+from backend.scalability.job_queue import configure_queue, get_job_queue, job_handler
 
 from backend.models.file_asset import FileAsset
 from backend.schemas.file_asset import FileAssetUpdate
@@ -435,6 +438,7 @@ async def run_parsing_job(asset_id: str, session: AsyncSession, ai_client: Async
         # they do not block the overall parsing pipeline.
         try:
             from backend.services.component_db_service import ComponentDBService
+            from backend.services.component_query import component_query_engine
             from backend.schemas.component_master import ComponentMasterCreate
 
             # Instantiate the component DB service using the current session
@@ -610,6 +614,9 @@ async def run_parsing_job(asset_id: str, session: AsyncSession, ai_client: Async
                 else:
                     create_obj = ComponentMasterCreate(**data)
                     await comp_service.create(create_obj)
+            # The library's in-memory query index would otherwise serve the
+            # old rows until its TTL expires.
+            component_query_engine.invalidate([category])
 
             # ------------------------------------------------------------------
             # NEW: Ingest parsed component into the AI component DB service.
@@ -655,6 +662,7 @@ async def run_parsing_job(asset_id: str, session: AsyncSession, ai_client: Async
                 # Call create() on the service.  If the part number already
                 # exists, the UNIQUE constraint will trigger an update instead.
                 await ai_comp_service.create(ingest_record)
+                component_query_engine.invalidate([category])
             except Exception as ingest_err:  # pragma: no cover - log and continue
                 import logging
                 logger = logging.getLogger(__name__)
@@ -669,6 +677,26 @@ async def run_parsing_job(asset_id: str, session: AsyncSession, ai_client: Async
     await session.commit()
 
 
+configure_queue(
+    "datasheets",
+    concurrency=max(1, int(os.getenv("DATASHEET_PARSE_WORKERS", "2"))),
+    visibility_timeout_s=float(os.getenv("DATASHEET_PARSE_TIMEOUT_S", "900")),
+)
+
+
+@job_handler("parse_datasheet", queue="datasheets")
+async def parse_datasheet_job(payload: dict[str, Any]) -> None:
+    """Job entry point for ``run_parsing_job`` with its own session and client."""
+    ai_client = AsyncOpenAI(api_key=settings.openai_api_key)
+    async with SessionMaker() as session:
+        await run_parsing_job(payload["asset_id"], session, ai_client)
+
+
+async def enqueue_parsing_job(asset_id: str, priority: int = 5) -> str:
+    """Queue datasheet parsing for `asset_id` on the durable job queue."""
+    return await get_job_queue().enqueue("parse_datasheet", {"asset_id": asset_id}, priority=priority)
+
+
 class FileService:
     """Service layer for file asset CRUD."""
 
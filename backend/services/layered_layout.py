@@ -0,0 +1,260 @@
+from __future__ import annotations
+"""
+In-process layered (Sugiyama) layout, a local stand-in for ELK ``layered``.
+
+Phases:
+ 1. Cycle removal: links closing a DFS back edge are reversed.
+ 2. Layering: longest path from the sources; locked nodes keep the layer
+    their x coordinate falls in and push their successors right.
+ 3. Links spanning several layers are split into chains of dummy nodes, so
+    long links get their own lanes.
+ 4. Crossing minimisation: alternating down/up barycenter sweeps, keeping
+    the ordering with the fewest crossings.  Ports are ordered (ELK
+    ``FIXED_ORDER``): a link's barycenter contribution is offset by its
+    position among its endpoint's links in model order, and ties keep model
+    order.
+ 5. Coordinates: each node gets an integer row near the median row of its
+    neighbours, strictly increasing within a layer and skipping rows held by
+    locked nodes.
+
+Positions sit on the ``layout_engine`` grid (``100 + layer * H_GAP``,
+``100 + row * V_GAP``) so incremental re-layout can read the layering back.
+The functions take plain ids and tuples so they can run in a worker process.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from backend.schemas.analysis import DesignSnapshot
+from backend.services.layout_engine import H_GAP, V_GAP
+
+MAX_SWEEPS = 8
+
+_Seg = Tuple[object, object, float, float]  # upper node, lower node, out-port offset, in-port offset
+
+
+def _break_cycles(nodes: Sequence[str], edges: Sequence[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Edges with every DFS back edge reversed (self loops dropped)."""
+    succ: Dict[str, List[str]] = {n: [] for n in nodes}
+    for s, t in edges:
+        if s != t:
+            succ[s].append(t)
+    state: Dict[str, int] = {}  # 1 = on stack, 2 = done
+    back = set()
+    for root in nodes:
+        if root in state:
+            continue
+        state[root] = 1
+        stack = [(root, iter(succ[root]))]
+        while stack:
+            n, it = stack[-1]
+            nxt = next(it, None)
+            if nxt is None:
+                state[n] = 2
+                stack.pop()
+            elif state.get(nxt) == 1:
+                back.add((n, nxt))
+            elif nxt not in state:
+                state[nxt] = 1
+                stack.append((nxt, iter(succ[nxt])))
+    return [(t, s) if (s, t) in back else (s, t) for s, t in edges if s != t]
+
+
+def _layers(
+    nodes: Sequence[str], dag: Sequence[Tuple[str, str]], fixed_layer: Dict[str, int]
+) -> Dict[str, int]:
+    preds: Dict[str, List[str]] = {n: [] for n in nodes}
+    indeg = {n: 0 for n in nodes}
+    succ: Dict[str, List[str]] = {n: [] for n in nodes}
+    for s, t in dag:
+        preds[t].append(s)
+        succ[s].append(t)
+        indeg[t] += 1
+    order = [n for n in nodes if indeg[n] == 0]
+    for n in order:
+        for t in succ[n]:
+            indeg[t] -= 1
+            if indeg[t] == 0:
+                order.append(t)
+    layer: Dict[str, int] = {}
+    for n in order:
+        if n in fixed_layer:
+            layer[n] = fixed_layer[n]
+        else:
+            layer[n] = max((layer[p] + 1 for p in preds[n]), default=0)
+    return layer
+
+
+def _crossings(segs: List[_Seg], pos: Dict[object, float]) -> int:
+    """Inversions between the two ends of the segments of one layer gap."""
+    ends = [pos[b] + fb for _, b, _, fb in sorted(segs, key=lambda s: (pos[s[0]] + s[2], pos[s[1]] + s[3]))]
+    # Merge-sort inversion count
+    def count(xs: List[float]) -> Tuple[List[float], int]:
+        if len(xs) <= 1:
+            return xs, 0
+        mid = len(xs) // 2
+        left, a = count(xs[:mid])
+        right, b = count(xs[mid:])
+        merged, inv, i, j = [], a + b, 0, 0
+        while i < len(left) and j < len(right):
+            if right[j] < left[i]:
+                merged.append(right[j])
+                inv += len(left) - i
+                j += 1
+            else:
+                merged.append(left[i])
+                i += 1
+        merged += left[i:] + right[j:]
+        return merged, inv
+
+    return count(ends)[1]
+
+
+def layered_layout(
+    nodes: Sequence[str],
+    edges: Sequence[Tuple[str, str]],
+    fixed: Optional[Dict[str, Tuple[float, float]]] = None,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Positions ``{node_id: {"x", "y"}}`` for every node not in `fixed`.
+
+    `nodes` and `edges` are in model order; `fixed` maps locked node ids to
+    their (x, y), which are respected as given.
+    """
+    fixed = fixed or {}
+    nodes = list(dict.fromkeys(nodes))
+    known = set(nodes)
+    edges = [(s, t) for s, t in edges if s in known and t in known]
+    fixed_layer = {n: max(0, round((x - 100) / H_GAP)) for n, (x, _) in fixed.items() if n in known}
+    fixed_row = {n: max(0, round((y - 100) / V_GAP)) for n, (_, y) in fixed.items() if n in known}
+
+    dag = _break_cycles(nodes, edges)
+    layer = _layers(nodes, dag, fixed_layer)
+    model = {n: i for i, n in enumerate(nodes)}
+
+    # Port offsets in model order: k-th of d links at a node -> (k + 1) / (d + 1)
+    outs: Dict[str, List[int]] = {}
+    ins: Dict[str, List[int]] = {}
+    for i, (s, t) in enumerate(dag):
+        outs.setdefault(s, []).append(i)
+        ins.setdefault(t, []).append(i)
+    out_off = {i: (k + 1) / (len(v) + 1) for v in outs.values() for k, i in enumerate(v)}
+    in_off = {i: (k + 1) / (len(v) + 1) for v in ins.values() for k, i in enumerate(v)}
+
+    n_layers = max(layer.values(), default=-1) + 1
+    ranks: List[List[object]] = [[] for _ in range(n_layers)]
+    for n in nodes:
+        ranks[layer[n]].append(n)
+    gaps: List[List[_Seg]] = [[] for _ in range(max(0, n_layers - 1))]
+    for i, (s, t) in enumerate(dag):
+        if layer[t] <= layer[s]:
+            continue  # points at or behind a locked node: drawn, not laid out
+        prev, fo = s, out_off[i]
+        for li in range(layer[s] + 1, layer[t]):
+            dummy = ("~", i, li)
+            ranks[li].append(dummy)
+            gaps[li - 1].append((prev, dummy, fo, 0.5))
+            prev, fo = dummy, 0.5
+        gaps[layer[t] - 1].append((prev, t, fo, in_off[i]))
+
+    # Crossing minimisation
+    pos: Dict[object, float] = {}
+    for rank in ranks:
+        for k, n in enumerate(rank):
+            pos[n] = float(k)
+
+    def total() -> int:
+        return sum(_crossings(g, pos) for g in gaps)
+
+    def reorder(li: int, down: bool) -> None:
+        acc: Dict[object, List[float]] = {}
+        if down and li > 0:
+            for a, b, fa, _ in gaps[li - 1]:
+                acc.setdefault(b, []).append(pos[a] + fa)
+        elif not down and li < n_layers - 1:
+            for a, b, _, fb in gaps[li]:
+                acc.setdefault(a, []).append(pos[b] + fb)
+        rank = ranks[li]
+        key = {n: (sum(acc[n]) / len(acc[n]) if n in acc else pos[n]) for n in rank}
+        rank.sort(key=lambda n: (key[n], pos[n]))
+        for k, n in enumerate(rank):
+            pos[n] = float(k)
+
+    best, best_ranks = total(), [list(r) for r in ranks]
+    for sweep in range(MAX_SWEEPS):
+        down = sweep % 2 == 0
+        for li in range(n_layers) if down else reversed(range(n_layers)):
+            reorder(li, down)
+        c = total()
+        if c < best:
+            best, best_ranks = c, [list(r) for r in ranks]
+        if best == 0:
+            break
+    ranks = best_ranks
+
+    # Coordinate assignment on integer rows
+    row: Dict[object, int] = {}
+    locked_rows: List[set] = [set() for _ in range(n_layers)]
+    for n, r in fixed_row.items():
+        row[n] = r
+        locked_rows[layer[n]].add(r)
+    up: Dict[object, List[object]] = {}
+    dn: Dict[object, List[object]] = {}
+    for g in gaps:
+        for a, b, _, _ in g:
+            up.setdefault(b, []).append(a)
+            dn.setdefault(a, []).append(b)
+
+    def median(xs: List[int]) -> Optional[float]:
+        if not xs:
+            return None
+        xs = sorted(xs)
+        m = len(xs) // 2
+        return float(xs[m]) if len(xs) % 2 else (xs[m - 1] + xs[m]) / 2
+
+    def place(li: int, desired: Dict[object, Optional[float]]) -> None:
+        nxt = 0
+        for n in ranks[li]:
+            if n in fixed_row:
+                continue
+            r = max(nxt, int(round(desired[n])) if desired.get(n) is not None else nxt)
+            while r in locked_rows[li]:
+                r += 1
+            row[n] = r
+            nxt = r + 1
+
+    for li in range(n_layers):
+        place(li, {n: median([row[p] for p in up.get(n, []) if p in row]) for n in ranks[li]})
+    for li in reversed(range(n_layers)):
+        desired: Dict[object, Optional[float]] = {}
+        for n in ranks[li]:
+            a = median([row[p] for p in up.get(n, [])])
+            b = median([row[s] for s in dn.get(n, [])])
+            both = [v for v in (a, b) if v is not None]
+            desired[n] = sum(both) / len(both) if both else None
+        place(li, desired)
+
+    out: Dict[str, Dict[str, float]] = {}
+    for n in sorted(nodes, key=model.__getitem__):
+        if n in fixed_row:
+            continue
+        out[n] = {"x": float(100 + layer[n] * H_GAP), "y": float(100 + row[n] * V_GAP)}
+    return out
+
+
+def layout_args(snapshot: DesignSnapshot, layer: str) -> Tuple[List[str], List[Tuple[str, str]], Dict[str, Tuple[float, float]]]:
+    """Plain (nodes, edges, fixed) arguments for ``layered_layout``."""
+    nodes = [c.id for c in snapshot.components]
+    edges = [(l.source_id, l.target_id) for l in snapshot.links]
+    fixed: Dict[str, Tuple[float, float]] = {}
+    for c in snapshot.components:
+        pos = (c.layout or {}).get(layer)
+        if (c.locked_in_layers or {}).get(layer, False) and pos:
+            fixed[c.id] = (float(pos["x"]), float(pos["y"]))
+    return nodes, edges, fixed
+
+
+def layered_layout_job(args: Tuple[List[str], List[Tuple[str, str]], Dict[str, Tuple[float, float]]]) -> Dict[str, Dict[str, float]]:
+    """Single-argument entry point for worker pools."""
+    return layered_layout(*args)
+
+
+__all__ = ["layered_layout", "layout_args", "layered_layout_job"]
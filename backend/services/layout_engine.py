@@ -6,8 +6,13 @@ Goal:
  - Respect per-layer locks (never move locked nodes).
  - Provide a layered (left->right) placement for UNLOCKED nodes as a sane default.
  - Keep API small so we can swap to ELK/Dagre later without touching callers.
+ - Re-layout incrementally after an edit: ``apply_layout_incremental`` reads
+   the previous layering back from the grid positions already on the layer
+   and only places changed nodes (plus anything downstream that must shift
+   right to keep links flowing left->right).
 """
-from typing import Dict, List, Tuple, Set
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple, Set
 
 from backend.schemas.analysis import DesignSnapshot, CanvasComponent
 
@@ -72,3 +77,126 @@ def apply_layout(snapshot: DesignSnapshot, layer: str = "single_line") -> Design
             y = y0 + idx * V_GAP
             c.layout = {**(c.layout or {}), layer: {"x": float(x), "y": float(y)}}
     return snapshot
+
+
+def _grid_cell(pos: Dict[str, float]) -> Tuple[int, int]:
+    """(layer, row) of a position on the builtin layout grid."""
+    return max(0, round((pos["x"] - 100) / H_GAP)), max(0, round((pos["y"] - 100) / V_GAP))
+
+
+def apply_layout_incremental(
+    snapshot: DesignSnapshot,
+    layer: str = "single_line",
+    changed: Optional[Iterable[str]] = None,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Re-place only `changed` nodes (default: unlocked nodes with no position on
+    `layer`) and return the positions that moved, in component order.
+
+    Nodes already on the layer keep their (layer, row) cell unless a link
+    from a re-placed node now points at or behind them, in which case they
+    shift right (and so on downstream).  Re-placed nodes land one layer after
+    their rightmost placed predecessor (or before their leftmost successor)
+    at the first free row at or below that neighbour's row.  If nothing on
+    the layer is placed yet this falls back to the full ``apply_layout``.
+    """
+    nodes = {c.id: c for c in snapshot.components}
+
+    def locked(nid: str) -> bool:
+        return bool((nodes[nid].locked_in_layers or {}).get(layer, False))
+
+    cell: Dict[str, Tuple[int, int]] = {}
+    for nid, c in nodes.items():
+        pos = (c.layout or {}).get(layer)
+        if pos:
+            cell[nid] = _grid_cell(pos)
+    if changed is None:
+        todo = [nid for nid in nodes if nid not in cell and not locked(nid)]
+    else:
+        wanted = set(changed)
+        todo = [nid for nid in nodes if nid in wanted and not locked(nid)]
+    if not todo:
+        return {}
+    if not any(nid not in todo for nid in cell):
+        before = {nid: dict((c.layout or {}).get(layer) or {}) for nid, c in nodes.items()}
+        apply_layout(snapshot, layer=layer)
+        return {
+            nid: c.layout[layer]
+            for nid, c in nodes.items()
+            if not locked(nid) and c.layout[layer] != before[nid]
+        }
+
+    succ: Dict[str, List[str]] = {nid: [] for nid in nodes}
+    pred: Dict[str, List[str]] = {nid: [] for nid in nodes}
+    for l in snapshot.links:
+        if l.source_id in nodes and l.target_id in nodes and l.source_id != l.target_id:
+            succ[l.source_id].append(l.target_id)
+            pred[l.target_id].append(l.source_id)
+
+    for nid in todo:
+        cell.pop(nid, None)
+    level: Dict[str, int] = {nid: lc[0] for nid, lc in cell.items()}
+    anchor: Dict[str, int] = {}  # preferred row for re-placed nodes
+
+    # Changed nodes in topological order among themselves (cycle members last)
+    pending = set(todo)
+    indeg = {nid: sum(p in pending for p in pred[nid]) for nid in todo}
+    order: List[str] = []
+    queue = deque(nid for nid in todo if indeg[nid] == 0)
+    while queue:
+        nid = queue.popleft()
+        order.append(nid)
+        for t in succ[nid]:
+            if t in indeg:
+                indeg[t] -= 1
+                if indeg[t] == 0:
+                    queue.append(t)
+    ordered = set(order)
+    order += [nid for nid in todo if nid not in ordered]
+
+    for nid in order:
+        preds = [p for p in pred[nid] if p in level]
+        succs = [t for t in succ[nid] if t in level]
+        if preds:
+            src = max(preds, key=lambda p: level[p])
+            level[nid] = level[src] + 1
+            anchor[nid] = cell[src][1] if src in cell else anchor.get(src, 0)
+        elif succs:
+            dst = min(succs, key=lambda t: level[t])
+            level[nid] = max(0, level[dst] - 1)
+            anchor[nid] = cell[dst][1] if dst in cell else anchor.get(dst, 0)
+        else:
+            level[nid] = 0
+            anchor[nid] = 0
+
+    # Shift placed nodes right until every link from a re-placed node flows left->right
+    moved: Set[str] = set(todo)
+    queue = deque(todo)
+    limit = len(nodes)
+    while queue:
+        u = queue.popleft()
+        for v in succ[u]:
+            if v in level and level[v] <= level[u] and level[u] < limit and not locked(v):
+                level[v] = level[u] + 1
+                if v in cell:
+                    anchor[v] = cell.pop(v)[1]
+                moved.add(v)
+                queue.append(v)
+
+    taken: Dict[int, Set[int]] = {}
+    for nid, (li, row) in cell.items():
+        taken.setdefault(li, set()).add(row)
+    out: Dict[str, Dict[str, float]] = {}
+    for nid, c in nodes.items():
+        if nid not in moved:
+            continue
+        rows = taken.setdefault(level[nid], set())
+        row = anchor.get(nid, 0)
+        while row in rows:
+            row += 1
+        rows.add(row)
+        pos = {"x": float(100 + level[nid] * H_GAP), "y": float(100 + row * V_GAP)}
+        if (c.layout or {}).get(layer) != pos:
+            c.layout = {**(c.layout or {}), layer: pos}
+            out[nid] = pos
+    return out
@@ -1,20 +1,30 @@
 from __future__ import annotations
 """
 Layout provider shim:
+ - "layered": in-process Sugiyama layout (crossing minimisation, ordered ports,
+   locked-node constraints), on a process pool for large diagrams.
  - "elk": call an external ELK HTTP service to compute positions for UNLOCKED nodes.
  - "builtin": use the internal layered fallback.
  - "dagre": indicate that the client should perform layout (server returns 501).
 
 All providers return a dict: { node_id: {"x": float, "y": float} } for a single layer.
 """
-from typing import Dict, List
+import asyncio
+import logging
+from concurrent.futures import Executor
+from typing import Dict, List, Optional
 import httpx
 
 from backend.config import LAYOUT_PROVIDER, LAYOUT_HTTP_URL
 from backend.schemas.analysis import DesignSnapshot
-from backend.services.layout_engine import apply_layout
+from backend.services.layered_layout import layered_layout_job, layout_args
+from backend.services.layout_engine import apply_layout, apply_layout_incremental
+from backend.utils.process_pool import SharedProcessPool
+
+logger = logging.getLogger(__name__)
 
 DEFAULT_NODE_SIZE = (120.0, 72.0)  # width, height (can be refined per type)
+POOL_MIN_NODES = 200  # smaller diagrams are laid out inline
 
 
 def _unlocked_ids(snapshot: DesignSnapshot, layer: str) -> List[str]:
@@ -83,12 +93,56 @@ def _elk_graph(snapshot: DesignSnapshot, layer: str) -> dict:
     return graph
 
 
-async def suggest_positions(snapshot: DesignSnapshot, layer: str = "single_line") -> Dict[str, Dict[str, float]]:
+_POOL = SharedProcessPool("layout", "LAYOUT_WORKERS")
+
+
+def _layout_pool() -> Optional[Executor]:
+    """Shared worker pool (LAYOUT_WORKERS, default CPU count up to 4); None lays out inline."""
+    return _POOL.get()
+
+
+async def _layered_positions(snapshot: DesignSnapshot, layer: str) -> Dict[str, Dict[str, float]]:
+    args = layout_args(snapshot, layer)
+    pool = _layout_pool() if len(args[0]) >= POOL_MIN_NODES else None
+    positions = None
+    if pool is not None:
+        try:
+            positions = await asyncio.get_running_loop().run_in_executor(pool, layered_layout_job, args)
+        except Exception as e:  # broken pool: degrade to inline layout
+            _POOL.discard(pool, e)
+            logger.warning(f"Layout pool failed, laying out inline: {e}")
+    if positions is None:
+        positions = layered_layout_job(args)
+    unlocked = set(_unlocked_ids(snapshot, layer))
+    return {nid: pos for nid, pos in positions.items() if nid in unlocked}
+
+
+def supports_incremental() -> bool:
+    """Whether the configured provider honours ``incremental``; ELK and dagre
+    always lay out the whole layer."""
+    return LAYOUT_PROVIDER not in ("elk", "dagre")
+
+
+async def suggest_positions(
+    snapshot: DesignSnapshot,
+    layer: str = "single_line",
+    incremental: bool = False,
+    changed: Optional[List[str]] = None,
+) -> Dict[str, Dict[str, float]]:
     """
     Return suggested positions for UNLOCKED nodes on the given layer.
     Does NOT mutate the snapshot; callers may merge/persist as needed.
+
+    With ``incremental`` the builtin engine keeps the existing layout, places
+    only ``changed`` nodes (default: those not yet on the layer) and returns
+    just the positions that moved.  Providers without ``supports_incremental``
+    ignore the flag.
     """
     provider = LAYOUT_PROVIDER
+    if incremental and supports_incremental():
+        return apply_layout_incremental(snapshot.model_copy(deep=True), layer=layer, changed=changed)
+    if provider == "layered":
+        return await _layered_positions(snapshot, layer)
     if provider == "elk":
         if not LAYOUT_HTTP_URL:
             raise RuntimeError("ELK provider selected but LAYOUT_HTTP_URL is not configured.")
@@ -6,6 +6,11 @@ SQLite-backed store. Each session's graph is serialized to JSON and
 persisted alongside a monotonic `version` integer for optimistic concurrency.
 Incremental patches are also stored to support diffing and undo/redo.
 
+Storage goes through a :class:`~backend.database.sqlite_pool.SQLitePool`:
+WAL-mode connections opened once, reads on worker threads and writes batched
+by a single writer thread, so the async API never blocks the event loop on
+disk I/O.
+
 Schema:
     CREATE TABLE IF NOT EXISTS sessions (
         session_id TEXT PRIMARY KEY,
@@ -20,20 +25,39 @@ Schema:
         created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
         FOREIGN KEY (session_id) REFERENCES sessions(session_id)
     );
+    CREATE INDEX IF NOT EXISTS ix_patches_session_version
+        ON patches (session_id, version);
+    CREATE TABLE IF NOT EXISTS checkpoints (
+        session_id TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        graph_blob BLOB NOT NULL,
+        PRIMARY KEY (session_id, version)
+    );
+
+Every ``ODL_CHECKPOINT_EVERY`` versions a zlib-compressed copy of the graph is
+written to ``checkpoints``.  Any retained version is rebuilt from the nearest
+checkpoint at or below it plus at most that many patch replays.  With
+``ODL_HISTORY_RETENTION`` set, only that many recent versions stay revertible
+and older patches/checkpoints are pruned as new checkpoints are written.
 """
 
 from __future__ import annotations
 
 import json
+import os
 import sqlite3
+import zlib
 from collections import Counter
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from pydantic import BaseModel, Field
 
 import networkx as nx
 import asyncio
+import threading
+
+from backend.database.sqlite_pool import SQLitePool
 
 from backend.utils.errors import (
     DesignConflictError,
@@ -93,33 +117,89 @@ DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 # Per-session locks to ensure patch applications are atomic.
 _locks: Dict[str, asyncio.Lock] = {}
 
+_PATCH_KEYS = ("add_nodes", "add_edges", "remove_nodes", "remove_edges", "update_edges")
 
-def _init_db() -> None:
-    """Initialise the sessions and patches tables if they do not exist."""
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS sessions (
-                session_id TEXT PRIMARY KEY,
-                graph_json TEXT NOT NULL,
-                version INTEGER NOT NULL
-            )
-            """
+
+def _env_int(name: str, default: int, minimum: int) -> int:
+    try:
+        return max(minimum, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+# Versions between graph checkpoints (bounds the replay needed for a rebuild).
+CHECKPOINT_EVERY = _env_int("ODL_CHECKPOINT_EVERY", 50, 1)
+# Most recent versions kept revertible per session; 0 keeps the full history.
+HISTORY_RETENTION = _env_int("ODL_HISTORY_RETENTION", 0, 0)
+
+
+def _init_schema(conn: sqlite3.Connection) -> None:
+    """Create the sessions, patches and checkpoints tables if they do not exist."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            graph_json TEXT NOT NULL,
+            version INTEGER NOT NULL
         )
-        # New patches table stores each incremental patch applied to a session.
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS patches (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT NOT NULL,
-                version INTEGER NOT NULL,
-                patch_json TEXT NOT NULL,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (session_id) REFERENCES sessions(session_id)
-            )
-            """
+        """
+    )
+    # New patches table stores each incremental patch applied to a session.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS patches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            patch_json TEXT NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (session_id) REFERENCES sessions(session_id)
         )
-        conn.commit()
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS ix_patches_session_version ON patches (session_id, version)"
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS checkpoints (
+            session_id TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            graph_blob BLOB NOT NULL,
+            PRIMARY KEY (session_id, version)
+        )
+        """
+    )
+
+
+# Connections are opened (and the schema created) once, on first use or via
+# ``init_db`` at startup.  Reads run on pooled WAL connections in worker
+# threads; writes are batched by a single writer thread.
+_pool: Optional[SQLitePool] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> SQLitePool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SQLitePool(DB_PATH, init_schema=_init_schema)
+    return _pool
+
+
+def init_db() -> None:
+    """Open the connection pool and create the schema (idempotent)."""
+    _get_pool().start()
+
+
+def close_db() -> None:
+    """Flush pending writes and close all pooled connections."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
 
 
 def _serialize_graph(g: nx.DiGraph) -> str:
@@ -147,9 +227,23 @@ def _deserialize_graph(data: str) -> nx.DiGraph:
     return g
 
 
+def _encode_checkpoint(g: nx.DiGraph) -> bytes:
+    return zlib.compress(_serialize_graph(g).encode("utf-8"))
+
+
+def _decode_checkpoint(blob: bytes) -> nx.DiGraph:
+    return _deserialize_graph(zlib.decompress(blob).decode("utf-8"))
+
+
+def _select_graph_json(conn: sqlite3.Connection, session_id: str) -> Optional[str]:
+    row = conn.execute(
+        "SELECT graph_json FROM sessions WHERE session_id = ?", (session_id,)
+    ).fetchone()
+    return row[0] if row else None
+
+
 async def create_graph(session_id: str) -> nx.DiGraph:
     """Create a new graph for ``session_id`` if none exists."""
-    _init_db()
     # ``get_graph`` is async, so we must await it here; the previous
     # implementation returned a coroutine and short‑circuited creation.
     g = await get_graph(session_id)
@@ -157,46 +251,116 @@ async def create_graph(session_id: str) -> nx.DiGraph:
         return g
     g = nx.DiGraph()
     g.graph["version"] = 0
-    with sqlite3.connect(DB_PATH) as conn:
+    data = _serialize_graph(g)
+    blob = _encode_checkpoint(g)
+
+    def _insert(conn: sqlite3.Connection) -> None:
         conn.execute(
             "INSERT OR REPLACE INTO sessions (session_id, graph_json, version) VALUES (?, ?, ?)",
-            (session_id, _serialize_graph(g), 0),
+            (session_id, data, 0),
         )
-        conn.commit()
+        conn.execute(
+            "INSERT OR REPLACE INTO checkpoints (session_id, version, graph_blob) VALUES (?, ?, ?)",
+            (session_id, 0, blob),
+        )
+
+    await _get_pool().write(_insert)
     return g
 
 
 async def get_graph(session_id: str) -> Optional[nx.DiGraph]:
     """Load and return the graph for `session_id`, or ``None`` if it does not exist."""
-    _init_db()
-    with sqlite3.connect(DB_PATH) as conn:
-        cur = conn.execute(
-            "SELECT graph_json FROM sessions WHERE session_id = ?", (session_id,)
-        )
-        row = cur.fetchone()
-        if not row:
-            return None
-        return _deserialize_graph(row[0])
+    data = await _get_pool().read(lambda conn: _select_graph_json(conn, session_id))
+    if data is None:
+        return None
+    return _deserialize_graph(data)
 
 
 async def save_graph(session_id: str, g: nx.DiGraph) -> None:
     """Persist the provided graph back to storage."""
-    _init_db()
     version = g.graph.get("version", 0)
-    with sqlite3.connect(DB_PATH) as conn:
+    data = _serialize_graph(g)
+
+    def _update(conn: sqlite3.Connection) -> None:
         conn.execute(
             "UPDATE sessions SET graph_json = ?, version = ? WHERE session_id = ?",
-            (_serialize_graph(g), version, session_id),
+            (data, version, session_id),
         )
-        conn.commit()
 
+    await _get_pool().write(_update)
+
+
+async def delete_graph(session_id: str) -> None:
+    """Remove a session and its history from persistence."""
+
+    def _delete(conn: sqlite3.Connection) -> None:
+        for table in ("sessions", "patches", "checkpoints"):
+            conn.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
 
-def delete_graph(session_id: str) -> None:
-    """Remove a session from persistence."""
-    _init_db()
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
-        conn.commit()
+    await _get_pool().write(_delete)
+
+
+def _apply_ops(g: nx.DiGraph, patch: Dict[str, Any]) -> None:
+    """Apply the add/remove/update lists of `patch` to `g` in place."""
+    existing_nodes = set(g.nodes())
+    existing_edges = set(g.edges())
+
+    try:
+        # Apply removals first to detect conflicts
+        for node_id in patch.get("remove_nodes", []):
+            if node_id not in existing_nodes:
+                raise DesignConflictError(f"Node '{node_id}' does not exist")
+            g.remove_node(node_id)
+            existing_nodes.remove(node_id)
+
+        for edge in patch.get("remove_edges", []):
+            u = edge.get("source")
+            v = edge.get("target")
+            if u is None or v is None:
+                raise InvalidPatchError("Edge removal requires source and target")
+            if (u, v) not in existing_edges:
+                raise DesignConflictError(f"Edge '{u}->{v}' does not exist")
+            g.remove_edge(u, v)
+            existing_edges.remove((u, v))
+
+        # Apply additions, skipping duplicates for idempotency
+        for node in patch.get("add_nodes", []):
+            node_id = node.get("id")
+            if node_id is None:
+                raise InvalidPatchError("Node id is required")
+            if node_id in existing_nodes:
+                continue
+            g.add_node(node_id, **node.get("data", {}))
+            existing_nodes.add(node_id)
+
+        for edge in patch.get("add_edges", []):
+            src = edge.get("source")
+            dst = edge.get("target")
+            if src is None or dst is None:
+                raise InvalidPatchError("Edge source and target are required")
+            if (src, dst) in existing_edges:
+                continue
+            g.add_edge(src, dst, **edge.get("data", {}))
+            existing_edges.add((src, dst))
+
+        # Handle edge updates
+        for edge in patch.get("update_edges", []):
+            src = edge.get("source")
+            dst = edge.get("target")
+            if src is None or dst is None:
+                raise InvalidPatchError(
+                    "Edge source and target are required for update"
+                )
+            if (src, dst) not in existing_edges:
+                raise DesignConflictError(
+                    f"Edge '{src}->{dst}' does not exist"
+                )
+            g.edges[src, dst].update(edge.get("data", {}))
+
+    except (DesignConflictError, InvalidPatchError):
+        raise
+    except Exception as exc:
+        raise InvalidPatchError(f"Failed to apply patch: {exc}") from exc
 
 
 async def apply_patch(session_id: str, patch: Dict[str, List[Dict]]) -> nx.DiGraph:
@@ -208,14 +372,16 @@ async def apply_patch(session_id: str, patch: Dict[str, List[Dict]]) -> nx.DiGra
     corrupting graph state.  Added nodes/edges are skipped if they already
     exist, removals raise :class:`DesignConflictError` when targets are
     missing, and all unexpected errors result in an
-    :class:`InvalidPatchError`.
+    :class:`InvalidPatchError`.  The updated graph and the patch record are
+    written in the same transaction.
     """
-    g = await get_graph(session_id)
-    if g is None:
-        raise SessionNotFoundError(f"Session '{session_id}' does not exist")
-
     lock = _locks.setdefault(session_id, asyncio.Lock())
     async with lock:
+        # Load under the lock so concurrent patches see each other's writes.
+        g = await get_graph(session_id)
+        if g is None:
+            raise SessionNotFoundError(f"Session '{session_id}' does not exist")
+
         incoming_version = patch.get("version")
         current_version = g.graph.get("version", 0)
         if incoming_version is not None and incoming_version != current_version:
@@ -223,155 +389,193 @@ async def apply_patch(session_id: str, patch: Dict[str, List[Dict]]) -> nx.DiGra
                 f"Version conflict: client has {incoming_version}, server has {current_version}"
             )
 
-        existing_nodes = set(g.nodes())
-        existing_edges = set(g.edges())
-
-        try:
-            # Apply removals first to detect conflicts
-            for node_id in patch.get("remove_nodes", []):
-                if node_id not in existing_nodes:
-                    raise DesignConflictError(f"Node '{node_id}' does not exist")
-                g.remove_node(node_id)
-                existing_nodes.remove(node_id)
-
-            for edge in patch.get("remove_edges", []):
-                u = edge.get("source")
-                v = edge.get("target")
-                if u is None or v is None:
-                    raise InvalidPatchError("Edge removal requires source and target")
-                if (u, v) not in existing_edges:
-                    raise DesignConflictError(f"Edge '{u}->{v}' does not exist")
-                g.remove_edge(u, v)
-                existing_edges.remove((u, v))
-
-            # Apply additions, skipping duplicates for idempotency
-            for node in patch.get("add_nodes", []):
-                node_id = node.get("id")
-                if node_id is None:
-                    raise InvalidPatchError("Node id is required")
-                if node_id in existing_nodes:
-                    continue
-                g.add_node(node_id, **node.get("data", {}))
-                existing_nodes.add(node_id)
-
-            for edge in patch.get("add_edges", []):
-                src = edge.get("source")
-                dst = edge.get("target")
-                if src is None or dst is None:
-                    raise InvalidPatchError("Edge source and target are required")
-                if (src, dst) in existing_edges:
-                    continue
-                g.add_edge(src, dst, **edge.get("data", {}))
-                existing_edges.add((src, dst))
-
-            # Handle edge updates
-            for edge in patch.get("update_edges", []):
-                src = edge.get("source")
-                dst = edge.get("target")
-                if src is None or dst is None:
-                    raise InvalidPatchError(
-                        "Edge source and target are required for update"
-                    )
-                if (src, dst) not in existing_edges:
-                    raise DesignConflictError(
-                        f"Edge '{src}->{dst}' does not exist"
-                    )
-                g.edges[src, dst].update(edge.get("data", {}))
-
-        except (DesignConflictError, InvalidPatchError):
-            raise
-        except Exception as exc:
-            raise InvalidPatchError(f"Failed to apply patch: {exc}") from exc
-
-        # bump version and persist graph
-        g.graph["version"] = g.graph.get("version", 0) + 1
-        await save_graph(session_id, g)
-
-        # persist the patch as a separate record for diff/undo, excluding version
-        stored_patch = {
-            key: val
-            for key, val in patch.items()
-            if key
-            in {"add_nodes", "add_edges", "remove_nodes", "remove_edges", "update_edges"}
-        }
-        with sqlite3.connect(DB_PATH) as conn:
+        _apply_ops(g, patch)
+
+        # bump version and persist graph plus the patch record (excluding
+        # version) for diff/undo in a single write
+        new_version = g.graph.get("version", 0) + 1
+        g.graph["version"] = new_version
+        graph_json = _serialize_graph(g)
+        patch_json = json.dumps({k: v for k, v in patch.items() if k in _PATCH_KEYS})
+
+        checkpoint = _encode_checkpoint(g) if new_version % CHECKPOINT_EVERY == 0 else None
+
+        def _persist(conn: sqlite3.Connection) -> None:
+            conn.execute(
+                "UPDATE sessions SET graph_json = ?, version = ? WHERE session_id = ?",
+                (graph_json, new_version, session_id),
+            )
             conn.execute(
                 "INSERT INTO patches (session_id, version, patch_json) VALUES (?, ?, ?)",
-                (
-                    session_id,
-                    g.graph["version"],
-                    json.dumps(stored_patch),
-                ),
+                (session_id, new_version, patch_json),
             )
-            conn.commit()
+            if checkpoint is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints (session_id, version, graph_blob) VALUES (?, ?, ?)",
+                    (session_id, new_version, checkpoint),
+                )
+                if HISTORY_RETENTION:
+                    _prune(conn, session_id, new_version, HISTORY_RETENTION)
+
+        await _get_pool().write(_persist)
     return g
 
 
-def get_patch_diff(session_id: str, from_version: int, to_version: int) -> Optional[List[Dict]]:
+def _select_patches(
+    conn: sqlite3.Connection, session_id: str, from_version: int, to_version: int
+) -> List[Tuple[int, str]]:
+    cur = conn.execute(
+        """
+        SELECT version, patch_json FROM patches
+        WHERE session_id = ? AND version > ? AND version <= ?
+        ORDER BY version ASC
+        """,
+        (session_id, from_version, to_version),
+    )
+    return cur.fetchall()
+
+
+def _prune(conn: sqlite3.Connection, session_id: str, head: int, keep: int) -> int:
+    """Drop history older than the last `keep` versions; return rows deleted.
+
+    The newest checkpoint at or below ``head - keep`` becomes the oldest
+    retained state, so every version from there to ``head`` stays rebuildable.
+    """
+    row = conn.execute(
+        "SELECT MAX(version) FROM checkpoints WHERE session_id = ? AND version <= ?",
+        (session_id, head - keep),
+    ).fetchone()
+    floor = row[0] if row else None
+    if floor is None:
+        return 0
+    deleted = conn.execute(
+        "DELETE FROM patches WHERE session_id = ? AND version <= ?", (session_id, floor)
+    ).rowcount
+    deleted += conn.execute(
+        "DELETE FROM checkpoints WHERE session_id = ? AND version < ?", (session_id, floor)
+    ).rowcount
+    return deleted
+
+
+def _rebuild(conn: sqlite3.Connection, session_id: str, version: int) -> Optional[nx.DiGraph]:
+    """Graph at `version` from the nearest checkpoint, or ``None`` if pruned."""
+    row = conn.execute(
+        """
+        SELECT version, graph_blob FROM checkpoints
+        WHERE session_id = ? AND version <= ?
+        ORDER BY version DESC LIMIT 1
+        """,
+        (session_id, version),
+    ).fetchone()
+    if row:
+        base_version, g = row[0], _decode_checkpoint(row[1])
+    else:
+        # Sessions created before checkpoints existed start from an empty graph
+        base_version, g = 0, nx.DiGraph()
+    rows = _select_patches(conn, session_id, base_version, version)
+    if [v for v, _ in rows] != list(range(base_version + 1, version + 1)):
+        return None
+    for _, patch_json in rows:
+        _apply_ops(g, json.loads(patch_json))
+    g.graph["version"] = version
+    return g
+
+
+async def get_patch_diff(session_id: str, from_version: int, to_version: int) -> Optional[List[Dict]]:
     """
     Return a list of patches needed to transform the graph from `from_version`
     to `to_version` (exclusive of from_version, inclusive of to_version).
-    If no patches exist or the versions are invalid, return None.
+    If no patches exist, the versions are invalid or the start of the range
+    has been pruned, return None.
     """
-    _init_db()
     if from_version >= to_version:
         return []
-    with sqlite3.connect(DB_PATH) as conn:
-        cur = conn.execute(
-            """
-            SELECT patch_json FROM patches
-            WHERE session_id = ? AND version > ? AND version <= ?
-            ORDER BY version ASC
-            """,
-            (session_id, from_version, to_version),
-        )
-        rows = cur.fetchall()
-        if not rows:
+    rows = await _get_pool().read(
+        lambda conn: _select_patches(conn, session_id, from_version, to_version)
+    )
+    if not rows or rows[0][0] != from_version + 1:
+        return None
+    return [json.loads(patch_json) for _, patch_json in rows]
+
+
+async def get_graph_at_version(session_id: str, version: int) -> Optional[nx.DiGraph]:
+    """
+    Rebuild the graph as it was at `version`.  Returns ``None`` if the session
+    does not exist, the version is in the future or its history was pruned.
+    """
+    if version < 0:
+        return None
+
+    def _load(conn: sqlite3.Connection) -> Optional[nx.DiGraph]:
+        row = conn.execute(
+            "SELECT version FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if not row or version > row[0]:
             return None
-        patches = [json.loads(row[0]) for row in rows]
-        return patches
+        return _rebuild(conn, session_id, version)
+
+    return await _get_pool().read(_load)
 
 
 async def revert_to_version(session_id: str, target_version: int) -> bool:
     """
-    Revert the graph to a previous version by reapplying patches up to the
-    target version.  Returns False if the target version does not exist.
+    Revert the graph to a previous version, discarding later history.  The
+    target state is rebuilt from the nearest checkpoint; graph-level metadata
+    that is not versioned by patches (e.g. requirements) is kept.  Returns
+    False if the target version does not exist or has been pruned.
     """
-    g = await get_graph(session_id)
-    if g is None:
-        return False
-    current_version = g.graph.get("version", 0)
-    if target_version > current_version:
-        return False
-    # Fetch patches to retain before mutating storage
-    patches = get_patch_diff(session_id, 0, target_version)
-    if patches is None:
-        return False
-    # Reset stored graph to version 0 and clear existing patches
-    with sqlite3.connect(DB_PATH) as conn:
-        cur = conn.execute(
-            "SELECT graph_json FROM sessions WHERE session_id = ?", (session_id,)
-        )
-        row = cur.fetchone()
-        if not row:
+    lock = _locks.setdefault(session_id, asyncio.Lock())
+    async with lock:
+        g = await get_graph(session_id)
+        if g is None:
             return False
-        base_graph = _deserialize_graph(row[0])
-        base_graph.graph["version"] = 0
-        conn.execute(
-            "UPDATE sessions SET graph_json = ?, version = 0 WHERE session_id = ?",
-            (_serialize_graph(base_graph), session_id),
-        )
-        conn.execute("DELETE FROM patches WHERE session_id = ?", (session_id,))
-        conn.commit()
-    # Reapply patches sequentially up to the target version
-    for p in patches:
-        await apply_patch(
-            session_id,
-            {k: p.get(k, []) for k in ["add_nodes", "add_edges", "remove_nodes", "remove_edges"]},
-        )
+        current_version = g.graph.get("version", 0)
+        if target_version < 0 or target_version > current_version:
+            return False
+        target = await get_graph_at_version(session_id, target_version)
+        if target is None:
+            return False
+        target.graph.update(g.graph)
+        target.graph["version"] = target_version
+        graph_json = _serialize_graph(target)
+
+        def _reset(conn: sqlite3.Connection) -> None:
+            conn.execute(
+                "UPDATE sessions SET graph_json = ?, version = ? WHERE session_id = ?",
+                (graph_json, target_version, session_id),
+            )
+            conn.execute(
+                "DELETE FROM patches WHERE session_id = ? AND version > ?",
+                (session_id, target_version),
+            )
+            conn.execute(
+                "DELETE FROM checkpoints WHERE session_id = ? AND version > ?",
+                (session_id, target_version),
+            )
+
+        await _get_pool().write(_reset)
     return True
 
 
+async def prune_history(session_id: str, keep_versions: Optional[int] = None) -> int:
+    """
+    Drop patches and checkpoints older than the last `keep_versions` versions
+    (default ``ODL_HISTORY_RETENTION``; 0 keeps everything).  Returns the
+    number of rows deleted.
+    """
+    keep = HISTORY_RETENTION if keep_versions is None else keep_versions
+    if keep <= 0:
+        return 0
+
+    def _run(conn: sqlite3.Connection) -> int:
+        row = conn.execute(
+            "SELECT version FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return _prune(conn, session_id, row[0], keep) if row else 0
+
+    return await _get_pool().write(_run)
+
+
 def describe_graph(g: nx.DiGraph) -> str:
     """Return a compact description of the current session graph.
     
@@ -1,20 +1,30 @@
 # backend/services/optimized_vector_search.py
-"""Optimized vector search service with caching and batch operations."""
+"""Optimized vector search service with caching and batch operations.
+
+Searches run against the process-wide ``DesignVectorIndex`` (a resident,
+L2-normalised float32 matrix that catches up with new ``DesignVector`` rows
+before every query) rather than reloading vectors from the database.
+Metadata filters are answered from per-``(key, value)`` row bitmaps kept
+alongside the matrix, so a filtered query scores only matching rows, and
+results come from a TTL'd W-TinyLFU cache keyed by the query, its parameters and
+the index generation (any write invalidates older entries).
+"""
 from __future__ import annotations
 
 import asyncio
 import hashlib
-from functools import lru_cache
+import json
+import threading
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 
 import numpy as np
-from sqlalchemy import select, text
+from sqlalchemy import func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from backend.models.design_vector import DesignVector
-from backend.services.embedding_service import EmbeddingService
+from backend.services.design_vector_index import DesignVectorIndex, get_design_vector_index
+from backend.utils.cache import MemoryCache
 
 
 @dataclass
@@ -26,102 +36,165 @@ class SearchResult:
     vector: Optional[List[float]] = None
 
 
-class VectorCache:
-    """LRU cache for vector embeddings."""
-    
-    def __init__(self, max_size: int = 1000):
+class VectorCache(MemoryCache):
+    """Query-result cache: W-TinyLFU admission with an optional TTL."""
+
+    def __init__(self, max_size: int = 1000, ttl_s: Optional[float] = None):
+        super().__init__(max_size, default_ttl=ttl_s, policy="tinylfu", name="vector_search")
         self.max_size = max_size
-        self._cache: Dict[str, Tuple[List[float], float]] = {}  # hash -> (vector, timestamp)
-        self._access_order: List[str] = []
-    
-    def get(self, vector_hash: str) -> Optional[List[float]]:
-        """Get vector from cache."""
-        if vector_hash in self._cache:
-            # Move to end (most recently used)
-            self._access_order.remove(vector_hash)
-            self._access_order.append(vector_hash)
-            return self._cache[vector_hash][0]
-        return None
-    
-    def put(self, vector_hash: str, vector: List[float]) -> None:
-        """Store vector in cache with LRU eviction."""
-        import time
-        
-        if vector_hash in self._cache:
-            # Update existing
-            self._cache[vector_hash] = (vector, time.time())
-            self._access_order.remove(vector_hash)
-            self._access_order.append(vector_hash)
-        else:
-            # Add new
-            if len(self._cache) >= self.max_size:
-                # Evict least recently used
-                lru_hash = self._access_order.pop(0)
-                del self._cache[lru_hash]
-            
-            self._cache[vector_hash] = (vector, time.time())
-            self._access_order.append(vector_hash)
-    
-    def clear(self) -> None:
-        """Clear the cache."""
-        self._cache.clear()
-        self._access_order.clear()
+        self.ttl_s = ttl_s
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a value, evicting by frequency and recency."""
+        self.set(key, value)
+
+
+def _canon(value: Any) -> str:
+    return str(value)
+
+
+def _is_scalar(value: Any) -> bool:
+    return value is None or isinstance(value, (str, int, float, bool))
+
+
+class MetadataBitmaps:
+    """Row bitmaps per ``(key, value)`` of top-level scalar metadata.
+
+    Rows follow the design vector index's row order; ``meta`` holds each
+    row's metadata so results need no database round trip.
+    """
+
+    def __init__(self) -> None:
+        self.meta: List[Dict[str, Any]] = []
+        self.last_id: Optional[int] = None
+        self._bits: Dict[Tuple[str, str], np.ndarray] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self.meta)
+
+    def add(self, last_id: int, metas: List[Dict[str, Any]]) -> None:
+        base = self.size
+        self.meta.extend(metas)
+        for offset, meta in enumerate(metas):
+            row = base + offset
+            for key, value in meta.items():
+                if not _is_scalar(value):
+                    continue
+                bits = self._bits.get((key, _canon(value)))
+                if bits is None or len(bits) <= row:
+                    grown = np.zeros(max(row + 1, 2 * (0 if bits is None else len(bits)), 64), dtype=bool)
+                    if bits is not None:
+                        grown[: len(bits)] = bits
+                    bits = self._bits[(key, _canon(value))] = grown
+                bits[row] = True
+        self.last_id = last_id
+
+    def mask(self, filters: Dict[str, Any]) -> np.ndarray:
+        """Rows whose metadata matches every filter (compared as strings)."""
+        out = np.ones(self.size, dtype=bool)
+        for key, value in filters.items():
+            if _is_scalar(value):
+                bits = self._bits.get((key, _canon(value)))
+                if bits is None:
+                    return np.zeros(self.size, dtype=bool)
+                part = bits[: self.size]
+                if len(part) < self.size:
+                    part = np.concatenate([part, np.zeros(self.size - len(part), dtype=bool)])
+                out &= part
+            else:
+                out &= np.fromiter((m.get(key) == value for m in self.meta), dtype=bool, count=self.size)
+        return out
+
+
+class _Resident:
+    """Process-wide bitmaps and result cache shared by service instances."""
+
+    def __init__(self) -> None:
+        self.bitmaps = MetadataBitmaps()
+        self.results = VectorCache(max_size=5000, ttl_s=300.0)
+        self.lock = threading.Lock()
+
+
+_resident = _Resident()
 
 
 class OptimizedVectorSearchService:
     """High-performance vector search with caching and optimization."""
-    
-    def __init__(self, session: AsyncSession):
+
+    def __init__(self, session: AsyncSession, index: Optional[DesignVectorIndex] = None):
         self.session = session
-        self._embedder = EmbeddingService()
-        self._vector_cache = VectorCache(max_size=2000)
-        self._similarity_cache = VectorCache(max_size=5000)
-    
-    @lru_cache(maxsize=100)
-    def _compute_similarity(self, query_hash: str, vector_hash: str) -> float:
-        """Cached cosine similarity computation."""
-        # In a real implementation, you'd retrieve the actual vectors
-        # This is a simplified version for demonstration
-        return 0.0
-    
+        self._index = index if index is not None else get_design_vector_index()
+        self._resident = _resident if index is None else _Resident()
+        self._similarity_cache = self._resident.results
+
+    async def _refresh(self, batch: int = 5000) -> MetadataBitmaps:
+        """Catch the index up with the database, then the bitmaps with the index."""
+        index = self._index
+        await index.sync(self.session)
+        res = self._resident
+        with res.lock:
+            bitmaps = res.bitmaps
+            stale = bitmaps.size > len(index) or (
+                bitmaps.size and int(index.ids[bitmaps.size - 1]) != bitmaps.last_id
+            )
+            if stale:  # the index was rebuilt
+                bitmaps = res.bitmaps = MetadataBitmaps()
+                res.results.clear()
+        while bitmaps.size < len(index):
+            ids = index.ids[bitmaps.size : bitmaps.size + batch]
+            stmt = select(DesignVector.id, DesignVector.meta).where(
+                DesignVector.id >= int(ids[0]), DesignVector.id <= int(ids[-1])
+            )
+            metas = {r[0]: r[1] or {} for r in (await self.session.execute(stmt)).all()}
+            with res.lock:
+                if res.bitmaps is not bitmaps:
+                    break
+                if bitmaps.last_id is not None and int(ids[0]) <= bitmaps.last_id:
+                    continue  # another request already added these rows
+                bitmaps.add(int(ids[-1]), [metas.get(int(i), {}) for i in ids])
+        return bitmaps
+
+    def _rows(self, ids: List[int]) -> np.ndarray:
+        return np.searchsorted(self._index.ids, np.asarray(ids, dtype=np.int64))
+
+    def _results(self, bitmaps: MetadataBitmaps, hits: List[Tuple[int, float]]) -> List[SearchResult]:
+        rows = self._rows([i for i, _ in hits])
+        return [
+            SearchResult(vector_id=i, score=score, metadata=bitmaps.meta[r] if r < bitmaps.size else {})
+            for (i, score), r in zip(hits, rows)
+        ]
+
+    async def _attach_vectors(self, batches: List[List[SearchResult]]) -> None:
+        wanted = {r.vector_id for batch in batches for r in batch}
+        if not wanted:
+            return
+        stmt = select(DesignVector.id, DesignVector.vector).where(DesignVector.id.in_(wanted))
+        vectors = {r[0]: r[1] for r in (await self.session.execute(stmt)).all()}
+        for batch in batches:
+            for r in batch:
+                r.vector = vectors.get(r.vector_id)
+
     async def batch_similarity_search(
         self,
         queries: List[List[float]],
         k: int = 5,
-        include_vectors: bool = False
+        include_vectors: bool = False,
+        filter_metadata: Optional[Dict[str, Any]] = None,
     ) -> List[List[SearchResult]]:
         """Perform batch similarity search for multiple queries."""
-        
-        # Load all vectors once
-        vectors_data = await self._load_all_vectors()
-        
-        # Convert to numpy for efficient computation
-        query_matrix = np.array(queries)
-        vector_matrix = np.array([v['vector'] for v in vectors_data])
-        
-        # Batch cosine similarity computation
-        similarities = self._batch_cosine_similarity(query_matrix, vector_matrix)
-        
-        results = []
-        for i, query_similarities in enumerate(similarities):
-            # Get top-k results for this query
-            top_k_indices = np.argsort(query_similarities)[-k:][::-1]
-            
-            query_results = []
-            for idx in top_k_indices:
-                vector_data = vectors_data[idx]
-                result = SearchResult(
-                    vector_id=vector_data['id'],
-                    score=float(query_similarities[idx]),
-                    metadata=vector_data['metadata'],
-                    vector=vector_data['vector'] if include_vectors else None
-                )
-                query_results.append(result)
-            
-            results.append(query_results)
-        
+        bitmaps = await self._refresh()
+        candidates = np.flatnonzero(bitmaps.mask(filter_metadata)) if filter_metadata else None
+        hits = self._index.search_batch(queries, k, candidates=candidates)
+        results = [self._results(bitmaps, h) for h in hits]
+        if include_vectors:
+            await self._attach_vectors(results)
         return results
-    
+
+    def _cache_key(self, query: List[float], k: int, filters: Optional[Dict[str, Any]], min_score: float) -> str:
+        filt = json.dumps(filters or {}, sort_keys=True, default=str)
+        return f"{self._hash_vector(query)}_{k}_{filt}_{min_score}_{self._index.generation}"
+
     async def similarity_search_optimized(
         self,
         query: List[float],
@@ -130,142 +203,55 @@ class OptimizedVectorSearchService:
         min_score: float = 0.0
     ) -> List[SearchResult]:
         """Optimized similarity search with filtering."""
-        
-        # Generate cache key
-        query_hash = self._hash_vector(query)
-        cache_key = f"{query_hash}_{k}_{hash(str(filter_metadata))}_{min_score}"
-        
-        # Check cache first
+        bitmaps = await self._refresh()
+        cache_key = self._cache_key(query, k, filter_metadata, min_score)
         cached_result = self._similarity_cache.get(cache_key)
-        if cached_result:
-            return cached_result
-        
-        # Build optimized query
-        stmt = select(DesignVector).options(
-            selectinload(DesignVector.metadata)  # Eager load if relation exists
-        )
-        
-        # Apply metadata filters efficiently
-        if filter_metadata:
-            for key, value in filter_metadata.items():
-                stmt = stmt.where(
-                    DesignVector.meta[key].astext == str(value)
-                )
-        
-        # Execute query
-        result = await self.session.execute(stmt)
-        vectors = result.scalars().all()
-        
-        # Compute similarities efficiently
-        similarities = []
-        for vector_obj in vectors:
-            similarity = self._fast_cosine_similarity(query, vector_obj.vector)
-            if similarity >= min_score:
-                similarities.append((similarity, vector_obj))
-        
-        # Sort and take top-k
-        similarities.sort(key=lambda x: x[0], reverse=True)
-        top_k = similarities[:k]
-        
-        # Build results
-        results = [
-            SearchResult(
-                vector_id=vector_obj.id,
-                score=score,
-                metadata=vector_obj.meta or {},
-                vector=None
-            )
-            for score, vector_obj in top_k
-        ]
-        
-        # Cache results
+        if cached_result is not None:
+            return list(cached_result)
+        results = self._search(bitmaps, query, k, filter_metadata, min_score)
         self._similarity_cache.put(cache_key, results)
-        
-        return results
-    
-    async def _load_all_vectors(self) -> List[Dict[str, Any]]:
-        """Load all vectors efficiently for batch operations."""
-        stmt = select(DesignVector)
-        result = await self.session.execute(stmt)
-        vectors = result.scalars().all()
-        
-        return [
-            {
-                'id': v.id,
-                'vector': v.vector,
-                'metadata': v.meta or {}
-            }
-            for v in vectors
-        ]
-    
-    @staticmethod
-    def _batch_cosine_similarity(queries: np.ndarray, vectors: np.ndarray) -> np.ndarray:
-        """Efficient batch cosine similarity computation."""
-        # Normalize vectors
-        queries_norm = queries / np.linalg.norm(queries, axis=1, keepdims=True)
-        vectors_norm = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
-        
-        # Compute similarities
-        similarities = np.dot(queries_norm, vectors_norm.T)
-        return similarities
-    
-    @staticmethod
-    def _fast_cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
-        """Fast cosine similarity computation."""
-        # Convert to numpy arrays
-        a = np.array(vec1)
-        b = np.array(vec2)
-        
-        # Compute cosine similarity
-        dot_product = np.dot(a, b)
-        norm_a = np.linalg.norm(a)
-        norm_b = np.linalg.norm(b)
-        
-        if norm_a == 0 or norm_b == 0:
-            return 0.0
-        
-        return dot_product / (norm_a * norm_b)
-    
+        return list(results)
+
+    def _search(
+        self,
+        bitmaps: MetadataBitmaps,
+        query: List[float],
+        k: int,
+        filter_metadata: Optional[Dict[str, Any]],
+        min_score: float,
+    ) -> List[SearchResult]:
+        """The uncached lookup behind every result-cache entry."""
+        candidates = np.flatnonzero(bitmaps.mask(filter_metadata)) if filter_metadata else None
+        hits = self._index.search(query, k, candidates=candidates, min_score=min_score)
+        return self._results(bitmaps, hits)
+
     @staticmethod
     def _hash_vector(vector: List[float]) -> str:
         """Generate hash for vector caching."""
-        vector_str = ','.join(f"{x:.6f}" for x in vector)
-        return hashlib.md5(vector_str.encode()).hexdigest()
-    
-    async def precompute_similarities(self, batch_size: int = 100) -> None:
-        """Precompute similarities for frequent queries."""
-        # Load all vectors
-        vectors_data = await self._load_all_vectors()
-        
-        # Process in batches
-        for i in range(0, len(vectors_data), batch_size):
-            batch = vectors_data[i:i + batch_size]
-            
-            # Precompute similarities within batch
-            for j, vec1 in enumerate(batch):
-                for k, vec2 in enumerate(batch):
-                    if j != k:
-                        similarity = self._fast_cosine_similarity(
-                            vec1['vector'], 
-                            vec2['vector']
-                        )
-                        # Cache the result
-                        hash1 = self._hash_vector(vec1['vector'])
-                        hash2 = self._hash_vector(vec2['vector'])
-                        cache_key = f"{hash1}_{hash2}"
-                        self._similarity_cache.put(cache_key, similarity)
-    
+        return hashlib.md5(np.asarray(vector, dtype=np.float32).tobytes()).hexdigest()
+
+    async def precompute_similarities(
+        self, batch_size: int = 100, queries: Optional[List[List[float]]] = None, k: int = 5
+    ) -> None:
+        """Warm the resident matrix and bitmaps and, for frequent `queries`,
+        the result cache (``similarity_search_optimized`` defaults), yielding
+        to the event loop every `batch_size` queries."""
+        bitmaps = await self._refresh()
+        for i, q in enumerate(queries or []):
+            self._similarity_cache.put(self._cache_key(q, k, None, 0.0), self._search(bitmaps, q, k, None, 0.0))
+            if (i + 1) % batch_size == 0:
+                await asyncio.sleep(0)
+
     async def get_statistics(self) -> Dict[str, Any]:
         """Get search service statistics."""
-        # Count total vectors
-        count_stmt = select(DesignVector.id).count()
-        total_vectors = await self.session.scalar(count_stmt)
-        
+        total_vectors = await self.session.scalar(select(func.count(DesignVector.id)))
+
         return {
             'total_vectors': total_vectors,
-            'cache_size': len(self._vector_cache._cache),
-            'similarity_cache_size': len(self._similarity_cache._cache),
-            'cache_hit_rate': 0.0,  # Would track in production
+            'indexed_vectors': len(self._index),
+            'metadata_rows': self._resident.bitmaps.size,
+            'similarity_cache_size': len(self._similarity_cache),
+            'cache_hit_rate': round(self._similarity_cache.hit_rate, 4),
         }
 
 
@@ -1,11 +1,11 @@
 from __future__ import annotations
 import asyncio
-import json
-import time
+import os
 from typing import Any, Dict, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.services.tenant_settings_service import TenantSettingsService
+from backend.utils.cache import _MISSING, MemoryCache, RedisTier, TwoTierCache
 from backend.observability.metrics import (
     now,
     policy_cache_get_latency,
@@ -22,81 +22,69 @@ class PolicyCache:
     """Layered policy cache with optional Redis and metrics."""
 
     ttl: int = 60
-    _mem: Dict[str, tuple[float, Dict[str, Any]]] = {}
+    _mem = MemoryCache(int(os.getenv("POLICY_CACHE_ENTRIES", "10000")), policy="lru", name="policy")
     _locks: Dict[str, asyncio.Lock] = {}
 
     @staticmethod
     async def _redis():  # pragma: no cover - overridden in tests
         return None
 
+    @classmethod
+    def _tiers(cls, r: Any) -> TwoTierCache:
+        # Both tiers hold {"value": policy, "version": n}; Redis keys are policy:<tenant>.
+        return TwoTierCache(cls._mem, RedisTier(r, key_prefix="policy:") if r else None)
+
     @staticmethod
-    def _redis_key(tenant_id: str) -> str:
-        return f"policy:{tenant_id}"
+    def _entry(policy: Dict[str, Any]) -> Dict[str, Any]:
+        return {"value": policy, "version": policy.get("version", 1)}
+
+    @staticmethod
+    def _policy(entry: Any) -> Optional[Dict[str, Any]]:
+        return entry.get("value") if isinstance(entry, dict) else None
 
     @classmethod
-    async def set(cls, tenant_id: str, policy: Dict[str, Any], ttl: Optional[int] = None) -> None:
-        exp = time.time() + (ttl or cls.ttl)
-        cls._mem[tenant_id] = (exp, policy)
+    async def _store(cls, r: Any, tenant_id: str, policy: Dict[str, Any], ttl: int) -> None:
+        """Write `policy` through both tiers; a Redis failure leaves the memory copy."""
+        try:
+            await cls._tiers(r).set(tenant_id, cls._entry(policy), ttl=ttl)
+        except Exception:  # pragma: no cover
+            r = None
         try:
             policy_cache_sets.labels("memory", tenant_id).inc()
+            if r:
+                policy_cache_sets.labels("redis", tenant_id).inc()
         except Exception:  # pragma: no cover
             pass
-        r = await cls._redis()
-        if r:
-            try:
-                await r.setex(cls._redis_key(tenant_id), ttl or cls.ttl, json.dumps({"value": policy, "version": policy.get("version", 1)}))
-                policy_cache_sets.labels("redis", tenant_id).inc()
-            except Exception:  # pragma: no cover
-                pass
+
+    @classmethod
+    async def set(cls, tenant_id: str, policy: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        await cls._store(await cls._redis(), tenant_id, policy, ttl or cls.ttl)
 
     @classmethod
     async def get(cls, session: AsyncSession, tenant_id: str) -> Dict[str, Any]:
         t0 = now()
-        cur = time.time()
-        entry = cls._mem.get(tenant_id)
-        if entry and cur < entry[0]:
+        r = await cls._redis()
+        try:
+            entry, tier = await cls._tiers(r).lookup(tenant_id)
+        except Exception:  # pragma: no cover - Redis unavailable
+            entry, tier = _MISSING, None
+        policy = cls._policy(entry)
+        if policy is not None:
             try:
-                policy_cache_hits.labels("memory", tenant_id).inc()
-                policy_cache_get_latency.labels("memory", tenant_id).observe(now() - t0)
+                if tier == "redis":
+                    policy_cache_misses.labels("memory", tenant_id).inc()
+                policy_cache_hits.labels(tier, tenant_id).inc()
+                policy_cache_get_latency.labels(tier, tenant_id).observe(now() - t0)
             except Exception:  # pragma: no cover
                 pass
-            return entry[1]
+            return policy
 
         try:
             policy_cache_misses.labels("memory", tenant_id).inc()
+            policy_cache_misses.labels("redis", tenant_id).inc()
         except Exception:  # pragma: no cover
             pass
 
-        r = await cls._redis()
-        if r:
-            try:
-                raw = await r.get(cls._redis_key(tenant_id))
-            except Exception:  # pragma: no cover
-                raw = None
-            if raw:
-                try:
-                    obj = json.loads(raw)
-                except Exception:  # pragma: no cover
-                    obj = {"value": None}
-                policy = obj.get("value")
-                if policy is not None:
-                    cls._mem[tenant_id] = (time.time() + cls.ttl, policy)
-                    try:
-                        policy_cache_hits.labels("redis", tenant_id).inc()
-                        policy_cache_get_latency.labels("redis", tenant_id).observe(now() - t0)
-                    except Exception:  # pragma: no cover
-                        pass
-                    return policy
-            try:
-                policy_cache_misses.labels("redis", tenant_id).inc()
-            except Exception:  # pragma: no cover
-                pass
-        else:
-            try:
-                policy_cache_misses.labels("redis", tenant_id).inc()
-            except Exception:  # pragma: no cover
-                pass
-
         lock = cls._locks.setdefault(tenant_id, asyncio.Lock())
         if lock.locked():
             try:
@@ -104,15 +92,14 @@ class PolicyCache:
             except Exception:  # pragma: no cover
                 pass
         async with lock:
-            cur = time.time()
-            entry = cls._mem.get(tenant_id)
-            if entry and cur < entry[0]:
+            policy = cls._policy(cls._mem.get(tenant_id))
+            if policy is not None:
                 try:
                     policy_cache_hits.labels("memory", tenant_id).inc()
                     policy_cache_get_latency.labels("memory", tenant_id).observe(now() - t0)
                 except Exception:  # pragma: no cover
                     pass
-                return entry[1]
+                return policy
 
             db_t0 = now()
             ts = await TenantSettingsService.get_or_create(session, tenant_id)
@@ -142,27 +129,20 @@ class PolicyCache:
                 "data": data.get("data") or {},
                 "version": int(data.get("version", 1)),
             }
-            cls._mem[tenant_id] = (time.time() + cls.ttl, policy)
             try:
                 policy_cache_misses.labels("db", tenant_id).inc()
                 policy_cache_db_load_latency.labels(tenant_id).observe(now() - db_t0)
                 policy_cache_get_latency.labels("db", tenant_id).observe(now() - t0)
-                policy_cache_sets.labels("memory", tenant_id).inc()
                 policy_cache_dogpile_wait.labels(tenant_id).inc()
             except Exception:  # pragma: no cover
                 pass
-            if r:
-                try:
-                    await r.setex(cls._redis_key(tenant_id), cls.ttl, json.dumps({"value": policy, "version": policy.get("version", 1)}))
-                    policy_cache_sets.labels("redis", tenant_id).inc()
-                except Exception:  # pragma: no cover
-                    pass
+            await cls._store(r, tenant_id, policy, cls.ttl)
             return policy
 
     @classmethod
     def invalidate(cls, tenant_id: Optional[str] = None) -> None:
         if tenant_id:
-            cls._mem.pop(tenant_id, None)
+            cls._mem.delete(tenant_id)
             try:
                 policy_cache_invalidations.labels(tenant_id).inc()
             except Exception:  # pragma: no cover
@@ -25,6 +25,10 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import List
 
+import numpy as np
+
+from backend.tools.conductor_sizing import ConductorTable, size_conductors
+
 
 @dataclass
 class WireSizingResult:
@@ -48,30 +52,45 @@ class RuleEngine:
         (65.0, "16\u00a0mm\u00b2", 16.0),
         (85.0, "25\u00a0mm\u00b2", 25.0),
     ]
+    _RESISTIVITY = 0.0175  # Ohm·mm²/m for copper
+    # The same table for the shared sizing kernel (resistance in ohm/km)
+    _CONDUCTORS = ConductorTable(
+        sizes=tuple(label for _, label, _ in _WIRE_TABLE),
+        ampacity_A=np.array([amps for amps, _, _ in _WIRE_TABLE]),
+        ohm_per_km=_RESISTIVITY * 1000.0 / np.array([area for _, _, area in _WIRE_TABLE]),
+    )
 
     def size_wire(self, load_kw: float, distance_m: float, voltage: float = 230.0) -> WireSizingResult:
         """Compute an appropriate wire size for a given load and distance."""
-        current_a = (load_kw * 1000.0) / voltage if voltage > 0 else 0.0
-        cross_section = 25.0
-        gauge = "25\u00a0mm\u00b2"
-        if voltage > 0 and current_a > 0:
-            for max_current, label, area in self._WIRE_TABLE:
-                if current_a <= max_current:
-                    gauge = label
-                    cross_section = area
-                    break
-        resistivity = 0.0175
-        resistance = (resistivity * distance_m) / cross_section
-        v_drop = current_a * resistance * 2
-        voltage_drop_pct = (v_drop / voltage) * 100.0 if voltage > 0 else 0.0
-        fuse_rating = current_a * 1.25
-        return WireSizingResult(
-            gauge=gauge,
-            cross_section_mm2=cross_section,
-            fuse_rating_a=fuse_rating,
-            current_a=current_a,
-            voltage_drop_pct=voltage_drop_pct,
-        )
+        return self.size_wires([load_kw], [distance_m], voltage)[0]
+
+    def size_wires(
+        self, loads_kw: List[float], distances_m: List[float], voltage: float = 230.0
+    ) -> List[WireSizingResult]:
+        """Size several single-phase runs in one pass of the sizing kernel.
+
+        A run takes the smallest conductor whose rated current covers the
+        load, or the largest one when none does (including zero-voltage or
+        zero-load inputs).
+        """
+        currents = [(kw * 1000.0) / voltage if voltage > 0 else 0.0 for kw in loads_kw]
+        sized = size_conductors(self._CONDUCTORS, currents, distances_m, voltage, phase="1ph")
+        results = []
+        for c, current_a in enumerate(currents):
+            k = int(sized.choice[c])
+            if k < 0 or current_a <= 0:
+                k = len(self._WIRE_TABLE) - 1
+            _, gauge, cross_section = self._WIRE_TABLE[k]
+            results.append(
+                WireSizingResult(
+                    gauge=gauge,
+                    cross_section_mm2=cross_section,
+                    fuse_rating_a=current_a * 1.25,
+                    current_a=current_a,
+                    voltage_drop_pct=float(sized.vdrop_pct[c, k]),
+                )
+            )
+        return results
 
     # ------------------------------------------------------------------
     # New validation logic for installed conductor and fuse.
@@ -129,8 +148,7 @@ class RuleEngine:
         # Calculate voltage drop for the installed conductor.
         current_a = rec.current_a
         if installed_cross_section_mm2 > 0 and voltage > 0 and current_a > 0:
-            resistivity = 0.0175  # Ohm·mm²/m for copper
-            resistance = (resistivity * distance_m) / installed_cross_section_mm2
+            resistance = (self._RESISTIVITY * distance_m) / installed_cross_section_mm2
             actual_v_drop = current_a * resistance * 2
             actual_v_drop_pct = (actual_v_drop / voltage) * 100.0
         else:
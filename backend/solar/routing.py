@@ -8,11 +8,36 @@ import logging
 import math
 from enum import Enum
 
+import numpy as np
+
+from backend.tools.conductor_sizing import ConductorTable, size_conductors
+
 from .components import ComponentLibrary, ComponentDefinition, ComponentCategory
 from .topologies import TopologyEngine, SystemDesignParameters, SystemTopology, ProtectionLevel
 
 logger = logging.getLogger(__name__)
 
+# NEC Table 310.15(B)(16) current carrying capacity (simplified - in production,
+# use full derating factors) and approximate resistance in ohms per 1000 ft.
+# Sizes above 4 AWG use a flat placeholder resistance.
+_WIRE_TABLE = ConductorTable.from_mappings(
+    {
+        "14 AWG": 20,
+        "12 AWG": 25,
+        "10 AWG": 35,
+        "8 AWG": 50,
+        "6 AWG": 65,
+        "4 AWG": 85,
+        "2 AWG": 115,
+        "1/0 AWG": 150,
+        "2/0 AWG": 175,
+        "3/0 AWG": 200,
+        "4/0 AWG": 230,
+    },
+    {"14 AWG": 2.525, "12 AWG": 1.588, "10 AWG": 0.999, "8 AWG": 0.628, "6 AWG": 0.395, "4 AWG": 0.249,
+     "2 AWG": 0.1, "1/0 AWG": 0.1, "2/0 AWG": 0.1, "3/0 AWG": 0.1, "4/0 AWG": 0.1},
+)
+
 class RouteType(Enum):
     DC_STRING = "dc_string"
     DC_COMBINER = "dc_combiner"
@@ -607,44 +632,28 @@ class Router:
     def _calculate_wire_size(self, current: float, distance: float, 
                            voltage_drop_percent: float = 3.0) -> str:
         """Calculate appropriate wire size based on current and voltage drop"""
-        
-        # NEC Table 310.15(B)(16) current carrying capacity
-        # Simplified - in production, use full derating factors
-        wire_sizes = {
-            "14 AWG": 20,
-            "12 AWG": 25,
-            "10 AWG": 35,
-            "8 AWG": 50,
-            "6 AWG": 65,
-            "4 AWG": 85,
-            "2 AWG": 115,
-            "1/0 AWG": 150,
-            "2/0 AWG": 175,
-            "3/0 AWG": 200,
-            "4/0 AWG": 230
-        }
-        
-        # Find minimum wire size for current capacity
-        min_current_capacity = current * 1.25  # 125% rule
-        suitable_wires = [(size, capacity) for size, capacity in wire_sizes.items() 
-                         if capacity >= min_current_capacity]
-        
-        if not suitable_wires:
-            return "4/0 AWG"  # Largest standard size
-        
-        # Check voltage drop
-        # Simplified calculation - use proper resistance values in production
-        for wire_size, capacity in suitable_wires:
-            # Approximate resistance in ohms per 1000 ft
-            resistance_per_1000ft = {"14 AWG": 2.525, "12 AWG": 1.588, "10 AWG": 0.999,
-                                   "8 AWG": 0.628, "6 AWG": 0.395, "4 AWG": 0.249}.get(wire_size, 0.1)
-            
-            voltage_drop = (2 * current * distance * resistance_per_1000ft / 1000) / 480 * 100
-            
-            if voltage_drop <= voltage_drop_percent:
-                return wire_size
-        
-        return suitable_wires[-1][0]  # Return largest suitable wire
+        return self._calculate_wire_sizes([current], [distance], voltage_drop_percent)[0]
+
+    def _calculate_wire_sizes(self, currents: List[float], distances: List[float],
+                              voltage_drop_percent: float = 3.0) -> List[str]:
+        """Size many runs at once with the shared conductor-sizing kernel"""
+        # 125% rule; voltage drop against a 480 V reference
+        sized = size_conductors(
+            _WIRE_TABLE,
+            currents,
+            distances,
+            480.0,
+            max_vdrop_pct=voltage_drop_percent,
+            required_A=[c * 1.25 for c in currents],
+        )
+        sizes = []
+        for c, k in enumerate(sized.choice):
+            if k < 0:
+                suitable = np.flatnonzero(sized.ampacity_ok[c])
+                # Largest suitable wire, or the largest standard size
+                k = suitable[-1] if len(suitable) else len(_WIRE_TABLE) - 1
+            sizes.append(_WIRE_TABLE.sizes[int(k)])
+        return sizes
     
     def _wire_size_to_area(self, wire_size: str) -> float:
         """Convert wire size to cross-sectional area (for conduit calculations)"""
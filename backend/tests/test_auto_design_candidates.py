@@ -0,0 +1,59 @@
+"""
+Multi-candidate auto-design: ranked previews, gate pruning and timings.
+"""
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.orchestrator import auto_designer  # noqa: E402
+from backend.orchestrator.plan_spec import Env, PlanSpec, Targets  # noqa: E402
+
+
+def _spec(kw):
+    return PlanSpec(env=Env(site_tmin_C=-10, site_tmax_C=45), targets=Targets(dc_kw_stc=kw))
+
+
+def test_candidates_ranked_with_stage_timings():
+    result = auto_designer.run_auto_design_candidates(_spec(6.0), "s", "mc1", top_k=4)
+    assert result.candidates and not result.pruned
+    assert [c.rank for c in result.candidates] == list(range(1, len(result.candidates) + 1))
+    assert [c.score for c in result.candidates] == sorted(c.score for c in result.candidates)
+    best = result.candidates[0]
+    assert abs(best.array_kw_stc - 6.0) <= 0.5
+    assert {"compliance_gate", "conductors", "bom", "story"} <= set(best.timings_ms)
+    assert {"rank", "evaluate"} <= set(result.timings_ms)
+    # Each preview is a full pipeline patch under its own request id
+    ids = [op.op_id for op in best.patch.operations]
+    assert all(i.startswith("mc1:c") for i in ids) and len(ids) == len(set(ids))
+    assert any(op.op == "set_meta" and op.value.get("path") == "physical.bom" for op in best.patch.operations)
+
+
+def test_gate_failures_are_pruned(monkeypatch):
+    real = auto_designer.rank_pairings
+
+    def with_overvoltage(spec, top_k=3, **kw):
+        pairs = real(spec, top_k, **kw)
+        m, inv, plan, kw_stc, score = pairs[0]
+        bad = auto_designer._Plan(series=30, parallel=1, modules=30)
+        return [(m, inv, bad, kw_stc, -1.0)] + pairs
+
+    monkeypatch.setattr(auto_designer, "rank_pairings", with_overvoltage)
+    with ThreadPoolExecutor(2) as pool:
+        result = auto_designer.run_auto_design_candidates(_spec(3.0), "s", "mc2", executor=pool)
+    assert len(result.pruned) == 1
+    assert result.pruned[0]["findings"][0]["code"] == "DC_MAX_V"
+    assert all(c.series != 30 for c in result.candidates) and result.candidates
+
+
+def test_each_candidate_records_its_own_equipment():
+    result = auto_designer.run_auto_design_candidates(_spec(6.0), "s", "mc3", top_k=4)
+    assert len({(c.module_id, c.inverter_id) for c in result.candidates}) > 1
+    for c in result.candidates:
+        equip = next(
+            op.value["data"] for op in c.patch.operations
+            if op.op == "set_meta" and op.value.get("path") == "design_state.equip"
+        )
+        assert equip["module"]["id"] == c.module_id
+        assert equip["inverter"]["id"] == c.inverter_id
@@ -0,0 +1,118 @@
+"""
+Shared cache subsystem: W-TinyLFU admission, timing-wheel expiry, tag and
+prefix invalidation, and the Redis tier (exercised against ``LocalRedis``).
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.utils.cache import LocalRedis, MemoryCache, RedisTier, TwoTierCache  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.t = 1000.0
+
+    def __call__(self) -> float:
+        return self.t
+
+
+def test_tinylfu_keeps_hot_keys_through_a_scan():
+    lru = MemoryCache(100, policy="lru")
+    lfu = MemoryCache(100, policy="tinylfu")
+    for cache in (lru, lfu):
+        for _ in range(5):
+            for i in range(50):
+                cache.set(f"hot{i}", i) if f"hot{i}" not in cache else cache.get(f"hot{i}")
+        for i in range(1000):
+            cache.set(f"scan{i}", i)
+    assert sum(f"hot{i}" in lru for i in range(50)) == 0
+    assert sum(f"hot{i}" in lfu for i in range(50)) >= 45  # the sketch is approximate
+    assert len(lfu) <= 100
+
+
+def test_expiry_tags_prefixes_and_byte_bound():
+    clock = FakeClock()
+    cache = MemoryCache(100, default_ttl=10, clock=clock, tick_s=1.0)
+    cache.set("a:1", 1, tags=("t1",))
+    cache.set("a:2", 2, tags=("t1",))
+    cache.set("b:1", 3, ttl=60)
+    clock.t += 11
+    assert cache.get("a:1") is None and cache.get("b:1") == 3
+    assert cache.stats()["expired"] == 2
+
+    cache.set("a:3", 4, tags=("t2",))
+    cache.set("a:4", 5, tags=("t2",))
+    assert cache.invalidate_tag("t2") == 2
+    cache.set("p:x", 1)
+    cache.set("p:y", 2)
+    assert cache.invalidate_prefix("p:") == 2
+    assert cache.keys() == ["b:1"]
+
+    sized = MemoryCache(100, max_bytes=10, sizeof=len)
+    for k in "abcd":
+        sized.set(k, "xxx")
+    assert sized.stats()["bytes"] <= 10 and "a" not in sized
+
+
+@pytest.mark.asyncio
+async def test_two_tier_promotes_pipelines_and_scans():
+    client = LocalRedis()
+    shared = RedisTier(client, scan_count=2)
+    one = TwoTierCache(MemoryCache(10, name="one"), shared)
+    two = TwoTierCache(MemoryCache(10, name="two"), shared)
+
+    await one.set("k:1", {"v": 1}, ttl=30, tags=("grp",))
+    assert client.commands == ["setex", "set", "sadd", "expire"]  # one pipeline round trip
+    assert "k:1" not in two.memory
+    assert await two.get("k:1") == {"v": 1}
+    assert "k:1" in two.memory  # promoted
+    assert two.memory.keys_for_tag("grp") == ["k:1"]  # with its tags
+
+    for i in range(2, 6):
+        await one.set(f"k:{i}", i)
+    await one.set("other", 0)
+    client.commands.clear()
+    assert await two.invalidate_prefix("k:") == 1 + 5
+    assert "scan" in client.commands and "keys" not in client.commands
+    assert await one.redis.get("other") == 0
+
+    await one.set("t:1", 1, tags=("grp2",))
+    assert await one.invalidate_tag("grp2") == 2
+    assert await two.get("t:1") is None
+
+
+@pytest.mark.asyncio
+async def test_promotion_keeps_remaining_ttl_and_key_prefix():
+    clock = FakeClock()
+    client = LocalRedis(clock=clock)
+    writer = TwoTierCache(MemoryCache(10, clock=clock), RedisTier(client, key_prefix="ns:"))
+    reader = TwoTierCache(MemoryCache(10, default_ttl=300, clock=clock), RedisTier(client, key_prefix="ns:"))
+
+    await writer.set("a", 1, ttl=30, tags=("t",))
+    assert await client.get("ns:a") == "1"
+    clock.t += 20
+    assert await reader.lookup("a") == (1, "redis")
+    assert await reader.lookup("a") == (1, "memory")
+    clock.t += 11
+    assert "a" not in reader.memory  # expired with the Redis copy, not 300s later
+    assert await reader.get("a") is None
+
+    await writer.set("b", 2, ttl=30, tags=("t",))
+    await writer.set("b", 3, ttl=30)  # rewriting without tags drops the old ones
+    await reader.get("b")
+    assert reader.memory.keys_for_tag("t") == []
+    assert await writer.invalidate_prefix("") == 1 + 1
+
+
+def test_replace_tagged_drops_selected_entries():
+    cache = MemoryCache(10)
+    for v in (1, 2, 3):
+        cache.set(("s", v), v, tags=("s",))
+    cache.set(("other", 1), 1, tags=("other",))
+    assert cache.replace_tagged(("s", 4), 4, "s", stale=lambda k: k[1] < 3) == 2
+    assert sorted(cache.keys_for_tag("s")) == [("s", 3), ("s", 4)]
+    assert ("other", 1) in cache
@@ -0,0 +1,58 @@
+"""
+Memoized catalog / standards-profile loading and indexed equipment lookups.
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.tools import catalog  # noqa: E402
+from backend.tools.catalog import InverterCatalog, InverterItem, ModuleCatalog, ModuleItem  # noqa: E402
+from backend.tools.standards_profiles import load_profile  # noqa: E402
+
+
+def _module(i, p_W):
+    return ModuleItem(f"M{i}", f"M{i}", p_W, 49.5, 41.5, 11.2, 10.7, -0.28)
+
+
+def _inverter(i, kw):
+    return InverterItem(f"I{i}", f"I{i}", kw, "240", "1ph", 600, [{"v_min": 200, "v_max": 550, "count": 2}])
+
+
+def test_indexed_lookups_match_sorting():
+    rng = np.random.default_rng(3)
+    mods = [_module(i, float(w)) for i, w in enumerate(rng.choice(np.arange(300, 600, 25), 40))]
+    invs = [_inverter(i, float(kw)) for i, kw in enumerate(rng.choice(np.arange(3.0, 12.0, 0.5), 30))]
+    mcat, icat = ModuleCatalog(mods), InverterCatalog(invs)
+    for target in list(range(250, 650, 5)) + [412.5]:
+        assert mcat.nearest_power(target) is sorted(mods, key=lambda m: abs(m.p_W - target))[0]
+    for lo in np.arange(1.0, 14.0, 0.25):
+        above = [i for i in invs if i.ac_kW >= lo]
+        expected = sorted(above, key=lambda i: i.ac_kW)[0] if above else sorted(invs, key=lambda i: i.ac_kW)[-1]
+        assert icat.smallest_at_least(lo) is expected
+        assert icat.in_window(lo, lo + 2) == sorted(
+            [i for i in invs if lo <= i.ac_kW <= lo + 2], key=lambda i: i.ac_kW
+        )
+
+
+def test_catalog_memoized_until_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / "modules.json"
+    rows = [vars(_module(0, 400)), vars(_module(1, 450))]
+    path.write_text(json.dumps(rows))
+    (tmp_path / "inverters.json").write_text(json.dumps([vars(_inverter(0, 5.0))]))
+    monkeypatch.setattr(catalog, "CAT_DIR", tmp_path)
+
+    first = catalog.module_catalog()
+    assert catalog.module_catalog() is first
+    assert [m.id for m in catalog.load_modules()] == ["M0", "M1"]
+
+    path.write_text(json.dumps(rows + [vars(_module(2, 500))]))
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert len(catalog.module_catalog()) == 3
+    assert catalog.module_catalog().nearest_power(490).id == "M2"
+    assert load_profile("NEC_2023") is load_profile("NEC_2023")
@@ -0,0 +1,170 @@
+"""
+Component query engine: SQL and columnar paths agree with a brute-force
+filter, keyset pagination walks every row once, library writes drop the
+shared index, and the in-memory ComponentDBService keeps its upsert/search
+semantics.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.models.component_master import ComponentMaster  # noqa: E402
+from backend.services import component_name_migration  # noqa: E402
+from backend.services.component_db_service import ComponentDBService  # noqa: E402
+from backend.services.component_naming_service import ComponentNamingService  # noqa: E402
+from backend.services.component_query import (  # noqa: E402
+    ComponentQuery,
+    ComponentQueryEngine,
+    component_query_engine,
+    search_sql,
+)
+
+
+def _catalog(n=1500, seed=11):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(1, n + 1):
+        cat = str(rng.choice(["panel", "inverter", "battery"]))
+        rows.append(
+            {
+                "id": i,
+                "part_number": f"PN{i}",
+                "name": f"Part {i}",
+                "manufacturer": str(rng.choice(["A", "B", "C", "D"])),
+                "category": cat,
+                # Coarse values force ties on every sort key
+                "power": None if rng.random() < 0.05 else float(rng.choice(np.arange(0, 800, 50))),
+                "voltage": None if rng.random() < 0.1 else float(rng.choice([24, 48, 240, 600])),
+                "price": None if rng.random() < 0.1 else float(rng.choice(np.arange(50, 500, 25))),
+                "deprecated": bool(rng.random() < 0.1),
+            }
+        )
+    return rows
+
+
+def _brute(rows, q):
+    def keep(r):
+        if r["category"] not in q.categories:
+            return False
+        p, v, c = r["power"], r["voltage"], r["price"]
+        if q.min_power is not None and not ((p if p is not None else 0) >= q.min_power):
+            return False
+        if q.max_power is not None and (p is None or p > q.max_power):
+            return False
+        if q.min_voltage is not None and (v is None or v < q.min_voltage):
+            return False
+        if q.max_voltage is not None and (v is None or v > q.max_voltage):
+            return False
+        if q.manufacturers and r["manufacturer"] not in q.manufacturers:
+            return False
+        if q.max_price is not None and (c is None or c > q.max_price):
+            return False
+        if not q.include_deprecated and r["deprecated"]:
+            return False
+        if q.sort == "price_per_watt":
+            return c is not None and p is not None and p > 0
+        return q.sort == "id" or r[q.sort] is not None
+
+    def key(r):
+        if q.sort == "id":
+            return (0, r["id"])
+        v = r["price"] / r["power"] if q.sort == "price_per_watt" else r[q.sort]
+        return (-v if q.descending else v, r["id"])
+
+    return [r["id"] for r in sorted(filter(keep, rows), key=key)]
+
+
+def _walk(search, q, page=37):
+    ids, cursor = [], None
+    while True:
+        res = search(ComponentQuery(**{**q.__dict__, "limit": page, "after": cursor}))
+        ids += [r["id"] for r in res.items]
+        cursor = res.next_cursor
+        if cursor is None:
+            return ids
+
+
+def test_sql_and_columnar_paths_match_brute_force():
+    rows = _catalog()
+    engine = create_engine("sqlite://")
+    ComponentMaster.__table__.create(engine)
+    with Session(engine) as db:
+        db.execute(insert(ComponentMaster), rows)
+        db.commit()
+        hot = ComponentQueryEngine(hot_categories=["panel", "inverter"], ttl_s=3600)
+        queries = [
+            ComponentQuery(categories=("panel",), min_power=300, sort="price_per_watt"),
+            ComponentQuery(categories=("panel", "inverter"), min_power=0, max_price=300, sort="power", descending=True),
+            ComponentQuery(categories=("inverter",), min_voltage=200, max_voltage=600, manufacturers=("A", "C")),
+            ComponentQuery(categories=("panel",), max_power=400, include_deprecated=False, sort="price"),
+        ]
+        for q in queries:
+            expected = _brute(rows, q)
+            assert expected
+            assert _walk(lambda qq: search_sql(db, qq), q) == expected
+            assert _walk(lambda qq: hot.search(db, qq), q) == expected
+            assert [r["id"] for r in hot.search(db, ComponentQuery(**{**q.__dict__, "limit": 10})).items] == expected[:10]
+            assert hot.facet_counts(db, q) == ComponentQueryEngine(hot_categories=()).facet_counts(db, q)
+        loaded = hot._index
+        assert loaded is not None and set(loaded.category) == {"panel", "inverter"}
+        # Battery is not hot, so it is answered by SQL and never loaded
+        battery = ComponentQuery(categories=("battery",), min_power=100, sort="price_per_watt")
+        assert _walk(lambda qq: hot.search(db, qq), battery) == _brute(rows, battery)
+        assert hot._index is loaded
+        hot.invalidate(["battery"])
+        assert hot._index is loaded
+        hot.invalidate(["panel"])
+        assert hot._index is None
+
+
+def test_component_db_service_upsert_and_range_search():
+    async def _run():
+        svc = ComponentDBService()
+        await svc.ingest("panel", "P1", {"power": 400})
+        await svc.ingest("inverter", "I1", {"capacity": 5000})
+        await svc.ingest("panel", "P2", {"power": "n/a"})
+        await svc.ingest("panel", "P3", {"power": 450})
+        assert [c["part_number"] for c in await svc.search("panel", min_power=410)] == ["P3"]
+        await svc.ingest("panel", "P1", {"power": 500})  # upsert keeps position
+        assert [c["part_number"] for c in await svc.search("panel", min_power=410)] == ["P1", "P3"]
+        assert [c["part_number"] for c in await svc.search("panel")] == ["P1", "P2", "P3"]
+        assert await svc.search("inverter", min_power=4000, max_power=6000) == [await svc.get_by_part_number("I1")]
+        await svc.ingest("inverter", "P3", {"capacity": 3000})  # moves category
+        assert [c["part_number"] for c in await svc.search("panel", min_power=0)] == ["P1"]
+        assert len(svc.components) == 4 and await svc.exists("inverter")
+
+    asyncio.run(_run())
+
+
+def test_name_migration_invalidates_the_shared_index(tmp_path, monkeypatch):
+    path = tmp_path / "components.db"
+    engine = create_engine(f"sqlite:///{path}")
+    ComponentMaster.__table__.create(engine)
+    row = {**_catalog(1)[0], "category": "panel", "name": "stale"}
+    with Session(engine) as db:
+        db.execute(insert(ComponentMaster), [row])
+        db.commit()
+    monkeypatch.setattr(component_query_engine, "hot_categories", {"panel"})
+    monkeypatch.setattr(component_query_engine, "ttl_s", 3600)
+    monkeypatch.setattr(ComponentNamingService, "generate_name", staticmethod(lambda meta: "fresh"))
+    component_query_engine.invalidate()
+    query = ComponentQuery(categories=("panel",))
+
+    async def _migrate():
+        aengine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with AsyncSession(aengine) as session:
+            await component_name_migration.update_existing_component_names(session)
+        await aengine.dispose()
+
+    with Session(engine) as db:
+        assert [r["name"] for r in component_query_engine.search(db, query).items] == ["stale"]
+        asyncio.run(_migrate())
+        assert [r["name"] for r in component_query_engine.search(db, query).items] == ["fresh"]
+    component_query_engine.invalidate()
@@ -0,0 +1,65 @@
+"""
+Shared conductor-sizing kernel: vectorized sizing, profile derate tables and
+the tools built on it.
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.tools import electrical_v2  # noqa: E402
+from backend.tools.conductor_sizing import awg_table, derate_tables, size_conductors  # noqa: E402
+from backend.tools.standards_profiles import grouping_factor, load_profile, temp_correction_factor  # noqa: E402
+
+
+def test_batch_matches_per_circuit_sizing():
+    rng = np.random.default_rng(7)
+    currents = rng.uniform(1, 250, 200)
+    lengths = rng.uniform(2, 150, 200)
+    volts = rng.choice([48.0, 240.0, 480.0], 200)
+    phases = list(rng.choice(["dc", "1ph", "3ph"], 200))
+    limits = rng.choice([1.0, 2.0, 3.0], 200)
+    table = awg_table()
+
+    batch = size_conductors(table, currents, lengths, volts, phase=phases, max_vdrop_pct=limits, derate=0.8)
+    for c in range(200):
+        one = size_conductors(
+            table, currents[c], lengths[c], volts[c], phase=phases[c], max_vdrop_pct=limits[c], derate=0.8
+        )
+        assert one.choice[0] == batch.choice[c]
+        k = batch.choice[c]
+        if k >= 0:
+            assert batch.ampacity_A[c, k] >= currents[c] and batch.vdrop_pct[c, k] <= limits[c]
+            assert not batch.acceptable[c, :k].any()
+
+
+def test_profile_tables_and_v2_tool():
+    prof = load_profile("NEC_2023")
+    tables = derate_tables("NEC_2023")
+    assert derate_tables("NEC_2023") is tables
+    ambients = [10, 30, 31, 47.5, 60, 75]
+    assert list(tables.temperature(ambients)) == [temp_correction_factor(t, prof) for t in ambients]
+    counts = [1, 3, 4, 9, 21, 5000]
+    assert list(tables.grouping(counts)) == [grouping_factor(n, prof) for n in counts]
+
+    inputs = [
+        electrical_v2.SelectConductorsV2Input(
+            session_id="s", request_id=f"r{i}", circuit_kind=kind, current_A=amps, length_m=length, system_v=volts
+        )
+        for i, (kind, amps, length, volts) in enumerate(
+            [("dc_string", 10.7, 15.0, 290.0), ("ac_feeder", 31.7, 20.0, 240.0), ("ac_feeder", 31.7, 200.0, 240.0)]
+        )
+    ]
+    patches = electrical_v2.select_conductors_v2_batch(inputs)
+    choices = [p.operations[0].value["attrs"]["choice"] for p in patches]
+    assert choices[0]["size_awg_or_kcmil"] == "14AWG" and choices[0]["compliant"]
+    assert choices[1]["ampacity_A"] >= 31.7 * 1.25
+    # A long feeder needs a larger conductor to stay within the profile's 3 % drop
+    assert choices[2]["vdrop_pct"] <= 3.0
+    assert awg_table().sizes.index(choices[2]["size_awg_or_kcmil"]) > awg_table().sizes.index(
+        choices[1]["size_awg_or_kcmil"]
+    )
+    single = electrical_v2.select_conductors_v2(inputs[1])
+    assert single.operations[0].value == patches[1].operations[0].value
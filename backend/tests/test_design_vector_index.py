@@ -0,0 +1,162 @@
+"""
+Search over the full corpus through the persistent design vector index:
+incremental sync, memory-mapped cold start and reset for
+DesignKnowledgeService; metadata bitmap filters, the result cache and batch
+search for OptimizedVectorSearchService.
+"""
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./test.db")
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import delete, insert  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from backend.models.design_vector import DesignVector  # noqa: E402
+from backend.services import design_knowledge_service as dks  # noqa: E402
+from backend.services.design_vector_index import DEFAULT_ROOT, DesignVectorIndex  # noqa: E402
+from backend.services.optimized_vector_search import OptimizedVectorSearchService  # noqa: E402
+
+
+def _brute(vectors, query, k, keep=None):
+    v = np.asarray(vectors, dtype=np.float64)
+    sims = (v / np.linalg.norm(v, axis=1, keepdims=True)) @ (query / np.linalg.norm(query))
+    order = [i for i in np.argsort(-sims, kind="stable") if keep is None or keep(i)]
+    return [int(i) + 1 for i in order[:k]]
+
+
+@pytest.mark.asyncio
+async def test_search_covers_full_corpus_and_cold_starts(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'dv.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(DesignVector.__table__.create)
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+    rng = np.random.default_rng(5)
+    vectors = rng.normal(size=(1500, 16)).round(4).tolist()
+
+    index = DesignVectorIndex(tmp_path / "index")
+    monkeypatch.setattr(dks, "get_design_vector_index", lambda: index)
+    monkeypatch.setattr(dks, "EmbeddingService", lambda: None)
+
+    async with maker() as session:
+        await session.execute(insert(DesignVector), [{"vector": v, "meta": {"i": i}} for i, v in enumerate(vectors)])
+        await session.commit()
+        svc = dks.DesignKnowledgeService(session)
+        # The best match for a late row's own vector is that row, past the old 1000-row cap
+        query = np.asarray(vectors[1400])
+        hits = await svc.search(list(query), limit=5)
+        assert [v.id for v, _ in hits] == _brute(vectors, query, 5)
+        assert hits[0][0].id == 1401 and hits[0][1] == pytest.approx(1.0, abs=1e-5)
+        assert len(index) == 1500
+
+        # Stored vectors are indexed incrementally
+        new = await svc.store_vector(dks.DesignVectorCreate(vector=[1.0] + [0.0] * 15, meta={"name": "axis"}))
+        assert len(index) == 1501
+        top = await svc.search([2.0] + [0.0] * 15, limit=1)
+        assert top[0][0].id == new.id
+
+    # A fresh process maps the persisted matrix instead of reading vectors from the DB
+    cold = DesignVectorIndex(tmp_path / "index")
+    monkeypatch.setattr(dks, "get_design_vector_index", lambda: cold)
+    async with maker() as session:
+        svc = dks.DesignKnowledgeService(session)
+        assert await cold.sync(session) == 0
+        assert isinstance(cold.ann.vectors.base, np.memmap) or isinstance(cold.ann.vectors, np.memmap)
+        hits = await svc.search(list(query), limit=5)
+        assert [v.id for v, _ in hits] == _brute(vectors, query, 5)
+
+        # A reset table (ids restart) triggers a rebuild from the database
+        await session.execute(delete(DesignVector))
+        await session.commit()
+        await session.execute(insert(DesignVector), [{"vector": v} for v in vectors[:3]])
+        await session.commit()
+        hits = await svc.search(list(vectors[2]), limit=10)
+        assert len(cold) == 3 and hits[0][0].vector == vectors[2]
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_filtered_cached_and_batch_search(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'dv.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(DesignVector.__table__.create)
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+    rng = np.random.default_rng(9)
+    vectors = rng.normal(size=(1200, 12)).round(4).tolist()
+    metas = [{"kind": ["roof", "ground", "carport"][i % 3], "strings": i % 4} for i in range(len(vectors))]
+
+    async with maker() as session:
+        await session.execute(insert(DesignVector), [{"vector": v, "meta": m} for v, m in zip(vectors, metas)])
+        await session.commit()
+        svc = OptimizedVectorSearchService(session, index=DesignVectorIndex(tmp_path / "index"))
+        query = np.asarray(vectors[700])
+
+        hits = await svc.similarity_search_optimized(list(query), k=5, min_score=-1.0)
+        assert [r.vector_id for r in hits] == _brute(vectors, query, 5)
+        assert hits[0].metadata == metas[700] and hits[0].score == pytest.approx(1.0, abs=1e-5)
+
+        filt = {"kind": "ground", "strings": 2}
+        hits = await svc.similarity_search_optimized(list(query), k=5, filter_metadata=filt, min_score=-1.0)
+        keep = lambda i: metas[i]["kind"] == "ground" and metas[i]["strings"] == 2  # noqa: E731
+        assert [r.vector_id for r in hits] == _brute(vectors, query, 5, keep)
+        assert await svc.similarity_search_optimized(list(query), k=5, filter_metadata={"kind": "none"}) == []
+
+        # A repeat is served from cache; a new row invalidates it
+        before = svc._similarity_cache.hits
+        again = await svc.similarity_search_optimized(list(query), k=5, filter_metadata=filt, min_score=-1.0)
+        assert svc._similarity_cache.hits == before + 1 and again == hits
+        session.add(DesignVector(vector=list(query * 2), meta={"kind": "ground", "strings": 2}))
+        await session.commit()
+        fresh = await svc.similarity_search_optimized(list(query), k=5, filter_metadata=filt, min_score=-1.0)
+        assert fresh[0].vector_id == 1201 and fresh[0].metadata["kind"] == "ground"
+
+        queries = [vectors[i] for i in (3, 400, 999)]
+        batch = await svc.batch_similarity_search(queries, k=4, include_vectors=True)
+        expected = [_brute(vectors + [list(query * 2)], np.asarray(q), 4) for q in queries]
+        assert [[r.vector_id for r in res] for res in batch] == expected
+        assert batch[0][0].vector == vectors[3]
+        stats = await svc.get_statistics()
+        assert stats["total_vectors"] == stats["indexed_vectors"] == stats["metadata_rows"] == 1201
+
+        # Warmed entries match what a cold query returns, IVF probe included
+        svc._index.ann.exact_threshold = 100
+        svc._index.ann.train_threshold = 500
+        svc._index.ann.maybe_train()
+        assert svc._index.ann.centroids is not None
+        await svc.precompute_similarities(queries=queries, k=4)
+        cold = OptimizedVectorSearchService(session, index=svc._index)
+        before = svc._similarity_cache.hits
+        for q in queries:
+            assert await svc.similarity_search_optimized(q, k=4) == await cold.similarity_search_optimized(q, k=4)
+        assert svc._similarity_cache.hits == before + len(queries)
+    await engine.dispose()
+
+
+def test_workers_sharing_a_directory_write_each_row_once(tmp_path):
+    rng = np.random.default_rng(3)
+    rows = [(i, rng.normal(size=8).tolist()) for i in range(1, 41)]
+    a = DesignVectorIndex(tmp_path / "index")
+    b = DesignVectorIndex(tmp_path / "index")
+    assert a.add([]) == b.add([]) == 0  # both start before anything is on disk
+    # Both workers catch up on the same rows, in overlapping batches
+    assert a.add(rows[:20]) == 20
+    assert b.add(rows[:30]) == 30
+    assert a.add(rows[20:]) == 20
+    assert b.add(rows[30:]) == 10
+
+    ids = np.fromfile(tmp_path / "index" / "ids.i64", dtype=np.int64)
+    assert ids.tolist() == list(range(1, 41))
+    cold = DesignVectorIndex(tmp_path / "index")
+    cold.add([])
+    assert len(cold) == 40 and cold.max_id == 40
+    assert cold.search(rows[32][1], 1)[0][0] == 33
+
+    assert DesignVectorIndex().root == DEFAULT_ROOT
+    assert DEFAULT_ROOT.parent.name == "data" and DEFAULT_ROOT.parent.parent.name == "backend"
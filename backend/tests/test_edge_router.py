@@ -0,0 +1,72 @@
+"""
+Builtin edge router: A* routes avoid node bodies with few bends, a boxed-in
+target falls back quickly, and pooled routing matches inline routing.
+"""
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./test.db")
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.schemas.analysis import CanvasComponent, CanvasLink, DesignSnapshot  # noqa: E402
+from backend.services import edge_router  # noqa: E402
+
+
+def _node(cid, x, y):
+    return CanvasComponent(id=cid, name=cid, type="panel", x=x, y=y, layout={"single_line": {"x": x, "y": y}})
+
+
+def _crosses_body(path, node, w=120.0, h=72.0):
+    cx, cy = node.layout["single_line"]["x"], node.layout["single_line"]["y"]
+    for (x0, y0), (x1, y1) in zip(path, path[1:]):
+        assert x0 == x1 or y0 == y1  # orthogonal
+        for t in range(101):
+            x, y = x0 + (x1 - x0) * t / 100, y0 + (y1 - y0) * t / 100
+            if abs(x - cx) < w / 2 and abs(y - cy) < h / 2:
+                return True
+    return False
+
+
+def _route(snapshot):
+    return asyncio.run(edge_router.route_edges(snapshot, layer="single_line"))
+
+
+def test_routes_around_obstacles_with_few_bends(monkeypatch):
+    monkeypatch.setattr(edge_router, "_router_pool", lambda: None)
+    a, blocker, b = _node("a", 0, 0), _node("m", 300, 0), _node("b", 600, 0)
+    snap = DesignSnapshot(components=[a, blocker, b], links=[CanvasLink(id="l1", source_id="a", target_id="b")])
+    path = [(p["x"], p["y"]) for p in _route(snap)["l1"]]
+    assert path[0] == (60.0, 0.0) and path[-1] == (540.0, 0.0)
+    assert not any(_crosses_body(path, n) for n in (a, blocker, b))
+    assert len(path) == 6  # out, around the blocker and back: four bends
+
+    # A target walled in on every side falls back to an L route without exploding
+    ring = [(1860, y) for y in range(-120, 121, 60)] + [(2140, y) for y in range(-120, 121, 60)]
+    ring += [(x, y) for x in range(1860, 2141, 70) for y in (-110, 110)]
+    walls = [_node(f"w{i}", x, y) for i, (x, y) in enumerate(ring)]
+    boxed = DesignSnapshot(
+        components=[a, _node("t", 2000, 0)] + walls,
+        links=[CanvasLink(id="l2", source_id="a", target_id="t")],
+    )
+    t0 = time.perf_counter()
+    route = _route(boxed)["l2"]
+    assert time.perf_counter() - t0 < 5 and len(route) == 3
+
+
+def test_pooled_routing_matches_inline(monkeypatch):
+    nodes = [_node(f"n{i}", (i % 8) * 220, (i // 8) * 160) for i in range(64)]
+    links = [CanvasLink(id=f"l{i}", source_id=f"n{i}", target_id=f"n{(i * 5 + 3) % 64}") for i in range(64)]
+    links.append(CanvasLink(id="locked", source_id="n0", target_id="n1", locked_in_layers={"single_line": True}))
+    snap = DesignSnapshot(components=nodes, links=links)
+    monkeypatch.setattr(edge_router, "_router_pool", lambda: None)
+    inline = _route(snap)
+    with ThreadPoolExecutor(4) as pool:
+        monkeypatch.setattr(edge_router, "_router_pool", lambda: pool)
+        pooled = _route(snap)
+    assert pooled == inline and len(inline) == 64 and "locked" not in inline
@@ -0,0 +1,64 @@
+"""
+Shared embedding worker: concurrent calls are micro-batched off the event
+loop, identical texts are encoded once and repeats come from the cache.
+"""
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./test.db")
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.services.embedding_service import (  # noqa: E402
+    EmbeddingCache,
+    EmbeddingService,
+    EmbeddingWorker,
+)
+
+
+def test_concurrent_calls_share_batches_and_cache(tmp_path):
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        time.sleep(0.05)  # a slow model must not stall the event loop
+        return [[float(len(t)), 1.0] if t != "bad" else [] for t in texts]
+
+    def worker(cache_dir):
+        cache = EmbeddingCache(max_entries=100, disk_dir=cache_dir)
+        return EmbeddingWorker(encode, "fake", window_ms=20, max_batch=8, cache=cache)
+
+    async def run():
+        svc = EmbeddingService(worker(tmp_path))
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        texts = [f"text {i}" for i in range(6)]
+        results = await asyncio.gather(
+            ticker(), *(svc.embed_text([t, "shared"]) for t in texts), svc.embed_text(["bad"])
+        )
+        assert ticks == 5
+        assert sum(len(c) for c in calls) == 8 and len(calls) == 1  # one batch, "shared" encoded once
+        assert results[1] == [[6.0, 1.0], [6.0, 1.0]] and results[-1] == [[]]
+
+        again = await svc.embed_text(["text 3", "shared", "bad"])
+        assert again == [[6.0, 1.0], [6.0, 1.0], []] and calls[-1] == ["bad"]  # failures are retried
+        assert svc._worker.cache.hits == 2
+
+        # max_batch splits a large burst
+        await svc.embed_text([f"burst {i}" for i in range(20)])
+        assert [len(c) for c in calls[-3:]] == [8, 8, 4]
+
+    asyncio.run(run())
+    # A new worker (another process) reads the disk tier
+    cold = worker(tmp_path)
+    assert asyncio.run(cold.embed(["shared"])) == [[6.0, 1.0]] and cold.cache.disk_hits == 1
@@ -0,0 +1,138 @@
+"""
+Job queue: priority order, retries with backoff into ``dead``, lease expiry
+and durability of the SQLite store across a restart.
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.scalability.job_queue import (  # noqa: E402
+    JobQueue,
+    MemoryJobStore,
+    QueueConfig,
+    QueueFullError,
+    SQLiteJobStore,
+    current_job,
+)
+
+
+def _queue(store=None, **cfg):
+    return JobQueue(store or MemoryJobStore(), handlers={}, queues={"q": QueueConfig(**cfg)})
+
+
+@pytest.mark.asyncio
+async def test_priority_order_and_queue_bound():
+    jobs = _queue(max_depth=4)
+    seen = []
+    jobs.register("record", lambda p: seen.append(p["n"]), queue="q")
+    ids = [await jobs.enqueue("record", {"n": n}, priority=prio) for n, prio in [(1, 1), (2, 9), (3, 5), (4, 9)]]
+    with pytest.raises(QueueFullError):
+        await jobs.enqueue("record", {"n": 5})
+
+    await jobs.start()
+    try:
+        for job_id in ids:
+            assert (await jobs.wait(job_id, timeout=5)).status == "done"
+    finally:
+        await jobs.stop()
+    assert seen == [2, 4, 3, 1]  # higher priority first, FIFO within a priority
+
+
+@pytest.mark.asyncio
+async def test_retries_with_backoff_then_dead(tmp_path):
+    store = SQLiteJobStore(tmp_path / "jobs.db")
+    jobs = _queue(store, concurrency=2, backoff_s=0.05)
+    attempts = []
+
+    async def flaky(payload):
+        attempts.append(current_job.get().attempts)
+        if len(attempts) < 3 or payload.get("always_fail"):
+            raise ValueError("boom")
+
+    jobs.register("flaky", flaky, queue="q", max_attempts=3)
+    await jobs.start()
+    try:
+        ok = await jobs.wait(await jobs.enqueue("flaky"), timeout=5)
+        assert ok.status == "done" and ok.attempts == 3 and attempts == [1, 2, 3]
+
+        dead = await jobs.wait(await jobs.enqueue("flaky", {"always_fail": True}), timeout=5)
+        assert dead.status == "dead" and dead.attempts == 3
+        assert dead.last_error == "ValueError: boom"
+    finally:
+        await jobs.stop()
+        store.close()
+
+
+@pytest.mark.asyncio
+async def test_lapsed_lease_is_reclaimed_after_restart(tmp_path):
+    path = tmp_path / "jobs.db"
+    store = SQLiteJobStore(path)
+    jobs = _queue(store)
+    job_id = await jobs.enqueue("work", {"x": 1}, queue="q")
+    # A worker claims the job and its process dies without finishing it.
+    claimed = await store.claim("q", time.time(), lease_s=0.05)
+    assert claimed.id == job_id and claimed.status == "running"
+    assert await store.claim("q", time.time(), lease_s=0.05) is None
+    store.close()
+
+    await asyncio.sleep(0.1)
+    store = SQLiteJobStore(path)
+    jobs = _queue(store)
+    done = []
+    jobs.register("work", lambda p: done.append(p), queue="q")
+    await jobs.start()
+    try:
+        job = await jobs.wait(job_id, timeout=5)
+    finally:
+        await jobs.stop()
+        store.close()
+    assert job.status == "done" and job.attempts == 2 and done == [{"x": 1}]
+
+
+@pytest.mark.asyncio
+async def test_manual_claim_ack_and_fail():
+    jobs = _queue(backoff_s=0.0, visibility_timeout_s=0.05)
+    first = await jobs.enqueue("manual", queue="q", max_attempts=2)
+    second = await jobs.enqueue("manual", queue="q", max_attempts=2)
+
+    job = await jobs.claim("q")
+    assert job.id == first and job.status == "running" and job.lease_until is not None
+    assert (await jobs.get(first)).status == "running"  # not done until acked
+    assert await jobs.ack(job)
+    assert (await jobs.get(first)).status == "done"
+    assert not await jobs.ack(job)  # a lease is settled once
+
+    job = await jobs.claim("q")
+    assert await jobs.fail(job, "boom")
+    retried = await jobs.claim("q")
+    assert retried.id == second and retried.attempts == 2
+    assert not await jobs.ack(job)  # the first attempt's lease is gone
+    assert await jobs.fail(retried, "boom again")
+    dead = await jobs.get(second)
+    assert dead.status == "dead" and dead.last_error == "boom again"
+
+    # An unsettled lease lapses and the job is handed out again
+    third = await jobs.enqueue("manual", queue="q")
+    lost = await jobs.claim("q")
+    await asyncio.sleep(0.1)
+    again = await jobs.claim("q")
+    assert again.id == third and again.attempts == lost.attempts + 1
+    assert not await jobs.ack(lost) and await jobs.ack(again)
+
+
+@pytest.mark.asyncio
+async def test_stop_only_named_queues():
+    jobs = JobQueue(MemoryJobStore(), handlers={}, queues={"a": QueueConfig(), "b": QueueConfig()})
+    jobs.register("noop", lambda p: None, queue="a")
+    jobs.register("noop_b", lambda p: None, queue="b")
+    await jobs.start()
+    await jobs.stop(["a"])
+    assert jobs.running
+    assert (await jobs.wait(await jobs.enqueue("noop_b"), timeout=5)).status == "done"
+    await jobs.stop()
+    assert not jobs.running
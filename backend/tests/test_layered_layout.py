@@ -0,0 +1,73 @@
+"""
+In-process layered layout: crossings are removed, port order and locked
+nodes are respected, and the provider's pooled path matches inline.
+"""
+import asyncio
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./test.db")
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.schemas.analysis import CanvasComponent, CanvasLink, DesignSnapshot  # noqa: E402
+from backend.services import layout_provider  # noqa: E402
+from backend.services.layered_layout import layered_layout  # noqa: E402
+
+
+def _crossings(pos, edges):
+    segs = [(pos[s]["x"], pos[s]["y"], pos[t]["x"], pos[t]["y"]) for s, t in edges]
+    count = 0
+    for i, (ax0, ay0, ax1, ay1) in enumerate(segs):
+        for bx0, by0, bx1, by1 in segs[i + 1:]:
+            if ax0 == bx0 and ax1 == bx1 and (ay0 - by0) * (ay1 - by1) < 0:
+                count += 1
+    return count
+
+
+def test_crossings_ports_locks_and_cycles():
+    pos = layered_layout(["a", "b", "c", "d"], [("a", "d"), ("b", "c")])
+    assert _crossings(pos, [("a", "d"), ("b", "c")]) == 0
+    # Ports keep model order: s's links to t1, t2, t3 fan out top to bottom
+    pos = layered_layout(["s", "t3", "t2", "t1"], [("s", "t1"), ("s", "t2"), ("s", "t3")])
+    assert pos["t1"]["y"] < pos["t2"]["y"] < pos["t3"]["y"]
+    # A locked node keeps its place, pushes its successor right and its row stays free
+    pos = layered_layout(["a", "k", "b", "c"], [("a", "k"), ("k", "b"), ("a", "c")], fixed={"k": (640.0, 100.0)})
+    assert "k" not in pos and pos["b"]["x"] == 820.0
+    assert all((p["x"], p["y"]) != (640.0, 100.0) for p in pos.values())
+    # Cycles and self loops still lay out
+    pos = layered_layout(["a", "b", "c"], [("a", "b"), ("b", "a"), ("b", "c"), ("c", "c")])
+    assert len({(p["x"], p["y"]) for p in pos.values()}) == 3
+
+    # A tree listed in shuffled model order is drawn without crossings
+    rng = np.random.default_rng(3)
+    ids = [f"n{i}" for i in range(80)]
+    edges = [(ids[int(rng.integers(0, i))], ids[i]) for i in range(1, 80)]
+    order = [ids[0]] + list(rng.permutation(ids[1:]))
+    pos = layered_layout(order, edges)
+    assert len({(p["x"], p["y"]) for p in pos.values()}) == 80
+    assert all(pos[t]["x"] - pos[s]["x"] == 180 for s, t in edges)
+    assert _crossings(pos, edges) == 0
+
+
+def test_provider_pool_matches_inline(monkeypatch):
+    ids = [f"n{i}" for i in range(40)]
+    snap = DesignSnapshot(
+        components=[CanvasComponent(id=i, name=i, type="panel", x=0, y=0) for i in ids],
+        links=[CanvasLink(id=f"l{i}", source_id=ids[i], target_id=ids[(i * 7 + 1) % 40]) for i in range(40)],
+    )
+    snap.components[5].locked_in_layers = {"single_line": True}
+    snap.components[5].layout = {"single_line": {"x": 280.0, "y": 100.0}}
+    monkeypatch.setattr(layout_provider, "LAYOUT_PROVIDER", "layered")
+    monkeypatch.setattr(layout_provider, "_layout_pool", lambda: None)
+    inline = asyncio.run(layout_provider.suggest_positions(snap))
+    monkeypatch.setattr(layout_provider, "POOL_MIN_NODES", 1)
+    with ThreadPoolExecutor(2) as pool:
+        monkeypatch.setattr(layout_provider, "_layout_pool", lambda: pool)
+        pooled = asyncio.run(layout_provider.suggest_positions(snap))
+    assert pooled == inline and len(inline) == 39 and "n5" not in inline
@@ -0,0 +1,84 @@
+"""
+Incremental layout: adding a device moves only it (and what must shift
+downstream), keeps everything else in place and matches full layout on an
+empty layer; routing can be limited to the links that moved.
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./test.db")
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.api.routes import layout as layout_routes  # noqa: E402
+from backend.schemas.analysis import CanvasComponent, CanvasLink, DesignSnapshot  # noqa: E402
+from backend.services import edge_router, layout_provider  # noqa: E402
+from backend.services.layout_engine import apply_layout, apply_layout_incremental  # noqa: E402
+
+
+def _snap(ids, edges):
+    comps = [CanvasComponent(id=i, name=i, type="panel", x=0, y=0) for i in ids]
+    links = [CanvasLink(id=f"{s}-{t}", source_id=s, target_id=t) for s, t in edges]
+    return DesignSnapshot(components=comps, links=links)
+
+
+def _pos(snap):
+    return {c.id: dict(c.layout["single_line"]) for c in snap.components if (c.layout or {}).get("single_line")}
+
+
+def test_incremental_moves_only_the_affected_region():
+    edges = [("a", "b"), ("b", "c"), ("x", "y")]
+    full = apply_layout(_snap(["a", "b", "c", "x", "y"], edges))
+    assert _pos(full) == _pos(apply_layout(_snap(["a", "b", "c", "x", "y"], edges)))
+    empty = _snap(["a", "b", "c", "x", "y"], edges)
+    assert apply_layout_incremental(empty) == _pos(full)
+
+    # A new device after b lands next to c; nothing else moves
+    snap = full.model_copy(deep=True)
+    snap.components.append(CanvasComponent(id="d", name="d", type="panel", x=0, y=0))
+    snap.links.append(CanvasLink(id="b-d", source_id="b", target_id="d"))
+    before = _pos(snap)
+    moved = apply_layout_incremental(snap)
+    assert moved == {"d": {"x": 100.0 + 2 * 180, "y": 100.0 + 120}}  # below c
+    assert {k: v for k, v in _pos(snap).items() if k != "d"} == before
+
+    # Inserting e between a and b pushes b and its descendants right, in order
+    snap.components.insert(0, CanvasComponent(id="e", name="e", type="panel", x=0, y=0))
+    snap.links = [lk for lk in snap.links if lk.id != "a-b"] + [
+        CanvasLink(id="a-e", source_id="a", target_id="e"),
+        CanvasLink(id="e-b", source_id="e", target_id="b"),
+    ]
+    snap.components[2].locked_in_layers = {"single_line": True}  # b stays put
+    moved = apply_layout_incremental(snap)
+    assert list(moved) == ["e"] and moved["e"]["x"] == 280.0
+    snap.components[2].locked_in_layers = None
+    moved = apply_layout_incremental(snap, changed=["e"])
+    assert list(moved) == ["e", "b", "c", "d"]  # component order; e takes the cell b vacated
+    assert [(moved[n]["x"], moved[n]["y"]) for n in moved] == [(280.0, 100.0), (460.0, 100.0), (640.0, 100.0), (640.0, 220.0)]
+    assert _pos(snap)["x"] == before["x"] and _pos(snap)["y"] == before["y"]
+
+    # Only links touching moved nodes are re-routed
+    routes = asyncio.run(edge_router.route_edges(snap, only={"b-c", "b-d"}))
+    assert set(routes) == {"b-c", "b-d"}
+
+
+def test_route_reports_when_incremental_is_ignored(monkeypatch):
+    snap = _snap(["a", "b"], [("a", "b")])
+    seen = []
+
+    async def snapshot(session_id):
+        return snap
+
+    async def suggest(snapshot, layer, incremental, changed):
+        seen.append(incremental)
+        return {}
+
+    monkeypatch.setattr(layout_routes, "get_current_snapshot", snapshot)
+    monkeypatch.setattr(layout_routes, "suggest_positions", suggest)
+    for provider, expected in [("builtin", True), ("elk", False)]:
+        monkeypatch.setattr(layout_provider, "LAYOUT_PROVIDER", provider)
+        body = asyncio.run(layout_routes.layout_suggest("s", layer="single_line", incremental=True, changed=None))
+        assert body["incremental"] is expected and seen[-1] is expected
@@ -0,0 +1,84 @@
+"""
+Checkpointed session history: bounded rebuilds, revert and retention pruning.
+"""
+import os
+import sys
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./test.db")
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.services import odl_graph_service as svc  # noqa: E402
+
+
+async def _session_with_chain(n: int) -> str:
+    """Session whose version v adds node f"n{v}" linked to the previous one."""
+    sid = f"hist-{uuid4()}"
+    await svc.create_graph(sid)
+    for v in range(1, n + 1):
+        patch = {"add_nodes": [{"id": f"n{v}", "data": {"v": v}}], "version": v - 1}
+        if v > 1:
+            patch["add_edges"] = [{"source": f"n{v - 1}", "target": f"n{v}", "data": {}}]
+        await svc.apply_patch(sid, patch)
+    return sid
+
+
+def _rows(table: str, sid: str):
+    return svc._get_pool().read_sync(
+        lambda conn: [r[0] for r in conn.execute(
+            f"SELECT version FROM {table} WHERE session_id = ? ORDER BY version", (sid,)
+        )]
+    )
+
+
+@pytest.mark.asyncio
+async def test_rebuild_from_checkpoint_and_revert(monkeypatch):
+    monkeypatch.setattr(svc, "CHECKPOINT_EVERY", 5)
+    sid = await _session_with_chain(12)
+    assert _rows("checkpoints", sid) == [0, 5, 10]
+
+    g = await svc.get_graph_at_version(sid, 7)
+    assert sorted(g.nodes) == [f"n{i}" for i in range(1, 8)]
+    assert g.graph["version"] == 7 and g.number_of_edges() == 6
+    assert await svc.get_graph_at_version(sid, 13) is None
+
+    await svc.update_requirements(sid, {"target_power": 5000})
+    assert await svc.revert_to_version(sid, 3)
+    g = await svc.get_graph(sid)
+    assert g.graph["version"] == 3 and sorted(g.nodes) == ["n1", "n2", "n3"]
+    assert g.graph["requirements"]["target_power"] == 5000
+    assert _rows("checkpoints", sid) == [0] and _rows("patches", sid) == [1, 2, 3]
+
+    # History continues from the reverted version
+    await svc.apply_patch(sid, {"add_nodes": [{"id": "x", "data": {}}], "version": 3})
+    assert await svc.get_patch_diff(sid, 3, 4) == [{"add_nodes": [{"id": "x", "data": {}}]}]
+
+
+@pytest.mark.asyncio
+async def test_retention_prunes_old_history(monkeypatch):
+    monkeypatch.setattr(svc, "CHECKPOINT_EVERY", 4)
+    monkeypatch.setattr(svc, "HISTORY_RETENTION", 5)
+    sid = await _session_with_chain(13)
+    # head=12 at the last checkpoint: floor is checkpoint 4 (<= 12 - 5)
+    assert _rows("checkpoints", sid) == [4, 8, 12]
+    assert _rows("patches", sid)[0] == 5
+
+    assert await svc.get_graph_at_version(sid, 3) is None
+    assert await svc.get_patch_diff(sid, 2, 6) is None
+    assert len(await svc.get_patch_diff(sid, 4, 6)) == 2
+    assert not await svc.revert_to_version(sid, 2)
+    g = await svc.get_graph_at_version(sid, 6)
+    assert sorted(g.nodes, key=lambda n: int(n[1:])) == [f"n{i}" for i in range(1, 7)]
+
+    assert await svc.prune_history(sid, keep_versions=1) > 0
+    assert _rows("checkpoints", sid) == [12]
+    assert _rows("patches", sid) == [13]
+
+    await svc.delete_graph(sid)
+    assert await svc.get_graph(sid) is None
+    assert _rows("checkpoints", sid) == [] and _rows("patches", sid) == []
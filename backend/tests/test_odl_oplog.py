@@ -0,0 +1,120 @@
+"""
+ODLStore "oplog" mode: patches append to the op log, snapshots compact it,
+and reads rebuild the same graph the snapshot mode would produce.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.odl.cache import GraphCache  # noqa: E402
+from backend.odl.schemas import ODLPatch, PatchOp  # noqa: E402
+from backend.odl.store import ODLStore, graphs, patch_log  # noqa: E402
+
+
+def _session_maker():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    return sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def _add_node_patch(i: int) -> ODLPatch:
+    return ODLPatch(
+        patch_id=f"p{i}",
+        operations=[
+            PatchOp(op_id=f"op{i}", op="add_node", value={"id": f"n{i}", "type": "panel", "attrs": {"layer": "single-line"}}),
+        ],
+    )
+
+
+async def _log_rows(db: AsyncSession, sid: str) -> int:
+    res = await db.execute(select(func.count()).select_from(patch_log).where(patch_log.c.session_id == sid))
+    return res.scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_oplog_appends_and_rebuilds():
+    async with _session_maker()() as db:
+        store = ODLStore(mode="oplog", snapshot_every=100, cache=None)
+        await store.init_schema(db)
+        await store.create_graph(db, "s1")
+        for i in range(1, 4):
+            await store.apply_patch_cas(db, "s1", expected_version=i, patch=_add_node_patch(i))
+
+        # Snapshot row untouched; only head version moved
+        row = (await db.execute(select(graphs).where(graphs.c.session_id == "s1"))).fetchone()
+        assert row._mapping["version"] == 4
+        assert row._mapping["graph_json"]["nodes"] == {}
+        assert await _log_rows(db, "s1") == 3
+
+        g = await store.get_graph(db, "s1")
+        assert g.version == 4
+        assert sorted(g.nodes) == ["n1", "n2", "n3"]
+
+        # Snapshot-mode readers see the same graph
+        g2 = await ODLStore(mode="snapshot", cache=None).get_graph(db, "s1")
+        assert g2 == g
+
+
+@pytest.mark.asyncio
+async def test_oplog_snapshot_compacts_log():
+    async with _session_maker()() as db:
+        store = ODLStore(mode="oplog", snapshot_every=3, cache=None)
+        await store.init_schema(db)
+        await store.create_graph(db, "s2")
+        for i in range(1, 5):
+            await store.apply_patch_cas(db, "s2", expected_version=i, patch=_add_node_patch(i))
+
+        # Version 3 triggered a snapshot; only version 4..5 remain in the log
+        row = (await db.execute(select(graphs).where(graphs.c.session_id == "s2"))).fetchone()
+        assert row._mapping["graph_json"]["version"] == 3
+        assert await _log_rows(db, "s2") == 2
+        g = await store.get_graph(db, "s2")
+        assert g.version == 5 and len(g.nodes) == 4
+
+        await store.compact(db, "s2")
+        assert await _log_rows(db, "s2") == 0
+        assert await store.get_graph(db, "s2") == g
+
+
+@pytest.mark.asyncio
+async def test_oplog_rejects_stale_version():
+    async with _session_maker()() as db:
+        store = ODLStore(mode="oplog", cache=None)
+        await store.init_schema(db)
+        await store.create_graph(db, "s3")
+        await store.apply_patch_cas(db, "s3", expected_version=1, patch=_add_node_patch(1))
+        with pytest.raises(ValueError):
+            await store.apply_patch_cas(db, "s3", expected_version=1, patch=_add_node_patch(2))
+
+
+@pytest.mark.asyncio
+async def test_graph_cache_write_through_and_head_probe():
+    async with _session_maker()() as db:
+        cache = GraphCache(max_entries=4)
+        store = ODLStore(cache=cache)
+        await store.init_schema(db)
+        await store.create_graph(db, "s4")
+        g, v = await store.apply_patch_cas(db, "s4", expected_version=1, patch=_add_node_patch(1))
+
+        # Write-through: reads (including the CAS read) hit and share the object
+        assert await store.get_head_version(db, "s4") == v
+        assert await store.get_graph(db, "s4") is g
+        assert cache.stats()["hits"] == 2
+        assert cache.stats()["misses"] == 0
+
+        # A write from another (uncached) store moves the head; the probe notices
+        await ODLStore(cache=None).apply_patch_cas(db, "s4", expected_version=v, patch=_add_node_patch(2))
+        g2 = await store.get_graph(db, "s4")
+        assert g2.version == v + 1 and "n2" in g2.nodes
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["size"] == 1
@@ -0,0 +1,108 @@
+"""
+Patch application semantics on top of the edge index.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.odl.edge_index import edge_index  # noqa: E402
+from backend.odl.patches import PatchError, apply_patch  # noqa: E402
+from backend.odl.schemas import ODLEdge, ODLGraph, ODLNode, ODLPatch, PatchOp  # noqa: E402
+
+
+def _graph() -> ODLGraph:
+    nodes = {nid: ODLNode(id=nid, type="panel") for nid in ("a", "b", "c", "d")}
+    edges = [
+        ODLEdge(id="ab", source_id="a", target_id="b", kind="dc_string"),
+        ODLEdge(id="bc", source_id="b", target_id="c", kind="dc_string"),
+        ODLEdge(id="cd", source_id="c", target_id="d", kind="dc_string"),
+        ODLEdge(id="da", source_id="d", target_id="a", kind="dc_string"),
+    ]
+    return ODLGraph(session_id="s", version=1, nodes=nodes, edges=edges)
+
+
+def _patch(*ops) -> ODLPatch:
+    return ODLPatch(patch_id="p", operations=[PatchOp(op_id=f"op{i}", op=o, value=v) for i, (o, v) in enumerate(ops)])
+
+
+def test_remove_node_drops_incident_edges_and_keeps_order():
+    g = _graph()
+    new, _ = apply_patch(g, _patch(("remove_node", {"id": "b"})), {})
+    assert [e.id for e in new.edges] == ["cd", "da"]
+    assert len(g.edges) == 4  # original untouched
+
+
+def test_mixed_edge_ops_match_list_semantics():
+    g = _graph()
+    new, _ = apply_patch(g, _patch(
+        ("remove_edge", {"id": "bc"}),
+        ("add_edge", {"id": "bc", "source_id": "b", "target_id": "d", "kind": "dc_bus"}),
+        ("update_edge", {"id": "ab", "attrs": {"gauge": "10AWG"}}),
+        ("remove_edge", {"id": "missing"}),
+        ("add_edge", {"id": "ac", "source_id": "a", "target_id": "c", "kind": "dc_string"}),
+        ("remove_node", {"id": "d"}),
+    ), {})
+    assert [(e.id, e.source_id, e.target_id) for e in new.edges] == [("ab", "a", "b"), ("ac", "a", "c")]
+    assert new.edges[0].attrs == {"gauge": "10AWG"}
+    # Index stays consistent with the list after compaction
+    idx = edge_index(new)
+    assert idx.is_current(new)
+    assert idx.incident("a") == {"ab", "ac"}
+    assert idx.get("bc") is None
+
+
+def test_add_edge_idempotency_and_errors():
+    g = _graph()
+    same = ("add_edge", {"id": "ab", "source_id": "a", "target_id": "b", "kind": "dc_string"})
+    new, _ = apply_patch(g, _patch(same), {})
+    assert len(new.edges) == 4
+    with pytest.raises(PatchError):
+        apply_patch(g, _patch(("add_edge", {"id": "ab", "source_id": "a", "target_id": "c", "kind": "x"})), {})
+    with pytest.raises(PatchError):
+        apply_patch(g, _patch(("update_edge", {"id": "zz"})), {})
+
+
+def test_index_rebuilds_after_external_list_mutation():
+    g = _graph()
+    edge_index(g)
+    g.edges.append(ODLEdge(id="ca", source_id="c", target_id="a", kind="dc_string"))
+    new, _ = apply_patch(g, _patch(("remove_node", {"id": "c"})), {})
+    assert [e.id for e in new.edges] == ["ab", "da"]
+    assert new == ODLGraph.model_validate(new.model_dump())
+
+
+def test_copy_on_write_shares_untouched_objects():
+    g = _graph()
+    edge_index(g)
+    new, _ = apply_patch(g, _patch(
+        ("update_node", {"id": "a", "attrs": {"layer": "electrical"}}),
+        ("update_edge", {"id": "bc", "attrs": {"gauge": "8AWG"}}),
+        ("add_edge", {"id": "ac", "source_id": "a", "target_id": "c", "kind": "dc_string"}),
+    ), {})
+    assert new.nodes["b"] is g.nodes["b"]
+    assert new.edges[0] is g.edges[0]
+    assert new.nodes["a"] is not g.nodes["a"] and g.nodes["a"].attrs == {}
+    assert new.edges[1] is not g.edges[1] and g.edges[1].attrs == {}
+    # The previous version's index is unaffected by writes to the fork
+    assert edge_index(g).incident("a") == {"ab", "da"}
+    assert edge_index(new).incident("a") == {"ab", "da", "ac"}
+
+
+def test_failed_patch_leaves_graph_untouched():
+    g = _graph()
+    edge_index(g)
+    before = g.model_dump()
+    with pytest.raises(PatchError):
+        apply_patch(g, _patch(
+            ("remove_node", {"id": "b"}),
+            ("update_node", {"id": "c", "attrs": {"x": 1}}),
+            ("set_meta", {"k": "v"}),
+            ("update_edge", {"id": "bc"}),  # removed above -> fails
+        ), {})
+    assert g.model_dump() == before
+    assert edge_index(g).incident("b") == {"ab", "bc"}
+    new, _ = apply_patch(g, _patch(("remove_edge", {"id": "ab"})), {})
+    assert [e.id for e in new.edges] == ["bc", "cd", "da"]
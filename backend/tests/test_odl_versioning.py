@@ -47,7 +47,7 @@ async def test_versions_diff_and_revert():
         session_id,
         {"add_nodes": [{"id": "b", "data": {}}], "version": 1},
     )
-    patches = get_patch_diff(session_id, 0, 2)
+    patches = await get_patch_diff(session_id, 0, 2)
     assert patches is not None
     assert len(patches) == 2
 
@@ -0,0 +1,74 @@
+"""
+layer_view over the layer/edge indexes matches a plain scan, including after
+patches that move nodes between layers.
+"""
+import random
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.odl.layer_index import layer_index  # noqa: E402
+from backend.odl.patches import apply_patch  # noqa: E402
+from backend.odl.schemas import ODLEdge, ODLGraph, ODLNode, ODLPatch, PatchOp  # noqa: E402
+from backend.odl.views import in_layer, layer_view  # noqa: E402
+
+LAYERS = ["single-line", "electrical", "structural", None]
+
+
+def _scan(g: ODLGraph, layer: str):
+    nodes = [n for n in g.nodes.values() if in_layer(n, layer)]
+    ids = {n.id for n in nodes}
+    return [n.id for n in nodes], [e.id for e in g.edges if e.source_id in ids and e.target_id in ids]
+
+
+def _random_graph(rng: random.Random, n: int = 200) -> ODLGraph:
+    nodes = {}
+    for i in range(n):
+        lyr = rng.choice(LAYERS)
+        nodes[f"n{i}"] = ODLNode(id=f"n{i}", type="panel", attrs={} if lyr is None else {"layer": lyr})
+    edges = [
+        ODLEdge(id=f"e{i}", source_id=f"n{rng.randrange(n)}", target_id=f"n{rng.randrange(n)}", kind="dc_string")
+        for i in range(3 * n)
+    ]
+    return ODLGraph(session_id="s", version=1, nodes=nodes, edges=edges)
+
+
+def _assert_views_match(g: ODLGraph):
+    for layer in ("single-line", "electrical", "structural", "other"):
+        v = layer_view(g, layer)
+        assert ([n.id for n in v.nodes], [e.id for e in v.edges]) == _scan(g, layer)
+
+
+def test_layer_view_matches_scan_across_patches():
+    rng = random.Random(7)
+    g = _random_graph(rng)
+    _assert_views_match(g)
+    for step in range(20):
+        ops = []
+        live = list(g.nodes)
+        for k in range(10):
+            nid = rng.choice(live)
+            kind = rng.random()
+            if kind < 0.4:
+                ops.append(("update_node", {"id": nid, "attrs": {"layer": rng.choice(LAYERS)}}))
+            elif kind < 0.6:
+                ops.append(("remove_node", {"id": nid}))
+                live.remove(nid)
+            else:
+                ops.append(("add_node", {"id": f"m{step}_{k}", "type": "panel", "attrs": {"layer": rng.choice(LAYERS[:3])}}))
+                live.append(f"m{step}_{k}")
+        patch = ODLPatch(patch_id=f"p{step}", operations=[PatchOp(op_id=f"{step}-{i}", op=o, value=v) for i, (o, v) in enumerate(ops)])
+        prev = g
+        g, _ = apply_patch(g, patch, {})
+        # The index was carried over (not rebuilt) and stays exact
+        assert g._layer_index is not None
+        _assert_views_match(g)
+        _assert_views_match(prev)
+
+
+def test_layer_index_rebuilds_after_external_mutation():
+    g = _random_graph(random.Random(1), n=20)
+    layer_index(g)
+    g.nodes["extra"] = ODLNode(id="extra", type="panel", attrs={"layer": "structural"})
+    _assert_views_match(g)
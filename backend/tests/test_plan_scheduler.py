@@ -0,0 +1,202 @@
+"""
+DAG scheduling of multi-step tool plans: dependency derivation, concurrent
+execution, critical path and patch conflict detection.
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./test.db")
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.odl.schemas import ODLGraph, ODLPatch, PatchOp  # noqa: E402
+from backend.orchestrator import orchestrator, router  # noqa: E402
+from backend.orchestrator.scheduler import (  # noqa: E402
+    PatchConflictError,
+    PlanStep,
+    ToolIO,
+    ancestors,
+    build_dag,
+    execute_plan,
+    topological_order,
+)
+from backend.planner.long_planner import LongPlanner  # noqa: E402
+from backend.planner.schema import LongPlan, PlanTask  # noqa: E402
+
+
+def _meta_patch(step_id, path):
+    op = PatchOp(op_id=f"r:{step_id}", op="set_meta", value={"path": path, "data": {"by": step_id}})
+    return ODLPatch(patch_id=f"patch:{step_id}", operations=[op])
+
+
+@pytest.mark.asyncio
+async def test_long_plan_orders_steps_by_data_only():
+    card = await LongPlanner().plan("s", "design a 6 kW system", "single-line")
+    steps = [PlanStep(id=t.id, depends_on=t.depends_on) for t in card.plan.tasks]
+    preds = build_dag(steps)
+    upstream = ancestors(topological_order(steps, preds), preds)
+    assert preds["mech_surface"] == set()  # the roof runs alongside the PV steps
+    assert "mech_racking_layout" in preds["pv_stringing_plan"]
+    assert "pv_stringing_plan" in preds["mech_attachment_check"]
+    assert "pv_apply_stringing" not in upstream["pv_add_disconnects"]
+    assert "pv_size_conductors" in preds["pv_compute_bom"]
+    assert "pv_generate_wiring" in preds["pv_compliance_check"]
+
+
+@pytest.mark.asyncio
+async def test_run_plan_exposes_upstream_patches(monkeypatch):
+    seen = {}
+
+    async def fake_run_task(*, task, request_id, layer_nodes, graph, **_):
+        seen[task] = (sorted(n.id for n in layer_nodes), sorted(graph.nodes))
+        if task == "place":
+            op = PatchOp(op_id=f"{request_id}:n", op="add_node", value={"id": "m1", "type": "panel"})
+            return ODLPatch(patch_id=f"patch:{request_id}", operations=[op])
+        return ODLPatch(patch_id=f"patch:{request_id}", operations=[])
+
+    monkeypatch.setattr(router, "run_task", fake_run_task)
+    plan = LongPlan(
+        session_id="s",
+        layer="single-line",
+        tasks=[
+            PlanTask(id="place", title="place", args={}),
+            PlanTask(id="inspect", title="inspect", args={}, depends_on=["place"]),
+        ],
+    )
+    base = ODLGraph(session_id="s", version=1)
+    res = await router.run_plan(plan=plan, session_id="s", request_id="r", graph=base)
+    assert seen["place"] == ([], [])
+    assert seen["inspect"] == (["m1"], ["m1"])
+    assert base.nodes == {}  # working graphs never touch the caller's graph
+    assert [op.op_id for op in res.patch.operations] == ["r:place:n"]
+    assert all(r.status == "done" for r in res.results.values())
+
+
+@pytest.mark.asyncio
+async def test_run_plan_skips_dependents_of_a_failed_pv_tool(monkeypatch):
+    ran = []
+
+    async def tool(*, store, session_id, args):
+        ran.append(args["step"])
+        if args["step"] == "pv_stringing_plan":
+            raise RuntimeError("no inverter")
+        return {"operations": []}, {}, []
+
+    monkeypatch.setattr(router, "get_tool", lambda task: tool)
+    plan = LongPlan(
+        session_id="s",
+        layer="single-line",
+        tasks=[
+            PlanTask(id=t, title=t, args={"step": t})
+            for t in ("pv_set_assumptions", "pv_stringing_plan", "pv_apply_stringing", "mech_surface")
+        ],
+    )
+    res = await router.run_plan(plan=plan, session_id="s", request_id="r", graph=ODLGraph(session_id="s", version=1))
+    status = {sid: r.status for sid, r in res.results.items()}
+    assert status == {
+        "pv_set_assumptions": "done",
+        "pv_stringing_plan": "failed",
+        "pv_apply_stringing": "skipped",
+        "mech_surface": "done",
+    }
+    assert res.results["pv_stringing_plan"].error == "no inverter"
+    assert "pv_apply_stringing" not in ran
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_runs_long_plan_and_applies_it(monkeypatch):
+    graph = ODLGraph(session_id="s", version=3)
+    seen, applied = {}, {}
+
+    async def load(db, session_id, layer):
+        return graph, []
+
+    async def fake_run_plan(*, plan, session_id, request_id, graph):
+        seen["tasks"] = [t.id for t in plan.tasks]
+
+        async def runner(step):
+            return _meta_patch(step.id, f"out.{step.id}")
+
+        steps = [PlanStep(id=t.id, depends_on=t.depends_on) for t in plan.tasks]
+        return await execute_plan(steps, runner, request_id=request_id)
+
+    class Store:
+        async def apply_patch_cas(self, *, db, session_id, expected_version, patch):
+            applied.update(version=expected_version, ops=len(patch.operations))
+            return graph, expected_version + 1
+
+    monkeypatch.setattr(orchestrator, "load_graph_and_view_nodes", load)
+    monkeypatch.setattr(orchestrator, "run_plan", fake_run_plan)
+    monkeypatch.setattr(orchestrator, "ODLStore", Store)
+    env = await orchestrator.Orchestrator().run(
+        db=None,
+        session_id="s",
+        task="long_plan",
+        request_id="r",
+        args=router.ActArgs(command="design a 6 kW system"),
+    )
+    card = env["output"]["card"]
+    assert env["status"] == "complete"  # every PV and mechanical step is low risk
+    assert seen["tasks"][0] == "pv_set_assumptions" and "mech_surface" in seen["tasks"]
+    assert card["critical_path"] and {s["status"] for s in card["steps"]} == {"done"}
+    assert applied == {"version": 3, "ops": len(seen["tasks"])}
+
+
+@pytest.mark.asyncio
+async def test_independent_steps_overlap_and_critical_path():
+    io = {
+        "a": ToolIO(writes=frozenset({"meta:a"})),
+        "b": ToolIO(writes=frozenset({"meta:b"})),
+        "c": ToolIO(reads=frozenset({"meta:a", "meta:b"}), writes=frozenset({"meta:c"})),
+    }
+    delays = {"a": 0.05, "b": 0.15, "c": 0.05}
+
+    async def runner(step):
+        await asyncio.sleep(delays[step.id])
+        return _meta_patch(step.id, f"{step.id}.out")
+
+    steps = [PlanStep(id=s) for s in ("a", "b", "c")]
+    res = await execute_plan(steps, runner, request_id="r", io=io.__getitem__)
+    assert all(r.status == "done" for r in res.results.values())
+    assert res.predecessors["c"] == {"a", "b"}
+    assert res.critical_path == ["b", "c"]
+    assert res.wall_ms < res.work_ms
+    assert res.results["b"].start_ms < res.results["a"].start_ms + res.results["a"].duration_ms
+    assert [op.op_id for op in res.patch.operations] == ["r:a", "r:b", "r:c"]
+    assert not res.conflicts
+
+
+@pytest.mark.asyncio
+async def test_conflicts_failures_and_cycles():
+    io = {
+        "x": ToolIO(writes=frozenset({"meta:x"})),
+        "y": ToolIO(writes=frozenset({"meta:y"})),
+        "z": ToolIO(reads=frozenset({"meta:x"})),
+    }
+
+    async def same_path(step):
+        if step.id == "z":
+            return None
+        return _meta_patch(step.id, "design_state.equip")
+
+    steps = [PlanStep(id="x"), PlanStep(id="y"), PlanStep(id="z")]
+    res = await execute_plan(steps, same_path, request_id="r", io=io.__getitem__)
+    assert res.conflicts == [{"steps": ["x", "y"], "keys": ["meta:design_state.equip"]}]
+    with pytest.raises(PatchConflictError):
+        await execute_plan(steps, same_path, request_id="r", io=io.__getitem__, strict=True)
+
+    async def x_fails(step):
+        if step.id == "x":
+            raise RuntimeError("boom")
+        return None
+
+    res = await execute_plan(steps, x_fails, request_id="r", io=io.__getitem__)
+    assert [res.results[s].status for s in ("x", "y", "z")] == ["failed", "done", "skipped"]
+
+    with pytest.raises(ValueError):
+        build_dag([PlanStep(id="p", depends_on=["q"]), PlanStep(id="q", depends_on=["p"])], io=lambda _t: ToolIO())
@@ -0,0 +1,44 @@
+"""
+Shared process pools: capped default size, a non-fork start method, and a
+broken pool replaced on the next call.
+"""
+import os
+import sys
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.utils.process_pool import DEFAULT_MAX_WORKERS, SharedProcessPool  # noqa: E402
+
+
+def _die(_):
+    os._exit(1)
+
+
+def test_broken_pool_is_replaced_and_shut_down(monkeypatch):
+    monkeypatch.setenv("TEST_POOL_WORKERS", "2")
+    shared = SharedProcessPool("test", "TEST_POOL_WORKERS")
+    try:
+        pool = shared.get()
+        assert pool is shared.get()
+        assert pool._mp_context.get_start_method() in ("forkserver", "spawn")
+        assert pool.submit(abs, -3).result(timeout=30) == 3
+
+        try:
+            pool.submit(_die, None).result(timeout=30)
+        except BrokenProcessPool as e:
+            shared.discard(pool, e)
+        fresh = shared.get()
+        assert fresh is not pool
+        assert fresh.submit(abs, -4).result(timeout=30) == 4
+        shared.discard(fresh, ValueError("not broken"))
+        assert shared.get() is fresh
+    finally:
+        shared.shutdown()
+    assert shared._pool is None
+
+    monkeypatch.delenv("TEST_POOL_WORKERS")
+    assert shared.workers() == min(os.cpu_count() or 1, DEFAULT_MAX_WORKERS)
+    monkeypatch.setenv("TEST_POOL_WORKERS", "1")
+    assert shared.get() is None
@@ -0,0 +1,52 @@
+"""
+Pooled WAL-mode SQLite access: off-loop reads, batched single-writer commits.
+"""
+import asyncio
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.database.sqlite_pool import SQLitePool  # noqa: E402
+
+
+def _schema(conn: sqlite3.Connection) -> None:
+    conn.execute("CREATE TABLE IF NOT EXISTS kv (k TEXT PRIMARY KEY, v INTEGER NOT NULL)")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_commit_and_failures_are_isolated(tmp_path):
+    pool = SQLitePool(tmp_path / "kv.db", readers=2, init_schema=_schema)
+    try:
+        def put(k, v):
+            return lambda conn: conn.execute("INSERT INTO kv VALUES (?, ?)", (k, v)).rowcount
+
+        results = await asyncio.gather(
+            *(pool.write(put(f"k{i}", i)) for i in range(50)),
+            pool.write(put("k0", -1)),  # duplicate key -> only this job fails
+            return_exceptions=True,
+        )
+        assert results[:50] == [1] * 50
+        assert isinstance(results[50], sqlite3.IntegrityError)
+
+        rows = await pool.read(lambda conn: conn.execute("SELECT COUNT(*), SUM(v) FROM kv").fetchone())
+        assert rows == (50, sum(range(50)))
+        mode = pool.read_sync(lambda conn: conn.execute("PRAGMA journal_mode").fetchone()[0])
+        assert mode == "wal"
+    finally:
+        pool.close()
+
+
+def test_close_flushes_pending_writes(tmp_path):
+    path = tmp_path / "kv.db"
+    pool = SQLitePool(path, init_schema=_schema)
+    futures = [pool.submit(lambda conn, i=i: conn.execute("INSERT INTO kv VALUES (?, ?)", (str(i), i))) for i in range(20)]
+    pool.close()
+    assert all(f.done() and f.exception() is None for f in futures)
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM kv").fetchone()[0] == 20
+    with pytest.raises(RuntimeError):
+        pool.start()
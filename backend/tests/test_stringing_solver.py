@@ -0,0 +1,93 @@
+"""
+Vectorized stringing solver: agreement with the scalar series rule across
+many module x inverter x site combinations.
+"""
+import sys
+from math import ceil
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.tools.stringing_solver import (  # noqa: E402
+    InverterArrays,
+    ModuleArrays,
+    SiteArrays,
+    solve_stringing,
+    voc_at_temp,
+)
+
+
+def _scalar_best(mod, inv, tmin, n_modules, series_range, margin):
+    """Reference loop: longest feasible N, its parallel count and fitting inputs."""
+    voc_cold = voc_at_temp(mod["voc"], mod["beta_voc_pct_per_C"], tmin)
+    best = None
+    for n in range(series_range[0], series_range[1] + 1):
+        if voc_cold * n > inv["max_system_vdc"] * (1 - margin):
+            continue
+        fits = [w for w in inv["mppt_windows"] if w["v_min"] <= mod["vmp"] * n <= w["v_max"]]
+        if fits:
+            best = (n, ceil(n_modules / n), sum(w["count"] for w in fits))
+    return best
+
+
+def test_solver_matches_scalar_rule_on_random_combos():
+    rng = np.random.default_rng(1)
+    modules = [
+        {"p_W": float(p), "voc": float(v), "vmp": float(v * r), "beta_voc_pct_per_C": float(b)}
+        for p, v, r, b in zip(
+            rng.uniform(250, 600, 30), rng.uniform(30, 60, 30),
+            rng.uniform(0.78, 0.86, 30), rng.uniform(-0.35, -0.24, 30),
+        )
+    ]
+    inverters = []
+    for _ in range(12):
+        windows = []
+        for _ in range(int(rng.integers(1, 4))):
+            lo = float(rng.uniform(80, 300))
+            windows.append({"v_min": lo, "v_max": lo + float(rng.uniform(100, 500)), "count": int(rng.integers(1, 3))})
+        inverters.append({"max_system_vdc": float(rng.choice([480, 600, 1000])), "mppt_windows": windows})
+    tmins = [-25.0, -10.0, 5.0]
+
+    sol = solve_stringing(
+        ModuleArrays.from_items(modules), InverterArrays.from_items(inverters),
+        SiteArrays.from_values(tmins), target_kw_stc=7.5,
+    )
+    got = {(int(sol.module[k]), int(sol.inverter[k]), int(sol.site[k])): k for k in sol.best_per_combo()}
+    checked = 0
+    for m, mod in enumerate(modules):
+        for i, inv in enumerate(inverters):
+            for s, tmin in enumerate(tmins):
+                expected = _scalar_best(mod, inv, tmin, max(1, round(7500 / mod["p_W"])), (2, 24), 0.02)
+                if expected is None:
+                    assert (m, i, s) not in got
+                    continue
+                k = got[(m, i, s)]
+                assert (int(sol.series[k]), int(sol.parallel[k]), int(sol.mppt_inputs[k])) == expected
+                checked += 1
+    assert checked > 100
+
+
+def test_solution_records_and_allocation():
+    inv = {"max_system_vdc": 600, "mppt_windows": [{"v_min": 200, "v_max": 550, "count": 2}]}
+    mod = {"p_W": 400, "voc": 49.5, "vmp": 41.5, "beta_voc_pct_per_C": -0.28}
+    sol = solve_stringing(
+        ModuleArrays.from_items([mod]), InverterArrays.from_items([inv]),
+        SiteArrays.from_values(-10), target_kw_stc=5.0, series_range=(4, 19),
+    )
+    rec = sol.record(int(sol.best_per_combo()[0]))
+    assert rec["series"] == 10 and rec["parallel"] == 2
+    assert rec["mppt_allocation"] == [1, 1]
+    assert rec["voc_cold_string_V"] == round(voc_at_temp(49.5, -0.28, -10) * 10, 2)
+
+    # Hot-site Vmp drop pushes short strings below the MPPT floor
+    hot = solve_stringing(
+        ModuleArrays.from_items([mod]), InverterArrays.from_items([inv]),
+        SiteArrays.from_values(-10, tmax_C=70), n_modules=12, series_range=(4, 19),
+    )
+    assert hot.series.min() > sol.series.min()
+    assert len(solve_stringing(
+        ModuleArrays.from_items([mod]), InverterArrays.from_items([dict(inv, max_system_vdc=100)]),
+        SiteArrays.from_values(-10), n_modules=12,
+    )) == 0
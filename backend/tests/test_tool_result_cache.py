@@ -0,0 +1,109 @@
+"""
+Content-addressed tool result cache: id rebinding, eviction, disk tier and
+batched partial misses.
+"""
+import importlib.util
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.tools import electrical_v2, ocp_dc  # noqa: E402
+from backend.tools._result_cache import ToolResultCache, code_version, input_key  # noqa: E402
+
+
+def _ocp(rid, sid="s1", strings=3):
+    return ocp_dc.SelectOcpDcInput(
+        session_id=sid, request_id=rid, strings_parallel=strings, module=ocp_dc.Module(isc=11.2)
+    )
+
+
+def test_hits_rebind_ids_and_match_recompute():
+    cache = ToolResultCache(max_entries=8, max_bytes=1 << 20)
+    calls = []
+
+    @cache.memoize("select_ocp_dc")
+    def tool(inp):
+        calls.append(inp.request_id)
+        return ocp_dc.select_ocp_dc.uncached(inp)
+
+    assert input_key("t", _ocp("a", "s1")) == input_key("t", _ocp("b", "s2"))
+    assert input_key("t", _ocp("a")) != input_key("t", _ocp("a", strings=4))
+
+    first = tool(_ocp("req-1"))
+    again = tool(_ocp("req-2", sid="other"))
+    assert len(calls) == 1
+    assert again.model_dump() == ocp_dc.select_ocp_dc.uncached(_ocp("req-2")).model_dump()
+    assert first.patch_id == "patch:req-1" and again.operations[0].op_id == "req-2:ann:ocpdc"
+    assert again.operations[0].value["id"] == "ann:ocpdc:req-2"
+    # Ids needing JSON escaping survive the round trip
+    quoted = tool(_ocp('q"\\x'))
+    assert quoted.patch_id == 'patch:q"\\x'
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 1 and stats["hit_rate"] == round(2 / 3, 4)
+
+
+def test_eviction_disk_tier_and_batch(tmp_path):
+    cache = ToolResultCache(max_entries=2, max_bytes=1 << 20, disk_dir=tmp_path)
+    tool = cache.memoize("select_ocp_dc")(ocp_dc.select_ocp_dc.uncached)
+    for n in (3, 4, 5):
+        tool(_ocp("r", strings=n))
+    assert cache.stats()["entries"] == 2 and cache.stats()["evictions"] == 1
+    tool(_ocp("r", strings=3))  # evicted from memory, served from disk
+    assert cache.stats()["disk_hits"] == 1
+
+    small = ToolResultCache(max_entries=100, max_bytes=500)
+    small.memoize("select_ocp_dc")(ocp_dc.select_ocp_dc.uncached)(_ocp("r"))
+    small.memoize("select_ocp_dc")(ocp_dc.select_ocp_dc.uncached)(_ocp("r", strings=4))
+    assert small.stats()["bytes"] <= 500 and small.stats()["evictions"] >= 1
+
+    sized = []
+
+    def batch(inputs):
+        sized.append(len(inputs))
+        return electrical_v2.select_conductors_v2_batch.uncached(inputs)
+
+    cached_batch = ToolResultCache(disk_dir=None).memoize_batch("select_conductors_v2")(batch)
+
+    def circuit(rid, amps):
+        return electrical_v2.SelectConductorsV2Input(
+            session_id="s", request_id=rid, circuit_kind="ac_feeder", current_A=amps, length_m=20, system_v=240
+        )
+
+    cached_batch([circuit("a", 10), circuit("b", 20)])
+    out = cached_batch([circuit("c", 20), circuit("d", 30), circuit("e", 30)])
+    assert sized == [2, 1]  # only the new current was sized, once
+    expected = electrical_v2.select_conductors_v2_batch.uncached([circuit("c", 20), circuit("d", 30), circuit("e", 30)])
+    assert [p.model_dump() for p in out] == [p.model_dump() for p in expected]
+
+
+TOOL_SOURCE = """
+from backend.tools import ocp_dc
+
+
+def tool(inp):
+    patch = ocp_dc.select_ocp_dc.uncached(inp)
+    patch.operations[0].value["attrs"]["build"] = {build!r}
+    return patch
+"""
+
+
+def _tool_module(path, build):
+    path.write_text(TOOL_SOURCE.format(build=build))
+    spec = importlib.util.spec_from_file_location(f"cached_tool_{build}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.tool
+
+
+def test_editing_a_tool_retires_its_disk_entries(tmp_path):
+    old = _tool_module(tmp_path / "old.py", "v1")
+    new = _tool_module(tmp_path / "new.py", "v2")
+    assert code_version(old) != code_version(new)
+    assert code_version(old) == code_version(_tool_module(tmp_path / "same.py", "v1"))
+
+    # Same tool name and disk directory, as across a deploy
+    before = ToolResultCache(disk_dir=tmp_path / "cache").memoize("select_ocp_dc")(old)
+    after = ToolResultCache(disk_dir=tmp_path / "cache").memoize("select_ocp_dc")(new)
+    assert before(_ocp("r")).operations[0].value["attrs"]["build"] == "v1"
+    assert after(_ocp("r")).operations[0].value["attrs"]["build"] == "v2"
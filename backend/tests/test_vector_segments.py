@@ -0,0 +1,88 @@
+"""
+Segment-file persistence for EnterpriseVectorStore: batched appends, torn-tail
+recovery, compaction and migration from the legacy JSON store.
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.ai.vector_segments import SegmentStore  # noqa: E402
+from backend.ai.vector_store import (  # noqa: E402
+    DesignCategory,
+    DesignMetadata,
+    EnterpriseVectorStore,
+)
+
+
+def _meta(power):
+    return DesignMetadata(
+        system_type="grid_tied", power_rating=power, voltage_class="LV",
+        component_count=1, connection_count=0, compliance_codes=["NEC_2020"],
+        geographical_region="US", installation_type="rooftop",
+        design_category=DesignCategory.RESIDENTIAL_PV, performance_metrics={},
+        creation_timestamp=time.time(),
+    )
+
+
+def _graph(panels):
+    nodes = {f"p{i}": {"type": "panel", "attrs": {"power": 400}} for i in range(panels)}
+    nodes["inv"] = {"type": "inverter", "attrs": {"power": 5000}}
+    return {"nodes": nodes, "edges": [{"source": f"p{i}", "target": "inv", "kind": "dc"} for i in range(panels)]}
+
+
+def test_batched_appends_and_torn_tail_recovery(tmp_path):
+    seg = SegmentStore(tmp_path / "s", dim=4, flush_every=3)
+    seg.open()
+    for i in range(5):
+        seg.append({"i": i}, f"blob{i}".encode(), np.full(4, i, dtype=np.float32))
+    # Three records were flushed as one batch, two are still buffered
+    assert len(seg.embeddings) == 3
+    assert seg.read_blob(seg.refs[4]) == b"blob4"
+    seg.flush()
+
+    # Simulate a crash mid-flush: a half-written record and an extra row
+    with open(tmp_path / "s" / "rec-0.log", "ab") as f:
+        f.write(b"\x10\x00\x00\x00garbage")
+    with open(tmp_path / "s" / "emb-0.f32", "ab") as f:
+        f.write(np.ones(4, dtype=np.float32).tobytes())
+
+    reopened = SegmentStore(tmp_path / "s", dim=4)
+    refs = reopened.open()
+    assert [r.meta["i"] for r in refs] == [0, 1, 2, 3, 4]
+    assert reopened.embeddings.shape == (5, 4) and reopened.embeddings[4][0] == 4
+    assert reopened.read_blob(refs[2]) == b"blob2"
+
+    refs = reopened.compact([({"i": 9}, b"x", None)])
+    assert [r.meta["i"] for r in refs] == [9]
+    assert sorted(p.name for p in (tmp_path / "s").iterdir()) == ["emb-1.f32", "manifest.json", "rec-1.log"]
+
+
+def test_store_reloads_lazily_and_migrates_json(tmp_path):
+    legacy = tmp_path / "vs.json"
+    old = EnterpriseVectorStore(store_path=str(tmp_path / "seed.json"))
+    pid = old.store_design(_graph(3), _meta(3.0))
+    pattern = old.patterns[pid]
+    meta = dict(pattern.metadata.__dict__, design_category=pattern.metadata.design_category.value)
+    legacy.write_text(json.dumps({"patterns": [{
+        "pattern_id": pid, "graph_data": pattern.graph_data, "metadata": meta,
+        "embedding": pattern.embedding, "similarity_hash": pattern.similarity_hash,
+    }]}))
+
+    store = EnterpriseVectorStore(store_path=str(legacy))
+    assert list(store.patterns) == [pid]
+    store.store_design(_graph(5), _meta(5.0))
+    store.flush()
+
+    reloaded = EnterpriseVectorStore(store_path=str(legacy))
+    assert len(reloaded.patterns) == 2
+    assert reloaded.patterns._loaded == {}  # graphs are read on demand
+    results = reloaded.search_similar(_graph(3), top_k=1, min_similarity=0.0)
+    assert results[0].pattern.pattern_id == pid
+    assert results[0].pattern.graph_data == _graph(3)
+    assert np.allclose(results[0].pattern.embedding, pattern.embedding)
+    assert reloaded.get_statistics()["total_patterns"] == 2
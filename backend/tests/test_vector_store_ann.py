@@ -0,0 +1,113 @@
+"""
+ANN retrieval for EnterpriseVectorStore: IVF index accuracy and metadata
+pre-filtering through inverted indexes.
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.ai.ann_index import IVFFlatIndex  # noqa: E402
+from backend.ai.vector_store import (  # noqa: E402
+    DesignCategory,
+    DesignMetadata,
+    EnterpriseVectorStore,
+    get_enterprise_vector_store,
+    retrieve_similar,
+    store_design_pattern,
+)
+
+
+def _unit_rows(rng, n, dim):
+    centers = rng.normal(size=(20, dim))
+    x = centers[rng.integers(0, 20, n)] + 0.5 * rng.normal(size=(n, dim))
+    return (x / np.linalg.norm(x, axis=1, keepdims=True)).astype(np.float32)
+
+
+def test_ivf_matches_exact_search_closely():
+    rng = np.random.default_rng(0)
+    x = _unit_rows(rng, 3000, 32)
+    index = IVFFlatIndex(32, train_threshold=500, exact_threshold=100)
+    index.add(x[:2000])
+    index.search(x[0], 10)
+    assert index.centroids is None  # queries never train; untrained is exact
+    assert index.maybe_train() and not index.maybe_train()
+    index.add(x[2000:])  # assigned incrementally to the trained lists
+    assert not index.needs_training
+    recall = 0.0
+    for q in x[rng.integers(0, 3000, 20)]:
+        rows, scores = index.search(q, 10)
+        assert list(scores) == sorted(scores, reverse=True)
+        exact = set(np.argsort(-(x @ q))[:10])
+        recall += len(exact & set(rows)) / 10
+    assert index.centroids is not None
+    assert recall / 20 >= 0.9
+
+    cand = np.arange(0, 3000, 7)
+    rows, _ = index.search(x[5], 5, candidates=cand, min_score=0.0)
+    assert set(rows) <= set(cand)
+
+
+def _meta(system_type, category, region, power, ts):
+    return DesignMetadata(
+        system_type=system_type,
+        power_rating=power,
+        voltage_class="LV",
+        component_count=2,
+        connection_count=1,
+        compliance_codes=["NEC_2020"] if region == "US" else ["IEC_60364"],
+        geographical_region=region,
+        installation_type="rooftop",
+        design_category=category,
+        performance_metrics={},
+        creation_timestamp=ts,
+    )
+
+
+def _graph(panels, inverters=1):
+    nodes = {f"p{i}": {"type": "panel", "attrs": {"power": 400}} for i in range(panels)}
+    nodes.update({f"i{i}": {"type": "inverter", "attrs": {"power": 5000}} for i in range(inverters)})
+    edges = [{"source": f"p{i}", "target": "i0", "kind": "dc"} for i in range(panels)]
+    return {"nodes": nodes, "edges": edges}
+
+
+def test_filtered_search_uses_metadata_indexes(tmp_path):
+    store = EnterpriseVectorStore(store_path=str(tmp_path / "vs.json"))
+    for i in range(1, 9):
+        region = "US" if i % 2 else "EU"
+        category = DesignCategory.RESIDENTIAL_PV if i < 5 else DesignCategory.COMMERCIAL_PV
+        store.store_design(_graph(i), _meta("grid_tied", category, region, float(i), time.time() + i))
+
+    results = store.search_similar(
+        _graph(3), top_k=3, min_similarity=0.0,
+        filters={"region": "US", "design_category": DesignCategory.RESIDENTIAL_PV},
+    )
+    assert [r.pattern.metadata.power_rating for r in results] == [3.0, 1.0]
+    assert results[0].similarity_score >= results[1].similarity_score
+    assert set(results[0].match_factors) == {"component_types", "scale_similarity", "connection_patterns"}
+
+    results = store.search_similar(_graph(6), top_k=10, min_similarity=0.0, filters={"power_range": (5, 7)})
+    assert sorted(r.pattern.metadata.power_rating for r in results) == [5.0, 6.0, 7.0]
+
+    # Reloading rebuilds the same index from disk; duplicates resolve by hash
+    store.flush()
+    reloaded = EnterpriseVectorStore(store_path=str(tmp_path / "vs.json"))
+    assert reloaded.ann_index.size == 8
+    existing = next(p.pattern_id for p in reloaded.patterns.values() if p.metadata.power_rating == 2.0)
+    assert reloaded.store_design(_graph(2), _meta("grid_tied", DesignCategory.RESIDENTIAL_PV, "EU", 2.0, 0)) == existing
+    assert len(reloaded.patterns) == 8
+
+
+def test_convenience_functions_share_one_store_per_path(tmp_path):
+    path = str(tmp_path / "shared.json")
+    store = get_enterprise_vector_store(path)
+    assert get_enterprise_vector_store(path) is store
+    assert get_enterprise_vector_store(str(tmp_path / "other.json")) is not store
+
+    pattern_id = store_design_pattern(_graph(4), "grid_tied", 4.0, store_path=path)
+    assert pattern_id in store.patterns
+    [(graph, meta)] = retrieve_similar(_graph(4), top_n=1, store_path=path)
+    assert meta["power_rating"] == 4.0 and set(graph["nodes"]) == set(_graph(4)["nodes"])
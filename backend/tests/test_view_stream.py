@@ -0,0 +1,104 @@
+"""
+Per-layer view deltas computed from applied patches, and the SSE stream that
+pushes them (with snapshot fallback on resume gaps).
+"""
+import asyncio
+import json
+import sys
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from backend.odl.deltas import build_change, layer_delta  # noqa: E402
+from backend.odl.events import ODLEventBus  # noqa: E402
+from backend.odl.patches import apply_patch  # noqa: E402
+from backend.odl.schemas import ODLEdge, ODLGraph, ODLNode, ODLPatch, PatchOp  # noqa: E402
+
+
+def _patch(*ops) -> ODLPatch:
+    return ODLPatch(patch_id=str(uuid4()), operations=[PatchOp(op_id=str(uuid4()), op=o, value=v) for o, v in ops])
+
+
+def _graph() -> ODLGraph:
+    nodes = {
+        "p1": ODLNode(id="p1", type="panel", attrs={"layer": "single-line"}),
+        "p2": ODLNode(id="p2", type="panel", attrs={"layer": "single-line"}),
+        "r1": ODLNode(id="r1", type="rail", attrs={"layer": "structural"}),
+    }
+    edges = [ODLEdge(id="e1", source_id="p1", target_id="p2", kind="dc_string")]
+    return ODLGraph(session_id="s", version=3, nodes=nodes, edges=edges)
+
+
+def _delta(before: ODLGraph, patch: ODLPatch, layer: str) -> dict:
+    after, _ = apply_patch(before, patch, {})
+    after.version = before.version + 1
+    return layer_delta(build_change(before, after, patch), layer)
+
+
+def test_layer_delta_only_reports_the_touched_layer():
+    d = _delta(_graph(), _patch(
+        ("update_node", {"id": "p1", "attrs": {"x": 10}}),
+        ("add_node", {"id": "r2", "type": "rail", "attrs": {"layer": "structural"}}),
+    ), "single-line")
+    assert (d["from_version"], d["version"]) == (3, 4)
+    assert [n["id"] for n in d["nodes"]["updated"]] == ["p1"]
+    assert d["nodes"]["added"] == [] and d["edges"] == {"added": [], "updated": [], "removed": []}
+
+
+def test_layer_move_carries_incident_edges():
+    d = _delta(_graph(), _patch(("update_node", {"id": "p2", "attrs": {"layer": "structural"}})), "single-line")
+    assert d["nodes"]["removed"] == ["p2"]
+    assert d["edges"]["removed"] == ["e1"]
+
+    s = _delta(_graph(), _patch(("update_node", {"id": "p2", "attrs": {"layer": "structural"}})), "structural")
+    assert [n["id"] for n in s["nodes"]["added"]] == ["p2"]
+    assert s["edges"]["added"] == []  # p1 is still single-line only
+
+
+def test_remove_node_removes_edges_from_view():
+    d = _delta(_graph(), _patch(("remove_node", {"id": "p1"})), "single-line")
+    assert d["nodes"]["removed"] == ["p1"]
+    assert d["edges"]["removed"] == ["e1"]
+
+
+def _events(frames):
+    return [json.loads(f.split("data: ", 1)[1]) for f in frames]
+
+
+@pytest.mark.asyncio
+async def test_stream_pushes_deltas_and_falls_back_to_snapshot():
+    from backend.api.routes.odl import _view_event_stream
+    from backend.database.session import SessionMaker
+    from backend.odl.store import ODLStore
+
+    sid = f"stream-{uuid4()}"
+    store = ODLStore()
+    async with SessionMaker() as db:
+        await store.init_schema(db)
+        await store.create_graph(db, sid)
+        await store.apply_patch_cas(db, sid, 1, _patch(("add_node", {"id": "n1", "type": "panel"})))
+
+    # Resume from v1: history bridges the gap -> one delta, no snapshot
+    gen = _view_event_stream(sid, "single-line", since=1, heartbeat=0.05)
+    hello, first = _events([await gen.__anext__(), await gen.__anext__()])
+    assert hello["type"] == "hello" and hello["version"] == 2
+    assert first["type"] == "delta" and [n["id"] for n in first["nodes"]["added"]] == ["n1"]
+
+    # Live push
+    async with SessionMaker() as db:
+        await store.apply_patch_cas(db, sid, 2, _patch(("update_node", {"id": "n1", "attrs": {"x": 5}})))
+    live = _events([await gen.__anext__()])[0]
+    assert live["type"] == "delta" and live["version"] == 3
+    assert live["nodes"]["updated"][0]["attrs"] == {"x": 5}
+    await gen.aclose()
+
+    # Too old for the retained history -> full snapshot
+    ODLEventBus.reset()
+    gen = _view_event_stream(sid, "single-line", since=1, heartbeat=0.05)
+    _, snap = _events([await gen.__anext__(), await gen.__anext__()])
+    assert snap["type"] == "snapshot" and snap["version"] == 3
+    assert [n["id"] for n in snap["view"]["nodes"]] == ["n1"]
+    await gen.aclose()
@@ -0,0 +1,43 @@
+"""Process-wide memo for parsed data files, invalidated on file change."""
+from __future__ import annotations
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_lock = threading.Lock()
+_entries: Dict[Tuple[Path, str], Tuple[Tuple[int, int], Any]] = {}
+
+
+def file_stamp(path: Path) -> Tuple[int, int]:
+    """``(mtime_ns, size)`` of `path`; changes whenever the file is rewritten."""
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def load_cached(path: Path, parse: Callable[[Path], T], kind: str = "") -> T:
+    """Return ``parse(path)``, re-parsing only when the file's mtime or size changes.
+
+    `kind` separates different parsed views of the same file.  Raises
+    ``FileNotFoundError`` like a plain read when the file is missing.
+    """
+    key = (Path(path), kind)
+    stamp = file_stamp(key[0])
+    with _lock:
+        hit = _entries.get(key)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+    value = parse(key[0])
+    with _lock:
+        _entries[key] = (stamp, value)
+    return value
+
+
+def clear_cache() -> None:
+    """Drop every memoized file (tests, or after bulk edits within one mtime tick)."""
+    with _lock:
+        _entries.clear()
+
+
+__all__ = ["file_stamp", "load_cached", "clear_cache"]
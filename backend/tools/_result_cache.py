@@ -0,0 +1,322 @@
+"""
+Content-addressed result cache for deterministic tools.
+
+A pure tool's patch depends only on its input, apart from ``request_id`` and
+``session_id``, which merely scope op_ids and annotation ids.  The cache key is
+a SHA-256 over the tool name, a code version, any extra key material (e.g.
+the standards-profile file a tool reads) and the canonical JSON of the input
+with those two fields excluded.  The code version is a hash of the source of
+the module defining the tool, taken when it is decorated, so editing a tool
+retires its cached results (on disk too) at the next deploy.
+
+On a miss the tool runs with placeholder ids and the serialized patch is
+stored; every call (hit or miss) substitutes the caller's ids back in, so a
+hit is byte-identical to recomputation.  Memory is a bounded LRU (entries and
+serialized bytes); an optional directory adds a persistent tier that survives
+restarts and is shared between worker processes.
+
+Environment:
+  TOOL_RESULT_CACHE            "0" disables caching (default on)
+  TOOL_RESULT_CACHE_ENTRIES    memory entry bound (default 4096)
+  TOOL_RESULT_CACHE_BYTES      memory byte bound (default 32 MiB)
+  TOOL_RESULT_CACHE_DIR        enables the on-disk tier
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import marshal
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from pydantic import BaseModel
+
+from backend.odl.schemas import ODLPatch
+from backend.observability.metrics import (
+    tool_result_cache_bytes,
+    tool_result_cache_evictions,
+    tool_result_cache_hits,
+    tool_result_cache_misses,
+)
+
+logger = logging.getLogger(__name__)
+
+# Stand-ins for the caller's ids while computing a cacheable result
+_RID = "__cached_request_id__"
+_SID = "__cached_session_id__"
+_SCOPE_FIELDS = {"request_id", "session_id"}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def code_version(fn: Callable[..., Any]) -> str:
+    """Hash of the source of the module defining `fn` (its bytecode when the
+    source is unavailable)."""
+    try:
+        module = inspect.getmodule(fn)
+        blob = inspect.getsource(module if module is not None else fn).encode("utf-8")
+    except (OSError, TypeError):
+        code = getattr(inspect.unwrap(fn), "__code__", None)
+        blob = marshal.dumps(code) if code is not None else repr(fn).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+def input_key(tool: str, inp: BaseModel, version: str = "1", extra: Any = None) -> str:
+    """Canonical hash of a tool input, ignoring request/session scope."""
+    body = inp.model_dump(mode="json", exclude=_SCOPE_FIELDS)
+    blob = json.dumps(
+        {"tool": tool, "version": version, "extra": extra, "input": body},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ToolResultCache:
+    """LRU of serialized tool patches bounded by entry count and bytes."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        disk_dir: Optional[str | Path] = None,
+        enabled: Optional[bool] = None,
+    ) -> None:
+        self.max_entries = _env_int("TOOL_RESULT_CACHE_ENTRIES", 4096) if max_entries is None else max_entries
+        self.max_bytes = _env_int("TOOL_RESULT_CACHE_BYTES", 32 << 20) if max_bytes is None else max_bytes
+        if disk_dir is None:
+            disk_dir = os.getenv("TOOL_RESULT_CACHE_DIR") or None
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if enabled is None:
+            enabled = os.getenv("TOOL_RESULT_CACHE", "1").lower() not in ("0", "false", "no")
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._per_tool: Dict[str, List[int]] = {}  # tool -> [hits, misses]
+
+    # ---- storage tiers ----
+    def _disk_path(self, key: str) -> Optional[Path]:
+        return self.disk_dir / key[:2] / f"{key}.json" if self.disk_dir else None
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        path = self._disk_path(key)
+        if path is None:
+            return None
+        try:
+            return path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Tool cache read failed for {path}: {e}")
+            return None
+
+    def _write_disk(self, key: str, payload: str) -> None:
+        path = self._disk_path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(payload, encoding="utf-8")
+            os.replace(tmp, path)  # atomic: readers never see a partial file
+        except OSError as e:
+            logger.warning(f"Tool cache write failed for {path}: {e}")
+
+    def _remember(self, key: str, payload: str) -> None:
+        size = len(payload)
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        evicted = 0
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = payload
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, dropped = self._entries.popitem(last=False)
+                self._bytes -= len(dropped)
+                evicted += 1
+            self.evictions += evicted
+            total = self._bytes
+        try:
+            if evicted:
+                tool_result_cache_evictions.inc(evicted)
+            tool_result_cache_bytes.set(total)
+        except Exception:  # pragma: no cover
+            pass
+
+    def _count(self, tool: str, tier: Optional[str]) -> None:
+        with self._lock:
+            counts = self._per_tool.setdefault(tool, [0, 0])
+            if tier is None:
+                self.misses += 1
+                counts[1] += 1
+            else:
+                self.hits += 1
+                self.disk_hits += tier == "disk"
+                counts[0] += 1
+        try:
+            if tier is None:
+                tool_result_cache_misses.labels(tool=tool).inc()
+            else:
+                tool_result_cache_hits.labels(tool=tool, tier=tier).inc()
+        except Exception:  # pragma: no cover
+            pass
+
+    def get(self, tool: str, key: str) -> Optional[str]:
+        """Serialized result for `key` from memory, then disk, or None."""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+        tier = "memory" if payload is not None else None
+        if payload is None:
+            payload = self._read_disk(key)
+            if payload is not None:
+                tier = "disk"
+                self._remember(key, payload)
+        self._count(tool, tier)
+        return payload
+
+    def put(self, key: str, payload: str) -> None:
+        self._remember(key, payload)
+        self._write_disk(key, payload)
+
+    def clear(self, disk: bool = False) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if disk and self.disk_dir is not None:
+            for path in self.disk_dir.glob("*/*.json"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "tools": {t: {"hits": h, "misses": m} for t, (h, m) in self._per_tool.items()},
+            }
+
+    # ---- tool adapters ----
+    def _keyed(self, tool, version, extra, inp) -> str:
+        return input_key(tool, inp, version, extra(inp) if extra else None)
+
+    @staticmethod
+    def _version(fn: Callable[..., Any], version: Optional[str]) -> str:
+        derived = code_version(fn)
+        return derived if version is None else f"{derived}:{version}"
+
+    def memoize(
+        self,
+        tool: str,
+        version: Optional[str] = None,
+        extra: Optional[Callable[[Any], Any]] = None,
+    ) -> Callable[[Callable[[Any], ODLPatch]], Callable[[Any], ODLPatch]]:
+        """Decorate ``fn(inp) -> ODLPatch``; `extra(inp)` adds key material and
+        `version` salts the derived code version (for changes to helpers in
+        other modules)."""
+
+        def wrap(fn: Callable[[Any], ODLPatch]) -> Callable[[Any], ODLPatch]:
+            version_ = self._version(fn, version)
+
+            @functools.wraps(fn)
+            def cached(inp):
+                if not self.enabled:
+                    return fn(inp)
+                key = self._keyed(tool, version_, extra, inp)
+                payload = self.get(tool, key)
+                if payload is None:
+                    payload = fn(_placeholder(inp)).model_dump_json()
+                    self.put(key, payload)
+                return _rebind(payload, inp)
+
+            cached.uncached = fn  # type: ignore[attr-defined]
+            return cached
+
+        return wrap
+
+    def memoize_batch(
+        self,
+        tool: str,
+        version: Optional[str] = None,
+        extra: Optional[Callable[[Any], Any]] = None,
+    ) -> Callable[[Callable[[Sequence[Any]], List[ODLPatch]]], Callable[[Sequence[Any]], List[ODLPatch]]]:
+        """Decorate ``fn(inputs) -> patches``; only missed inputs are computed,
+        in a single call, so vectorized tools keep their batching."""
+
+        def wrap(fn):
+            version_ = self._version(fn, version)
+
+            @functools.wraps(fn)
+            def cached(inputs):
+                if not self.enabled:
+                    return fn(inputs)
+                keys = [self._keyed(tool, version_, extra, inp) for inp in inputs]
+                payloads: List[Optional[str]] = []
+                first_miss: Dict[str, int] = {}
+                for key in keys:
+                    # Duplicate inputs within one batch are computed once
+                    payloads.append(None if key in first_miss else self.get(tool, key))
+                    if payloads[-1] is None:
+                        first_miss.setdefault(key, len(payloads) - 1)
+                if first_miss:
+                    todo = list(first_miss.items())
+                    fresh = fn([_placeholder(inputs[i]) for _, i in todo])
+                    computed = {key: patch.model_dump_json() for (key, _), patch in zip(todo, fresh)}
+                    for key, payload in computed.items():
+                        self.put(key, payload)
+                    payloads = [p if p is not None else computed[k] for p, k in zip(payloads, keys)]
+                return [_rebind(p, inp) for p, inp in zip(payloads, inputs)]
+
+            cached.uncached = fn  # type: ignore[attr-defined]
+            return cached
+
+        return wrap
+
+
+def _placeholder(inp: BaseModel) -> BaseModel:
+    return inp.model_copy(update={"request_id": _RID, "session_id": _SID})
+
+
+def _json_str(s: str) -> str:
+    return json.dumps(s)[1:-1]
+
+
+def _rebind(payload: str, inp: Any) -> ODLPatch:
+    text = payload.replace(_RID, _json_str(inp.request_id)).replace(_SID, _json_str(inp.session_id))
+    return ODLPatch.model_validate_json(text)
+
+
+# Process-wide cache shared by every memoized tool.
+tool_cache = ToolResultCache()
+
+
+__all__ = ["ToolResultCache", "code_version", "input_key", "tool_cache"]
@@ -1,8 +1,13 @@
 from __future__ import annotations
 import json
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+
+from backend.tools._file_cache import load_cached
 
 
 CAT_DIR = Path(__file__).parent / "data" / "catalog"
@@ -31,17 +36,112 @@ class InverterItem:
     mppt_windows: List[Dict[str, float]]
 
 
+class ModuleCatalog:
+    """Parsed module catalog: items in file order plus column arrays and a wattage index.
+
+    Instances are shared process-wide; treat items and arrays as read-only.
+    """
+
+    def __init__(self, items: List[ModuleItem]):
+        self.items: Tuple[ModuleItem, ...] = tuple(items)
+        col = lambda name: np.array([float(getattr(m, name)) for m in items])  # noqa: E731
+        self.p_W = col("p_W")
+        self.voc = col("voc")
+        self.vmp = col("vmp")
+        self.isc = col("isc")
+        self.imp = col("imp")
+        self.beta_voc_pct_per_C = col("beta_voc_pct_per_C")
+        # Stable sort: equal wattages keep file order
+        self._by_power = np.argsort(self.p_W, kind="stable")
+        self._sorted_W = self.p_W[self._by_power].tolist()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def nearest_power(self, target_W: float) -> ModuleItem:
+        """Module whose p_W is closest to `target_W`; ties go to the earlier catalog entry."""
+        if not self.items:
+            raise IndexError("module catalog is empty")
+        sw = self._sorted_W
+        pos = bisect_left(sw, target_W)
+        best = None
+        if pos < len(sw):
+            best = int(self._by_power[pos])
+        if pos > 0:
+            # First entry of the run of equal wattages just below the target
+            lo = int(self._by_power[bisect_left(sw, sw[pos - 1])])
+            if best is None:
+                best = lo
+            else:
+                d_lo, d_hi = abs(self.p_W[lo] - target_W), abs(self.p_W[best] - target_W)
+                if d_lo < d_hi or (d_lo == d_hi and lo < best):
+                    best = lo
+        return self.items[best]
+
+
+class InverterCatalog:
+    """Parsed inverter catalog with an AC-rating index for kW-window lookups."""
+
+    def __init__(self, items: List[InverterItem]):
+        self.items: Tuple[InverterItem, ...] = tuple(items)
+        self.ac_kW = np.array([float(i.ac_kW) for i in items])
+        self.max_system_vdc = np.array([float(i.max_system_vdc) for i in items])
+        self._by_kw = np.argsort(self.ac_kW, kind="stable")
+        self._sorted_kW = self.ac_kW[self._by_kw].tolist()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def smallest_at_least(self, kw: float) -> InverterItem:
+        """Smallest inverter rated >= `kw`, else the largest one."""
+        if not self.items:
+            raise IndexError("inverter catalog is empty")
+        pos = bisect_left(self._sorted_kW, kw)
+        if pos == len(self._sorted_kW):
+            # Largest rating; the last of equal-rated entries, as a stable sort would give
+            return self.items[int(self._by_kw[-1])]
+        return self.items[int(self._by_kw[pos])]
+
+    def in_window(self, lo_kW: float, hi_kW: float) -> List[InverterItem]:
+        """Inverters with ``lo_kW <= ac_kW <= hi_kW``, smallest first."""
+        a = bisect_left(self._sorted_kW, lo_kW)
+        b = bisect_right(self._sorted_kW, hi_kW)
+        return [self.items[int(i)] for i in self._by_kw[a:b]]
+
+
 def _load(path: Path) -> List[Dict[str, Any]]:
     return json.loads(path.read_text())
 
 
+def module_catalog() -> ModuleCatalog:
+    """Memoized module catalog, re-parsed when modules.json changes."""
+    return load_cached(
+        CAT_DIR / "modules.json", lambda p: ModuleCatalog([ModuleItem(**x) for x in _load(p)]), "modules"
+    )
+
+
+def inverter_catalog() -> InverterCatalog:
+    """Memoized inverter catalog, re-parsed when inverters.json changes."""
+    return load_cached(
+        CAT_DIR / "inverters.json", lambda p: InverterCatalog([InverterItem(**x) for x in _load(p)]), "inverters"
+    )
+
+
 def load_modules() -> List[ModuleItem]:
-    return [ModuleItem(**x) for x in _load(CAT_DIR / "modules.json")]
+    return list(module_catalog().items)
 
 
 def load_inverters() -> List[InverterItem]:
-    return [InverterItem(**x) for x in _load(CAT_DIR / "inverters.json")]
-
+    return list(inverter_catalog().items)
 
-__all__ = ["ModuleItem", "InverterItem", "load_modules", "load_inverters"]
 
+__all__ = [
+    "ModuleItem",
+    "InverterItem",
+    "ModuleCatalog",
+    "InverterCatalog",
+    "module_catalog",
+    "inverter_catalog",
+    "load_modules",
+    "load_inverters",
+]
@@ -0,0 +1,224 @@
+"""Vectorized conductor-sizing kernel.
+
+Sizes C circuits against a K-row conductor table in one NumPy pass: derated
+ampacity and voltage drop are computed as ``(C, K)`` matrices and the chosen
+size per circuit is the first table row (smallest first) that satisfies both.
+Fallback policies differ between callers, so the raw masks are returned
+alongside the choice.
+
+Derating factors (ambient temperature, conductor grouping), default
+voltage-drop limits and resistivity come from a standards profile and are
+held as sorted arrays, memoized per profile file.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from math import sqrt
+from typing import Dict, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from backend.tools._file_cache import load_cached
+from backend.tools.standards_profiles import PROFILES_DIR, StandardsProfile, load_profile
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+# Base ampacity (A) and DC resistance of copper (ohm/km) for common AWG/kcmil sizes
+AWG_AMPACITY_A: Dict[str, float] = {
+    "14AWG": 20,
+    "12AWG": 25,
+    "10AWG": 35,
+    "8AWG": 50,
+    "6AWG": 65,
+    "4AWG": 85,
+    "2AWG": 115,
+    "1/0": 150,
+    "2/0": 175,
+    "3/0": 200,
+    "4/0": 230,
+}
+AWG_OHM_PER_KM_CU: Dict[str, float] = {
+    "14AWG": 8.286,
+    "12AWG": 5.211,
+    "10AWG": 3.277,
+    "8AWG": 2.061,
+    "6AWG": 1.296,
+    "4AWG": 0.815,
+    "2AWG": 0.513,
+    "1/0": 0.324,
+    "2/0": 0.257,
+    "3/0": 0.204,
+    "4/0": 0.162,
+}
+CU_RESISTIVITY = 0.018  # ohm*mm2/m, the reference for AWG_OHM_PER_KM_CU
+
+# Voltage drop = factor * I * R * L: out-and-back for DC and 1ph, sqrt(3) for 3ph
+PHASE_FACTOR: Dict[str, float] = {"dc": 2.0, "1ph": 2.0, "3ph": sqrt(3)}
+
+
+@dataclass(frozen=True)
+class ConductorTable:
+    """Candidate conductors in selection order (smallest first)."""
+    sizes: Tuple[str, ...]
+    ampacity_A: np.ndarray  # (K,)
+    ohm_per_km: np.ndarray  # (K,)
+
+    @classmethod
+    def from_mappings(
+        cls,
+        ampacity_A: Mapping[str, float],
+        ohm_per_km: Mapping[str, float],
+        scale_ohm: float = 1.0,
+    ) -> "ConductorTable":
+        """Rows in `ampacity_A` order; every size must have a resistance."""
+        sizes = tuple(ampacity_A)
+        return cls(
+            sizes,
+            np.array([float(ampacity_A[s]) for s in sizes]),
+            np.array([float(ohm_per_km[s]) * scale_ohm for s in sizes]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+
+@lru_cache(maxsize=64)
+def awg_table(
+    ampacity_items: Optional[Tuple[Tuple[str, float], ...]] = None,
+    resistivity: float = CU_RESISTIVITY,
+) -> ConductorTable:
+    """AWG table (default ampacities unless given as items), with copper
+    resistances scaled to `resistivity`.  Cached per distinct input."""
+    ampacity = dict(ampacity_items) if ampacity_items is not None else AWG_AMPACITY_A
+    return ConductorTable.from_mappings(ampacity, AWG_OHM_PER_KM_CU, resistivity / CU_RESISTIVITY)
+
+
+@dataclass(frozen=True)
+class DerateTables:
+    """Standards-profile tables as sorted arrays for vectorized lookups."""
+    temp_max_C: np.ndarray
+    temp_factor: np.ndarray
+    group_max: np.ndarray
+    group_factor: np.ndarray
+    vdrop_pct: Dict[str, float]
+    resistivity: Dict[str, float]
+
+    @classmethod
+    def from_profile(cls, prof: StandardsProfile) -> "DerateTables":
+        return cls(
+            np.array([r.ambient_C_max for r in prof.temp_rows], dtype=float),
+            np.array([r.factor for r in prof.temp_rows], dtype=float),
+            np.array([r.cc_conductors_max for r in prof.group_rows], dtype=float),
+            np.array([r.factor for r in prof.group_rows], dtype=float),
+            dict(prof.defaults_vdrop_pct),
+            dict(prof.resistivity_ohm_per_km),
+        )
+
+    def temperature(self, ambient_C: ArrayLike) -> np.ndarray:
+        """First row with ``ambient_C <= ambient_C_max``, else the last row."""
+        idx = np.searchsorted(self.temp_max_C, np.asarray(ambient_C, dtype=float), side="left")
+        return self.temp_factor[np.minimum(idx, len(self.temp_factor) - 1)]
+
+    def grouping(self, n_ccc: ArrayLike) -> np.ndarray:
+        """First row with ``n_ccc <= cc_conductors_max``, else the last row."""
+        idx = np.searchsorted(self.group_max, np.asarray(n_ccc, dtype=float), side="left")
+        return self.group_factor[np.minimum(idx, len(self.group_factor) - 1)]
+
+
+def derate_tables(profile_id: str = "NEC_2023") -> DerateTables:
+    """Memoized `DerateTables` for a profile, rebuilt when its file changes."""
+    return load_cached(
+        PROFILES_DIR / f"{profile_id}.json",
+        lambda _p: DerateTables.from_profile(load_profile(profile_id)),
+        "derate_tables",
+    )
+
+
+@dataclass
+class ConductorSizing:
+    """Per-circuit results; matrices are ``(C, K)`` over the table rows."""
+    table: ConductorTable
+    ampacity_A: np.ndarray
+    vdrop_pct: np.ndarray
+    ampacity_ok: np.ndarray
+    vdrop_ok: np.ndarray
+    choice: np.ndarray  # (C,) first acceptable row, -1 if none
+
+    @property
+    def acceptable(self) -> np.ndarray:
+        return self.ampacity_ok & self.vdrop_ok
+
+    def size(self, c: int) -> Optional[str]:
+        k = int(self.choice[c])
+        return self.table.sizes[k] if k >= 0 else None
+
+
+def first_true(mask: np.ndarray) -> np.ndarray:
+    """Index of the first True per row of a 2-D mask, -1 for all-False rows."""
+    if mask.shape[1] == 0:
+        return np.full(mask.shape[0], -1, dtype=np.int64)
+    return np.where(mask.any(axis=1), mask.argmax(axis=1), -1)
+
+
+def size_conductors(
+    table: ConductorTable,
+    current_A: ArrayLike,
+    length_m: ArrayLike,
+    system_v: ArrayLike,
+    *,
+    phase: Union[str, Sequence[str]] = "dc",
+    max_vdrop_pct: ArrayLike = np.inf,
+    derate: ArrayLike = 1.0,
+    required_A: Optional[ArrayLike] = None,
+) -> ConductorSizing:
+    """Size every circuit against `table` in one pass.
+
+    Per-circuit arguments broadcast to C circuits.  A row is acceptable when
+    its derated ampacity covers `required_A` (default `current_A`) and its
+    voltage drop at `current_A` is within `max_vdrop_pct`.  Circuits with a
+    non-positive `system_v` report zero voltage drop.
+    """
+    current = np.atleast_1d(np.asarray(current_A, dtype=float))
+    shape = np.broadcast_shapes(
+        current.shape, np.shape(length_m), np.shape(system_v), np.shape(max_vdrop_pct), np.shape(derate)
+    )
+    current = np.broadcast_to(current, shape)
+    length = np.broadcast_to(np.asarray(length_m, dtype=float), shape)
+    volts = np.broadcast_to(np.asarray(system_v, dtype=float), shape)
+    required = current if required_A is None else np.broadcast_to(np.asarray(required_A, dtype=float), shape)
+    if isinstance(phase, str):
+        factor = np.full(shape, PHASE_FACTOR[phase])
+    else:
+        factor = np.array([PHASE_FACTOR[p] for p in phase], dtype=float).reshape(shape)
+
+    ampacity = table.ampacity_A[None, :] * np.broadcast_to(np.asarray(derate, dtype=float), shape)[:, None]
+    vdrop_V = (factor * current * length / 1000.0)[:, None] * table.ohm_per_km[None, :]
+    safe_v = np.where(volts > 0, volts, 1.0)[:, None]
+    vdrop_pct = np.where(volts[:, None] > 0, vdrop_V / safe_v * 100.0, 0.0)
+
+    ampacity_ok = ampacity >= required[:, None]
+    limit = np.broadcast_to(np.asarray(max_vdrop_pct, dtype=float), shape)[:, None]
+    # Relative tolerance keeps the limit inclusive regardless of operation order
+    vdrop_ok = vdrop_pct <= limit * (1.0 + 1e-12)
+    return ConductorSizing(
+        table=table,
+        ampacity_A=ampacity,
+        vdrop_pct=vdrop_pct,
+        ampacity_ok=ampacity_ok,
+        vdrop_ok=vdrop_ok,
+        choice=first_true(ampacity_ok & vdrop_ok),
+    )
+
+
+__all__ = [
+    "AWG_AMPACITY_A",
+    "AWG_OHM_PER_KM_CU",
+    "ConductorTable",
+    "ConductorSizing",
+    "DerateTables",
+    "awg_table",
+    "derate_tables",
+    "first_true",
+    "size_conductors",
+]
@@ -8,7 +8,11 @@ from __future__ import annotations
 
 from typing import List
 
+import numpy as np
+
 from backend.odl.schemas import PatchOp
+from .conductor_sizing import awg_table, size_conductors
+from .stringing_solver import voc_at_temp
 from .schemas import (
     SelectDcStringingInput,
     SelectOcpDcInput,
@@ -24,23 +28,7 @@ from .schemas import (
 # ---------- helpers ----------
 
 def _worst_case_voc(module, env, ref_C: float = 25.0) -> float:
-    dv_pct = module.beta_voc_pct_per_C * (env.ambient_min_C - ref_C)
-    return module.voc_stc * (1.0 + dv_pct / 100.0)
-
-
-
-def _vdrop_dc(I: float, ohm_km: float, L_m: float) -> float:
-    return I * ohm_km * (2 * L_m / 1000)
-
-
-def _vdrop_ac_1ph(I: float, ohm_km: float, L_m: float) -> float:
-    return 2 * I * ohm_km * (L_m / 1000)
-
-
-def _vdrop_ac_3ph(I: float, ohm_km: float, L_m: float) -> float:
-    from math import sqrt
-
-    return sqrt(3) * I * ohm_km * (L_m / 1000)
+    return voc_at_temp(module.voc_stc, module.beta_voc_pct_per_C, env.ambient_min_C, ref_C)
 
 
 # ---------- tools ----------
@@ -199,42 +187,27 @@ def select_ocp_ac(inp: SelectOcpAcInput):
 
 def select_conductors(inp: SelectConductorsInput):
     I = inp.current_A
-    L = inp.env.length_m
-    def vdrop_for(size_label: str) -> float:
-        ohm_km_map = {
-            "14AWG": 8.286,
-            "12AWG": 5.211,
-            "10AWG": 3.277,
-            "8AWG": 2.061,
-            "6AWG": 1.296,
-            "4AWG": 0.815,
-            "2AWG": 0.513,
-            "1/0": 0.324,
-            "2/0": 0.257,
-            "3/0": 0.204,
-            "4/0": 0.162,
-        }
-        ohm_km = ohm_km_map[size_label] * (
-            inp.resistivity_ohm_km[inp.env.material] / 0.018
-        )
-        if inp.phase == "dc":
-            return _vdrop_dc(I, ohm_km, L)
-        if inp.phase == "1ph":
-            return _vdrop_ac_1ph(I, ohm_km, L)
-        return _vdrop_ac_3ph(I, ohm_km, L)
-
-    candidates: List[ConductorChoice] = []
-    for size, base_amp in inp.ampacity_table_A.items():
-        amp = base_amp * inp.derate_ambient_pct * inp.derate_bundling_pct
-        vd = vdrop_for(size)
-        candidates.append(
-            ConductorChoice(
-                size_awg_or_kcmil=size,
-                vdrop_pct=vd / inp.system_v * 100.0,
-                ampacity_A=amp,
-            )
+    table = awg_table(
+        tuple(inp.ampacity_table_A.items()), inp.resistivity_ohm_km[inp.env.material]
+    )
+    sized = size_conductors(
+        table,
+        I,
+        inp.env.length_m,
+        inp.system_v,
+        phase=inp.phase,
+        max_vdrop_pct=inp.env.max_vdrop_pct,
+        derate=inp.derate_ambient_pct * inp.derate_bundling_pct,
+    )
+    candidates: List[ConductorChoice] = [
+        ConductorChoice(
+            size_awg_or_kcmil=size,
+            vdrop_pct=float(sized.vdrop_pct[0, k]),
+            ampacity_A=float(sized.ampacity_A[0, k]),
         )
-    acceptable = [c for c in candidates if c.ampacity_A >= I and c.vdrop_pct <= inp.env.max_vdrop_pct]
+        for k, size in enumerate(table.sizes)
+    ]
+    acceptable = [candidates[k] for k in np.flatnonzero(sized.acceptable[0])]
     choice = acceptable[0] if acceptable else max(candidates, key=lambda c: c.ampacity_A)
     decision = {"choice": choice.model_dump(), "candidates": [c.model_dump() for c in acceptable[:3]]}
     ops = [
@@ -1,14 +1,20 @@
 """Minimal electrical v2 tools used by auto-designer tests.
 
 These are lightweight wrappers that emit annotation-only patches. They are
-placeholders until full electrical_v2 implementations are available."""
+placeholders until full electrical_v2 implementations are available, except
+conductor sizing, which runs the shared ``conductor_sizing`` kernel against
+the standards profile."""
 from __future__ import annotations
 
-from typing import List
+from typing import Any, Dict, List, Literal, Tuple
+import numpy as np
 from pydantic import BaseModel
 
-from backend.odl.schemas import PatchOp
+from backend.odl.schemas import ODLPatch, PatchOp
+from backend.tools._result_cache import tool_cache
+from backend.tools.conductor_sizing import awg_table, derate_tables, first_true, size_conductors
 from backend.tools.schemas import ToolBase, make_patch
+from backend.tools.standards_profiles import profile_stamp
 
 
 class SelectOcpACV2Input(ToolBase):
@@ -37,9 +43,64 @@ class SelectConductorsV2Input(ToolBase):
     current_A: float
     length_m: float
     system_v: float
+    phase: Literal["dc", "1ph", "3ph"] | None = None  # default: dc for dc_* kinds, else 1ph
+    material: Literal["Cu", "Al"] = "Cu"
+    ambient_C: float = 30.0
+    current_carrying: int = 3
+    continuous_factor: float = 1.25  # ampacity must cover 125% of continuous current
+    max_vdrop_pct: float | None = None  # default: profile limit for circuit_kind
+    code_profile: str = "NEC_2023"
+
+
+@tool_cache.memoize_batch("select_conductors_v2", extra=lambda inp: profile_stamp(inp.code_profile))
+def select_conductors_v2_batch(inputs: List[SelectConductorsV2Input]) -> List[ODLPatch]:
+    """Size several circuits in one pass; returns one patch per input, in order.
+
+    Inputs are grouped by (profile, material) so each group shares one
+    conductor table.  Results are memoized per input; only uncached circuits
+    are sized.
+    """
+    patches: List[ODLPatch | None] = [None] * len(inputs)
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    for idx, inp in enumerate(inputs):
+        groups.setdefault((inp.code_profile, inp.material), []).append(idx)
+    for (profile_id, material), idxs in groups.items():
+        tables = derate_tables(profile_id)
+        table = awg_table(None, tables.resistivity.get(material, 0.018))
+        group = [inputs[i] for i in idxs]
+        sized = size_conductors(
+            table,
+            [c.current_A for c in group],
+            [c.length_m for c in group],
+            [c.system_v for c in group],
+            phase=[c.phase or ("dc" if c.circuit_kind.startswith("dc") else "1ph") for c in group],
+            max_vdrop_pct=[
+                c.max_vdrop_pct if c.max_vdrop_pct is not None else tables.vdrop_pct.get(c.circuit_kind, 3.0)
+                for c in group
+            ],
+            derate=tables.temperature([c.ambient_C for c in group])
+            * tables.grouping([c.current_carrying for c in group]),
+            required_A=[c.current_A * c.continuous_factor for c in group],
+        )
+        # No acceptable size: the smallest that carries the current, else the largest
+        fallback = first_true(sized.ampacity_ok)
+        fallback[fallback < 0] = len(table) - 1
+        chosen = np.where(sized.choice >= 0, sized.choice, fallback)
+        for j, idx in enumerate(idxs):
+            k = int(chosen[j])
+            patches[idx] = _conductor_patch(
+                group[j],
+                {
+                    "size_awg_or_kcmil": table.sizes[k],
+                    "ampacity_A": round(float(sized.ampacity_A[j, k]), 2),
+                    "vdrop_pct": round(float(sized.vdrop_pct[j, k]), 3),
+                    "compliant": bool(sized.choice[j] >= 0),
+                },
+            )
+    return patches
 
 
-def select_conductors_v2(inp: SelectConductorsV2Input):
+def _conductor_patch(inp: SelectConductorsV2Input, choice: Dict[str, Any]) -> ODLPatch:
     ops = [
         PatchOp(
             op_id=f"{inp.request_id}:ann:conductor",
@@ -53,6 +114,7 @@ def select_conductors_v2(inp: SelectConductorsV2Input):
                     "tool": "select_conductors_v2",
                     "kind": inp.circuit_kind,
                     "current_A": inp.current_A,
+                    "choice": choice,
                 },
             },
         )
@@ -60,6 +122,10 @@ def select_conductors_v2(inp: SelectConductorsV2Input):
     return make_patch(inp.request_id, ops)
 
 
+def select_conductors_v2(inp: SelectConductorsV2Input):
+    return select_conductors_v2_batch([inp])[0]
+
+
 class ExpandConnectionsV2Input(ToolBase):
     source_id: str
     target_id: str
@@ -104,6 +170,7 @@ __all__ = [
     "select_ocp_ac_v2",
     "SelectConductorsV2Input",
     "select_conductors_v2",
+    "select_conductors_v2_batch",
     "ExpandConnectionsV2Input",
     "expand_connections_v2",
 ]
@@ -2,6 +2,7 @@ from __future__ import annotations
 from typing import Dict, List
 from pydantic import BaseModel
 from backend.odl.schemas import PatchOp
+from backend.tools._result_cache import tool_cache
 from backend.tools.schemas import ToolBase, make_patch
 
 
@@ -14,6 +15,7 @@ class SelectOcpDcInput(ToolBase):
     module: Module
 
 
+@tool_cache.memoize("select_ocp_dc")
 def select_ocp_dc(inp: SelectOcpDcInput):
     findings = []
     result: Dict = {"string_fusing_required": False, "fuse_A": None}
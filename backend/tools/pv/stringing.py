@@ -3,10 +3,19 @@ from typing import Any, Dict, Tuple, List
 from backend.tools.patch_builder import PatchBuilder
 from math import ceil
 from backend.utils.adpf import card_from_text
+from backend.tools.stringing_solver import (
+    InverterArrays,
+    ModuleArrays,
+    SiteArrays,
+    solve_stringing,
+    voc_at_temp,
+)
+
+_BETA_VOC_PCT_PER_C = -0.28  # typical mono-Si Voc temperature coefficient
 
 def _worst_case_voc(voc_stc: float, t_min_c: float = -10.0) -> float:
     """Worst-case Voc at minimum temperature."""
-    return voc_stc * (1 + (t_min_c - 25) * (-0.0028))
+    return voc_at_temp(voc_stc, _BETA_VOC_PCT_PER_C, t_min_c)
 
 def query_nodes(graph, layer: str, kind: str) -> List:
     """Simple placeholder to query nodes from ODL graph."""
@@ -44,15 +53,21 @@ async def plan(*, store, session_id: str, args: Dict[str, Any]) -> Tuple[dict, d
         rationale = "Microinverters: one module per inverter, AC trunk wiring."
     else:
         # Series N must satisfy Voc_cold*N < 0.98*Vdc_max and mppt_vmin <= Vmp*N <= mppt_vmax
-        n_ok = []
-        for N in range(2, 25):
-            vocN = s_voc * N
-            vmpN = vmp * N
-            if vocN <= 0.98*vdc_max and mppt_vmin <= vmpN <= mppt_vmax:
-                n_ok.append(N)
-        if not n_ok:
-            n_ok = [max(2, int(0.98*vdc_max/s_voc))]
-        series = max(n_ok)
+        solutions = solve_stringing(
+            ModuleArrays.from_items([{"voc": voc, "vmp": vmp, "beta_voc_pct_per_C": _BETA_VOC_PCT_PER_C}]),
+            InverterArrays.from_items([{
+                "max_system_vdc": vdc_max,
+                "mppt_windows": [{"v_min": mppt_vmin, "v_max": mppt_vmax, "count": mppts}],
+            }]),
+            SiteArrays.from_values(tmin),
+            n_modules=total,
+            series_range=(2, 24),
+            margin_voc_pct=0.02,
+        )
+        if len(solutions):
+            series = int(solutions.series.max())
+        else:
+            series = max(2, int(0.98*vdc_max/s_voc))
         strings = ceil(total / series)
         strings = max(strings, mppts)  # at least one per MPPT
         rationale = f"String inverter: MPPT window {mppt_vmin}-{mppt_vmax} V; choose {series} in series."
@@ -7,6 +7,7 @@ from __future__ import annotations
 from typing import List, Dict, Optional
 from pydantic import BaseModel, Field
 from backend.odl.schemas import PatchOp
+from backend.tools._result_cache import tool_cache
 from backend.tools.schemas import ToolBase, ODLEdge, make_patch
 
 
@@ -65,6 +66,7 @@ def _length_for_bundle(bid: str, routes: List[Dict], fallback: float = 1.0) -> f
     return fallback
 
 
+@tool_cache.memoize("generate_schedules")
 def generate_schedules(inp: GenerateSchedulesInput):
     bundles = _collect_bundles(inp.view_edges)
     cables: List[Dict] = []
@@ -1,9 +1,17 @@
 from __future__ import annotations
+from dataclasses import asdict
 from typing import List, Dict, Any
 from pydantic import BaseModel
 from backend.odl.schemas import PatchOp
 from backend.tools.schemas import ToolBase, make_patch
-from backend.tools.catalog import load_modules, load_inverters, ModuleItem, InverterItem
+from backend.tools.catalog import (
+    InverterCatalog,
+    InverterItem,
+    ModuleCatalog,
+    ModuleItem,
+    inverter_catalog,
+    module_catalog,
+)
 
 
 class SelectEquipmentInput(ToolBase):
@@ -12,34 +20,27 @@ class SelectEquipmentInput(ToolBase):
     inverter_kw_window: tuple[float, float] = (0.7, 1.2)  # inverter AC size relative to DC target
 
 
-def _choose_module(target_kw: float, preferred_W: float | None, modules: List[ModuleItem]) -> ModuleItem:
+def _choose_module(target_kw: float, preferred_W: float | None, modules: ModuleCatalog) -> ModuleItem:
     if preferred_W:
-        byW = sorted(modules, key=lambda m: abs(m.p_W - preferred_W))
-        return byW[0]
+        return modules.nearest_power(preferred_W)
     # Pick mid-bin module
-    return sorted(modules, key=lambda m: abs(m.p_W - 400))[0]
+    return modules.nearest_power(400)
 
 
-def _choose_inverter(target_kw: float, window: tuple[float, float], inverters: List[InverterItem]) -> InverterItem:
+def _choose_inverter(target_kw: float, window: tuple[float, float], inverters: InverterCatalog) -> InverterItem:
     lo = target_kw * window[0]
-    hi = target_kw * window[1]
     # Prefer the smallest inverter within window; fallback to nearest above
-    cands = [i for i in inverters if lo <= i.ac_kW <= hi]
-    if not cands:
-        above = [i for i in inverters if i.ac_kW >= lo]
-        return sorted(above, key=lambda i: i.ac_kW)[0] if above else sorted(inverters, key=lambda i: i.ac_kW)[-1]
-    return sorted(cands, key=lambda i: i.ac_kW)[0]
+    # (the smallest rated >= lo is either, else the largest overall)
+    return inverters.smallest_at_least(lo)
 
 
-def select_equipment(inp: SelectEquipmentInput):
-    mods = load_modules()
-    invs = load_inverters()
-    m = _choose_module(inp.target_kw_stc, inp.preferred_module_W, mods)
-    inv = _choose_inverter(inp.target_kw_stc, inp.inverter_kw_window, invs)
+def equipment_patch(request_id: str, m: ModuleItem, inv: InverterItem):
+    """Patch recording `m` + `inv` as the design's equipment."""
+    # Copies: catalog items are shared process-wide
     equip = {
-        "module": m.__dict__,
+        "module": asdict(m),
         "inverter": {
-            **inv.__dict__,
+            **asdict(inv),
             "mppt_count": sum(w.get("count", 1) for w in inv.mppt_windows),
         },
     }
@@ -47,7 +48,7 @@ def select_equipment(inp: SelectEquipmentInput):
     # Persist to meta.design_state.equip (state only)
     ops.append(
         PatchOp(
-            op_id=f"{inp.request_id}:meta:equip",
+            op_id=f"{request_id}:meta:equip",
             op="set_meta",
             value={"path": "design_state.equip", "merge": True, "data": equip},
         )
@@ -55,10 +56,10 @@ def select_equipment(inp: SelectEquipmentInput):
     # Annotation
     ops.append(
         PatchOp(
-            op_id=f"{inp.request_id}:ann:equip",
+            op_id=f"{request_id}:ann:equip",
             op="add_edge",
             value={
-                "id": f"ann:equip:{inp.request_id}",
+                "id": f"ann:equip:{request_id}",
                 "source_id": "__decision__",
                 "target_id": "__design__",
                 "kind": "annotation",
@@ -69,8 +70,13 @@ def select_equipment(inp: SelectEquipmentInput):
             },
         )
     )
-    return make_patch(inp.request_id, ops)
+    return make_patch(request_id, ops)
+
 
+def select_equipment(inp: SelectEquipmentInput):
+    m = _choose_module(inp.target_kw_stc, inp.preferred_module_W, module_catalog())
+    inv = _choose_inverter(inp.target_kw_stc, inp.inverter_kw_window, inverter_catalog())
+    return equipment_patch(inp.request_id, m, inv)
 
-__all__ = ["SelectEquipmentInput", "select_equipment"]
 
+__all__ = ["SelectEquipmentInput", "equipment_patch", "select_equipment"]
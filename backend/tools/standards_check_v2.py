@@ -6,8 +6,9 @@ from __future__ import annotations
 from typing import List, Dict, Optional
 from pydantic import BaseModel, Field
 from backend.odl.schemas import PatchOp
+from backend.tools._result_cache import tool_cache
 from backend.tools.schemas import ToolBase, make_patch
-from backend.tools.standards_profiles import load_profile, default_vdrop_pct
+from backend.tools.standards_profiles import load_profile, default_vdrop_pct, profile_stamp
 
 
 class Env(BaseModel):
@@ -61,6 +62,7 @@ def _voc_at_t(module: Module, tC: float, ref: float = 25.0) -> float:
     return module.voc_stc * (1.0 + dv / 100.0)
 
 
+@tool_cache.memoize("check_compliance_v2", extra=lambda inp: profile_stamp(inp.env.code_profile))
 def check_compliance_v2(inp: CheckComplianceV2Input):
     prof = load_profile(inp.env.code_profile)
     findings: List[Dict] = []
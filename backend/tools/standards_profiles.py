@@ -2,8 +2,9 @@ from __future__ import annotations
 import json
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
+from backend.tools._file_cache import file_stamp, load_cached
 
 PROFILES_DIR = Path(__file__).parent / "data" / "profiles"
 
@@ -31,9 +32,25 @@ class StandardsProfile:
 
 
 def load_profile(profile_id: str = "NEC_2023") -> StandardsProfile:
+    """Parsed profile, memoized process-wide until its file changes.
+
+    The returned object is shared; do not mutate it.
+    """
     p = PROFILES_DIR / f"{profile_id}.json"
     if not p.exists():
         raise FileNotFoundError(f"Standards profile not found: {p}")
+    return load_cached(p, _parse_profile, "profile")
+
+
+def profile_stamp(profile_id: str = "NEC_2023") -> Optional[Tuple[int, int]]:
+    """File stamp of a profile (None if missing), for keying derived caches."""
+    try:
+        return file_stamp(PROFILES_DIR / f"{profile_id}.json")
+    except FileNotFoundError:
+        return None
+
+
+def _parse_profile(p: Path) -> StandardsProfile:
     data = json.loads(p.read_text())
     return StandardsProfile(
         id=data["id"],
@@ -70,6 +87,7 @@ def resistivity(material: str, prof: StandardsProfile) -> float:
 __all__ = [
     "StandardsProfile",
     "load_profile",
+    "profile_stamp",
     "temp_correction_factor",
     "grouping_factor",
     "default_vdrop_pct",
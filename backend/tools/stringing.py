@@ -3,7 +3,15 @@ from math import ceil
 from typing import Dict, List
 from pydantic import BaseModel
 from backend.odl.schemas import PatchOp
+from backend.tools._result_cache import tool_cache
 from backend.tools.schemas import ToolBase, make_patch
+from backend.tools.stringing_solver import (
+    InverterArrays,
+    ModuleArrays,
+    SiteArrays,
+    solve_stringing,
+    voc_at_temp,
+)
 
 
 class Env(BaseModel):
@@ -38,10 +46,10 @@ class SelectStringingInput(ToolBase):
 
 
 def _voc_cold(voc_stc: float, beta_pct_perC: float, tmin: float, ref: float = 25.0) -> float:
-    dv = beta_pct_perC * (tmin - ref)
-    return voc_stc * (1.0 + dv / 100.0)
+    return voc_at_temp(voc_stc, beta_pct_perC, tmin, ref)
 
 
+@tool_cache.memoize("select_dc_stringing")
 def select_dc_stringing(inp: SelectStringingInput):
     target_W = inp.target_kw_stc * 1000
     n_modules = max(1, round(target_W / inp.module.p_W))
@@ -49,16 +57,15 @@ def select_dc_stringing(inp: SelectStringingInput):
     voc_cold = _voc_cold(inp.module.voc, inp.module.beta_voc_pct_per_C, inp.env.site_tmin_C)
     sys_lim = inp.inverter.max_system_vdc * (1.0 - inp.margin_voc_pct)
     # Pick max N satisfying Voc_cold*N <= sys_lim and Vmp*N within any MPPT window
-    best = None
-    for N in range(4, 20):  # practical residential range
-        vocN = voc_cold * N
-        vmpN = inp.module.vmp * N
-        if vocN > sys_lim:
-            break
-        fits = any(w.v_min <= vmpN <= w.v_max for w in inp.inverter.mppt_windows)
-        if not fits:
-            continue
-        best = N
+    solutions = solve_stringing(
+        ModuleArrays.from_items([inp.module]),
+        InverterArrays.from_items([inp.inverter]),
+        SiteArrays.from_values(inp.env.site_tmin_C),
+        n_modules=n_modules,
+        series_range=(4, 19),  # practical residential range
+        margin_voc_pct=inp.margin_voc_pct,
+    )
+    best = int(solutions.series.max()) if len(solutions) else None
     if best is None:
         # fallback: smallest N under system voltage
         for N in range(2, 20):
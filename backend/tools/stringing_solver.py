@@ -0,0 +1,249 @@
+"""Vectorized PV stringing solver.
+
+Evaluates series/parallel feasibility for every module x inverter x site
+combination in one NumPy pass, so equipment sweeps (auto-design proposals,
+catalog ranking) don't loop over candidates in Python.
+
+A series count ``N`` is feasible for a combination when
+
+- the cold-weather string Voc (at site Tmin) stays within the inverter's
+  system voltage less ``margin_voc_pct``, and
+- the string Vmp fits at least one MPPT window: STC Vmp below ``v_max`` and,
+  when a site Tmax is given, hot-weather Vmp above ``v_min`` (STC otherwise).
+
+Each feasible ``(module, inverter, site, N)`` is returned with its parallel
+string count and MPPT allocation.  The scalar tools (``stringing``,
+``pv.stringing``) call the same kernel with a single combination.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+
+def voc_at_temp(voc_stc: ArrayLike, beta_pct_per_C: ArrayLike, t_C: ArrayLike, ref_C: float = 25.0):
+    """Module Voc at cell temperature `t_C` (scalar or broadcastable arrays)."""
+    return voc_stc * (1.0 + beta_pct_per_C * (t_C - ref_C) / 100.0)
+
+
+def _get(item: Any, name: str, default: Any = None) -> Any:
+    if isinstance(item, dict):
+        return item.get(name, default)
+    return getattr(item, name, default)
+
+
+@dataclass
+class ModuleArrays:
+    """Column arrays for M modules."""
+    p_W: np.ndarray
+    voc: np.ndarray
+    vmp: np.ndarray
+    beta_voc_pct_per_C: np.ndarray
+    # Vmp temperature coefficient; defaults to the Voc coefficient
+    beta_vmp_pct_per_C: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_items(cls, items: Iterable[Any]) -> "ModuleArrays":
+        """Build from catalog items, tool models or dicts with the same field names."""
+        items = list(items)
+        col = lambda name, default=None: np.array([float(_get(x, name, default)) for x in items])  # noqa: E731
+        beta_vmp = None
+        if any(_get(x, "beta_vmp_pct_per_C") is not None for x in items):
+            beta_vmp = np.array([
+                float(_get(x, "beta_vmp_pct_per_C", _get(x, "beta_voc_pct_per_C"))) for x in items
+            ])
+        return cls(col("p_W", 0.0), col("voc"), col("vmp"), col("beta_voc_pct_per_C"), beta_vmp)
+
+    def __len__(self) -> int:
+        return len(self.voc)
+
+
+@dataclass
+class InverterArrays:
+    """Column arrays for I inverters with up to W MPPT windows each.
+
+    Window arrays have shape ``(I, W)``; unused slots have ``count == 0``.
+    """
+    max_system_vdc: np.ndarray
+    v_min: np.ndarray
+    v_max: np.ndarray
+    count: np.ndarray
+
+    @classmethod
+    def from_items(cls, items: Iterable[Any]) -> "InverterArrays":
+        items = list(items)
+        windows = [list(_get(x, "mppt_windows", []) or []) for x in items]
+        w = max((len(ws) for ws in windows), default=0) or 1
+        v_min = np.zeros((len(items), w))
+        v_max = np.zeros((len(items), w))
+        count = np.zeros((len(items), w), dtype=np.int64)
+        for i, ws in enumerate(windows):
+            for j, win in enumerate(ws):
+                v_min[i, j] = float(_get(win, "v_min"))
+                v_max[i, j] = float(_get(win, "v_max"))
+                count[i, j] = int(_get(win, "count", 1))
+        vdc = np.array([float(_get(x, "max_system_vdc")) for x in items])
+        return cls(vdc, v_min, v_max, count)
+
+    def __len__(self) -> int:
+        return len(self.max_system_vdc)
+
+
+@dataclass
+class SiteArrays:
+    """Design temperatures for S sites."""
+    tmin_C: np.ndarray
+    tmax_C: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_values(cls, tmin_C: ArrayLike, tmax_C: Optional[ArrayLike] = None) -> "SiteArrays":
+        tmin = np.atleast_1d(np.asarray(tmin_C, dtype=float))
+        tmax = None if tmax_C is None else np.broadcast_to(np.asarray(tmax_C, dtype=float), tmin.shape).copy()
+        return cls(tmin, tmax)
+
+    def __len__(self) -> int:
+        return len(self.tmin_C)
+
+
+@dataclass
+class StringingSolutions:
+    """All feasible designs, one entry per ``(module, inverter, site, series)``."""
+    module: np.ndarray
+    inverter: np.ndarray
+    site: np.ndarray
+    series: np.ndarray
+    parallel: np.ndarray
+    n_modules: np.ndarray
+    mppt_inputs: np.ndarray
+    voc_cold_string_V: np.ndarray
+    vmp_string_V: np.ndarray
+    array_kw_stc: np.ndarray
+    window_fit: np.ndarray  # (K, W) windows whose MPPT range hosts the string
+
+    def __len__(self) -> int:
+        return len(self.series)
+
+    def mppt_allocation(self, k: int) -> List[int]:
+        """Strings per MPPT input for solution `k`, spread as evenly as possible."""
+        inputs = int(self.mppt_inputs[k])
+        base, extra = divmod(int(self.parallel[k]), inputs)
+        return [base + 1 if j < extra else base for j in range(inputs)]
+
+    def best_per_combo(self) -> np.ndarray:
+        """Index of the longest feasible string for each combination, in combo order."""
+        if not len(self):
+            return np.empty(0, dtype=np.int64)
+        order = np.lexsort((-self.series, self.site, self.inverter, self.module))
+        combo = np.stack([self.module[order], self.inverter[order], self.site[order]])
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = np.any(combo[:, 1:] != combo[:, :-1], axis=0)
+        return order[first]
+
+    def record(self, k: int) -> Dict[str, Any]:
+        return {
+            "module": int(self.module[k]),
+            "inverter": int(self.inverter[k]),
+            "site": int(self.site[k]),
+            "series": int(self.series[k]),
+            "parallel": int(self.parallel[k]),
+            "mppt_allocation": self.mppt_allocation(k),
+            "array_modules": int(self.series[k] * self.parallel[k]),
+            "array_kw_stc": float(self.array_kw_stc[k]),
+            "voc_cold_string_V": float(self.voc_cold_string_V[k]),
+            "vmp_string_V": float(self.vmp_string_V[k]),
+        }
+
+
+def solve_stringing(
+    modules: ModuleArrays,
+    inverters: InverterArrays,
+    sites: SiteArrays,
+    *,
+    target_kw_stc: Optional[ArrayLike] = None,
+    n_modules: Optional[ArrayLike] = None,
+    series_range: Tuple[int, int] = (2, 24),
+    margin_voc_pct: float = 0.02,
+) -> StringingSolutions:
+    """Every feasible stringing for all module x inverter x site combinations.
+
+    The array size comes from `n_modules` (per site, or scalar) or, failing
+    that, ``round(target_kw_stc * 1000 / p_W)`` per module and site.
+    `series_range` is inclusive.
+    """
+    n_lo, n_hi = series_range
+    N = np.arange(n_lo, n_hi + 1, dtype=np.int64)
+    M, I, S = len(modules), len(inverters), len(sites)
+    if not (M and I and S) or not len(N):
+        return _empty(inverters)
+
+    tmin = sites.tmin_C
+    voc_cold = voc_at_temp(modules.voc[:, None], modules.beta_voc_pct_per_C[:, None], tmin[None, :])  # (M, S)
+    vmp_stc = modules.vmp  # (M,)
+    if sites.tmax_C is not None:
+        beta_vmp = modules.beta_vmp_pct_per_C
+        if beta_vmp is None:
+            beta_vmp = modules.beta_voc_pct_per_C
+        vmp_low = voc_at_temp(vmp_stc[:, None], beta_vmp[:, None], sites.tmax_C[None, :])  # (M, S)
+    else:
+        vmp_low = np.broadcast_to(vmp_stc[:, None], (M, S))
+    sys_lim = inverters.max_system_vdc * (1.0 - margin_voc_pct)  # (I,)
+
+    # (M, I, S, N): cold Voc within the system voltage limit
+    v_ok = voc_cold[:, None, :, None] * N <= sys_lim[None, :, None, None]
+    # (M, I, S, W, N): string Vmp inside a window
+    lo = vmp_low[:, None, :, None, None] * N
+    hi = vmp_stc[:, None, None, None, None] * N
+    fit = (
+        (inverters.v_min[None, :, None, :, None] <= lo)
+        & (hi <= inverters.v_max[None, :, None, :, None])
+        & (inverters.count > 0)[None, :, None, :, None]
+    )
+    feasible = v_ok & fit.any(axis=3)
+    m, i, s, n = np.nonzero(feasible)
+    series = N[n]
+
+    if n_modules is not None:
+        total = np.broadcast_to(np.asarray(n_modules, dtype=np.int64), (S,))[s]
+    elif target_kw_stc is not None:
+        target_W = np.broadcast_to(np.asarray(target_kw_stc, dtype=float), (S,))[s] * 1000.0
+        total = np.maximum(1, np.round(target_W / modules.p_W[m])).astype(np.int64)
+    else:
+        raise ValueError("solve_stringing needs target_kw_stc or n_modules")
+    parallel = -(-total // series)  # ceil
+
+    window_fit = fit[m, i, s, :, n]  # (K, W)
+    mppt_inputs = (window_fit * inverters.count[i]).sum(axis=1)
+    return StringingSolutions(
+        module=m,
+        inverter=i,
+        site=s,
+        series=series,
+        parallel=parallel,
+        n_modules=total,
+        mppt_inputs=mppt_inputs,
+        voc_cold_string_V=np.round(voc_cold[m, s] * series, 2),
+        vmp_string_V=np.round(vmp_stc[m] * series, 2),
+        array_kw_stc=np.round(series * parallel * modules.p_W[m] / 1000.0, 3),
+        window_fit=window_fit,
+    )
+
+
+def _empty(inverters: InverterArrays) -> StringingSolutions:
+    e = np.empty(0, dtype=np.int64)
+    f = np.empty(0)
+    w = inverters.count.shape[1] if inverters.count.ndim == 2 else 0
+    return StringingSolutions(e, e, e, e, e, e, e, f, f, f, np.zeros((0, w), dtype=bool))
+
+
+__all__ = [
+    "ModuleArrays",
+    "InverterArrays",
+    "SiteArrays",
+    "StringingSolutions",
+    "solve_stringing",
+    "voc_at_temp",
+]
@@ -0,0 +1,673 @@
+"""
+Shared two-tier cache subsystem.
+
+``MemoryCache`` is the in-process tier: a size-bounded map (entry count and,
+optionally, bytes) with one of two eviction policies:
+
+* ``"lru"``: plain least-recently-used.
+* ``"tinylfu"``: W-TinyLFU.  New keys enter a small LRU window; a key
+  leaving the window only displaces the main region's LRU victim if a
+  count-min frequency sketch says it has been requested more often, so a
+  burst of one-off keys cannot flush the hot set.
+
+Expiry runs on a hashed timing wheel: each entry sits in the bucket of the
+tick it expires in and every operation pops only the buckets that have come
+due, so there is no full scan on write.  Entries can carry tags and be
+invalidated by tag (or by key prefix).
+
+``RedisTier`` is the shared tier: JSON values written with pipelined
+``SETEX``, a Redis set per tag, and prefix invalidation through ``SCAN``
+(never ``KEYS``, which blocks the server).  ``LocalRedis`` implements the
+subset of the ``redis.asyncio`` client it uses, in process, for tests and
+single-node development (``redis_from_url("memory://")``).
+
+``TwoTierCache`` chains the two: reads fall through memory to Redis and
+promote hits (keeping their remaining TTL and tags); writes and
+invalidations go to both.
+"""
+from __future__ import annotations
+
+import fnmatch
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from backend.observability.metrics import cache_tier_evictions, cache_tier_hits, cache_tier_misses
+
+_MISSING = object()
+
+
+def _inc(metric, n: int = 1, **labels: str) -> None:
+    try:
+        (metric.labels(**labels) if labels else metric).inc(n)
+    except Exception:  # pragma: no cover
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Memory tier
+# ---------------------------------------------------------------------------
+class TTLWheel:
+    """Hashed timing wheel: keys bucketed by the tick they expire in."""
+
+    def __init__(self, tick_s: float = 1.0) -> None:
+        self.tick_s = tick_s
+        self._slots: Dict[int, Set[Hashable]] = {}
+        self._cursor: Optional[int] = None  # next tick to process
+
+    def add(self, key: Hashable, expires_at: float) -> int:
+        slot = math.ceil(expires_at / self.tick_s)
+        if self._cursor is not None:
+            slot = max(slot, self._cursor)
+        self._slots.setdefault(slot, set()).add(key)
+        return slot
+
+    def discard(self, key: Hashable, slot: int) -> None:
+        keys = self._slots.get(slot)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._slots[slot]
+
+    def due(self, now: float) -> List[Hashable]:
+        """Keys in every bucket whose tick has passed."""
+        tick = int(now // self.tick_s)
+        if self._cursor is None:
+            self._cursor = tick
+        if tick < self._cursor or not self._slots:
+            self._cursor = max(self._cursor, tick + 1)
+            return []
+        if tick - self._cursor < len(self._slots):
+            ticks = [t for t in range(self._cursor, tick + 1) if t in self._slots]
+        else:  # long idle gap: cheaper to look at the occupied buckets
+            ticks = [t for t in self._slots if t <= tick]
+        self._cursor = tick + 1
+        out: List[Hashable] = []
+        for t in ticks:
+            out.extend(self._slots.pop(t))
+        return out
+
+    def clear(self) -> None:
+        self._slots.clear()
+
+
+class FrequencySketch:
+    """Count-min sketch of 4-bit counters, halved periodically (TinyLFU)."""
+
+    _SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0x27D4EB2F165667C5)
+
+    def __init__(self, capacity: int) -> None:
+        width = 1 << max(4, (max(1, capacity) * 4 - 1).bit_length())
+        self._mask = width - 1
+        self._rows = [bytearray(width) for _ in self._SEEDS]
+        self._sample = 10 * max(1, capacity)
+        self._additions = 0
+
+    def _slots(self, key: Hashable) -> List[int]:
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        return [(((h ^ (h >> 29)) * seed) >> 32) & self._mask for seed in self._SEEDS]
+
+    def increment(self, key: Hashable) -> None:
+        for row, i in zip(self._rows, self._slots(key)):
+            if row[i] < 15:
+                row[i] += 1
+        self._additions += 1
+        if self._additions >= self._sample:  # age: halve every counter
+            self._rows = [bytearray(b >> 1 for b in row) for row in self._rows]
+            self._additions //= 2
+
+    def estimate(self, key: Hashable) -> int:
+        return min(row[i] for row, i in zip(self._rows, self._slots(key)))
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "slot", "tags", "size")
+
+    def __init__(self, value: Any, expires_at: Optional[float], slot: Optional[int], tags: Tuple[str, ...], size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.slot = slot
+        self.tags = tags
+        self.size = size
+
+
+class MemoryCache:
+    """Bounded in-process cache with TTLs, tags and LRU or W-TinyLFU eviction."""
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        *,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+        default_ttl: Optional[float] = None,
+        policy: str = "lru",
+        name: str = "cache",
+        tick_s: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if policy not in ("lru", "tinylfu"):
+            raise ValueError(f"Unknown cache policy {policy!r}")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.default_ttl = default_ttl
+        self.policy = policy
+        self.name = name
+        self._clock = clock
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._main: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._window: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._window_cap = max(1, max_entries // 100) if policy == "tinylfu" else 0
+        self._sketch = FrequencySketch(max_entries) if policy == "tinylfu" else None
+        self._wheel = TTLWheel(tick_s)
+        self._tags: Dict[str, Set[Hashable]] = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    # ---- internals (lock held) ----
+    def _region(self, key: Hashable) -> "OrderedDict[Hashable, None]":
+        return self._window if key in self._window else self._main
+
+    def _drop(self, key: Hashable) -> Optional[_Entry]:
+        e = self._entries.pop(key, None)
+        if e is None:
+            return None
+        self._region(key).pop(key, None)
+        if e.slot is not None:
+            self._wheel.discard(key, e.slot)
+        for tag in e.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        self._bytes -= e.size
+        return e
+
+    def _expire(self, now: float) -> None:
+        n = 0
+        for key in self._wheel.due(now):
+            e = self._entries.get(key)
+            if e is not None and e.expires_at is not None and e.expires_at <= now:
+                e.slot = None  # already popped from the wheel
+                self._drop(key)
+                n += 1
+        if n:
+            self.expired += n
+            _inc(cache_tier_evictions, n, cache=self.name, reason="expired")
+
+    def _evict(self, key: Hashable, reason: str = "size") -> None:
+        if self._drop(key) is not None:
+            self.evictions += 1
+            _inc(cache_tier_evictions, cache=self.name, reason=reason)
+
+    def _enforce(self) -> None:
+        if self.policy == "tinylfu":
+            main_cap = max(0, self.max_entries - self._window_cap)
+            while len(self._window) > self._window_cap:
+                cand = next(iter(self._window))
+                del self._window[cand]
+                if len(self._main) < main_cap:
+                    self._main[cand] = None
+                    continue
+                victim = next(iter(self._main), None)
+                if victim is not None and self._sketch.estimate(cand) > self._sketch.estimate(victim):
+                    self._evict(victim)
+                    self._main[cand] = None
+                else:
+                    self._main[cand] = None  # so _drop finds its region
+                    self._evict(cand, "rejected")
+        while self._main and len(self._entries) > self.max_entries:
+            self._evict(next(iter(self._main)))
+        while self.max_bytes is not None and self._bytes > self.max_bytes and self._entries:
+            self._evict(next(iter(self._main or self._window)))
+
+    # ---- public API ----
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            if self._sketch is not None:
+                self._sketch.increment(key)
+            e = self._entries.get(key)
+            if e is not None and e.expires_at is not None and e.expires_at <= now:
+                self._drop(key)
+                self.expired += 1
+                e = None
+            if e is None:
+                self.misses += 1
+                hit = False
+            else:
+                self._region(key).move_to_end(key)
+                self.hits += 1
+                hit = True
+        if hit:
+            _inc(cache_tier_hits, cache=self.name, tier="memory")
+            return e.value
+        _inc(cache_tier_misses, cache=self.name)
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> bool:
+        """Store `value`; False if it cannot be held (no room, too big, ttl <= 0)."""
+        ttl = self.default_ttl if ttl is None else ttl
+        size = self.sizeof(value) if self.sizeof is not None else 0
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            region = self._region(key) if key in self._entries else None
+            self._drop(key)
+            if self.max_entries <= 0 or (ttl is not None and ttl <= 0):
+                return False
+            if self.max_bytes is not None and size > self.max_bytes:
+                return False
+            expires_at = None if ttl is None else now + ttl
+            slot = None if expires_at is None else self._wheel.add(key, expires_at)
+            tags = tuple(tags)
+            self._entries[key] = _Entry(value, expires_at, slot, tags, size)
+            self._bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            if region is None:
+                region = self._window if self.policy == "tinylfu" else self._main
+                if self._sketch is not None:
+                    self._sketch.increment(key)
+            region[key] = None
+            self._enforce()
+            return key in self._entries
+
+    def replace_tagged(
+        self,
+        key: Hashable,
+        value: Any,
+        tag: str,
+        stale: Callable[[Hashable], bool] = lambda _key: True,
+        ttl: Optional[float] = None,
+    ) -> int:
+        """Set `key` (tagged `tag`) and, atomically with it, drop the other
+        entries of `tag` that `stale` selects; returns how many were dropped."""
+        with self._lock:
+            old = [k for k in self._tags.get(tag, ()) if k != key and stale(k)]
+            for k in old:
+                self._drop(k)
+            self.set(key, value, ttl=ttl, tags=(tag,))
+            return len(old)
+
+    def delete(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._drop(key) is not None
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove `key` and return its live value, else `default`."""
+        with self._lock:
+            e = self._drop(key)
+        if e is None or (e.expires_at is not None and e.expires_at <= self._clock()):
+            return default
+        return e.value
+
+    def keys_for_tag(self, tag: str) -> List[Hashable]:
+        with self._lock:
+            return list(self._tags.get(tag, ()))
+
+    def invalidate_tag(self, tag: str) -> int:
+        with self._lock:
+            keys = list(self._tags.get(tag, ()))
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def invalidate_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [k for k in self._entries if isinstance(k, str) and k.startswith(prefix)]
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._main.clear()
+            self._window.clear()
+            self._wheel.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        e = self._entries.get(key)
+        return e is not None and (e.expires_at is None or e.expires_at > self._clock())
+
+    def keys(self) -> List[Hashable]:
+        with self._lock:
+            return list(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hit_rate, 4),
+                "evictions": self.evictions,
+                "expired": self.expired,
+            }
+
+
+# ---------------------------------------------------------------------------
+# Redis tier
+# ---------------------------------------------------------------------------
+class _LocalPipeline:
+    def __init__(self, client: "LocalRedis") -> None:
+        self._client = client
+        self._ops: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        def queue(*args, **kwargs):
+            self._ops.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> List[Any]:
+        ops, self._ops = self._ops, []
+        return [await getattr(self._client, name)(*args, **kwargs) for name, args, kwargs in ops]
+
+    async def __aenter__(self) -> "_LocalPipeline":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._ops = []
+
+
+class LocalRedis:
+    """In-process stand-in for the ``redis.asyncio`` commands the cache uses."""
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        self._clock = clock
+        self._data: Dict[str, Any] = {}
+        self._expiry: Dict[str, float] = {}
+        self.commands: List[str] = []  # command log, for tests
+
+    def _live(self, key: str) -> bool:
+        exp = self._expiry.get(key)
+        if exp is not None and exp <= self._clock():
+            self._data.pop(key, None)
+            self._expiry.pop(key, None)
+        return key in self._data
+
+    async def ping(self) -> bool:
+        return True
+
+    async def get(self, key: str) -> Optional[str]:
+        self.commands.append("get")
+        return self._data.get(key) if self._live(key) else None
+
+    async def mget(self, *keys) -> List[Optional[str]]:
+        self.commands.append("mget")
+        keys = keys[0] if len(keys) == 1 and isinstance(keys[0], (list, tuple)) else keys
+        return [self._data.get(k) if self._live(k) else None for k in keys]
+
+    async def set(self, key: str, value: Any, ex: Optional[int] = None) -> bool:
+        self.commands.append("set")
+        self._data[key] = value
+        self._expiry.pop(key, None)
+        if ex is not None:
+            self._expiry[key] = self._clock() + ex
+        return True
+
+    async def setex(self, key: str, ttl: int, value: Any) -> bool:
+        await self.set(key, value, ex=ttl)
+        self.commands[-1] = "setex"
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        self.commands.append("delete")
+        n = 0
+        for k in keys:
+            if self._live(k):
+                n += 1
+            self._data.pop(k, None)
+            self._expiry.pop(k, None)
+        return n
+
+    unlink = delete
+
+    async def sadd(self, key: str, *members: str) -> int:
+        self.commands.append("sadd")
+        if not self._live(key):
+            self._data[key] = set()
+        s = self._data[key]
+        before = len(s)
+        s.update(members)
+        return len(s) - before
+
+    async def smembers(self, key: str) -> Set[str]:
+        self.commands.append("smembers")
+        return set(self._data.get(key, ())) if self._live(key) else set()
+
+    async def pttl(self, key: str) -> int:
+        self.commands.append("pttl")
+        if not self._live(key):
+            return -2
+        exp = self._expiry.get(key)
+        return -1 if exp is None else max(0, int((exp - self._clock()) * 1000))
+
+    async def expire(self, key: str, ttl: int) -> bool:
+        self.commands.append("expire")
+        if not self._live(key):
+            return False
+        self._expiry[key] = self._clock() + ttl
+        return True
+
+    async def keys(self, pattern: str = "*") -> List[str]:
+        self.commands.append("keys")
+        return [k for k in list(self._data) if self._live(k) and fnmatch.fnmatchcase(k, pattern)]
+
+    async def scan(self, cursor: int = 0, match: Optional[str] = None, count: int = 10) -> Tuple[int, List[str]]:
+        self.commands.append("scan")
+        names = sorted(self._data)
+        batch = names[cursor : cursor + count]
+        nxt = cursor + count if cursor + count < len(names) else 0
+        return nxt, [k for k in batch if self._live(k) and (match is None or fnmatch.fnmatchcase(k, match))]
+
+    async def scan_iter(self, match: Optional[str] = None, count: int = 10):
+        cursor = 0
+        while True:
+            cursor, keys = await self.scan(cursor, match=match, count=count)
+            for k in keys:
+                yield k
+            if cursor == 0:
+                return
+
+    def pipeline(self, transaction: bool = True) -> _LocalPipeline:
+        return _LocalPipeline(self)
+
+
+def redis_from_url(url: str):
+    """A Redis client for `url`; ``memory://`` gives a ``LocalRedis``."""
+    if url.startswith("memory://"):
+        return LocalRedis()
+    import redis.asyncio as redis  # optional dependency
+
+    return redis.from_url(url)
+
+
+def _text(v: Any) -> str:
+    return v.decode("utf-8") if isinstance(v, (bytes, bytearray)) else v
+
+
+class RedisTier:
+    """JSON values in Redis with per-tag key sets and SCAN-based prefix deletes.
+
+    `key_prefix` namespaces every key this tier touches.  A tagged key also
+    records its tags (under ``<tag_prefix>of:<key>``) so that ``get_entry``
+    can hand them to the memory tier along with the remaining TTL.
+    """
+
+    def __init__(self, client: Any, tag_prefix: str = "cachetag:", scan_count: int = 500, key_prefix: str = "") -> None:
+        self.client = client
+        self.tag_prefix = tag_prefix
+        self.scan_count = scan_count
+        self.key_prefix = key_prefix
+
+    def _key(self, key: str) -> str:
+        return self.key_prefix + key
+
+    def _tags_key(self, key: str) -> str:
+        return f"{self.tag_prefix}of:{self.key_prefix}{key}"
+
+    async def get(self, key: str) -> Any:
+        raw = await self.client.get(self._key(key))
+        return _MISSING if raw is None else json.loads(raw)
+
+    async def get_entry(self, key: str) -> Any:
+        """``(value, remaining ttl or None, tags)`` for `key` in one round
+        trip, or ``_MISSING``."""
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.get(self._key(key))
+            pipe.pttl(self._key(key))
+            pipe.get(self._tags_key(key))
+            raw, pttl, tags = await pipe.execute()
+        if raw is None:
+            return _MISSING
+        ttl = pttl / 1000.0 if pttl is not None and pttl >= 0 else None
+        return json.loads(raw), ttl, tuple(json.loads(tags)) if tags else ()
+
+    async def get_many(self, keys: List[str]) -> List[Any]:
+        if not keys:
+            return []
+        raws = await self.client.mget([self._key(k) for k in keys])
+        return [_MISSING if raw is None else json.loads(raw) for raw in raws]
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        payload = json.dumps(value, default=str)
+        tags = tuple(tags)
+        ex = None if ttl is None else max(1, int(math.ceil(ttl)))
+        async with self.client.pipeline(transaction=False) as pipe:
+            if ex is None:
+                pipe.set(self._key(key), payload)
+            else:
+                pipe.setex(self._key(key), ex, payload)
+            if tags:
+                pipe.set(self._tags_key(key), json.dumps(tags), ex=ex)
+            else:
+                pipe.delete(self._tags_key(key))
+            for tag in tags:
+                pipe.sadd(self.tag_prefix + tag, self._key(key))
+                if ex is not None:
+                    pipe.expire(self.tag_prefix + tag, ex)
+            await pipe.execute()
+
+    async def delete(self, *keys: str) -> int:
+        return await self._delete_raw([self._key(k) for k in keys])
+
+    async def _delete_raw(self, keys: List[str]) -> int:
+        """Delete full Redis keys (prefix included) and their tag records."""
+        if not keys:
+            return 0
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.delete(*keys)
+            pipe.delete(*[f"{self.tag_prefix}of:{k}" for k in keys])
+            n, _ = await pipe.execute()
+        return int(n)
+
+    async def _delete_batches(self, keys: Iterable[str], batch: int) -> int:
+        n, chunk = 0, []
+        for k in keys:
+            chunk.append(k)
+            if len(chunk) >= batch:
+                n += await self._delete_raw(chunk)
+                chunk = []
+        if chunk:
+            n += await self._delete_raw(chunk)
+        return n
+
+    async def invalidate_tag(self, tag: str) -> int:
+        members = [_text(m) for m in await self.client.smembers(self.tag_prefix + tag)]
+        n = await self._delete_batches(members, self.scan_count)
+        await self.client.delete(self.tag_prefix + tag)
+        return n
+
+    async def invalidate_prefix(self, prefix: str) -> int:
+        """Delete keys starting with `prefix`, found incrementally with SCAN."""
+        pattern = "".join("\\" + c if c in "*?[]\\" else c for c in self._key(prefix)) + "*"
+        keys = [_text(k) async for k in self.client.scan_iter(match=pattern, count=self.scan_count)]
+        return await self._delete_batches(keys, self.scan_count)
+
+
+class TwoTierCache:
+    """Memory in front of an optional Redis tier."""
+
+    def __init__(self, memory: MemoryCache, redis: Optional[RedisTier] = None) -> None:
+        self.memory = memory
+        self.redis = redis
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        value, tier = await self.lookup(key)
+        return default if tier is None else value
+
+    async def lookup(self, key: str) -> Tuple[Any, Optional[str]]:
+        """``(value, tier)`` where tier is ``"memory"``, ``"redis"`` or None
+        (miss, value ``_MISSING``).  Redis hits are promoted with their
+        remaining TTL and tags."""
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value, "memory"
+        if self.redis is not None:
+            entry = await self.redis.get_entry(key)
+            if entry is not _MISSING:
+                value, ttl, tags = entry
+                self.memory.set(key, value, ttl=ttl, tags=tags)
+                _inc(cache_tier_hits, cache=self.memory.name, tier="redis")
+                return value, "redis"
+        return _MISSING, None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()) -> None:
+        tags = tuple(tags)
+        self.memory.set(key, value, ttl=ttl, tags=tags)
+        if self.redis is not None:
+            await self.redis.set(key, value, ttl=self.memory.default_ttl if ttl is None else ttl, tags=tags)
+
+    async def delete(self, key: str) -> int:
+        n = int(self.memory.delete(key))
+        if self.redis is not None:
+            n += await self.redis.delete(key)
+        return n
+
+    async def invalidate_tag(self, tag: str) -> int:
+        n = self.memory.invalidate_tag(tag)
+        if self.redis is not None:
+            n += await self.redis.invalidate_tag(tag)
+        return n
+
+    async def invalidate_prefix(self, prefix: str) -> int:
+        n = self.memory.invalidate_prefix(prefix)
+        if self.redis is not None:
+            n += await self.redis.invalidate_prefix(prefix)
+        return n
+
+
+__all__ = [
+    "FrequencySketch",
+    "LocalRedis",
+    "MemoryCache",
+    "RedisTier",
+    "TTLWheel",
+    "TwoTierCache",
+    "redis_from_url",
+]
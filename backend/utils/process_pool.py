@@ -0,0 +1,93 @@
+"""
+Lazily created, process-wide worker pools for CPU-bound fan-out.
+
+``SharedProcessPool`` owns one ``ProcessPoolExecutor`` per subsystem:
+
+* workers start with ``forkserver`` (``spawn`` where that is unavailable),
+  never ``fork``, so they do not inherit the server's threads, event loop or
+  open connections;
+* the size comes from an environment variable; unset, it is the CPU count
+  capped at ``DEFAULT_MAX_WORKERS`` so several pools on one host do not each
+  claim every core;
+* a pool broken by a dead worker (``BrokenProcessPool``) is dropped so the
+  next call starts a fresh one instead of failing forever;
+* ``shutdown_process_pools`` stops every pool, from the application lifespan.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+
+
+def _mp_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class SharedProcessPool:
+    """A process pool created on first use and replaced when it breaks."""
+
+    def __init__(self, name: str, env: str, max_default: int = DEFAULT_MAX_WORKERS) -> None:
+        self.name = name
+        self.env = env
+        self.max_default = max_default
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        _POOLS.append(self)
+
+    def workers(self) -> int:
+        raw = os.getenv(self.env)
+        if raw:
+            return int(raw)
+        return min(os.cpu_count() or 1, self.max_default)
+
+    def get(self) -> Optional[Executor]:
+        """The pool, or None when it is disabled (one worker) or cannot start."""
+        workers = self.workers()
+        if workers <= 1:
+            return None
+        with self._lock:
+            if self._pool is None:
+                try:
+                    self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context())
+                except (OSError, NotImplementedError, ValueError) as e:
+                    logger.warning(f"{self.name} process pool unavailable, running inline: {e}")
+                    return None
+            return self._pool
+
+    def discard(self, pool: Executor, exc: BaseException) -> None:
+        """Drop `pool` if `exc` says it is broken; other errors leave it in place."""
+        if not isinstance(exc, BrokenProcessPool):
+            return
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_POOLS: List[SharedProcessPool] = []
+
+
+def shutdown_process_pools(wait: bool = True) -> None:
+    """Stop every shared pool that has been started."""
+    for pool in _POOLS:
+        pool.shutdown(wait=wait)
+
+
+__all__ = ["DEFAULT_MAX_WORKERS", "SharedProcessPool", "shutdown_process_pools"]
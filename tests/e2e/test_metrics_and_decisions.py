@@ -47,6 +47,7 @@ sys_modules["backend.services.approval_policy_service"] = approval_module
 spec_ap.loader.exec_module(approval_module)  # type: ignore
 ApprovalPolicyService = approval_module.ApprovalPolicyService
 
+from backend.utils.cache import LocalRedis
 from backend.utils.tenant_context import set_tenant_id
 
 app = FastAPI()
@@ -60,18 +61,6 @@ async def metrics_endpoint():
 
 TENANT = "e2e-tenant"
 
-class FakeRedis:
-    def __init__(self):
-        self.store = {}
-    async def get(self, key: str):
-        return self.store.get(key)
-    async def setex(self, key: str, ttl: int, val: str):
-        self.store[key] = val
-        return True
-    async def delete(self, key: str):
-        self.store.pop(key, None)
-        return True
-
 class DummySession:
     class _Row:
         def to_dict(self):
@@ -123,7 +112,7 @@ async def test_policy_cache_metrics_hits_and_misses(monkeypatch):
     assert scrape_metric(after.content, "policy_cache_hits_total", labels) >= scrape_metric(before.content, "policy_cache_hits_total", labels) + 1
 
     # Now test redis hit
-    fake = FakeRedis()
+    fake = LocalRedis()
     # Clear memory
     PolicyCache._mem.pop(TENANT, None)
     # Write redis payload directly
@@ -140,7 +129,7 @@ async def test_policy_cache_metrics_hits_and_misses(monkeypatch):
 
     # Miss path: memory & redis miss → DB load + dogpile
     PolicyCache._mem.pop(TENANT, None)
-    fake.store.clear()
+    await fake.delete(f"policy:{TENANT}")
     before = client.get("/metrics")
     _ = await PolicyCache.get(DummySession(), TENANT)
     after = client.get("/metrics")